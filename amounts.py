@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Fixed-Point Amounts
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Donation amounts are carried through the monitor as integer base units
+(1 SATOX = 100,000,000 units) so filters and totals are exact. Values are
+only turned back into SATOX strings when rendered for display.
+
+Conversion rule used throughout: ints are already base units; floats,
+strings and Decimals are SATOX-denominated values.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Dict, Optional, Union
+
+COIN = 100000000
+DECIMALS = 8
+
+AmountLike = Union[int, float, str, Decimal]
+
+
+def parse_amount(value: Union[float, str, Decimal]) -> int:
+    """Convert a SATOX-denominated value to integer base units
+
+    Raises ValueError if the value is not a number or has more than
+    8 decimal places.
+    """
+    if isinstance(value, float):
+        # repr() gives the shortest string that round-trips, e.g. 0.1 -> '0.1'
+        value = repr(value)
+    try:
+        units = Decimal(value).scaleb(DECIMALS)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not units.is_finite() or units != units.to_integral_value():
+        raise ValueError(f"Amount has more than {DECIMALS} decimal places: {value!r}")
+    return int(units)
+
+
+def rpc_amount_units(value: Union[int, Decimal]) -> int:
+    """Base units for an amount field of a JSON-RPC reply decoded with parse_float=Decimal
+
+    RPC amounts are SATOX whether written as 2.5 or 5, so unlike
+    coerce_amount() an int is scaled too.
+    """
+    if isinstance(value, int):
+        return value * COIN
+    return int(value.scaleb(DECIMALS).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def coerce_amount(value: AmountLike) -> int:
+    """Return base units for an int (passed through) or a SATOX value"""
+    if isinstance(value, bool):
+        raise TypeError("Amounts cannot be booleans")
+    if isinstance(value, int):
+        return value
+    return parse_amount(value)
+
+
+def format_amount(units: int, places: int = 2) -> str:
+    """Render base units as a SATOX string with the given decimal places"""
+    quantum = Decimal(1).scaleb(-places)
+    return format(Decimal(units).scaleb(-DECIMALS).quantize(quantum, rounding=ROUND_HALF_EVEN), 'f')
+
+
+class DonationTotals:
+    """Exact running totals of donations, optionally tracked against a goal"""
+
+    def __init__(self, goal: Optional[int] = None):
+        self.goal = goal
+        self.total = 0
+        self.count = 0
+        self.by_address: Dict[str, int] = {}
+
+    def add(self, address: str, amount: int) -> None:
+        """Add a donation of amount base units from address"""
+        self.total += amount
+        self.count += 1
+        self.by_address[address] = self.by_address.get(address, 0) + amount
+
+    def remove(self, address: str, amount: int) -> None:
+        """Reverse a previously added donation"""
+        self.total -= amount
+        self.count -= 1
+        remaining = self.by_address.get(address, 0) - amount
+        if remaining:
+            self.by_address[address] = remaining
+        else:
+            self.by_address.pop(address, None)
+
+    def goal_progress(self) -> Optional[float]:
+        """Return progress towards the goal as a fraction (display only)"""
+        if not self.goal:
+            return None
+        return self.total / self.goal
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert totals to dictionary for serialization"""
+        return {
+            'total': self.total,
+            'count': self.count,
+            'goal': self.goal,
+            'by_address': dict(self.by_address)
+        }
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Historical Backfill
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Reconstructs donation history and totals for the watched addresses by
+scanning a block height range. The range is split into chunks that a
+process pool fetches with getblock (verbosity 2) and filters in parallel;
+results are merged back in height order, written to the donation store
+and checkpointed so an interrupted backfill can resume.
+
+Each worker process has its own RPC scheduler and the workers split
+the configured rate between them. The backfill priority class therefore
+only orders calls inside one worker: it is not coordinated with a
+monitor running in another process, so cap --rpc-rate to leave the
+node headroom for live detection while both run.
+
+Usage:
+    python backfill.py --start 100000 [--end 120000] [--workers 4] [--rpc-rate 10] [--no-resume]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from amounts import DonationTotals, format_amount
+from confirmations import CONFIRMED
+from ingestion import match_outputs
+from rpc_client import PRIORITY_BACKFILL
+
+# (height, block time, txid, address, amount in base units)
+Donation = Tuple[int, int, str, str, int]
+
+DEFAULT_CHUNK_SIZE = 250
+DEFAULT_CHECKPOINT = "backfill_checkpoint.json"
+BLOCKS_PER_BATCH = 25
+
+# Monitor instance owned by each worker process
+_worker_monitor = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """Process pool initializer: one RPC client per worker"""
+    global _worker_monitor
+    from wallet_monitor import SatoxWalletMonitor, initialize
+    # The parent process owns the rotating log file
+    initialize(log_path=None)
+    _worker_monitor = SatoxWalletMonitor(config)
+
+
+def scan_range(start: int, end: int) -> Tuple[int, int, List[Donation]]:
+    """Fetch blocks start..end (inclusive) and return matching donations"""
+    monitor = _worker_monitor
+    watched = monitor.watched_addresses
+    heights = list(range(start, end + 1))
+    donations: List[Donation] = []
+
+    for offset in range(0, len(heights), BLOCKS_PER_BATCH):
+        batch = heights[offset:offset + BLOCKS_PER_BATCH]
+        hashes = monitor.rpc_batch([("getblockhash", [height]) for height in batch], priority=PRIORITY_BACKFILL)
+        if any(block_hash is None for block_hash in hashes):
+            raise RuntimeError(f"Could not fetch block hashes for heights {batch[0]}-{batch[-1]}")
+        blocks = monitor.rpc_batch([("getblock", [block_hash, 2]) for block_hash in hashes],
+                                   priority=PRIORITY_BACKFILL)
+        for height, block in zip(batch, blocks):
+            if block is None:
+                raise RuntimeError(f"Could not fetch block at height {height}")
+            block_time = block.get("time", 0)
+            for tx in block.get("tx", ()):
+                for txid, address, amount, _ in match_outputs(tx, watched, height):
+                    donations.append((height, block_time, txid, address, amount))
+
+    return start, end, donations
+
+
+def split_range(start: int, end: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split an inclusive height range into consecutive chunks"""
+    return [(low, min(end, low + chunk_size - 1)) for low in range(start, end + 1, chunk_size)]
+
+
+class BackfillError(RuntimeError):
+    """A chunk could not be scanned; the checkpoint stops before it"""
+
+    def __init__(self, start: int, end: int, reason: str):
+        super().__init__(f"heights {start}-{end}: {reason}")
+        self.start = start
+        self.end = end
+
+
+class Checkpoint:
+    """Resumable backfill progress persisted as JSON"""
+
+    def __init__(self, path: str, start: int, end: int, addresses: List[str]):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.addresses = sorted(addresses)
+        self.next_height = start
+        self.totals = DonationTotals()
+
+    def load(self) -> bool:
+        """Restore progress if the checkpoint matches this backfill"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if (data.get("start"), data.get("end"), data.get("addresses")) != (self.start, self.end, self.addresses):
+            return False
+        self.next_height = data["next_height"]
+        totals = data.get("totals", {})
+        self.totals.total = totals.get("total", 0)
+        self.totals.count = totals.get("count", 0)
+        self.totals.by_address = dict(totals.get("by_address", {}))
+        return True
+
+    def save(self) -> None:
+        """Atomically write the checkpoint"""
+        data = {
+            "start": self.start,
+            "end": self.end,
+            "addresses": self.addresses,
+            "next_height": self.next_height,
+            "totals": self.totals.to_dict(),
+            "updated": time.time()
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    @property
+    def complete(self) -> bool:
+        return self.next_height > self.end
+
+
+def run_backfill(monitor, start: int, end: int, workers: int = 4, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 checkpoint_path: str = DEFAULT_CHECKPOINT, resume: bool = True,
+                 config: Optional[Dict[str, Any]] = None, progress=print) -> Checkpoint:
+    """Backfill donations for monitor's watched addresses over start..end
+
+    Chunks are scanned by a process pool; completed chunks are merged in
+    height order so the store and checkpoint only ever advance over a
+    contiguous prefix of the range. Raises BackfillError for the first
+    chunk a worker could not scan, after merging everything before it.
+    """
+    checkpoint = Checkpoint(checkpoint_path, start, end, list(monitor.watched_addresses))
+    if resume and checkpoint.load():
+        progress(f"↩️  Resuming from height {checkpoint.next_height}")
+    if checkpoint.complete:
+        return checkpoint
+
+    worker_config = dict(config or {})
+    worker_config.setdefault("rpc_url", monitor.rpc_url)
+    worker_config.setdefault("rpc_urls", list(monitor.rpc_urls))
+    worker_config.setdefault("wallet_address", monitor.wallet_address)
+    worker_config["watch_addresses"] = sorted(monitor.watched_addresses)
+    # Workers split the RPC rate between them; nothing shares it with a running monitor
+    rate = worker_config.get("rpc_rate", monitor.rpc_scheduler.rate)
+    if rate:
+        worker_config["rpc_rate"] = rate / max(1, workers)
+
+    chunks = split_range(checkpoint.next_height, end, chunk_size)
+    total_blocks = end - checkpoint.next_height + 1
+    started = time.monotonic()
+    done_blocks = 0
+    ready: Dict[int, Tuple[int, List[Donation]]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(worker_config,)) as pool:
+        chunk_of = {pool.submit(scan_range, low, high): (low, high) for low, high in chunks}
+        pending = set(chunk_of)
+        failure: Optional[BackfillError] = None
+        while pending and failure is None:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    low, high, donations = future.result()
+                except RuntimeError as e:
+                    low, high = chunk_of[future]
+                    if failure is None or low < failure.start:
+                        failure = BackfillError(low, high, str(e))
+                    continue
+                ready[low] = (high, donations)
+
+            # Merge the contiguous prefix in height order
+            while checkpoint.next_height in ready:
+                high, donations = ready.pop(checkpoint.next_height)
+                donations = [donation for donation in sorted(donations) if donation[4] >= monitor.min_donation]
+                for _, _, _, address, amount in donations:
+                    checkpoint.totals.add(address, amount)
+                done_blocks += high - checkpoint.next_height + 1
+                checkpoint.next_height = high + 1
+                # Checkpoint before writing so a crash in between cannot
+                # write the chunk a second time on resume
+                checkpoint.save()
+                for height, block_time, txid, address, amount in donations:
+                    monitor.log_donation(amount, address, timestamp=block_time)
+                    monitor.record_donation(CONFIRMED, txid, address, "Unknown", amount, timestamp=block_time)
+                monitor.commit_donations()
+
+                elapsed = max(time.monotonic() - started, 1e-9)
+                rate = done_blocks / elapsed
+                remaining = (end - high) / rate if rate else 0
+                progress(f"📦 {done_blocks}/{total_blocks} blocks (height {high}) - "
+                         f"{rate:.1f} blocks/s - ETA {remaining:.0f}s")
+
+        if failure is not None:
+            for future in pending:
+                future.cancel()
+            raise failure
+
+    return checkpoint
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Backfill Satoxcoin donation history over a block range")
+    parser.add_argument("--start", type=int, required=True, help="First block height to scan")
+    parser.add_argument("--end", type=int, help="Last block height to scan (default: current tip)")
+    parser.add_argument("--address", action="append", default=[], help="Extra address to scan (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Blocks per work unit")
+    parser.add_argument("--rpc-rate", type=float,
+                        help="RPC calls per second shared by all workers (default: SATOX_RPC_RATE)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    from wallet_monitor import SatoxWalletMonitor, initialize
+
+    initialize()
+    print("⏪ Satoxcoin Donation Backfill")
+    print("=" * 50)
+
+    config = {}
+    if args.address:
+        config["watch_addresses"] = args.address
+    if args.rpc_rate is not None:
+        config["rpc_rate"] = args.rpc_rate
+    monitor = SatoxWalletMonitor(config)
+    if not monitor.watched_addresses:
+        print("❌ No valid addresses to scan. Set SATOX_DONATION_ADDRESS or pass --address")
+        return 1
+
+    end = args.end
+    if end is None:
+        end = monitor.rpc_call("getblockcount")
+        if end is None:
+            print("❌ Could not query the current block height")
+            return 1
+    if end < args.start:
+        print(f"❌ End height {end} is below start height {args.start}")
+        return 1
+
+    print(f"   Addresses: {len(monitor.watched_addresses)}")
+    print(f"   Heights: {args.start}-{end} in chunks of {args.chunk_size} over {args.workers} workers")
+    print()
+
+    started = time.monotonic()
+    try:
+        checkpoint = run_backfill(monitor, args.start, end, workers=args.workers, chunk_size=args.chunk_size,
+                                  checkpoint_path=args.checkpoint, resume=not args.no_resume, config=config)
+    except BackfillError as e:
+        print(f"❌ Backfill stopped at {e}")
+        print(f"   Progress is saved in {args.checkpoint}; run again to resume")
+        return 1
+    finally:
+        monitor.close()
+    elapsed = time.monotonic() - started
+
+    print()
+    print(f"✅ Backfill complete in {elapsed:.1f}s")
+    print(f"   Donations: {checkpoint.totals.count}")
+    print(f"   Total: {format_amount(checkpoint.totals.total, 8)} SATOX")
+    for address, amount in sorted(checkpoint.totals.by_address.items()):
+        print(f"   {address}: {format_amount(amount, 8)} SATOX")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Block File Scanner
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Offline donation scanner that reads Satox Core's blocks/blk*.dat files
+directly instead of going through RPC. Each file is memory-mapped and
+walked record by record through a memoryview, so block data is never
+copied; only transaction outputs are decoded and matched against the
+watched addresses by hash160.
+
+Run it while the node is stopped (or against a copy of the blocks
+directory): a running node may be appending to the newest file.
+
+The block files also keep stale blocks from abandoned forks, and telling
+them apart needs the X16R/KawPoW block hashes, which are not computed
+here. A payment mined both in a stale block and in its main chain
+replacement is reported once, from the block stored first. One only ever
+mined in a stale block is still reported.
+
+Usage:
+    python blockfile_scanner.py [--datadir ~/.satoxcoin] [--address S...] [--record]
+"""
+
+import argparse
+import glob
+import mmap
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from amounts import DonationTotals, format_amount
+from confirmations import CONFIRMED
+from chain_decode import DecodeError, ScriptMatcher, iter_block_transactions
+from satox_address import validate_many
+
+# (height or None, block time, txid, address, amount in base units)
+BlockDonation = Tuple[Optional[int], int, str, str, int]
+
+DEFAULT_DATADIR = os.path.expanduser("~/.satoxcoin")
+BLOCK_FILE_PATTERN = "blk[0-9][0-9][0-9][0-9][0-9].dat"
+RECORD_HEADER_SIZE = 8  # network magic + block size
+
+
+def block_files(blocks_dir: str) -> List[str]:
+    """Return the blk*.dat files in blocks_dir in file number order"""
+    return sorted(glob.glob(os.path.join(blocks_dir, BLOCK_FILE_PATTERN)))
+
+
+def read_network_magic(blocks_dir: str) -> Optional[bytes]:
+    """Return the 4-byte network magic from the first block file"""
+    for path in block_files(blocks_dir):
+        with open(path, "rb") as f:
+            magic = f.read(4)
+        if len(magic) == 4 and magic != b"\x00\x00\x00\x00":
+            return magic
+    return None
+
+
+class BlockFileScanner:
+    """Scans memory-mapped block files for payments to watched addresses"""
+
+    def __init__(self, blocks_dir: str, addresses: Iterable[str], magic: Optional[bytes] = None,
+                 kawpow_activation_time: int = 0):
+        self.blocks_dir = blocks_dir
+        self.matcher = ScriptMatcher(addresses)
+        self.magic = magic or read_network_magic(blocks_dir)
+        self.kawpow_activation_time = kawpow_activation_time
+        self.blocks = 0
+        self.transactions = 0
+        self.bytes_scanned = 0
+        self.errors = 0
+        # Payments skipped because an earlier block (a stale fork) already had them
+        self.duplicates = 0
+
+    def scan(self, start_height: Optional[int] = None,
+             end_height: Optional[int] = None) -> Iterator[BlockDonation]:
+        """Yield donations from every block file
+
+        Block files are written in download order, not height order, so
+        callers that need ordering should sort the results by height. Each
+        (txid, address) is yielded once, however many blocks contain it.
+        """
+        seen: Set[Tuple[str, str]] = set()
+        for path in block_files(self.blocks_dir):
+            for donation in self.scan_file(path, start_height, end_height):
+                key = (donation[2], donation[3])
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                yield donation
+
+    def scan_file(self, path: str, start_height: Optional[int] = None,
+                  end_height: Optional[int] = None) -> Iterator[BlockDonation]:
+        """Yield donations from one blk*.dat file"""
+        if self.magic is None or os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield from self._scan_view(mapped, view, start_height, end_height)
+            finally:
+                view.release()
+
+    def _scan_view(self, mapped, view: memoryview, start_height: Optional[int],
+                   end_height: Optional[int]) -> Iterator[BlockDonation]:
+        magic = self.magic
+        matcher = self.matcher
+        size = len(view)
+        position = 0
+
+        while position + RECORD_HEADER_SIZE <= size:
+            record_magic = view[position:position + 4]
+            if record_magic != magic:
+                if record_magic == b"\x00\x00\x00\x00":
+                    # Pre-allocated, not yet written space at the end of the file
+                    break
+                # Resynchronise on the next record after a corrupt stretch
+                self.errors += 1
+                position = mapped.find(magic, position + 1)
+                if position < 0:
+                    break
+                continue
+
+            block_size = int.from_bytes(view[position + 4:position + 8], "little")
+            start = position + RECORD_HEADER_SIZE
+            end = start + block_size
+            if end > size:
+                # Truncated final record (node stopped mid-write)
+                break
+            position = end
+
+            block = view[start:end]
+            try:
+                header, transactions = iter_block_transactions(block, 0, self.kawpow_activation_time)
+                if header.height is not None:
+                    if start_height is not None and header.height < start_height:
+                        continue
+                    if end_height is not None and header.height > end_height:
+                        continue
+                self.blocks += 1
+                self.bytes_scanned += block_size
+                for tx in transactions:
+                    self.transactions += 1
+                    paid = matcher.match_transaction(tx)
+                    if paid:
+                        txid = tx.txid
+                        for address, amount in paid.items():
+                            yield header.height, header.time, txid, address, amount
+            except DecodeError:
+                self.errors += 1
+            finally:
+                block.release()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Scan Satox Core block files for donations without RPC")
+    parser.add_argument("--datadir", default=DEFAULT_DATADIR, help="Satox Core data directory")
+    parser.add_argument("--blocks-dir", help="Blocks directory (default: <datadir>/blocks)")
+    parser.add_argument("--address", action="append", default=[], help="Address to scan for (repeatable)")
+    parser.add_argument("--start", type=int, help="Ignore blocks below this height")
+    parser.add_argument("--end", type=int, help="Ignore blocks above this height")
+    parser.add_argument("--magic", help="Network magic as 8 hex digits (default: read from blk00000.dat)")
+    parser.add_argument("--kawpow-activation-time", type=int, default=0,
+                        help="Unix time from which block headers are 120-byte KawPoW headers")
+    parser.add_argument("--record", action="store_true", help="Write found donations to the donation log")
+    args = parser.parse_args(argv)
+
+    import wallet_monitor
+
+    # Only --record writes to the log, through a monitor built for that
+    wallet_monitor.initialize(log_path=wallet_monitor.log_file if args.record else None)
+    print("📂 Satoxcoin Block File Scanner")
+    print("=" * 50)
+
+    # --address replaces the configured donation and watched addresses
+    candidates = args.address or [wallet_monitor.DONATION_ADDRESS] + wallet_monitor.WATCH_ADDRESSES
+    addresses = sorted(address for address, valid in validate_many(candidates).items() if valid)
+    if not addresses:
+        print("❌ No valid addresses to scan. Set SATOX_DONATION_ADDRESS or pass --address")
+        return 1
+    min_donation = wallet_monitor.MIN_DONATION
+
+    blocks_dir = args.blocks_dir or os.path.join(os.path.expanduser(args.datadir), "blocks")
+    if not block_files(blocks_dir):
+        print(f"❌ No block files found in {blocks_dir}")
+        return 1
+
+    magic = None
+    if args.magic:
+        try:
+            magic = bytes.fromhex(args.magic)
+        except ValueError:
+            magic = b""
+        if len(magic) != 4:
+            print(f"❌ Invalid network magic: {args.magic}")
+            return 1
+
+    scanner = BlockFileScanner(blocks_dir, addresses, magic=magic,
+                               kawpow_activation_time=args.kawpow_activation_time)
+    print(f"   Blocks: {blocks_dir}")
+    print(f"   Addresses: {len(addresses)}")
+    print()
+
+    started = time.monotonic()
+    donations = sorted(scanner.scan(args.start, args.end), key=lambda d: (d[0] or 0, d[1], d[2], d[3]))
+    elapsed = max(time.monotonic() - started, 1e-9)
+
+    monitor = wallet_monitor.SatoxWalletMonitor({"watch_addresses": addresses}) if args.record else None
+    totals = DonationTotals()
+    for height, block_time, txid, address, amount in donations:
+        if amount < min_donation:
+            continue
+        totals.add(address, amount)
+        print(f"   {height} {txid} {address} {format_amount(amount, 8)} SATOX")
+        if monitor is not None:
+            monitor.log_donation(amount, address, timestamp=block_time)
+            monitor.record_donation(CONFIRMED, txid, address, "Unknown", amount, timestamp=block_time)
+    if monitor is not None:
+        monitor.close()
+
+    print()
+    print(f"✅ Scanned {scanner.blocks} blocks ({scanner.bytes_scanned / 1e6:.1f} MB) in {elapsed:.1f}s "
+          f"- {scanner.blocks / elapsed:.0f} blocks/s")
+    if scanner.errors:
+        print(f"⚠️  Skipped {scanner.errors} unreadable records")
+    if scanner.duplicates:
+        print(f"⚠️  Skipped {scanner.duplicates} payments repeated in stale blocks")
+    print(f"   Donations: {totals.count}")
+    print(f"   Total: {format_amount(totals.total, 8)} SATOX")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Binary Chain Decoding
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Minimal decoders for serialized Satoxcoin blocks and transactions, shared
+by the block file scanner and the P2P listener. Decoders work on
+memoryviews and only materialise what they need: inputs are skipped,
+outputs are yielded as (value, script) slices, and a txid is only hashed
+when a caller asks for it.
+"""
+
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from satox_address import decode_address, double_sha256, PUBKEY_ADDRESS_VERSION
+
+# Ravencoin-family block headers grow from 80 to 120 bytes once KawPoW is
+# active (nNonce is replaced by nHeight, nNonce64 and mix_hash)
+LEGACY_HEADER_SIZE = 80
+KAWPOW_HEADER_SIZE = 120
+
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+
+
+class DecodeError(ValueError):
+    """Raised when serialized data is truncated or malformed"""
+
+
+def read_varint(buf, offset: int) -> Tuple[int, int]:
+    """Read a CompactSize integer, returning (value, new offset)"""
+    try:
+        first = buf[offset]
+        if first < 0xfd:
+            return first, offset + 1
+        if first == 0xfd:
+            return buf[offset + 1] | (buf[offset + 2] << 8), offset + 3
+        if first == 0xfe:
+            return _UINT32.unpack_from(buf, offset + 1)[0], offset + 5
+        return _UINT64.unpack_from(buf, offset + 1)[0], offset + 9
+    except (IndexError, struct.error):
+        raise DecodeError("Truncated varint")
+
+
+def encode_varint(value: int) -> bytes:
+    """Serialize an integer as CompactSize"""
+    if value < 0xfd:
+        return bytes([value])
+    if value <= 0xffff:
+        return b'\xfd' + value.to_bytes(2, 'little')
+    if value <= 0xffffffff:
+        return b'\xfe' + value.to_bytes(4, 'little')
+    return b'\xff' + value.to_bytes(8, 'little')
+
+
+def p2pkh_script(hash160: bytes) -> bytes:
+    """Return the pay-to-pubkey-hash scriptPubKey for hash160"""
+    return b'\x76\xa9\x14' + hash160 + b'\x88\xac'
+
+
+def script_hash160(script) -> Optional[bytes]:
+    """Return the hash160 paid by a plain P2PKH script, else None"""
+    if (len(script) == 25 and script[0] == 0x76 and script[1] == 0xa9 and script[2] == 0x14
+            and script[23] == 0x88 and script[24] == 0xac):
+        return bytes(script[3:23])
+    return None
+
+
+class ParsedTransaction:
+    """Location of a transaction inside a buffer plus its decoded outputs"""
+
+    __slots__ = ('buf', 'start', 'end', 'outputs', '_txid_parts')
+
+    def __init__(self, buf, start: int, end: int, outputs: List[Tuple[int, memoryview]], txid_parts):
+        self.buf = buf
+        self.start = start
+        self.end = end
+        self.outputs = outputs
+        self._txid_parts = txid_parts
+
+    @property
+    def txid(self) -> str:
+        """Transaction id (hex, display byte order), computed on demand"""
+        if len(self._txid_parts) == 1:
+            data = self.buf[self._txid_parts[0][0]:self._txid_parts[0][1]]
+        else:
+            # Segwit serialization: hash without marker, flag and witnesses
+            data = b''.join(bytes(self.buf[a:b]) for a, b in self._txid_parts)
+        return double_sha256(data)[::-1].hex()
+
+
+def parse_transaction(buf, offset: int) -> ParsedTransaction:
+    """Parse one transaction starting at offset, skipping over its inputs"""
+    start = offset
+    try:
+        offset += 4  # version
+        segwit = buf[offset] == 0 and buf[offset + 1] == 1
+        if segwit:
+            offset += 2
+        body_start = offset
+
+        input_count, offset = read_varint(buf, offset)
+        for _ in range(input_count):
+            offset += 36  # previous outpoint
+            script_length, offset = read_varint(buf, offset)
+            offset += script_length + 4  # script + sequence
+
+        output_count, offset = read_varint(buf, offset)
+        outputs = []
+        for _ in range(output_count):
+            value = _UINT64.unpack_from(buf, offset)[0]
+            script_length, offset = read_varint(buf, offset + 8)
+            outputs.append((value, buf[offset:offset + script_length]))
+            offset += script_length
+        body_end = offset
+
+        if segwit:
+            for _ in range(input_count):
+                item_count, offset = read_varint(buf, offset)
+                for _ in range(item_count):
+                    item_length, offset = read_varint(buf, offset)
+                    offset += item_length
+
+        offset += 4  # lock time
+    except (IndexError, struct.error):
+        raise DecodeError("Truncated transaction")
+    if offset > len(buf):
+        raise DecodeError("Truncated transaction")
+
+    if segwit:
+        parts = [(start, start + 4), (body_start, body_end), (offset - 4, offset)]
+    else:
+        parts = [(start, offset)]
+    return ParsedTransaction(buf, start, offset, outputs, parts)
+
+
+class BlockHeader:
+    """Fields of a block header needed by the scanners"""
+
+    __slots__ = ('version', 'prev_hash', 'time', 'height', 'size')
+
+    def __init__(self, version: int, prev_hash: str, time: int, height: Optional[int], size: int):
+        self.version = version
+        self.prev_hash = prev_hash
+        self.time = time
+        self.height = height
+        self.size = size
+
+
+def parse_block_header(buf, offset: int = 0, kawpow_activation_time: int = 0) -> BlockHeader:
+    """Parse a block header; KawPoW headers carry the block height"""
+    if len(buf) - offset < LEGACY_HEADER_SIZE:
+        raise DecodeError("Truncated block header")
+    version = _UINT32.unpack_from(buf, offset)[0]
+    prev_hash = bytes(buf[offset + 4:offset + 36])[::-1].hex()
+    time = _UINT32.unpack_from(buf, offset + 68)[0]
+    if time >= kawpow_activation_time:
+        if len(buf) - offset < KAWPOW_HEADER_SIZE:
+            raise DecodeError("Truncated block header")
+        height = _UINT32.unpack_from(buf, offset + 76)[0]
+        return BlockHeader(version, prev_hash, time, height, KAWPOW_HEADER_SIZE)
+    return BlockHeader(version, prev_hash, time, None, LEGACY_HEADER_SIZE)
+
+
+def iter_block_transactions(buf, offset: int = 0, kawpow_activation_time: int = 0
+                            ) -> Tuple[BlockHeader, Iterator[ParsedTransaction]]:
+    """Return a block's header and a lazy iterator over its transactions"""
+    header = parse_block_header(buf, offset, kawpow_activation_time)
+    tx_count, position = read_varint(buf, offset + header.size)
+
+    def transactions() -> Iterator[ParsedTransaction]:
+        current = position
+        for _ in range(tx_count):
+            tx = parse_transaction(buf, current)
+            current = tx.end
+            yield tx
+
+    return header, transactions()
+
+
+class ScriptMatcher:
+    """Matches output scripts against a watched address set by hash160"""
+
+    def __init__(self, addresses, versions=(PUBKEY_ADDRESS_VERSION,)):
+        self.by_hash160: Dict[bytes, str] = {}
+        for address in addresses:
+            try:
+                version, hash160 = decode_address(address)
+            except ValueError:
+                continue
+            if version in versions:
+                self.by_hash160[hash160] = address
+
+    def match(self, script) -> Optional[str]:
+        """Return the watched address paid by script, if any"""
+        hash160 = script_hash160(script)
+        if hash160 is None:
+            return None
+        return self.by_hash160.get(hash160)
+
+    def match_transaction(self, tx: ParsedTransaction) -> Dict[str, int]:
+        """Return {address: total value} for outputs paying watched addresses"""
+        paid: Dict[str, int] = {}
+        for value, script in tx.outputs:
+            address = self.match(script)
+            if address is not None:
+                paid[address] = paid.get(address, 0) + value
+        return paid
+
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Confirmation Tracking
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Tracks donations from first sighting until they reach the required number
+of confirmations. Pending donations are bucketed by the height at which
+they mature, so a new block only touches the donations maturing at that
+height. Donations are also indexed by inclusion height so a reorg can
+retract exactly the donations that lived in the orphaned blocks.
+Donations that are never mined are forgotten once no source has reported
+them for a reorg window's worth of blocks.
+
+A donation is one (txid, address) pair, so a transaction paying several
+watched addresses is tracked, and credited, once per address.
+"""
+
+import heapq
+import logging
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Alert policies
+POLICY_ZERO_CONF = "zero-conf"    # Alert on first sighting
+POLICY_CONFIRMED = "confirmed"    # Alert once N confirmations are reached
+POLICY_BOTH = "both"              # Provisional alert, then a final one
+ALERT_POLICIES = (POLICY_ZERO_CONF, POLICY_CONFIRMED, POLICY_BOTH)
+
+# Event kinds
+SEEN = "seen"
+CONFIRMED = "confirmed"
+RECONFIRMED = "reconfirmed"
+RETRACTED = "retracted"
+
+# (txid, address)
+DonationKey = Tuple[str, str]
+
+
+class TrackedDonation:
+    """A donation followed by the tracker"""
+
+    __slots__ = ('txid', 'address', 'amount', 'height', 'confirmed', 'ever_confirmed', 'last_seen')
+
+    def __init__(self, txid: str, address: str, amount: int):
+        self.txid = txid
+        self.address = address
+        self.amount = amount
+        self.height: Optional[int] = None
+        self.confirmed = False
+        self.ever_confirmed = False
+        # Tip height when a source last reported it (None before the first tip)
+        self.last_seen: Optional[int] = None
+
+    @property
+    def key(self) -> DonationKey:
+        return (self.txid, self.address)
+
+    def __repr__(self) -> str:
+        return f"TrackedDonation(txid={self.txid[:16]}..., amount={self.amount}, height={self.height})"
+
+
+class DonationEvent:
+    """State change of a tracked donation"""
+
+    __slots__ = ('kind', 'donation')
+
+    def __init__(self, kind: str, donation: TrackedDonation):
+        self.kind = kind
+        self.donation = donation
+
+    def __repr__(self) -> str:
+        return f"DonationEvent({self.kind}, {self.donation!r})"
+
+
+class ConfirmationTracker:
+    """Height-indexed pending set with reorg handling"""
+
+    def __init__(self, required_confirmations: int = 6, max_reorg_depth: int = 100):
+        self.required_confirmations = max(1, int(required_confirmations))
+        if max_reorg_depth < self.required_confirmations:
+            # Pruning must never drop a donation that is still waiting to mature
+            logger.warning(f"Reorg window of {max_reorg_depth} blocks is shorter than "
+                           f"{self.required_confirmations} confirmations; using {self.required_confirmations}")
+            max_reorg_depth = self.required_confirmations
+        self.max_reorg_depth = max_reorg_depth
+        self.tip_height: Optional[int] = None
+        self._donations: Dict[DonationKey, TrackedDonation] = {}
+        self._unconfirmed: Set[DonationKey] = set()         # not in any block
+        self._maturing: Dict[int, Set[DonationKey]] = {}   # maturity height -> donations
+        self._maturity_heap: List[int] = []
+        self._included: Dict[int, Set[DonationKey]] = {}   # inclusion height -> donations
+        self._block_hashes: Dict[int, str] = {}    # recent main chain hashes
+        self._block_heights: Dict[str, int] = {}   # the same, by hash
+        self._prune_floor = 0
+
+    def __contains__(self, key: DonationKey) -> bool:
+        return key in self._donations
+
+    def __len__(self) -> int:
+        return len(self._donations)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of donations waiting to mature"""
+        return sum(len(bucket) for bucket in self._maturing.values())
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """Height of a recent main chain block, or None if it is not one"""
+        return self._block_heights.get(block_hash)
+
+    def maturity_height(self, height: int) -> int:
+        """Height at which a donation included at height is fully confirmed"""
+        return height + self.required_confirmations - 1
+
+    def observe(self, txid: str, address: str, amount: int, height: Optional[int] = None) -> List[DonationEvent]:
+        """Record a sighting of a donation, included at height (None if unconfirmed)"""
+        events: List[DonationEvent] = []
+        key = (txid, address)
+        donation = self._donations.get(key)
+        if donation is None:
+            donation = TrackedDonation(txid, address, amount)
+            self._donations[key] = donation
+            self._unconfirmed.add(key)
+            events.append(DonationEvent(SEEN, donation))
+        elif donation.height == height:
+            donation.last_seen = self.tip_height
+            return events
+        else:
+            # Moved to another block (or back to the mempool)
+            events.extend(self._detach(donation))
+        donation.last_seen = self.tip_height
+
+        if height is not None:
+            events.extend(self._attach(donation, height))
+        return events
+
+    def connect_block(self, height: int, block_hash: Optional[str] = None) -> List[DonationEvent]:
+        """Advance the tip to height and confirm everything that matured"""
+        events: List[DonationEvent] = []
+        self.tip_height = height
+        if block_hash is not None:
+            self._record_hash(height, block_hash)
+
+        heap = self._maturity_heap
+        while heap and heap[0] <= height:
+            maturity = heapq.heappop(heap)
+            for key in self._maturing.pop(maturity, ()):
+                events.append(self._confirm(self._donations[key]))
+
+        self._prune(height - self.max_reorg_depth)
+        return events
+
+    def disconnect_above(self, fork_height: int) -> List[DonationEvent]:
+        """Undo every block above fork_height, retracting donations they contained"""
+        events: List[DonationEvent] = []
+        top = self.tip_height if self.tip_height is not None else fork_height
+        for height in range(top, fork_height, -1):
+            self._forget_hash(height)
+            for key in list(self._included.get(height, ())):
+                events.extend(self._detach(self._donations[key]))
+        self.tip_height = fork_height
+        return events
+
+    def update_tip(self, best_hash: str, get_block: Callable[[str], Optional[Dict]]) -> List[DonationEvent]:
+        """Sync to the node's best block, detecting reorgs along the way
+
+        get_block(hash) must return a block header dict with 'height' and
+        'previousblockhash' (e.g. getblock verbosity 1).
+        """
+        if self.tip_height is not None and self._block_hashes.get(self.tip_height) == best_hash:
+            return []
+
+        block = get_block(best_hash)
+        if not block:
+            return []
+        new_height = block['height']
+
+        if self.tip_height is None:
+            return self.connect_block(new_height, best_hash)
+
+        # Walk back from the new tip until we reach a block we already know
+        fork_height = None
+        walked: Dict[int, str] = {new_height: best_hash}
+        current = block
+        for _ in range(self.max_reorg_depth):
+            parent_height = current['height'] - 1
+            parent_hash = current.get('previousblockhash')
+            if parent_hash is None:
+                break
+            recorded = self._block_hashes.get(parent_height)
+            if recorded == parent_hash:
+                fork_height = parent_height
+                break
+            if recorded is None and parent_height < self._lowest_recorded_height():
+                # Older than anything we remember; assume it is shared history
+                fork_height = parent_height
+                break
+            walked[parent_height] = parent_hash
+            current = get_block(parent_hash)
+            if not current:
+                break
+
+        events: List[DonationEvent] = []
+        if fork_height is None:
+            logger.warning("Could not locate fork point within reorg window; assuming linear chain")
+            fork_height = min(self.tip_height, new_height - 1)
+        if fork_height < self.tip_height:
+            logger.warning(f"Chain reorganisation detected: rolling back to height {fork_height}")
+            events.extend(self.disconnect_above(fork_height))
+
+        for height in sorted(walked):
+            self._record_hash(height, walked[height])
+        events.extend(self.connect_block(new_height, best_hash))
+        return events
+
+    def _lowest_recorded_height(self) -> int:
+        return min(self._block_hashes) if self._block_hashes else 0
+
+    def _record_hash(self, height: int, block_hash: str) -> None:
+        self._forget_hash(height)
+        self._block_hashes[height] = block_hash
+        self._block_heights[block_hash] = height
+
+    def _forget_hash(self, height: int) -> None:
+        block_hash = self._block_hashes.pop(height, None)
+        if block_hash is not None and self._block_heights.get(block_hash) == height:
+            del self._block_heights[block_hash]
+
+    def _attach(self, donation: TrackedDonation, height: int) -> List[DonationEvent]:
+        donation.height = height
+        self._unconfirmed.discard(donation.key)
+        self._included.setdefault(height, set()).add(donation.key)
+
+        maturity = self.maturity_height(height)
+        if self.tip_height is not None and maturity <= self.tip_height:
+            return [self._confirm(donation)]
+
+        bucket = self._maturing.get(maturity)
+        if bucket is None:
+            bucket = self._maturing[maturity] = set()
+            heapq.heappush(self._maturity_heap, maturity)
+        bucket.add(donation.key)
+        return []
+
+    def _detach(self, donation: TrackedDonation) -> List[DonationEvent]:
+        height = donation.height
+        if height is None:
+            return []
+        included = self._included.get(height)
+        if included is not None:
+            included.discard(donation.key)
+            if not included:
+                del self._included[height]
+        bucket = self._maturing.get(self.maturity_height(height))
+        if bucket is not None:
+            # Stale heap entries are skipped when popped
+            bucket.discard(donation.key)
+        donation.height = None
+        # Back out of the chain: the unmined window starts again
+        donation.last_seen = self.tip_height
+        self._unconfirmed.add(donation.key)
+
+        if donation.confirmed:
+            donation.confirmed = False
+            return [DonationEvent(RETRACTED, donation)]
+        return []
+
+    def _confirm(self, donation: TrackedDonation) -> DonationEvent:
+        donation.confirmed = True
+        kind = RECONFIRMED if donation.ever_confirmed else CONFIRMED
+        donation.ever_confirmed = True
+        return DonationEvent(kind, donation)
+
+    def _prune(self, floor: int) -> None:
+        """Forget confirmed donations and block hashes too deep to be reorged,
+        and unmined donations not reported for a reorg window"""
+        if floor <= self._prune_floor:
+            return
+        for key in list(self._unconfirmed):
+            donation = self._donations[key]
+            if donation.last_seen is None:
+                # Seen before the first tip: the window starts now
+                donation.last_seen = self.tip_height
+            elif donation.last_seen < floor:
+                self._unconfirmed.discard(key)
+                del self._donations[key]
+                logger.debug(f"Forgetting unmined donation {donation.txid[:16]}...")
+        if floor - self._prune_floor > len(self._included) + len(self._block_hashes):
+            # Large jump (e.g. first block seen): scan the indexes instead
+            heights = [h for h in set(self._included) | set(self._block_hashes) if h < floor]
+        else:
+            heights = range(self._prune_floor, floor)
+        for height in heights:
+            self._forget_hash(height)
+            for key in self._included.pop(height, ()):
+                self._donations.pop(key, None)
+        self._prune_floor = floor
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Donation Ledger
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Append-only JSONL record of donation events (confirmed, reconfirmed,
+retracted), one object per line:
+
+    {"time":1735689600.0,"event":"confirmed","txid":"...","address":"S...","donor":"S...","amount":500000000}
+
+Amounts are integer base units. Next to the ledger, <ledger>.idx is a
+sparse time index: one fixed-size entry per block of BLOCK_RECORDS lines,
+giving the block's byte range and its earliest and latest event time.
+Queries memory-map the ledger and only parse the blocks whose time range
+overlaps the requested window, plus the not yet indexed tail. Blocks
+carry a min/max rather than relying on order, so backfilled events with
+old block times are still found.
+
+Usage:
+    python donation_ledger.py stats [--since 24h] [--until 2025-01-31]
+    python donation_ledger.py top [-n 10] [--by donor|address] [--since 7d]
+    python donation_ledger.py range --since 2025-01-01 [--until 2025-01-02] [--json]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from amounts import format_amount
+
+BLOCK_RECORDS = 256
+INDEX_ENTRY = struct.Struct("<QQdd")  # block start, block end, earliest time, latest time
+
+# Sign of each event in donation totals
+EVENT_SIGNS = {"confirmed": 1, "reconfirmed": 1, "retracted": -1}
+
+# The monitor writes SATOX_LEDGER relative to its log directory, next to this file
+DEFAULT_LEDGER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv("SATOX_LEDGER") or "donations.jsonl")
+
+IndexEntry = Tuple[int, int, float, float]
+
+
+def read_index(index_path: str, size: int) -> List[IndexEntry]:
+    """Index entries that lie within a ledger of size bytes"""
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    entries = []
+    end = len(data) - len(data) % INDEX_ENTRY.size
+    for entry in INDEX_ENTRY.iter_unpack(data[:end]):
+        if entry[1] > size or (entries and entry[0] != entries[-1][1]):
+            # Torn or stale: everything from here on is treated as unindexed tail
+            break
+        entries.append(entry)
+    return entries
+
+
+class DonationLedger:
+    """Appends donation events and maintains the sparse time index"""
+
+    def __init__(self, path: str, block_records: int = BLOCK_RECORDS):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.block_records = block_records
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        if self._size:
+            self._repair_torn_line()
+        entries = read_index(self.index_path, self._size)
+        # Rewrite the index without anything read_index rejected
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in entries))
+        self._index = open(self.index_path, "ab")
+        self._block_start = entries[-1][1] if entries else 0
+        self._block_count = 0
+        self._block_min = self._block_max = 0.0
+        for offset, end, event in self._scan(self._block_start):
+            self._add_to_block(offset, end, event["time"])
+
+    def append(self, event: str, txid: str, address: str, donor: str, amount: int,
+               timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Write one event (timestamp defaults to now) and return it"""
+        record = {
+            "time": round(timestamp if timestamp is not None else time.time(), 3),
+            "event": event, "txid": txid, "address": address, "donor": donor, "amount": amount,
+        }
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        offset = self._size
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line)
+        self._add_to_block(offset, self._size, record["time"])
+        return record
+
+    def close(self) -> None:
+        self._file.close()
+        self._index.close()
+
+    def _add_to_block(self, offset: int, end: int, when: float) -> None:
+        if self._block_count == 0:
+            self._block_start = offset
+            self._block_min = self._block_max = when
+        else:
+            self._block_min = min(self._block_min, when)
+            self._block_max = max(self._block_max, when)
+        self._block_count += 1
+        if self._block_count >= self.block_records:
+            self._index.write(INDEX_ENTRY.pack(self._block_start, end, self._block_min, self._block_max))
+            self._index.flush()
+            self._block_count = 0
+            self._block_start = end
+
+    def _repair_torn_line(self) -> None:
+        # A crash mid-append leaves a partial last line; terminate it so the
+        # next event starts cleanly (readers skip the unparsable fragment)
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                self._file.write(b"\n")
+                self._file.flush()
+                self._size += 1
+
+    def _scan(self, start: int) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                event = _parse(line)
+                if event is not None:
+                    yield offset, offset + len(line), event
+                offset += len(line)
+
+
+def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and "time" in event else None
+
+
+class LedgerReader:
+    """Read-only, memory-mapped view of a ledger for time-window queries"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bytes_read = 0
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.index = read_index(path + ".idx", self.size)
+
+    def __enter__(self) -> "LedgerReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def events(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Events with since <= time < until, in ledger order"""
+        low = since if since is not None else float("-inf")
+        high = until if until is not None else float("inf")
+        for start, end in self._ranges(low, high):
+            for event in self._events_in(start, end):
+                if low <= event["time"] < high:
+                    yield event
+
+    def _ranges(self, low: float, high: float) -> List[Tuple[int, int]]:
+        ranges: List[Tuple[int, int]] = []
+        for start, end, earliest, latest in self.index:
+            if latest >= low and earliest < high:
+                if ranges and ranges[-1][1] == start:
+                    ranges[-1] = (ranges[-1][0], end)
+                else:
+                    ranges.append((start, end))
+        tail = self.index[-1][1] if self.index else 0
+        if tail < self.size:
+            ranges.append((tail, self.size))
+        return ranges
+
+    def _events_in(self, start: int, end: int) -> Iterator[Dict[str, Any]]:
+        data = self._map
+        self.bytes_read += end - start
+        position = start
+        while position < end:
+            newline = data.find(b"\n", position, end)
+            if newline < 0:
+                newline = end
+            event = _parse(data[position:newline])
+            if event is not None:
+                yield event
+            position = newline + 1
+
+
+def summarize(events: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Net counts and totals of a stream of events
+
+    Like top(), a retraction cancels one donation and a reconfirmation
+    restores it, so a reorged donation is counted once. "retracted" is
+    the number of retraction events in the window.
+    """
+    count = retracted = total = 0
+    largest: Optional[Dict[str, Any]] = None
+    donors: Dict[Any, int] = {}
+    first = last = None
+    for event in events:
+        sign = EVENT_SIGNS.get(event.get("event"), 0)
+        if sign == 0:
+            continue
+        total += sign * event["amount"]
+        count += sign
+        donors[event.get("donor")] = donors.get(event.get("donor"), 0) + sign
+        if sign < 0:
+            retracted += 1
+            continue
+        if largest is None or event["amount"] > largest["amount"]:
+            largest = event
+        first = event["time"] if first is None else min(first, event["time"])
+        last = event["time"] if last is None else max(last, event["time"])
+    return {
+        "donations": count, "retracted": retracted, "total": total,
+        "donors": sum(1 for net in donors.values() if net > 0),
+        "average": total // count if count > 0 else 0, "largest": largest, "first": first, "last": last,
+    }
+
+
+def top(events: Iterator[Dict[str, Any]], n: int = 10, by: str = "donor") -> List[Tuple[str, int, int]]:
+    """(key, net total, net donations) for the n largest keys by net total"""
+    totals: Dict[str, List[int]] = {}
+    for event in events:
+        sign = EVENT_SIGNS.get(event.get("event"), 0)
+        if sign == 0:
+            continue
+        entry = totals.setdefault(event.get(by) or "Unknown", [0, 0])
+        entry[0] += sign * event["amount"]
+        entry[1] += sign
+    ranked = sorted(totals.items(), key=lambda item: (-item[1][0], item[0]))
+    return [(key, amount, count) for key, (amount, count) in ranked[:n] if amount > 0]
+
+
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """Unix time from "24h"/"7d" (ago), an ISO date/time or a Unix timestamp"""
+    match = _RELATIVE.match(value.strip())
+    if match:
+        return (now if now is not None else time.time()) - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Unrecognised time {value!r}; use e.g. 24h, 7d, 2025-01-31 or 2025-01-31T18:00")
+
+
+def mask_address(address: str, show: bool) -> str:
+    """address as S8f3**** unless show is set (short values are left alone)"""
+    return address if show or len(address) <= 8 else f"{address[:4]}****"
+
+
+def format_time(timestamp: Optional[float]) -> str:
+    """Local time of a Unix timestamp for CLI output, "-" for None"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp is not None else "-"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Query the donation ledger")
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER, help="Ledger file")
+    parser.add_argument("--show-addresses", action="store_true", help="Print full addresses instead of S8f3****")
+    commands = parser.add_subparsers(dest="command")
+    for name, description in (("stats", "Totals for a time window"), ("top", "Largest donors in a time window"),
+                              ("range", "Donation events in a time window")):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("--since", help="Start of the window: 24h, 7d, 2025-01-31, 2025-01-31T18:00 ...")
+        command.add_argument("--until", help="End of the window (exclusive), same formats")
+        if name == "top":
+            command.add_argument("-n", type=int, default=10, help="How many to list")
+            command.add_argument("--by", choices=("donor", "address"), default="donor",
+                                 help="Rank donors, or the receiving addresses")
+        if name == "range":
+            command.add_argument("--json", action="store_true", help="Print the raw JSON lines")
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not os.path.exists(args.ledger):
+        print(f"❌ No ledger at {args.ledger}")
+        return 1
+
+    with LedgerReader(args.ledger) as reader:
+        events = reader.events(since, until)
+        if args.command == "stats":
+            stats = summarize(events)
+            print(f"📒 {args.ledger}: {format_time(since) if since else 'start'} → {format_time(until) if until else 'now'}")
+            print(f"   Donations: {stats['donations']} from {stats['donors']} donors"
+                  + (f" ({stats['retracted']} retracted)" if stats['retracted'] else ""))
+            print(f"   Total: {format_amount(stats['total'], 8)} SATOX")
+            print(f"   Average: {format_amount(stats['average'], 8)} SATOX")
+            if stats["largest"]:
+                largest = stats["largest"]
+                print(f"   Largest: {format_amount(largest['amount'], 8)} SATOX from "
+                      f"{mask_address(largest['donor'], args.show_addresses)} at {format_time(largest['time'])}")
+            print(f"   First: {format_time(stats['first'])}   Last: {format_time(stats['last'])}")
+        elif args.command == "top":
+            for rank, (key, amount, count) in enumerate(top(events, args.n, args.by), 1):
+                print(f"{rank:>4}. {mask_address(key, args.show_addresses):<36}{format_amount(amount, 8):>20} SATOX"
+                      f"  ({count} donation{'s' if count != 1 else ''})")
+        else:
+            for event in events:
+                if args.json:
+                    print(json.dumps(event, separators=(",", ":")))
+                else:
+                    print(f"{format_time(event['time'])}  {event['event']:<11} {format_amount(event['amount'], 8):>18} SATOX"
+                          f"  {mask_address(event['donor'], args.show_addresses)}  {event['txid']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
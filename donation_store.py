@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Donation Store
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Optional SQLite copy of the donation events for dashboards and
+leaderboards. The monitor buffers the events of a poll cycle and hands
+them to a writer thread at the end of the cycle, which inserts the batch
+in one transaction, so the detection loop never waits on the disk.
+
+The database runs in WAL mode: readers (this CLI, a dashboard) see the
+last committed batch and never block the writer or each other. Events are
+indexed by (address, time) and (donor, time), and a trigger keeps
+daily_totals - one row per UTC day and address - up to date on every
+insert, so stats over whole days read a few hundred rows instead of
+millions. Only the partial days at the edges of a window are summed from
+the events themselves.
+
+Usage:
+    python donation_store.py stats [--since 24h] [--until 2025-01-31]
+    python donation_store.py top [-n 10] [--by donor|address] [--since 7d]
+    python donation_store.py daily [--since 30d] [--address S...]
+    python donation_store.py import [--ledger donations.jsonl]
+"""
+
+import argparse
+import logging
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from amounts import format_amount
+from donation_ledger import DEFAULT_LEDGER, EVENT_SIGNS, LedgerReader, format_time, mask_address, parse_time
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+# Pending events handed to the writer without waiting for the end of the cycle
+MAX_BATCH = 500
+
+# The monitor writes SATOX_DONATION_DB relative to its log directory, next to this file
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.getenv("SATOX_DONATION_DB") or "donations.db")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS donations ("
+    " id INTEGER PRIMARY KEY, time REAL NOT NULL, event TEXT NOT NULL, sign INTEGER NOT NULL,"
+    " txid TEXT NOT NULL, address TEXT NOT NULL, donor TEXT NOT NULL, amount INTEGER NOT NULL,"
+    # A backfill run twice records the same block time, so it is not counted twice
+    " UNIQUE (txid, address, event, time))",
+    "CREATE INDEX IF NOT EXISTS donations_address_time ON donations (address, time)",
+    "CREATE INDEX IF NOT EXISTS donations_donor_time ON donations (donor, time)",
+    "CREATE TABLE IF NOT EXISTS daily_totals ("
+    " day TEXT NOT NULL, address TEXT NOT NULL, donations INTEGER NOT NULL DEFAULT 0,"
+    " retracted INTEGER NOT NULL DEFAULT 0, total INTEGER NOT NULL DEFAULT 0, largest INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (day, address)) WITHOUT ROWID",
+    "CREATE TRIGGER IF NOT EXISTS donations_daily_totals AFTER INSERT ON donations BEGIN"
+    " INSERT OR IGNORE INTO daily_totals (day, address) VALUES (date(NEW.time, 'unixepoch'), NEW.address);"
+    " UPDATE daily_totals SET donations = donations + (NEW.sign > 0), retracted = retracted + (NEW.sign < 0),"
+    " total = total + NEW.sign * NEW.amount,"
+    " largest = CASE WHEN NEW.sign > 0 AND NEW.amount > largest THEN NEW.amount ELSE largest END"
+    " WHERE day = date(NEW.time, 'unixepoch') AND address = NEW.address;"
+    " END",
+)
+
+# Constant SQL text, so sqlite3's statement cache prepares each of these once per connection
+INSERT = ("INSERT OR IGNORE INTO donations (time, event, sign, txid, address, donor, amount)"
+          " VALUES (?, ?, ?, ?, ?, ?, ?)")
+SUM_EVENTS = ("SELECT COUNT(CASE WHEN sign > 0 THEN 1 END), COUNT(CASE WHEN sign < 0 THEN 1 END),"
+              " SUM(sign * amount), MAX(CASE WHEN sign > 0 THEN amount END) FROM donations"
+              " WHERE {address}time >= ? AND time < ?")
+SUM_DAYS = ("SELECT SUM(donations), SUM(retracted), SUM(total), MAX(NULLIF(largest, 0)) FROM daily_totals"
+            " WHERE day >= ? AND day < ?{address}")
+
+Event = Tuple[float, str, int, str, str, str, int]
+
+
+def day_of(timestamp: float) -> str:
+    """UTC date a timestamp is totalled under, as daily_totals.day"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+class DonationStore:
+    """Batched writer of donation events and their aggregate queries"""
+
+    def __init__(self, path: str, max_batch: int = MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self.inserted = 0
+        self.batches = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = self._connect()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            for statement in SCHEMA:
+                self._db.execute(statement)
+        self._pending: List[Event] = []
+        self._lock = threading.Lock()
+        self._batches: "queue.Queue[Optional[List[Event]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._readers = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level="DEFERRED")
+        # WAL only needs to sync at checkpoints; a crash can lose the last batch, never corrupt
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA busy_timeout=5000")
+        return db
+
+    def add(self, event: str, txid: str, address: str, donor: str, amount: int,
+            timestamp: Optional[float] = None) -> None:
+        """Buffer one event (timestamp defaults to now) until the next commit()"""
+        sign = EVENT_SIGNS.get(event, 0)
+        if sign == 0:
+            return
+        when = round(timestamp if timestamp is not None else time.time(), 3)
+        with self._lock:
+            self._pending.append((when, event, sign, txid, address, donor or "Unknown", amount))
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self.commit()
+
+    def commit(self) -> int:
+        """Hand the buffered events to the writer thread as one transaction"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_batches, name="donation-store", daemon=True)
+                self._writer.start()
+            self._batches.put(batch)
+        return len(batch)
+
+    def flush(self) -> None:
+        """Commit what is buffered and wait until every batch is on disk"""
+        self.commit()
+        if self._writer is not None:
+            self._batches.join()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._batches.put(None)
+        if writer is not None:
+            writer.join()
+        for db in self._reader_connections:
+            db.close()
+        self._reader_connections = []
+        self._readers = threading.local()
+        self._db.close()
+
+    def _write_batches(self) -> None:
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is None:
+                    return
+                with self._db:
+                    # rowcount skips duplicates and the trigger's own changes
+                    inserted = self._db.executemany(INSERT, batch).rowcount
+                self.inserted += inserted
+                self.batches += 1
+            except sqlite3.Error as e:
+                logger.error(f"Could not store {len(batch)} donation events in {self.path}: {e}")
+            finally:
+                self._batches.task_done()
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection; it never shares the writer's"""
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            db = self._readers.db = self._connect()
+            db.execute("PRAGMA query_only=ON")
+            with self._lock:
+                self._reader_connections.append(db)
+        return db
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def totals(self, since: Optional[float] = None, until: Optional[float] = None,
+               address: Optional[str] = None) -> Dict[str, Any]:
+        """Net donations, retractions, net total and largest donation in [since, until)
+
+        As in donation_ledger, a retraction cancels a donation and a
+        reconfirmation restores it. Whole UTC days come from daily_totals; events are only summed for
+        the partial days at either end of the window.
+        """
+        db = self._reader()
+        low = since if since is not None else -math.inf
+        high = until if until is not None else math.inf
+        first_day = math.ceil(low / DAY) * DAY if since is not None else low
+        last_day = math.floor(high / DAY) * DAY if until is not None else high
+        parts = []
+        if first_day >= last_day:
+            parts.append(self._sum_events(db, low, high, address))
+        else:
+            if low < first_day:
+                parts.append(self._sum_events(db, low, first_day, address))
+            parts.append(self._sum_days(db, first_day, last_day, address))
+            if last_day < high:
+                parts.append(self._sum_events(db, last_day, high, address))
+        retracted = sum(part[1] or 0 for part in parts)
+        count = sum(part[0] or 0 for part in parts) - retracted
+        total = sum(part[2] or 0 for part in parts)
+        largest = [part[3] for part in parts if part[3] is not None]
+        return {
+            "donations": count, "retracted": retracted, "total": total,
+            "average": total // count if count > 0 else 0, "largest": max(largest) if largest else 0,
+        }
+
+    def top(self, since: Optional[float] = None, until: Optional[float] = None, n: int = 10,
+            by: str = "donor") -> List[Tuple[str, int, int]]:
+        """(key, net total, net donations) for the n largest donors or addresses by net total"""
+        column = {"donor": "donor", "address": "address"}[by]
+        rows = self._reader().execute(
+            f"SELECT {column}, SUM(sign * amount) AS net, SUM(sign) FROM donations"
+            f" WHERE time >= ? AND time < ?"
+            f" GROUP BY {column} HAVING net > 0 ORDER BY net DESC, {column} LIMIT ?",
+            (_bound(since, -math.inf), _bound(until, math.inf), n),
+        ).fetchall()
+        return [(key, amount, count) for key, amount, count in rows]
+
+    def daily(self, since: Optional[float] = None, until: Optional[float] = None,
+              address: Optional[str] = None) -> List[Tuple[str, int, int, int]]:
+        """(UTC day, net donations, retracted, net total) from the day of since up to the day of until"""
+        rows = self._reader().execute(
+            "SELECT day, SUM(donations) - SUM(retracted), SUM(retracted), SUM(total) FROM daily_totals"
+            " WHERE day >= ? AND day < ?" + (" AND address = ?" if address else "") + " GROUP BY day ORDER BY day",
+            (_day_bound(since, ""), _day_bound(until, "~")) + ((address,) if address else ()),
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def history(self, donor: str, since: Optional[float] = None, until: Optional[float] = None,
+                limit: int = 100) -> List[Dict[str, Any]]:
+        """A donor's most recent events in the window, newest first"""
+        rows = self._reader().execute(
+            "SELECT time, event, txid, address, donor, amount FROM donations"
+            " WHERE donor = ? AND time >= ? AND time < ? ORDER BY time DESC LIMIT ?",
+            (donor, _bound(since, -math.inf), _bound(until, math.inf), limit),
+        ).fetchall()
+        keys = ("time", "event", "txid", "address", "donor", "amount")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _sum_events(self, db: sqlite3.Connection, low: float, high: float,
+                    address: Optional[str]) -> Tuple[Any, ...]:
+        if address:
+            return db.execute(SUM_EVENTS.format(address="address = ? AND "), (address, low, high)).fetchone()
+        return db.execute(SUM_EVENTS.format(address=""), (low, high)).fetchone()
+
+    def _sum_days(self, db: sqlite3.Connection, first: float, last: float,
+                  address: Optional[str]) -> Tuple[Any, ...]:
+        days = (_day_bound(first, ""), _day_bound(last, "~"))
+        if address:
+            return db.execute(SUM_DAYS.format(address=" AND address = ?"), days + (address,)).fetchone()
+        return db.execute(SUM_DAYS.format(address=""), days).fetchone()
+
+
+def _bound(timestamp: Optional[float], default: float) -> float:
+    return timestamp if timestamp is not None else default
+
+
+def _day_bound(timestamp: Optional[float], default: str) -> str:
+    # "" sorts before and "~" after every YYYY-MM-DD
+    return day_of(timestamp) if timestamp is not None and math.isfinite(timestamp) else default
+
+
+def import_ledger(store: DonationStore, ledger_path: str) -> int:
+    """Copy the events of a JSONL ledger into store; returns how many were new"""
+    before = store.inserted
+    with LedgerReader(ledger_path) as reader:
+        for event in reader.events():
+            store.add(event["event"], event["txid"], event["address"], event.get("donor") or "Unknown",
+                      event["amount"], timestamp=event["time"])
+    store.flush()
+    return store.inserted - before
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Query the SQLite donation store")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Donation database")
+    parser.add_argument("--show-addresses", action="store_true", help="Print full addresses instead of S8f3****")
+    commands = parser.add_subparsers(dest="command")
+    for name, description in (("stats", "Totals for a time window"), ("top", "Largest donors in a time window"),
+                              ("daily", "Totals per UTC day"), ("import", "Load a JSONL donation ledger")):
+        command = commands.add_parser(name, help=description)
+        if name == "import":
+            command.add_argument("--ledger", default=DEFAULT_LEDGER, help="Ledger file")
+            continue
+        command.add_argument("--since", help="Start of the window: 24h, 7d, 2025-01-31, 2025-01-31T18:00 ...")
+        command.add_argument("--until", help="End of the window (exclusive), same formats")
+        if name == "top":
+            command.add_argument("-n", type=int, default=10, help="How many to list")
+            command.add_argument("--by", choices=("donor", "address"), default="donor",
+                                 help="Rank donors, or the receiving addresses")
+        else:
+            command.add_argument("--address", help="Only donations to this address")
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+
+    if args.command == "import":
+        if not os.path.exists(args.ledger):
+            print(f"❌ No ledger at {args.ledger}")
+            return 1
+        store = DonationStore(args.db)
+        try:
+            added = import_ledger(store, args.ledger)
+        finally:
+            store.close()
+        print(f"📥 Imported {added} new events from {args.ledger} into {args.db}")
+        return 0
+
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not os.path.exists(args.db):
+        print(f"❌ No donation database at {args.db}")
+        return 1
+
+    store = DonationStore(args.db)
+    try:
+        if args.command == "stats":
+            stats = store.totals(since, until, args.address)
+            print(f"🗄️ {args.db}: {format_time(since) if since else 'start'} → {format_time(until) if until else 'now'}")
+            print(f"   Donations: {stats['donations']}"
+                  + (f" ({stats['retracted']} retracted)" if stats['retracted'] else ""))
+            print(f"   Total: {format_amount(stats['total'], 8)} SATOX")
+            print(f"   Average: {format_amount(stats['average'], 8)} SATOX")
+            print(f"   Largest: {format_amount(stats['largest'], 8)} SATOX")
+        elif args.command == "top":
+            for rank, (key, amount, count) in enumerate(store.top(since, until, args.n, args.by), 1):
+                print(f"{rank:>4}. {mask_address(key, args.show_addresses):<36}{format_amount(amount, 8):>20} SATOX"
+                      f"  ({count} donation{'s' if count != 1 else ''})")
+        else:
+            for day, count, retracted, total in store.daily(since, until, args.address):
+                print(f"{day}  {count:>6} donation{'s' if count != 1 else ' '}"
+                      + (f" ({retracted} retracted)" if retracted else "")
+                      + f"  {format_amount(total, 8):>20} SATOX")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Ingestion Sources
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Alternative ways of discovering donations besides polling the wallet's
+listtransactions. Each source returns (txid, address, amount, height)
+tuples that the monitor feeds into SatoxWalletMonitor.handle_donation().
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (txid, address, amount in base units, inclusion height or None)
+Payment = Tuple[str, str, int, Optional[int]]
+
+RpcCall = Callable[..., Any]
+RpcBatch = Callable[[List[Tuple[str, list]]], List[Any]]
+
+
+def output_addresses(script_pubkey: Dict[str, Any]) -> List[str]:
+    """Return the addresses paid by a decoded scriptPubKey"""
+    addresses = script_pubkey.get('addresses')
+    if addresses:
+        return addresses
+    address = script_pubkey.get('address')
+    return [address] if address else []
+
+
+def match_outputs(tx: Dict[str, Any], watched: Set[str], height: Optional[int] = None) -> List[Payment]:
+    """Sum the outputs of a decoded transaction that pay watched addresses"""
+    paid: Dict[str, int] = {}
+    for vout in tx.get('vout', ()):
+        addresses = output_addresses(vout.get('scriptPubKey', {}))
+        # Multisig outputs cannot be attributed to a single donation address
+        if len(addresses) == 1 and addresses[0] in watched:
+            paid[addresses[0]] = paid.get(addresses[0], 0) + vout.get('value', 0)
+    txid = tx.get('txid')
+    return [(txid, address, amount, height) for address, amount in paid.items()]
+
+
+class MempoolWatcher:
+    """Detects donations by diffing getrawmempool between ticks
+
+    Only txids that appeared since the previous tick are fetched, in
+    batched getrawtransaction calls. At most max_fetch_per_tick are fetched
+    per tick; the rest wait in a backlog and are dropped if they leave the
+    mempool before being fetched (the wallet poll still sees mined ones).
+    """
+
+    def __init__(self, rpc_call: RpcCall, rpc_batch: RpcBatch, watched: Set[str],
+                 batch_size: int = 100, max_fetch_per_tick: int = 1000, prime: bool = True):
+        self.rpc_call = rpc_call
+        self.rpc_batch = rpc_batch
+        self.watched = watched
+        self.batch_size = batch_size
+        self.max_fetch_per_tick = max_fetch_per_tick
+        self.known: Set[str] = set()
+        self.primed = not prime
+        self._backlog: Dict[str, None] = {}   # insertion-ordered set
+        self.fetched = 0
+
+    def poll(self) -> List[Payment]:
+        """Diff the mempool against the previous tick and decode new transactions"""
+        txids = self.rpc_call("getrawmempool")
+        if txids is None:
+            return []
+        current = set(txids)
+
+        if not self.primed:
+            # Transactions already waiting at startup are the wallet poll's job
+            self.known = current
+            self.primed = True
+            return []
+
+        new = current - self.known
+        self.known = current
+
+        backlog = self._backlog
+        if backlog:
+            for txid in [txid for txid in backlog if txid not in current]:
+                del backlog[txid]
+        for txid in new:
+            backlog[txid] = None
+
+        return self._fetch(self._take(self.max_fetch_per_tick))
+
+    @property
+    def backlog_size(self) -> int:
+        """Number of new txids still waiting to be fetched"""
+        return len(self._backlog)
+
+    def _take(self, count: int) -> List[str]:
+        taken = []
+        for txid in self._backlog:
+            if len(taken) >= count:
+                break
+            taken.append(txid)
+        for txid in taken:
+            del self._backlog[txid]
+        return taken
+
+    def _fetch(self, txids: Iterable[str]) -> List[Payment]:
+        payments: List[Payment] = []
+        txids = list(txids)
+        for start in range(0, len(txids), self.batch_size):
+            chunk = txids[start:start + self.batch_size]
+            results = self.rpc_batch([("getrawtransaction", [txid, 1]) for txid in chunk])
+            self.fetched += len(chunk)
+            for tx in results:
+                if tx:
+                    payments.extend(match_outputs(tx, self.watched))
+        return payments
+
+
+class AddressIndexSource:
+    """Wallet-less detection through the node's address index
+
+    Requires a node started with addressindex=1. One getaddressdeltas
+    call covers every watched address for a whole height range, and one
+    getaddressmempool call covers their unconfirmed payments, so the
+    donation keys never need to be loaded in the node's wallet.
+
+    Each poll re-scans the last rescan_depth blocks so payments moved by a
+    shallow reorg are picked up again; repeats are de-duplicated downstream.
+    """
+
+    def __init__(self, rpc_call: RpcCall, watched: Set[str], start_height: Optional[int] = None,
+                 rescan_depth: int = 6, max_range: int = 1000):
+        self.rpc_call = rpc_call
+        self.watched = watched
+        self.next_height = start_height
+        self.rescan_depth = rescan_depth
+        self.max_range = max_range
+        self._mempool_seen: Set[Tuple[str, str]] = set()
+
+    def poll(self) -> List[Payment]:
+        """Return payments confirmed since the last poll plus new mempool payments"""
+        if not self.watched:
+            return []
+        addresses = sorted(self.watched)
+        payments = self.poll_confirmed(addresses)
+        payments.extend(self.poll_mempool(addresses))
+        return payments
+
+    def poll_confirmed(self, addresses: List[str]) -> List[Payment]:
+        """Query getaddressdeltas for all blocks up to the current tip"""
+        tip = self.rpc_call("getblockcount")
+        if tip is None:
+            return []
+        if self.next_height is None:
+            # Start following from the current tip
+            self.next_height = tip + 1
+
+        payments: List[Payment] = []
+        start = max(0, self.next_height - self.rescan_depth)
+        while start <= tip:
+            end = min(tip, start + self.max_range - 1)
+            deltas = self.rpc_call("getaddressdeltas", [{"addresses": addresses, "start": start, "end": end}])
+            if deltas is None:
+                # Try the same range again next time
+                return payments
+            payments.extend(self._aggregate(deltas, confirmed=True))
+            start = end + 1
+            self.next_height = max(self.next_height, start)
+        return payments
+
+    def poll_mempool(self, addresses: List[str]) -> List[Payment]:
+        """Query getaddressmempool and return payments not reported before"""
+        entries = self.rpc_call("getaddressmempool", [{"addresses": addresses}])
+        if entries is None:
+            return []
+        payments = self._aggregate(entries, confirmed=False)
+        current = {(txid, address) for txid, address, _, _ in payments}
+        new = [payment for payment in payments if (payment[0], payment[1]) not in self._mempool_seen]
+        self._mempool_seen = current
+        return new
+
+    def _aggregate(self, deltas: Iterable[Dict[str, Any]], confirmed: bool) -> List[Payment]:
+        """Net the deltas per transaction and address, keeping net receipts
+
+        Netting keeps change returned to a watched address from counting
+        as a donation.
+        """
+        net: Dict[Tuple[str, str], int] = {}
+        heights: Dict[Tuple[str, str], Optional[int]] = {}
+        for delta in deltas:
+            if delta.get("address") not in self.watched:
+                continue
+            key = (delta["txid"], delta["address"])
+            net[key] = net.get(key, 0) + delta.get("satoshis", 0)
+            heights[key] = delta.get("height") if confirmed else None
+        return [(txid, address, amount, heights[(txid, address)])
+                for (txid, address), amount in net.items() if amount > 0]
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Log Pipeline
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Moves log I/O off the detection path: loggers only put records on a queue
+(QueueHandler), and a listener thread writes them to the console and to a
+log file that rotates by size and age. Rotated segments are gzipped on a
+background thread so a rollover never stalls the listener either.
+
+Identical warnings and errors repeated within a window (an RPC error
+logged every poll while the node is down) are collapsed into one line
+plus a count of what was suppressed.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_INTERVAL = 24 * 3600.0
+DEFAULT_BACKUPS = 7
+DEFAULT_REPEAT_WINDOW = 60.0
+
+# Distinct messages remembered by RepeatFilter before old ones are forgotten
+MAX_TRACKED_MESSAGES = 1000
+
+
+class RawFormatter(logging.Formatter):
+    """Formats records, except ones marked raw, which are written verbatim"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "raw", False):
+            return record.getMessage()
+        return super().format(record)
+
+
+def _not_raw(record: logging.LogRecord) -> bool:
+    return not getattr(record, "raw", False)
+
+
+def _segment_order(entry: str) -> Tuple[str, int]:
+    # <name>.<YYYYmmdd-HHMMSS>[-<n>].gz: n orders segments rotated within one second
+    stamp = entry[:-len(".gz")].rsplit(".", 1)[-1]
+    if stamp.count("-") == 2:
+        stamp, sequence = stamp.rsplit("-", 1)
+        return stamp, int(sequence) if sequence.isdigit() else 0
+    return stamp, 0
+
+
+class RotatingGzipFileHandler(logging.handlers.BaseRotatingHandler):
+    """File handler rolling over at max_bytes or every interval seconds
+
+    The current file is renamed to <name>.<YYYYmmdd-HHMMSS> and compressed
+    to .gz on a background thread; only the newest backup_count compressed
+    segments are kept (0 keeps all). A limit of 0 disables that trigger.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES, interval: float = DEFAULT_INTERVAL,
+                 backup_count: int = DEFAULT_BACKUPS, encoding: str = "utf-8",
+                 clock: Callable[[], float] = time.time):
+        super().__init__(filename, "a", encoding)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.clock = clock
+        self._compressors: List[threading.Thread] = []
+        self._last_segment = ("", 0)
+        # Age counts from the last write, so restarts do not reset the clock
+        started = os.path.getmtime(self.baseFilename) if os.path.getsize(self.baseFilename) else clock()
+        self.rollover_at = started + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        position = self.stream.tell()
+        if position == 0:
+            return False
+        if self.max_bytes > 0 and position + len(self.format(record)) + 1 >= self.max_bytes:
+            return True
+        return self.interval > 0 and self.clock() >= self.rollover_at
+
+    def doRollover(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            segment = self._segment_name()
+            os.rename(self.baseFilename, segment)
+            compressor = threading.Thread(target=self._compress, args=(segment,), name="log-compress", daemon=True)
+            compressor.start()
+            self._compressors = [thread for thread in self._compressors if thread.is_alive()] + [compressor]
+        self.stream = self._open()
+        self.rollover_at = self.clock() + self.interval
+
+    def segments(self) -> List[str]:
+        """Compressed segments, oldest first"""
+        directory, name = os.path.split(self.baseFilename)
+        entries = [entry for entry in os.listdir(directory) if entry.startswith(name + ".") and entry.endswith(".gz")]
+        return [os.path.join(directory, entry) for entry in sorted(entries, key=_segment_order)]
+
+    def wait_for_compression(self, timeout: Optional[float] = None) -> None:
+        for thread in list(self._compressors):
+            thread.join(timeout)
+
+    def close(self) -> None:
+        self.wait_for_compression()
+        super().close()
+
+    def _segment_name(self) -> str:
+        stamp = datetime.fromtimestamp(self.clock()).strftime("%Y%m%d-%H%M%S")
+        # Never reuse a sequence number within a second, even once pruned
+        sequence = self._last_segment[1] + 1 if self._last_segment[0] == stamp else 0
+        while True:
+            segment = f"{self.baseFilename}.{stamp}" + (f"-{sequence}" if sequence else "")
+            if not (os.path.exists(segment) or os.path.exists(segment + ".gz")):
+                break
+            sequence += 1
+        self._last_segment = (stamp, sequence)
+        return segment
+
+    def _compress(self, segment: str) -> None:
+        import gzip
+        import shutil
+        try:
+            with open(segment, "rb") as source, gzip.open(segment + ".gz.tmp", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(segment + ".gz.tmp", segment + ".gz")
+            os.remove(segment)
+        except OSError as e:
+            sys.stderr.write(f"Could not compress log segment {segment}: {e}\n")
+            return
+        if self.backup_count > 0:
+            for old in self.segments()[:-self.backup_count]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+
+class RepeatFilter(logging.Filter):
+    """Collapses identical records at or above level repeated within window seconds
+
+    The first record passes; repeats inside the window are dropped and
+    counted, and the first one after the window notes how many were.
+    """
+
+    def __init__(self, window: float = DEFAULT_REPEAT_WINDOW, level: int = logging.WARNING,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self.clock = clock
+        self.suppressed = 0
+        # (logger, level, message) -> [time it last passed, repeats dropped since]
+        self._seen: Dict[Tuple[str, int, str], List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.window <= 0:
+            return True
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = self.clock()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                self.suppressed += 1
+                return False
+            repeats = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            if len(self._seen) > MAX_TRACKED_MESSAGES:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+        if repeats:
+            record.msg = f"{message} ({repeats} identical messages suppressed)"
+            record.args = None
+        return True
+
+
+class _Listener(logging.handlers.QueueListener):
+    """Queue listener that also acknowledges flush markers"""
+
+    def handle(self, record: logging.LogRecord) -> None:
+        done = getattr(record, "flush_event", None)
+        if done is not None:
+            done.set()
+            return
+        super().handle(record)
+
+
+class LogPipeline:
+    """Root logger -> queue -> listener thread -> console and rotating file"""
+
+    def __init__(self, path: str, level: int = logging.INFO, fmt: str = LOG_FORMAT,
+                 max_bytes: int = DEFAULT_MAX_BYTES, interval: float = DEFAULT_INTERVAL,
+                 backup_count: int = DEFAULT_BACKUPS, repeat_window: float = DEFAULT_REPEAT_WINDOW,
+                 console: bool = True):
+        self.path = os.path.abspath(path)
+        self.level = level
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        self.file_handler = RotatingGzipFileHandler(self.path, max_bytes, interval, backup_count)
+        self.file_handler.setFormatter(RawFormatter(fmt))
+        handlers: List[logging.Handler] = [self.file_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(logging.Formatter(fmt))
+            console_handler.addFilter(_not_raw)
+            handlers.append(console_handler)
+        self.handlers = handlers
+        self.repeat_filter = RepeatFilter(repeat_window)
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.handler.addFilter(self.repeat_filter)
+        self.listener = _Listener(self.queue, *handlers, respect_handler_level=True)
+        self._running = False
+
+    def start(self) -> None:
+        """Route the root logger through the queue"""
+        if self._running:
+            return
+        self.listener.start()
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self._running = True
+
+    def append(self, line: str) -> None:
+        """Queue a line written verbatim to the log file only (not the console)"""
+        record = logging.LogRecord("donations", logging.INFO, __file__, 0, line, None, None)
+        record.raw = True
+        self.queue.put_nowait(record)
+
+    def flush(self) -> None:
+        """Wait until every record queued so far has been written"""
+        if not self._running:
+            return
+        done = threading.Event()
+        marker = logging.LogRecord("log_pipeline", logging.DEBUG, __file__, 0, "", None, None)
+        marker.flush_event = done
+        self.queue.put_nowait(marker)
+        done.wait(5)
+
+    def stop(self) -> None:
+        """Write out what is queued, then detach and close the handlers"""
+        if not self._running:
+            return
+        self._running = False
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Metrics
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Counters, histograms and gauges rendered in the Prometheus text exposition
+format (served at /metrics by the overlay server).
+
+Updates must stay cheap on the polling path, so counters and histograms
+keep one shard per thread: a thread only ever writes its own shard, with
+no lock, and a scrape adds the shards together. Gauges are callbacks read
+at scrape time (queue depth, dedup set size, cache counters), so they cost
+nothing between scrapes.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Seconds; covers a local RPC round trip up to a stalled node
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+Samples = Union[float, Dict[Labels, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    """Name, help text and label names shared by every metric type"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """Per-thread shards: writes touch only the calling thread's dict"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            # First write from this thread; shards outlive their thread so totals never drop
+            shard: dict = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _collect(self) -> List[Tuple[Labels, object]]:
+        with self._lock:
+            shards = list(self._shards)
+        # dict.items() is copied in one step under the GIL, so a writer never
+        # changes a shard while it is being read
+        return [item for shard in shards for item in list(shard.items())]
+
+
+class Counter(_Sharded):
+    """Monotonic count, optionally split by labels"""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return sum(count for key, count in self._collect() if key == labels)
+
+    def _totals(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for key, count in self._collect():
+            totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(count)}"
+                for key, count in sorted(self._totals().items())]
+
+
+class Histogram(_Sharded):
+    """Observations counted into cumulative buckets, plus their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        # [count per bucket..., +Inf bucket, sum, count]
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        return sum(values[-1] for key, values in self._collect() if key == labels)
+
+    def _samples(self) -> List[str]:
+        merged: Dict[Labels, List[float]] = {}
+        for key, values in self._collect():
+            values = list(values)
+            total = merged.get(key)
+            merged[key] = values if total is None else [a + b for a, b in zip(total, values)]
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        names = self.labelnames + ("le",)
+        for key, values in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{labels} {values[-1]}")
+        return lines
+
+
+class Callback(_Metric):
+    """Gauge or counter read from the instrumented object at scrape time
+
+    callback returns a number, or a dict of label value tuples to numbers.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Samples],
+                 labelnames: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def _samples(self) -> List[str]:
+        samples = self.callback()
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(samples.items())]
+
+
+class MetricsRegistry:
+    """The metrics of one monitor, rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], Samples],
+              labelnames: Sequence[str] = ()) -> Callback:
+        return self._add(Callback(name, documentation, callback, labelnames))
+
+    def counter_callback(self, name: str, documentation: str, callback: Callable[[], Samples],
+                         labelnames: Sequence[str] = ()) -> Callback:
+        return self._add(Callback(name, documentation, callback, labelnames, kind="counter"))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
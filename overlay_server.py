@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Overlay Server
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Serves the OBS browser source (alert.html, demo.html, alert.txt and their
+images and sounds) from inside the monitor process, in place of running
+`python -m http.server` next to it. Only overlay asset types are served,
+so .env, logs and source files in the same directory stay private.
+
+Diagnostics:
+    GET /metrics                     Prometheus metrics
+    GET /debug/spans                 pipeline spans as JSON
+    GET /debug/spans?format=chrome   the same in Chrome trace event format
+    GET /debug/profile?seconds=N     sample all thread stacks for N seconds (collapsed stacks)
+"""
+
+import logging
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from metrics import CONTENT_TYPE, MetricsRegistry
+from profiler import MAX_SECONDS, SamplingProfiler
+from spans import SpanRecorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LISTEN = "127.0.0.1:8080"
+
+# File types the overlay pages load; everything else is 404
+OVERLAY_EXTENSIONS = {
+    ".html", ".txt", ".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp",
+    ".ico", ".mp3", ".ogg", ".wav", ".woff", ".woff2"
+}
+PRIVATE_FILES = {"requests.jsonl", "requirements.txt"}
+
+
+def parse_listen(listen: str) -> Tuple[str, int]:
+    """Split "host:port" (or a bare port) into a bind address"""
+    host, _, port = listen.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class OverlayHandler(SimpleHTTPRequestHandler):
+    """Static overlay files plus the /debug endpoints"""
+
+    server: "OverlayServer"
+    # Keep-alive, so each browser source holds one connection while it polls
+    protocol_version = "HTTP/1.1"
+    timeout = 60
+
+    def setup(self):
+        super().setup()
+        self.server.client_connected(1)
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.server.client_connected(-1)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/metrics":
+            self._send_metrics()
+            return
+        if url.path == "/debug/spans":
+            self._send_spans(parse_qs(url.query).get("format", ["json"])[0])
+            return
+        if url.path == "/debug/profile":
+            self._send_profile(parse_qs(url.query).get("seconds", ["10"])[0])
+            return
+        if not self._is_overlay_file(url.path):
+            self.send_error(404)
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        if not self._is_overlay_file(urlsplit(self.path).path):
+            self.send_error(404)
+            return
+        super().do_HEAD()
+
+    def end_headers(self):
+        # alert.txt changes in place; OBS must never show a cached alert
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def _is_overlay_file(self, path: str) -> bool:
+        if path.endswith("/"):
+            path += "index.html"
+        parts = [part for part in path.split("/") if part]
+        if any(part.startswith(".") for part in parts):
+            return False
+        name = parts[-1] if parts else ""
+        return os.path.splitext(name)[1].lower() in OVERLAY_EXTENSIONS and name not in PRIVATE_FILES
+
+    def list_directory(self, path):
+        # Never reveal the file names next to the overlay
+        self.send_error(404)
+        return None
+
+    def _send_metrics(self) -> None:
+        registry = self.server.metrics
+        if registry is None:
+            self.send_error(404, "Metrics are not enabled")
+            return
+        self._send_body(registry.render().encode(), CONTENT_TYPE)
+
+    def _send_spans(self, fmt: str) -> None:
+        recorder = self.server.spans
+        if recorder is None:
+            self.send_error(404, "Span recording is not enabled")
+            return
+        try:
+            body = recorder.dumps(fmt).encode()
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        self._send_body(body, "application/json")
+
+    def _send_profile(self, seconds: str) -> None:
+        profiler = self.server.profiler
+        if profiler is None:
+            self.send_error(404, "Profiling is not enabled")
+            return
+        try:
+            duration = float(seconds)
+        except ValueError:
+            duration = -1
+        if not 0 < duration <= MAX_SECONDS:
+            self.send_error(400, f"seconds must be between 0 and {MAX_SECONDS}")
+            return
+        stacks = profiler.profile(duration)
+        if stacks is None:
+            self.send_error(409, "A profile is already running")
+            return
+        self._send_body(stacks.encode(), "text/plain; charset=utf-8")
+
+    def _send_body(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class OverlayServer(ThreadingHTTPServer):
+    """HTTP server for the overlay directory, run on a daemon thread"""
+
+    daemon_threads = True
+
+    def __init__(self, directory: str, listen: str = DEFAULT_LISTEN, spans: Optional[SpanRecorder] = None,
+                 metrics: Optional[MetricsRegistry] = None, profiler: Optional[SamplingProfiler] = None):
+        self.directory = os.path.abspath(directory)
+        self.spans = spans
+        self.metrics = metrics
+        self.profiler = profiler
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        super().__init__(parse_listen(listen), partial(OverlayHandler, directory=self.directory))
+        if metrics is not None:
+            metrics.gauge("satox_overlay_clients", "Open connections from overlay browser sources",
+                          lambda: self.clients)
+
+    def client_connected(self, change: int) -> None:
+        with self._clients_lock:
+            self.clients += change
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in the background and return the base URL"""
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.2,), name="overlay-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Overlay served at {self.url}/alert.html")
+        return self.url
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
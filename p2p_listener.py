@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - P2P Mempool Listener
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Ingestion source that keeps a single P2P connection to the local Satox
+Core node (port 60777) instead of polling RPC. After the version
+handshake it asks for the node's mempool, then requests every announced
+transaction with getdata and matches its outputs against the watched
+addresses. Matching payments are queued for the monitor's loop.
+
+The node only answers the mempool message for peers it trusts with it;
+add whitelist=127.0.0.1 (or keep peerbloomfilters=1) to satoxcoin.conf.
+"""
+
+import logging
+import os
+import queue
+import random
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from chain_decode import DecodeError, ScriptMatcher, encode_varint, parse_transaction, read_varint
+from satox_address import double_sha256
+
+logger = logging.getLogger(__name__)
+
+# (txid, address, amount in base units, inclusion height or None)
+Payment = Tuple[str, str, int, Optional[int]]
+
+DEFAULT_P2P_PORT = 60777
+PROTOCOL_VERSION = 70028
+USER_AGENT = b"/satox-donation-overlay:1.0/"
+MAX_PAYLOAD = 32 * 1024 * 1024
+
+MSG_TX = 1
+MSG_WITNESS_FLAG = 1 << 30
+HEADER_SIZE = 24
+MAX_REQUESTED = 50000
+
+
+class ProtocolError(Exception):
+    """Raised when the peer sends something we cannot accept"""
+
+
+def resolve_network_magic(magic_hex: Optional[str], datadir: Optional[str]) -> bytes:
+    """Return the network magic from configuration or the node's block files"""
+    if magic_hex:
+        try:
+            magic = bytes.fromhex(magic_hex)
+        except ValueError:
+            magic = b""
+        if len(magic) != 4:
+            raise ValueError(f"Invalid network magic {magic_hex!r}; expected 8 hex digits")
+        return magic
+    if datadir:
+        # Deferred: the block file scanner is only needed when the magic isn't configured
+        from blockfile_scanner import read_network_magic
+        magic = read_network_magic(os.path.join(os.path.expanduser(datadir), "blocks"))
+        if magic:
+            return magic
+    raise ValueError("Network magic unknown; set SATOX_P2P_MAGIC or SATOX_DATADIR")
+
+
+def pack_message(magic: bytes, command: str, payload: bytes = b"") -> bytes:
+    """Frame a P2P message: magic, command, length, checksum, payload"""
+    checksum = double_sha256(payload)[:4]
+    return magic + command.encode("ascii").ljust(12, b"\x00") + struct.pack("<I", len(payload)) + checksum + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Peer closed the connection")
+        received += count
+    return bytes(buffer)
+
+
+def read_message(sock: socket.socket, magic: bytes) -> Tuple[str, bytes]:
+    """Read one framed message, returning (command, payload)"""
+    header = _recv_exact(sock, HEADER_SIZE)
+    if header[:4] != magic:
+        raise ProtocolError(f"Unexpected network magic {header[:4].hex()}")
+    command = header[4:16].rstrip(b"\x00").decode("ascii", "replace")
+    length = struct.unpack_from("<I", header, 16)[0]
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"Oversized {command} message ({length} bytes)")
+    payload = _recv_exact(sock, length) if length else b""
+    if double_sha256(payload)[:4] != header[20:24]:
+        raise ProtocolError(f"Bad checksum on {command} message")
+    return command, payload
+
+
+def _net_addr(host: str, port: int) -> bytes:
+    try:
+        ip = b"\x00" * 10 + b"\xff\xff" + socket.inet_aton(host)
+    except OSError:
+        ip = bytes(16)
+    return struct.pack("<Q", 0) + ip + struct.pack(">H", port)
+
+
+def version_payload(host: str, port: int, start_height: int = 0) -> bytes:
+    """Build a version message payload that asks the peer to relay transactions"""
+    return (struct.pack("<iQq", PROTOCOL_VERSION, 0, int(time.time()))
+            + _net_addr(host, port) + _net_addr("0.0.0.0", 0)
+            + struct.pack("<Q", random.getrandbits(64))
+            + encode_varint(len(USER_AGENT)) + USER_AGENT
+            + struct.pack("<i", start_height) + b"\x01")
+
+
+def parse_inventory(payload: bytes) -> List[Tuple[int, bytes]]:
+    """Decode an inv/getdata payload into (type, hash) entries"""
+    count, offset = read_varint(payload, 0)
+    if offset + count * 36 > len(payload):
+        raise ProtocolError("Truncated inventory")
+    return [(struct.unpack_from("<I", payload, offset + i * 36)[0],
+             payload[offset + i * 36 + 4:offset + i * 36 + 36]) for i in range(count)]
+
+
+def pack_inventory(entries: List[Tuple[int, bytes]]) -> bytes:
+    """Encode (type, hash) entries as an inv/getdata payload"""
+    return encode_varint(len(entries)) + b"".join(struct.pack("<I", kind) + item for kind, item in entries)
+
+
+class P2PMempoolListener:
+    """Streams mempool transactions from the node over one P2P connection"""
+
+    def __init__(self, host: str, port: int, watched: Iterable[str], magic: bytes,
+                 connect_timeout: float = 10.0, max_backoff: float = 30.0):
+        self.host = host
+        self.port = port
+        self.magic = magic
+        self.matcher = ScriptMatcher(watched)
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.payments: "queue.Queue[Payment]" = queue.Queue()
+        self.connected = threading.Event()
+        self.transactions = 0
+        self.peer_version: Optional[int] = None
+        self._requested: "OrderedDict[bytes, None]" = OrderedDict()
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Connect in a background thread, reconnecting until stopped"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="p2p-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Close the connection and wait for the reader thread"""
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def poll(self) -> List[Payment]:
+        """Return payments received since the previous poll"""
+        payments = []
+        while True:
+            try:
+                payments.append(self.payments.get_nowait())
+            except queue.Empty:
+                return payments
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._session()
+                backoff = 1.0
+            except (OSError, ProtocolError, DecodeError) as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"P2P connection to {self.host}:{self.port} lost: {e}")
+            finally:
+                self.connected.clear()
+                self._sock = None
+            self._stop.wait(backoff * (0.5 + random.random() / 2))
+            backoff = min(self.max_backoff, backoff * 2)
+
+    def _session(self) -> None:
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        self._sock = sock
+        try:
+            sock.settimeout(None)
+            self._send("version", version_payload(self.host, self.port))
+            self._handshake()
+            logger.info(f"P2P connected to {self.host}:{self.port} (protocol {self.peer_version})")
+            self.connected.set()
+            # Ask for everything already waiting; new transactions arrive as invs
+            self._send("mempool")
+            while not self._stop.is_set():
+                command, payload = read_message(sock, self.magic)
+                self._dispatch(command, payload)
+        finally:
+            sock.close()
+
+    def _handshake(self) -> None:
+        got_version = got_verack = False
+        while not (got_version and got_verack):
+            command, payload = read_message(self._sock, self.magic)
+            if command == "version":
+                if len(payload) < 4:
+                    raise ProtocolError("Short version message")
+                self.peer_version = struct.unpack_from("<i", payload, 0)[0]
+                got_version = True
+                self._send("verack")
+            elif command == "verack":
+                got_verack = True
+            else:
+                self._dispatch(command, payload)
+
+    def _dispatch(self, command: str, payload: bytes) -> None:
+        if command == "inv":
+            self._handle_inv(payload)
+        elif command == "tx":
+            self._handle_tx(payload)
+        elif command == "ping":
+            self._send("pong", payload[:8])
+
+    def _handle_inv(self, payload: bytes) -> None:
+        wanted = []
+        for kind, item in parse_inventory(payload):
+            if kind & ~MSG_WITNESS_FLAG != MSG_TX or item in self._requested:
+                continue
+            self._requested[item] = None
+            wanted.append((MSG_TX, item))
+        while len(self._requested) > MAX_REQUESTED:
+            self._requested.popitem(last=False)
+        if wanted:
+            self._send("getdata", pack_inventory(wanted))
+
+    def _handle_tx(self, payload: bytes) -> None:
+        tx = parse_transaction(memoryview(payload), 0)
+        self.transactions += 1
+        paid = self.matcher.match_transaction(tx)
+        if paid:
+            txid = tx.txid
+            for address, amount in paid.items():
+                self.payments.put((txid, address, amount, None))
+
+    def _send(self, command: str, payload: bytes = b"") -> None:
+        self._sock.sendall(pack_message(self.magic, command, payload))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Sampling Profiler
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Samples the stacks of every thread (sys._current_frames) at a fixed
+interval for a number of seconds and writes them as collapsed stacks, one
+"thread;outer;...;inner count" line per distinct stack, ready for
+flamegraph.pl, speedscope or inferno. Nothing runs while no profile is
+being taken, so it can stay built into the monitor.
+
+A profile is taken on demand (SIGUSR2, or GET /debug/profile?seconds=N on
+the overlay server) or by SlowCycleWatchdog while a monitor cycle is
+running past its deadline.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.01  # 100 samples per second
+MAX_SECONDS = 300
+
+
+def profile_path(directory: str, prefix: str = "profile") -> str:
+    """Timestamped .collapsed file name in directory"""
+    return os.path.join(directory, f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed")
+
+
+class SamplingProfiler:
+    """Stack sampler for all threads, running one profile at a time"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self._labels: Dict[Tuple[object, int], str] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self, seconds: float, path: Optional[str] = None,
+              on_done: Optional[Callable[[Optional[str]], None]] = None) -> bool:
+        """Sample for seconds (or until stop()) in the background
+
+        The collapsed stacks are written to path, if given, and on_done is
+        called with it. Returns False if a profile is already running.
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self.counts = {}
+            self.samples = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, args=(min(seconds, MAX_SECONDS), path, on_done),
+                                            name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """End the running profile early"""
+        self._stop_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def profile(self, seconds: float) -> Optional[str]:
+        """Sample for seconds and return the collapsed stacks (None if busy)"""
+        if not self.start(seconds):
+            return None
+        self.wait()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Stacks of the last profile, most sampled first"""
+        ordered = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+    def _run(self, seconds: float, path: Optional[str], on_done) -> None:
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while not self._stop_event.is_set() and time.monotonic() < deadline:
+            self._sample(own)
+            self._stop_event.wait(self.interval)
+        if path is not None:
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(self.collapsed())
+                logger.info(f"Profile of {self.samples} samples written to {path}")
+            except OSError as e:
+                logger.error(f"Could not write profile: {e}")
+                path = None
+        if on_done is not None:
+            on_done(path)
+
+    def _sample(self, own: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        counts = self.counts
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            key = ";".join(reversed(stack))
+            counts[key] = counts.get(key, 0) + 1
+        self.samples += 1
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        key = (code, frame.f_lineno)
+        label = self._labels.get(key)
+        if label is None:
+            # ";" separates frames in the collapsed format
+            name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+            label = self._labels[key] = name.replace(";", ":")
+        return label
+
+
+class SlowCycleWatchdog:
+    """Profiles a monitor cycle that runs past its deadline
+
+    The monitor brackets each cycle with cycle_started() and
+    cycle_finished(); a background thread notices a cycle that is still
+    running deadline seconds after it began and samples it until it ends
+    (at most seconds), writing slow-cycle-*.collapsed to directory. At most
+    one capture is taken per cooldown seconds.
+    """
+
+    def __init__(self, profiler: SamplingProfiler, deadline: float, directory: str,
+                 seconds: float = 30.0, cooldown: float = 300.0):
+        self.profiler = profiler
+        self.deadline = deadline
+        self.directory = directory
+        self.seconds = seconds
+        self.cooldown = cooldown
+        self.captures = 0
+        self.last_capture: Optional[str] = None
+        self._cycle = 0
+        self._cycle_started: Optional[float] = None
+        self._capturing: Optional[int] = None
+        self._next_capture = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline > 0
+
+    def cycle_started(self) -> None:
+        self._cycle += 1
+        self._cycle_started = time.monotonic()
+
+    def cycle_finished(self) -> None:
+        self._cycle_started = None
+        if self._capturing == self._cycle:
+            self.profiler.stop()
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="cycle-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def check(self) -> bool:
+        """Start a capture if the current cycle is overdue; True if one started"""
+        started, cycle = self._cycle_started, self._cycle
+        now = time.monotonic()
+        if started is None or now - started < self.deadline or now < self._next_capture:
+            return False
+        path = profile_path(self.directory, "slow-cycle")
+        if not self.profiler.start(self.seconds, path, on_done=self._captured):
+            return False
+        self._capturing = cycle
+        self._next_capture = now + self.cooldown
+        logger.warning(f"Monitor cycle running for {now - started:.1f}s (deadline {self.deadline:g}s); profiling it")
+        if self._cycle_started is None:
+            # Finished while the capture was starting
+            self.profiler.stop()
+        return True
+
+    def _captured(self, path: Optional[str]) -> None:
+        self._capturing = None
+        if path is not None:
+            self.captures += 1
+            self.last_capture = path
+
+    def _watch(self) -> None:
+        tick = min(1.0, self.deadline / 4)
+        while not self._stop_event.wait(tick):
+            self.check()
+
+
+def install_profile_signal(profiler: SamplingProfiler, directory: str, seconds: float) -> bool:
+    """Toggle a profile with SIGUSR2: the first signal starts one, a second ends it early
+
+    Returns False where SIGUSR2 does not exist (Windows) or when not
+    called from the main thread.
+    """
+    if not hasattr(signal, "SIGUSR2"):
+        return False
+
+    def handle(signum, frame):
+        if profiler.running:
+            profiler.stop()
+        elif profiler.start(seconds, profile_path(directory)):
+            logger.info(f"Profiling for up to {seconds:g}s (send SIGUSR2 again to stop)")
+
+    try:
+        signal.signal(signal.SIGUSR2, handle)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - RPC Client
+Copyright (c) 2025 Satoxcoin Core Developers
+
+JSON-RPC transport shared by the monitor and its tools. A NodePool holds
+one or more Satox Core endpoints, probes their latency and sync height
+with getblockchaininfo, and sends each request to the fastest node that
+is fully synced, falling through to the next node when one fails.
+
+Each endpoint sits behind a circuit breaker: after a few consecutive
+failures it stops being called, and is probed again after a capped,
+jittered exponential backoff. Falling through to another node counts as
+a retry and is paid for from a pool-wide retry budget, so an outage
+costs a handful of fast failures instead of a timeout per call.
+
+RpcScheduler rations calls to the node by priority class so detection
+polls are never starved by enrichment, balance checks or backfill.
+
+Replies are decoded with exact decimals: the known amount fields (and the
+results of balance calls) become integer base units, every other decimal
+(difficulty, verificationprogress ...) an ordinary float.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from amounts import rpc_amount_units
+
+logger = logging.getLogger(__name__)
+
+# RPC_IN_WARMUP: the node is starting, loading the block index or reindexing
+FAILOVER_ERROR_CODES = {-28}
+LATENCY_SMOOTHING = 0.3
+
+# Reply fields holding SATOX amounts (listtransactions, gettransaction, vout values)
+AMOUNT_FIELDS = frozenset({"amount", "fee", "value"})
+# Methods whose whole result is a SATOX amount
+AMOUNT_RESULTS = frozenset({"getbalance", "getreceivedbyaddress", "getunconfirmedbalance"})
+
+# Priority classes, highest first
+PRIORITY_DETECTION = "detection"
+PRIORITY_ENRICHMENT = "enrichment"
+PRIORITY_BALANCE = "balance"
+PRIORITY_BACKFILL = "backfill"
+
+# class: (concurrent calls, share of the bucket kept back for higher classes)
+DEFAULT_PRIORITY_CLASSES = {
+    PRIORITY_DETECTION: (4, 0.0),
+    PRIORITY_ENRICHMENT: (2, 0.25),
+    PRIORITY_BALANCE: (1, 0.25),
+    PRIORITY_BACKFILL: (2, 0.5)
+}
+
+
+def _transport_errors() -> Tuple[type, ...]:
+    """Exceptions meaning a POST produced no usable reply
+
+    requests is imported on first use rather than with this module: it is
+    most of the monitor's import time and only needed once a call is made.
+    """
+    import requests
+    return requests.exceptions.RequestException, ValueError
+
+
+class RPCUnavailable(Exception):
+    """Raised when no endpoint could answer a request
+
+    retry_after is the number of seconds until the first open circuit
+    allows a probe again (0 when a node was tried and failed).
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RPCThrottled(RPCUnavailable):
+    """Raised when the scheduler could not grant a call slot in time"""
+
+
+class CircuitBreaker:
+    """Closed -> open after failure_threshold consecutive failures
+
+    While open, calls are refused until the backoff expires; the breaker
+    then lets a single half-open probe through. A successful probe closes
+    it, a failed one re-opens it with the backoff doubled (with jitter,
+    capped at max_backoff).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.successes = 0
+        self.times_opened = 0
+        self.open_until = 0.0
+        self._backoff = base_backoff
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now (reserves the half-open probe)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() >= self.open_until:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker allows a probe"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_until - self.clock())
+
+    def record_success(self) -> bool:
+        """Record a good call; returns True if this closed the breaker"""
+        with self._lock:
+            recovered = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.successes += 1
+            self._backoff = self.base_backoff
+            return recovered
+
+    def record_failure(self) -> bool:
+        """Record a failed call; returns True if this opened the breaker"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self._backoff = min(self.max_backoff, self._backoff * 2)
+            elif self.state == self.OPEN or self.consecutive_failures < self.failure_threshold:
+                return False
+            self.state = self.OPEN
+            self.times_opened += 1
+            # Equal jitter: somewhere between half and all of the backoff
+            self.open_until = self.clock() + self._backoff * (0.5 + random.random() / 2)
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failures": self.failures,
+            "successes": self.successes,
+            "times_opened": self.times_opened,
+            "retry_after": round(self.retry_after(), 3)
+        }
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of successful traffic
+
+    Every failure costs a token and every success earns token_ratio back;
+    retries are only allowed while more than half the tokens remain. A
+    healthy pool can always retry, a failing one quickly stops amplifying
+    load on the nodes that are still up.
+    """
+
+    def __init__(self, max_tokens: float = 10.0, token_ratio: float = 0.1):
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = max_tokens
+        self.retries = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def try_retry(self) -> bool:
+        """Return True and count the retry if the budget allows it"""
+        with self._lock:
+            if self.tokens > self.max_tokens / 2:
+                self.retries += 1
+                return True
+            self.denied += 1
+            return False
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.tokens = max(0.0, self.tokens - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "denied": self.denied}
+
+
+class NodeEndpoint:
+    """One Satox Core RPC endpoint and what we last measured about it"""
+
+    def __init__(self, url: str, auth: Optional[Tuple[str, str]] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        if parts.username is not None:
+            # Credentials embedded in the URL override the shared ones
+            auth = (parts.username, parts.password or "")
+            netloc = parts.hostname + (f":{parts.port}" if parts.port else "")
+            parts = parts._replace(netloc=netloc)
+        self.url = urlunsplit(parts)
+        self.auth = auth
+        self.breaker = breaker or CircuitBreaker()
+        self.latency: Optional[float] = None
+        self.blocks: Optional[int] = None
+        self.headers: Optional[int] = None
+        self.syncing = False
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        """True while the last call succeeded and the breaker is closed"""
+        return self.breaker.state == CircuitBreaker.CLOSED and self.breaker.consecutive_failures == 0
+
+    def record_latency(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "syncing": self.syncing,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "blocks": self.blocks,
+            "headers": self.headers,
+            "failures": self.breaker.failures,
+            "breaker": self.breaker.to_dict(),
+            "last_error": self.last_error
+        }
+
+
+def convert_amounts(value: Any, amount: bool = False) -> Any:
+    """Turn the amount fields of a decoded result into base units, other decimals into floats"""
+    if isinstance(value, dict):
+        return {key: convert_amounts(item, key in AMOUNT_FIELDS) for key, item in value.items()}
+    if isinstance(value, list):
+        return [convert_amounts(item) for item in value]
+    if amount and isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return rpc_amount_units(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def decode_reply(body: Any, payload: Any) -> Any:
+    """Apply convert_amounts to each reply's result, by the method that was called"""
+    if isinstance(body, list):
+        calls = payload if isinstance(payload, list) else []
+        methods = {call.get("id"): call.get("method") for call in calls if isinstance(call, dict)}
+        return [_decode_result(reply, methods.get(reply.get("id")) if isinstance(reply, dict) else None)
+                for reply in body]
+    return _decode_result(body, payload.get("method") if isinstance(payload, dict) else None)
+
+
+def _decode_result(reply: Any, method: Optional[str]) -> Any:
+    if isinstance(reply, dict) and "result" in reply:
+        reply["result"] = convert_amounts(reply["result"], method in AMOUNT_RESULTS)
+    return reply
+
+
+def _failover_error(body: Any) -> Optional[str]:
+    """Return a reason if a reply means the node cannot serve requests yet"""
+    replies = body if isinstance(body, list) else [body]
+    for reply in replies:
+        error = reply.get("error") if isinstance(reply, dict) else None
+        if isinstance(error, dict) and error.get("code") in FAILOVER_ERROR_CODES:
+            return error.get("message", "node warming up")
+    return None
+
+
+class NodePool:
+    """Routes JSON-RPC requests across several nodes with failover
+
+    With a single endpoint requests go straight to it. With several, the
+    pool probes every node each health_interval seconds and ranks them
+    (only the first probe runs inline, later ones on a background thread
+    so a slow node never delays the request that made them due):
+    healthy nodes within max_lag blocks of the best known header come
+    first, fastest first; everything else is only tried as a fallback.
+    A node that fails a request is demoted until its next good probe, so
+    the next node takes over within the same call.
+    """
+
+    def __init__(self, urls: Iterable[str], auth: Optional[Tuple[str, str]] = None, timeout: float = 10,
+                 health_interval: float = 10.0, max_lag: int = 1, failure_threshold: int = 3,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 retry_budget: Optional[RetryBudget] = None):
+        self.endpoints = [
+            NodeEndpoint(url, auth, CircuitBreaker(failure_threshold, base_backoff, max_backoff))
+            for url in urls
+        ]
+        if not self.endpoints:
+            raise ValueError("At least one RPC endpoint is required")
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.retry_budget = retry_budget or RetryBudget()
+        self.active: Optional[NodeEndpoint] = None
+        self.requests = 0
+        self.rejected = 0
+        self._next_health_check = 0.0
+        self._health_checked = False
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    @property
+    def available(self) -> bool:
+        """False while every endpoint's circuit is open"""
+        return any(endpoint.breaker.state != CircuitBreaker.OPEN or endpoint.breaker.retry_after() == 0
+                   for endpoint in self.endpoints)
+
+    def request(self, payload: Any) -> Any:
+        """POST a JSON-RPC request (or batch) and return the decoded reply
+
+        Raises RPCUnavailable when every endpoint failed or is cut off by
+        its circuit breaker, so callers can tell "node down" from an
+        empty result.
+        """
+        self.requests += 1
+        self.maybe_check_health()
+        errors = []
+        attempts = 0
+        for endpoint in self.ranked():
+            if attempts and not self.retry_budget.try_retry():
+                errors.append("retry budget exhausted")
+                break
+            if not endpoint.breaker.allow():
+                continue
+            attempts += 1
+            try:
+                body = self._post(endpoint, payload)
+            except _transport_errors() as e:
+                self._mark_failed(endpoint, str(e))
+                errors.append(f"{endpoint.url}: {e}")
+                continue
+            reason = _failover_error(body)
+            if reason is not None and len(self.endpoints) > 1:
+                endpoint.syncing = True
+                self._mark_failed(endpoint, reason)
+                errors.append(f"{endpoint.url}: {reason}")
+                continue
+            self._mark_ok(endpoint)
+            if self.active is not endpoint:
+                if self.active is not None:
+                    logger.warning(f"RPC failover: now using {endpoint.url}")
+                self.active = endpoint
+            return body
+
+        if not attempts:
+            self.rejected += 1
+            retry_after = min(endpoint.breaker.retry_after() for endpoint in self.endpoints)
+            raise RPCUnavailable(f"all RPC circuits open, next probe in {retry_after:.1f}s", retry_after)
+        raise RPCUnavailable("; ".join(errors))
+
+    def ranked(self) -> List[NodeEndpoint]:
+        """Endpoints in the order requests should try them"""
+        if len(self.endpoints) == 1:
+            return list(self.endpoints)
+        best = max((e.headers or e.blocks or 0 for e in self.endpoints if e.healthy), default=0)
+
+        def key(endpoint: NodeEndpoint):
+            synced = (endpoint.healthy and not endpoint.syncing
+                      and (endpoint.blocks is None or endpoint.blocks >= best - self.max_lag))
+            latency = endpoint.latency if endpoint.latency is not None else float("inf")
+            return (not synced, not endpoint.healthy, latency)
+
+        return sorted(self.endpoints, key=key)
+
+    def maybe_check_health(self) -> None:
+        """Probe all endpoints if the health interval has elapsed
+
+        The very first probe runs inline so requests are ranked from the
+        start; after that probes run on a daemon thread and requests keep
+        using the previous ranking until it finishes.
+        """
+        if len(self.endpoints) == 1 or time.monotonic() < self._next_health_check:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        if not self._health_checked:
+            try:
+                self.check_health()
+            finally:
+                self._lock.release()
+            return
+        self._next_health_check = time.monotonic() + self.health_interval
+        threading.Thread(target=self._check_health_locked, name="rpc-health", daemon=True).start()
+
+    def _check_health_locked(self) -> None:
+        try:
+            self.check_health()
+        except Exception as e:
+            logger.warning(f"RPC health check failed: {e}")
+        finally:
+            self._lock.release()
+
+    def check_health(self) -> None:
+        """Measure latency and sync state of every endpoint whose circuit allows it"""
+        self._next_health_check = time.monotonic() + self.health_interval
+        self._health_checked = True
+        probe = {"jsonrpc": "1.0", "id": "health", "method": "getblockchaininfo", "params": []}
+        for endpoint in self.endpoints:
+            if not endpoint.breaker.allow():
+                continue
+            endpoint.last_checked = time.time()
+            started = time.monotonic()
+            try:
+                body = self._post(endpoint, probe)
+            except _transport_errors() as e:
+                self._mark_failed(endpoint, str(e))
+                continue
+            endpoint.record_latency(time.monotonic() - started)
+            info = body.get("result") if isinstance(body, dict) else None
+            if not isinstance(info, dict):
+                endpoint.syncing = _failover_error(body) is not None
+                self._mark_failed(endpoint, _failover_error(body) or "health probe failed")
+                continue
+            endpoint.blocks = info.get("blocks")
+            endpoint.headers = info.get("headers", endpoint.blocks)
+            endpoint.syncing = bool(info.get("initialblockdownload")) or (
+                endpoint.blocks is not None and endpoint.headers is not None
+                and endpoint.headers - endpoint.blocks > self.max_lag)
+            self._mark_ok(endpoint)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Snapshot of every endpoint for diagnostics"""
+        return [endpoint.to_dict() for endpoint in self.endpoints]
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool-wide counters plus per-endpoint status"""
+        return {
+            "available": self.available,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "retry_budget": self.retry_budget.to_dict(),
+            "endpoints": self.status()
+        }
+
+    def _post(self, endpoint: NodeEndpoint, payload: Any) -> Any:
+        import requests
+        response = requests.post(endpoint.url, json=payload, auth=endpoint.auth, timeout=self.timeout)
+        if response.status_code not in (404, 500):
+            # Satox Core reports RPC-level errors with 404/500 and a JSON body
+            response.raise_for_status()
+        # Decimals are decoded exactly, then only amount fields become base units
+        return decode_reply(response.json(parse_float=Decimal), payload)
+
+    def _mark_ok(self, endpoint: NodeEndpoint) -> None:
+        self.retry_budget.on_success()
+        if endpoint.breaker.record_success():
+            logger.info(f"RPC endpoint {endpoint.url} recovered")
+
+    def _mark_failed(self, endpoint: NodeEndpoint, error: str) -> None:
+        endpoint.last_error = error
+        self.retry_budget.on_failure()
+        if endpoint.breaker.record_failure():
+            logger.error(f"RPC endpoint {endpoint.url} unavailable, pausing calls for "
+                         f"{endpoint.breaker.retry_after():.1f}s: {error}")
+        elif endpoint.breaker.state == CircuitBreaker.CLOSED:
+            logger.warning(f"RPC call to {endpoint.url} failed: {error}")
+
+
+class _PriorityClass:
+    __slots__ = ("name", "rank", "concurrency", "reserve", "waiting", "in_flight", "granted",
+                 "timeouts", "wait_seconds")
+
+    def __init__(self, name: str, rank: int, concurrency: int, reserve: float):
+        self.name = name
+        self.rank = rank
+        self.concurrency = concurrency
+        self.reserve = reserve
+        self.waiting = 0
+        self.in_flight = 0
+        self.granted = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+
+class RpcScheduler:
+    """Token-bucket rate limiter with strict priority classes
+
+    All classes share one bucket of rate tokens per second (up to burst).
+    A class may only take a token when no higher class is waiting for one
+    and, for lower classes, while the bucket stays above its reserve, so a
+    donation storm's detection polls find tokens even when enrichment and
+    backfill are saturating the node. Each class also has its own limit on
+    concurrent calls. A rate of 0 disables the bucket but keeps the
+    concurrency limits and priority ordering.
+    """
+
+    def __init__(self, rate: float = 50.0, burst: Optional[float] = None,
+                 classes: Optional[Dict[str, Tuple[int, float]]] = None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+        self.classes: Dict[str, _PriorityClass] = {
+            name: _PriorityClass(name, rank, concurrency, reserve)
+            for rank, (name, (concurrency, reserve)) in enumerate((classes or DEFAULT_PRIORITY_CLASSES).items())
+        }
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: str = PRIORITY_DETECTION, timeout: Optional[float] = None) -> bool:
+        """Wait for a call slot; returns False if timeout expired first"""
+        cls = self.classes[priority]
+        started = self.clock()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            cls.waiting += 1
+            try:
+                while True:
+                    wait = self._wait_time(cls)
+                    if wait == 0:
+                        break
+                    if deadline is not None:
+                        remaining = deadline - self.clock()
+                        if remaining <= 0:
+                            cls.timeouts += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+                if self.rate:
+                    self.tokens -= 1
+                cls.in_flight += 1
+                cls.granted += 1
+                cls.wait_seconds += self.clock() - started
+            finally:
+                cls.waiting -= 1
+            # Lower classes held back by this waiter can re-check
+            self._cond.notify_all()
+            return True
+
+    def release(self, priority: str = PRIORITY_DETECTION) -> None:
+        with self._cond:
+            self.classes[priority].in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: str = PRIORITY_DETECTION, timeout: Optional[float] = None) -> Iterator[None]:
+        """Context manager holding a call slot for priority"""
+        if not self.acquire(priority, timeout):
+            raise RPCThrottled(f"no {priority} RPC slot within {timeout}s")
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """Bucket level and per-class counters"""
+        with self._cond:
+            self._refill()
+            return {
+                "tokens": round(self.tokens, 2),
+                "rate": self.rate,
+                "classes": {
+                    cls.name: {"waiting": cls.waiting, "in_flight": cls.in_flight, "granted": cls.granted,
+                               "timeouts": cls.timeouts, "wait_seconds": round(cls.wait_seconds, 3)}
+                    for cls in self.classes.values()
+                }
+            }
+
+    def _refill(self) -> None:
+        now = self.clock()
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, cls: _PriorityClass) -> Optional[float]:
+        """0 if cls may go now, seconds until a token is due, or None to wait for a release"""
+        if cls.in_flight >= cls.concurrency:
+            return None
+        for other in self.classes.values():
+            if other.rank < cls.rank and other.waiting and other.in_flight < other.concurrency:
+                return None
+        if not self.rate:
+            return 0
+        self._refill()
+        floor = cls.reserve * self.burst
+        if self.tokens - 1 >= floor:
+            return 0
+        return (1 + floor - self.tokens) / self.rate
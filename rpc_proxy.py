@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Caching RPC Proxy
+Copyright (c) 2025 Satoxcoin Core Developers
+
+A small JSON-RPC proxy for running several monitor processes against one
+Satox Core node. Monitors point SATOX_RPC_HOST/SATOX_RPC_PORT at the proxy
+instead of the node and need no other change.
+
+- Identical requests that are in flight at the same time are sent to the
+  node once and the reply is shared (single-flight).
+- Results that can no longer change - blocks and transactions buried at
+  least --finality-depth blocks deep, block hashes at such heights, and
+  raw data addressed by its hash - are cached indefinitely (LRU-bounded).
+  Their "confirmations" field is recomputed from the current tip on
+  every hit.
+- Read-only chain and wallet queries (getbestblockhash, getrawmempool,
+  listtransactions, ...) are cached for --ttl seconds.
+- Everything else is passed straight through.
+
+Requests are forwarded to the same path on the node, so multi-wallet
+/wallet/<name> URLs reach their wallet. Wallet queries are cached per
+path and credentials; chain queries are shared. Cached replies are only
+served to clients whose credentials the node has already accepted.
+
+Usage:
+    python rpc_proxy.py [--listen 127.0.0.1:7778 | --unix-socket /tmp/satox-rpc.sock]
+                        [--upstream http://127.0.0.1:7777] [--ttl 1.0] [--finality-depth 6]
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LISTEN = "127.0.0.1:7778"
+DEFAULT_UPSTREAM = "http://127.0.0.1:7777"
+DEFAULT_TTL = 1.0
+DEFAULT_FINALITY_DEPTH = 6
+DEFAULT_MAX_IMMUTABLE = 100000
+
+# Read-only queries whose answers change with the tip or mempool
+VOLATILE_METHODS = {
+    "getbestblockhash", "getblockcount", "getblockchaininfo", "getrawmempool", "getmempoolinfo",
+    "getinfo", "getnetworkinfo", "getbalance", "listtransactions", "getaddressmempool"
+}
+# Queries whose answers become immutable once buried deep enough
+IMMUTABLE_METHODS = {"getblock", "getblockheader", "getblockhash", "getrawtransaction", "gettransaction"}
+# Answers that depend on the wallet selected by the URL path and credentials
+WALLET_METHODS = {"getbalance", "listtransactions", "gettransaction"}
+
+# (wallet scope, method, params): the scope is empty for chain queries
+CacheKey = Tuple[str, str, str]
+
+
+class UpstreamError(Exception):
+    """The node could not be reached or returned something unusable"""
+
+    def __init__(self, message: str, status: int = 502):
+        super().__init__(message)
+        self.status = status
+
+
+def dumps_rpc_json(value: Any) -> str:
+    """Serialize like json.dumps but write Decimals as exact number literals"""
+    if isinstance(value, Decimal):
+        return format(value, "f")
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{json.dumps(str(k))}: {dumps_rpc_json(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(dumps_rpc_json(v) for v in value) + "]"
+    return json.dumps(value)
+
+
+class _Flight:
+    """A request to the node that other identical requests can wait on"""
+
+    __slots__ = ("event", "reply")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.reply: Optional[Dict[str, Any]] = None
+
+
+class CachingProxy:
+    """Cache, single-flight and forwarding logic independent of the transport"""
+
+    def __init__(self, upstream: str = DEFAULT_UPSTREAM, ttl: float = DEFAULT_TTL,
+                 finality_depth: int = DEFAULT_FINALITY_DEPTH, max_immutable: int = DEFAULT_MAX_IMMUTABLE,
+                 timeout: float = 30.0):
+        self.upstream = upstream
+        self.ttl = ttl
+        self.finality_depth = finality_depth
+        self.max_immutable = max_immutable
+        self.timeout = timeout
+        self.tip_height: Optional[int] = None
+        self.authorized: set = set()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "coalesced": 0, "passthrough": 0, "upstream": 0}
+        # key -> (result, anchor height or None)
+        self._immutable: "OrderedDict[CacheKey, Tuple[Any, Optional[int]]]" = OrderedDict()
+        # key -> (expiry, result)
+        self._volatile: Dict[CacheKey, Tuple[float, Any]] = {}
+        self._inflight: Dict[CacheKey, _Flight] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # -- public entry point -------------------------------------------------
+
+    def handle(self, request: Any, auth: Optional[str], path: str = "/") -> Tuple[int, Any]:
+        """Answer a decoded JSON-RPC request or batch sent to path; returns (status, body)"""
+        if isinstance(request, list):
+            return 200, self._handle_batch(request, auth, path)
+        reply = self._handle_batch([request], auth, path)[0]
+        error = reply.get("error")
+        status = 200 if error is None else (404 if isinstance(error, dict) and error.get("code") == -32601 else 500)
+        return status, reply
+
+    # -- batching, cache lookup and single-flight ----------------------------
+
+    def _handle_batch(self, calls: List[Any], auth: Optional[str], path: str = "/") -> List[Dict[str, Any]]:
+        replies: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        forward: List[Tuple[int, Optional[CacheKey], Optional[_Flight]]] = []
+        followers: List[Tuple[int, _Flight]] = []
+        trusted = auth in self.authorized
+
+        self._count("requests", len(calls))
+        for index, call in enumerate(calls):
+            method = call.get("method") if isinstance(call, dict) else None
+            if method not in VOLATILE_METHODS and method not in IMMUTABLE_METHODS:
+                self._count("passthrough")
+                forward.append((index, None, None))
+                continue
+            scope = f"{path}|{auth}" if method in WALLET_METHODS else ""
+            key = (scope, method, json.dumps(call.get("params") or [], sort_keys=True, default=str))
+            if not trusted:
+                # Unproven credentials go to the node; the answer may still be cached
+                self._count("misses")
+                forward.append((index, key, None))
+                continue
+            with self._lock:
+                result = self._lookup(key)
+                if result is not _MISS:
+                    self.stats["hits"] += 1
+                    replies[index] = {"result": result, "error": None, "id": call.get("id")}
+                    continue
+                flight = self._inflight.get(key)
+                if flight is not None:
+                    self.stats["coalesced"] += 1
+                    followers.append((index, flight))
+                    continue
+                flight = self._inflight[key] = _Flight()
+                self.stats["misses"] += 1
+            forward.append((index, key, flight))
+
+        try:
+            if forward:
+                upstream_replies = self._forward([calls[index] for index, _, _ in forward], auth, path)
+                for (index, key, flight), reply in zip(forward, upstream_replies):
+                    reply = dict(reply, id=calls[index].get("id") if isinstance(calls[index], dict) else None)
+                    replies[index] = reply
+                    if key is not None and reply.get("error") is None:
+                        self._store(key, reply.get("result"))
+        finally:
+            # Release followers whether or not the node answered
+            with self._lock:
+                for index, key, flight in forward:
+                    if flight is not None:
+                        del self._inflight[key]
+                        flight.reply = replies[index]
+                        flight.event.set()
+
+        for index, flight in followers:
+            if not flight.event.wait(self.timeout) or flight.reply is None:
+                raise UpstreamError("Shared upstream request failed")
+            replies[index] = dict(flight.reply, id=calls[index].get("id"))
+        return replies
+
+    def _lookup(self, key: CacheKey) -> Any:
+        entry = self._immutable.get(key)
+        if entry is not None:
+            self._immutable.move_to_end(key)
+            result, anchor = entry
+            if anchor is not None and self.tip_height is not None and isinstance(result, dict):
+                result = dict(result, confirmations=self.tip_height - anchor + 1)
+            return result
+        entry = self._volatile.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                return entry[1]
+            del self._volatile[key]
+        return _MISS
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def _store(self, key: CacheKey, result: Any) -> None:
+        _, method, params_json = key
+        self._observe_tip(method, result)
+        with self._lock:
+            if method in VOLATILE_METHODS:
+                self._volatile[key] = (time.monotonic() + self.ttl, result)
+                return
+            final, anchor = self._finality(method, json.loads(params_json), result)
+            if final:
+                self._immutable[key] = (result, anchor)
+                while len(self._immutable) > self.max_immutable:
+                    self._immutable.popitem(last=False)
+
+    def _finality(self, method: str, params: List[Any], result: Any) -> Tuple[bool, Optional[int]]:
+        """Decide whether result can be cached forever, and its anchor height"""
+        if result is None:
+            return False, None
+        if method == "getblockhash":
+            height = params[0] if params else None
+            return (self.tip_height is not None and isinstance(height, int)
+                    and self.tip_height - height + 1 >= self.finality_depth), None
+        if not isinstance(result, dict):
+            # Raw hex of a block or transaction never changes for its hash
+            return method in ("getblock", "getrawtransaction"), None
+        confirmations = result.get("confirmations")
+        if not isinstance(confirmations, int) or confirmations < self.finality_depth:
+            return False, None
+        if "height" in result:
+            return True, result["height"]
+        if self.tip_height is None:
+            return False, None
+        return True, self.tip_height - confirmations + 1
+
+    def _observe_tip(self, method: str, result: Any) -> None:
+        tip = None
+        reported = False
+        if method == "getblockcount" and isinstance(result, int):
+            tip, reported = result, True
+        elif method == "getblockchaininfo" and isinstance(result, dict):
+            tip, reported = result.get("blocks"), True
+        elif method in ("getblock", "getblockheader") and isinstance(result, dict):
+            if isinstance(result.get("confirmations"), int) and result["confirmations"] > 0:
+                tip = result.get("height", 0) + result["confirmations"] - 1
+        if not isinstance(tip, int):
+            return
+        with self._lock:
+            # The node's own tip report is authoritative, so a reorg to a lower height
+            # lowers it too; a block's confirmations only ever prove a tip at least that high
+            if reported or self.tip_height is None or tip > self.tip_height:
+                self.tip_height = tip
+
+    # -- upstream -----------------------------------------------------------
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _forward(self, calls: List[Any], auth: Optional[str], path: str = "/") -> List[Dict[str, Any]]:
+        """Send calls to the same path on the node as one batch and return replies in call order"""
+        payload = [dict(call, id=index) if isinstance(call, dict) else call for index, call in enumerate(calls)]
+        headers = {"Content-Type": "application/json"}
+        if auth:
+            headers["Authorization"] = auth
+        self._count("upstream")
+        url = self.upstream.rstrip("/") + path if path and path != "/" else self.upstream
+        try:
+            response = self._session().post(url, data=dumps_rpc_json(payload), headers=headers,
+                                             timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise UpstreamError(f"Satox Core unreachable: {e}")
+        if response.status_code in (401, 403):
+            raise UpstreamError("Unauthorized", response.status_code)
+        try:
+            body = json.loads(response.text, parse_float=Decimal)
+        except ValueError:
+            raise UpstreamError(f"Invalid reply from Satox Core (HTTP {response.status_code})")
+        if not isinstance(body, list):
+            raise UpstreamError(f"Unexpected reply from Satox Core (HTTP {response.status_code})")
+        if auth is not None:
+            with self._lock:
+                self.authorized.add(auth)
+
+        replies = [{"result": None, "error": {"code": -32603, "message": "No reply"}}] * len(calls)
+        for reply in body:
+            index = reply.get("id") if isinstance(reply, dict) else None
+            if isinstance(index, int) and 0 <= index < len(calls):
+                replies[index] = {"result": reply.get("result"), "error": reply.get("error")}
+        return replies
+
+
+_MISS = object()
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """HTTP front end speaking JSON-RPC like Satox Core"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        proxy: CachingProxy = self.server.proxy
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))), parse_float=Decimal)
+        except ValueError:
+            self._send(400, {"result": None, "error": {"code": -32700, "message": "Parse error"}, "id": None})
+            return
+        try:
+            status, body = proxy.handle(request, self.headers.get("Authorization"), self.path)
+        except UpstreamError as e:
+            logger.warning(f"Upstream request failed: {e}")
+            self._send(e.status, {"result": None, "error": {"code": -32603, "message": str(e)}, "id": None})
+            return
+        self._send(status, body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            proxy: CachingProxy = self.server.proxy
+            with proxy._lock:
+                stats = dict(proxy.stats, tip_height=proxy.tip_height, immutable=len(proxy._immutable))
+            self._send(200, stats)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _send(self, status: int, body: Any) -> None:
+        encoded = dumps_rpc_json(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(proxy: CachingProxy, listen: Optional[str] = DEFAULT_LISTEN, unix_socket: Optional[str] = None):
+    """Create (but do not start) an HTTP server for proxy"""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, ProxyHandler)
+    else:
+        host, _, port = listen.rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), ProxyHandler)
+        server.daemon_threads = True
+    server.proxy = proxy
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Caching JSON-RPC proxy for Satox Core")
+    parser.add_argument("--listen", default=DEFAULT_LISTEN, help="host:port to listen on")
+    parser.add_argument("--unix-socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--upstream", default=os.getenv("SATOX_PROXY_UPSTREAM", DEFAULT_UPSTREAM),
+                        help="Satox Core RPC URL")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="Seconds to cache volatile queries")
+    parser.add_argument("--finality-depth", type=int, default=DEFAULT_FINALITY_DEPTH,
+                        help="Confirmations after which blocks and transactions are cached forever")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_IMMUTABLE,
+                        help="Maximum number of immutable results kept")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    proxy = CachingProxy(args.upstream, ttl=args.ttl, finality_depth=args.finality_depth,
+                         max_immutable=args.max_entries)
+    try:
+        server = make_server(proxy, args.listen, args.unix_socket)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not listen: {e}")
+        return 1
+
+    where = args.unix_socket or args.listen
+    print(f"🔀 Satoxcoin RPC proxy on {where} -> {args.upstream}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Proxy stopped")
+    finally:
+        server.server_close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
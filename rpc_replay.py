@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - RPC Record and Replay
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Captures real JSON-RPC traffic between a monitor and Satox Core, and serves
+it back later without a node, so any ingestion mode can be benchmarked and
+regression-tested against real traffic shapes.
+
+Recording runs as a pass-through proxy: point the monitor at it and every
+request/response pair is appended to a JSONL file together with its
+arrival offset, the node's latency and the URL path (e.g. /wallet/<name>
+for a named wallet). Credentials are never written. For
+a .gz cassette the lines go to a plain <cassette>.part file that is
+compressed onto the cassette on close, so a killed recorder loses at most
+its last line; leftovers are picked up by the next load or recording.
+
+Replay answers each request with the next recorded response for the same
+path, method and parameters (the last one repeats once they run out). A
+response is held for the recorded latency and, unless --no-pacing is
+given, until its original offset from the first request, so the client
+sees the recording's timeline; both are divided by --speed (0 = no delay).
+
+Usage:
+    python rpc_replay.py record --upstream http://127.0.0.1:7777 --listen 127.0.0.1:7779 -o traffic.jsonl.gz
+    python rpc_replay.py replay traffic.jsonl.gz --listen 127.0.0.1:7777 [--speed 2.0] [--no-pacing]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import sys
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import requests
+
+from rpc_proxy import dumps_rpc_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORD_LISTEN = "127.0.0.1:7779"
+DEFAULT_REPLAY_LISTEN = "127.0.0.1:7777"
+
+
+def request_key(request: Any) -> str:
+    """Identify a request or batch by methods and parameters, ignoring ids"""
+    if isinstance(request, list):
+        return "[" + ",".join(request_key(call) for call in request) + "]"
+    if not isinstance(request, dict):
+        return json.dumps(request, sort_keys=True, default=str)
+    return json.dumps([request.get("method"), request.get("params") or []], sort_keys=True, default=str)
+
+
+def _url_path(path: Optional[str]) -> str:
+    """The path a request was sent to, "/" for the node's default wallet"""
+    return path if path and path != "/" else "/"
+
+
+def read_exchanges(path: str) -> List[Dict[str, Any]]:
+    """Exchanges in a gzip or plain JSONL file, stopping at a truncated tail"""
+    exchanges = []
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    exchanges.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping a torn record in {path}")
+        except (EOFError, zlib.error) as e:
+            logger.warning(f"{path} ends in a truncated record: {e}")
+    return exchanges
+
+
+class Recorder:
+    """Appends exchanges to a JSONL cassette, compressing .gz cassettes on close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.part_path = path + ".part" if path.endswith(".gz") else path
+        self.count = 0
+        self.started = time.monotonic()
+        if self.part_path != path:
+            self._compress_part()
+        self._file = open(self.part_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, request_body: str, status: int, response_body: str, elapsed: float, offset: float,
+               path: str = "/") -> None:
+        # Bodies are kept verbatim so amount literals replay exactly
+        line = json.dumps({"t": round(offset, 6), "elapsed": round(elapsed, 6), "status": status,
+                           "path": _url_path(path), "request": request_body, "response": response_body})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            if self.part_path != self.path:
+                self._compress_part()
+
+    def _compress_part(self) -> None:
+        """Append the plain .part file (e.g. left by a killed recorder) to the cassette as a gzip member"""
+        if not os.path.exists(self.part_path):
+            return
+        exchanges = read_exchanges(self.part_path)
+        if exchanges:
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                for exchange in exchanges:
+                    f.write(json.dumps(exchange) + "\n")
+        os.remove(self.part_path)
+
+
+class Cassette:
+    """Recorded exchanges indexed by URL path and request key"""
+
+    def __init__(self, exchanges: List[Dict[str, Any]]):
+        self.exchanges = exchanges
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        for exchange in exchanges:
+            try:
+                key = request_key(json.loads(exchange["request"]))
+            except ValueError:
+                continue
+            self._queues[(_url_path(exchange.get("path")), key)].append(exchange)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Load a cassette, including lines a killed recorder left in its .part file"""
+        part_path = path + ".part"
+        if not path.endswith(".gz") or not os.path.exists(part_path):
+            return cls(read_exchanges(path))
+        exchanges = read_exchanges(path) if os.path.exists(path) else []
+        return cls(exchanges + read_exchanges(part_path))
+
+    def next_exchange(self, request: Any, path: str = "/") -> Optional[Dict[str, Any]]:
+        """Return the next recorded exchange for request sent to path, repeating the last one"""
+        with self._lock:
+            queue = self._queues.get((_url_path(path), request_key(request)))
+            if not queue:
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    @property
+    def start(self) -> float:
+        """Offset of the first recorded request"""
+        return min((exchange.get("t", 0.0) for exchange in self.exchanges), default=0.0)
+
+    @property
+    def duration(self) -> float:
+        return max((exchange.get("t", 0.0) for exchange in self.exchanges), default=0.0) - self.start
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Forwards requests upstream and records each exchange"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        headers = {"Content-Type": "application/json"}
+        if self.headers.get("Authorization"):
+            headers["Authorization"] = self.headers["Authorization"]
+        offset = time.monotonic() - server.recorder.started
+        # Keep /wallet/<name> so each wallet's traffic is recorded against that wallet
+        path = _url_path(self.path)
+        url = server.upstream.rstrip("/") + path if path != "/" else server.upstream
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, data=body, headers=headers, timeout=server.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Upstream request failed: {e}")
+            self._send(502, json.dumps({"result": None, "error": {"code": -32603, "message": str(e)}, "id": None}))
+            return
+        elapsed = time.perf_counter() - start
+        if response.status_code not in (401, 403):
+            server.recorder.record(body.decode("utf-8", "replace"), response.status_code, response.text,
+                                   elapsed, offset, path)
+        self._send(response.status_code, response.text)
+
+    def _send(self, status: int, text: str) -> None:
+        encoded = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class ReplayHandler(RecordingHandler):
+    """Answers requests from a cassette"""
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            request = json.loads(body, parse_float=Decimal)
+        except ValueError:
+            self._send(400, json.dumps({"result": None, "error": {"code": -32700, "message": "Parse error"},
+                                        "id": None}))
+            return
+        exchange = server.cassette.next_exchange(request, self.path)
+        if exchange is None:
+            server.unmatched += 1
+            logger.warning(f"No recorded response for {request_key(request)} at {self.path}")
+            self._send(500, json.dumps({"result": None,
+                                        "error": {"code": -32603, "message": "No recorded response"},
+                                        "id": request.get("id") if isinstance(request, dict) else None}))
+            return
+        server.served += 1
+        if server.speed > 0:
+            time.sleep(self._delay(exchange))
+        self._send(exchange["status"], self._with_ids(request, exchange["response"]))
+
+    def _delay(self, exchange: Dict[str, Any]) -> float:
+        """Seconds to hold the response: its latency, or until its place on the recorded timeline"""
+        server = self.server
+        delay = exchange["elapsed"] / server.speed
+        if server.paced:
+            now = time.monotonic()
+            with server.lock:
+                if server.origin is None:
+                    server.origin = now
+            offset = exchange.get("t", 0.0) - server.cassette.start + exchange["elapsed"]
+            delay = max(delay, server.origin + offset / server.speed - now)
+        return delay
+
+    @staticmethod
+    def _with_ids(request: Any, response_text: str) -> str:
+        """Give the recorded response the ids of the request being answered"""
+        try:
+            response = json.loads(response_text, parse_float=Decimal)
+        except ValueError:
+            return response_text
+        if isinstance(request, list) and isinstance(response, list):
+            # Replies to a batch may come back in any order; match on the recorded ids' positions
+            for reply, call in zip(sorted(response, key=_reply_order), request):
+                if isinstance(reply, dict) and isinstance(call, dict):
+                    reply["id"] = call.get("id")
+        elif isinstance(request, dict) and isinstance(response, dict):
+            response["id"] = request.get("id")
+        return dumps_rpc_json(response)
+
+
+def _reply_order(reply: Any) -> Tuple[int, str]:
+    index = reply.get("id") if isinstance(reply, dict) else None
+    return (index, "") if isinstance(index, int) else (0, str(index))
+
+
+def _parse_listen(listen: str) -> Tuple[str, int]:
+    host, _, port = listen.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def make_recorder(upstream: str, output: str, listen: str = DEFAULT_RECORD_LISTEN,
+                  timeout: float = 30.0) -> ThreadingHTTPServer:
+    """Create (but do not start) a recording proxy writing to output"""
+    server = ThreadingHTTPServer(_parse_listen(listen), RecordingHandler)
+    server.daemon_threads = True
+    server.upstream = upstream
+    server.timeout = timeout
+    server.recorder = Recorder(output)
+    return server
+
+
+def make_replayer(cassette: Cassette, listen: str = DEFAULT_REPLAY_LISTEN, speed: float = 1.0,
+                  paced: bool = True) -> ThreadingHTTPServer:
+    """Create (but do not start) a server replaying cassette
+
+    With paced set the recording's timeline starts at the first request.
+    """
+    server = ThreadingHTTPServer(_parse_listen(listen), ReplayHandler)
+    server.daemon_threads = True
+    server.cassette = cassette
+    server.speed = speed
+    server.paced = paced
+    server.origin = None
+    server.lock = threading.Lock()
+    server.served = 0
+    server.unmatched = 0
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Record and replay Satox Core JSON-RPC traffic")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    record = commands.add_parser("record", help="Proxy to a node and record the traffic")
+    record.add_argument("--upstream", default="http://127.0.0.1:7777", help="Satox Core RPC URL")
+    record.add_argument("--listen", default=DEFAULT_RECORD_LISTEN, help="host:port to listen on")
+    record.add_argument("-o", "--output", default="rpc_traffic.jsonl.gz", help="Cassette to append to")
+
+    replay = commands.add_parser("replay", help="Serve a recording in place of a node")
+    replay.add_argument("cassette", help="Recorded .jsonl.gz file")
+    replay.add_argument("--listen", default=DEFAULT_REPLAY_LISTEN, help="host:port to listen on")
+    replay.add_argument("--speed", type=float, default=1.0,
+                        help="Divide recorded timing by this factor (0 = answer immediately)")
+    replay.add_argument("--no-pacing", action="store_true",
+                        help="Only apply the recorded latency, not the original arrival times")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        if args.command == "record":
+            server = make_recorder(args.upstream, args.output, args.listen)
+            print(f"⏺️  Recording {args.listen} -> {args.upstream} into {args.output}")
+        else:
+            cassette = Cassette.load(args.cassette)
+            server = make_replayer(cassette, args.listen, args.speed, paced=not args.no_pacing)
+            print(f"▶️  Replaying {len(cassette.exchanges)} exchanges ({cassette.duration:.1f}s) on {args.listen}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.command == "record":
+            server.recorder.close()
+            print(f"\n💾 Recorded {server.recorder.count} exchanges")
+        else:
+            print(f"\n📊 Served {server.served} responses, {server.unmatched} unmatched")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Address Validation
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Base58Check encoding, decoding and validation for Satoxcoin addresses.
+Results are cached so large address lists (multi-address configs, donor
+registries) can be validated repeatedly at dictionary-lookup cost.
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_BASE58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+# Satoxcoin P2PKH addresses use version byte 63 and therefore start with 'S'
+PUBKEY_ADDRESS_VERSION = 63
+ADDRESS_VERSIONS = frozenset({PUBKEY_ADDRESS_VERSION})
+
+# 1 version byte + 20 byte hash160 + 4 byte checksum
+ADDRESS_PAYLOAD_SIZE = 25
+
+# Base58 lengths a 25-byte payload can encode to
+MIN_ADDRESS_LENGTH = 26
+MAX_ADDRESS_LENGTH = 35
+
+
+def double_sha256(data: bytes) -> bytes:
+    """Return SHA256(SHA256(data))"""
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def b58decode(value: str) -> bytes:
+    """Decode a Base58 string to bytes (raises ValueError on bad characters)"""
+    number = 0
+    try:
+        for char in value:
+            number = number * 58 + _BASE58_INDEX[char]
+    except KeyError as e:
+        raise ValueError(f"Invalid Base58 character: {e.args[0]!r}")
+
+    # Each leading '1' encodes a leading zero byte
+    leading_zeros = len(value) - len(value.lstrip('1'))
+    body = number.to_bytes((number.bit_length() + 7) // 8, 'big') if number else b''
+    return b'\x00' * leading_zeros + body
+
+
+def b58encode(data: bytes) -> str:
+    """Encode bytes as a Base58 string"""
+    number = int.from_bytes(data, 'big')
+    chars = []
+    while number:
+        number, remainder = divmod(number, 58)
+        chars.append(BASE58_ALPHABET[remainder])
+    leading_zeros = len(data) - len(data.lstrip(b'\x00'))
+    return '1' * leading_zeros + ''.join(reversed(chars))
+
+
+def encode_address(hash160: bytes, version: int = PUBKEY_ADDRESS_VERSION) -> str:
+    """Encode a 20-byte hash160 as a Base58Check address"""
+    if len(hash160) != 20:
+        raise ValueError("hash160 must be 20 bytes")
+    payload = bytes([version]) + hash160
+    return b58encode(payload + double_sha256(payload)[:4])
+
+
+def decode_address(address: str) -> Tuple[int, bytes]:
+    """Decode a Base58Check address into (version, hash160)
+
+    Raises ValueError if the address is malformed or the checksum is wrong.
+    """
+    if not MIN_ADDRESS_LENGTH <= len(address) <= MAX_ADDRESS_LENGTH:
+        raise ValueError(f"Invalid address length: {len(address)}")
+
+    raw = b58decode(address)
+    if len(raw) != ADDRESS_PAYLOAD_SIZE:
+        raise ValueError(f"Invalid address payload size: {len(raw)}")
+
+    payload, checksum = raw[:-4], raw[-4:]
+    if double_sha256(payload)[:4] != checksum:
+        raise ValueError("Address checksum mismatch")
+
+    return payload[0], payload[1:]
+
+
+class AddressValidator:
+    """Cached Base58Check validator for a set of accepted version bytes"""
+
+    def __init__(self, versions: Iterable[int] = ADDRESS_VERSIONS, cache_size: int = 65536):
+        self.versions: FrozenSet[int] = frozenset(versions)
+        self._cached_validate = lru_cache(maxsize=cache_size)(self._validate_uncached)
+
+    def _validate_uncached(self, address: str) -> bool:
+        try:
+            version, _ = decode_address(address)
+        except ValueError:
+            return False
+        return version in self.versions
+
+    def validate(self, address: str) -> bool:
+        """Return True if address is a checksummed address with an accepted version"""
+        if not address or not isinstance(address, str):
+            return False
+        return self._cached_validate(address)
+
+    def validate_many(self, addresses: Iterable[str]) -> Dict[str, bool]:
+        """Validate many addresses at once, returning {address: is_valid}
+
+        Duplicate entries are validated only once.
+        """
+        results: Dict[str, bool] = {}
+        validate = self.validate
+        for address in addresses:
+            if address not in results:
+                results[address] = validate(address)
+        return results
+
+    def cache_info(self):
+        """Return lru_cache statistics for the validation cache"""
+        return self._cached_validate.cache_info()
+
+    def clear_cache(self) -> None:
+        """Drop all cached validation results"""
+        self._cached_validate.cache_clear()
+
+
+# Shared validator used by the monitor and configuration tools
+default_validator = AddressValidator()
+
+
+def validate_address(address: str) -> bool:
+    """Validate a Satoxcoin address (Base58Check, version byte and checksum)"""
+    return default_validator.validate(address)
+
+
+def validate_many(addresses: Iterable[str]) -> Dict[str, bool]:
+    """Validate a batch of Satoxcoin addresses with the shared validator"""
+    return default_validator.validate_many(addresses)
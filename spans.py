@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Span Recorder
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Records timed spans of the monitor pipeline (cycle, poll, parse, dedup,
+enrich, queue, deliver) into a fixed-size ring buffer. Recording a span is
+a perf_counter_ns() pair and one list store, with no locks and no
+allocation beyond the tuple, so it can stay on in production; once the
+buffer is full the oldest spans are overwritten.
+
+The buffer can be dumped as JSON or in the Chrome trace event format
+(load it in chrome://tracing or ui.perfetto.dev), over the overlay
+server's /debug/spans endpoint or to a file on SIGUSR1.
+"""
+
+import itertools
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 4096
+
+# Pipeline stages, outermost first
+STAGES = ("cycle", "poll", "parse", "dedup", "enrich", "queue", "deliver")
+
+# (name, start ns, duration ns, thread id, args)
+Span = Tuple[str, int, int, int, Optional[Dict[str, Any]]]
+
+
+class _ActiveSpan:
+    """Context manager timing one span"""
+
+    __slots__ = ("recorder", "name", "args", "start")
+
+    def __init__(self, recorder: "SpanRecorder", name: str, args: Optional[Dict[str, Any]]):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_ActiveSpan":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.recorder.record(self.name, self.start, time.perf_counter_ns(), self.args)
+
+
+class _NullSpan:
+    """Stand-in returned while recording is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class SpanRecorder:
+    """Lock-free ring buffer of timed spans
+
+    Writers claim a slot from an itertools counter (atomic under the GIL)
+    and store one tuple, so concurrent threads never block each other.
+    A capacity of 0 disables recording.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(0, int(capacity))
+        self.enabled = self.capacity > 0
+        self.recorded = 0
+        self._slots: List[Optional[Span]] = [None] * self.capacity
+        self._counter = itertools.count()
+        self._origin = time.perf_counter_ns()
+        self._wall_origin = time.time()
+
+    def span(self, name: str, args: Optional[Dict[str, Any]] = None):
+        """Context manager recording the time spent inside it as a span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, args)
+
+    def start(self) -> int:
+        """Timestamp for a span finished later with finish()"""
+        return time.perf_counter_ns()
+
+    def finish(self, name: str, start: int, args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a span from start (see start()) until now"""
+        self.record(name, start, time.perf_counter_ns(), args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: Optional[Dict[str, Any]] = None) -> None:
+        """Store a finished span, overwriting the oldest once full"""
+        if not self.enabled:
+            return
+        index = next(self._counter)
+        self._slots[index % self.capacity] = (name, start_ns, end_ns - start_ns, threading.get_ident(), args)
+        self.recorded = index + 1
+
+    def clear(self) -> None:
+        """Drop every recorded span"""
+        self._slots = [None] * self.capacity
+        self._counter = itertools.count()
+        self.recorded = 0
+
+    def spans(self) -> List[Span]:
+        """Recorded spans still in the buffer, oldest first"""
+        recorded = self.recorded
+        first = max(0, recorded - self.capacity)
+        slots = self._slots
+        spans = [slots[index % self.capacity] for index in range(first, recorded)] if self.capacity else []
+        # A writer may be mid-way through a slot; order by start time regardless
+        return sorted((span for span in spans if span is not None), key=lambda span: span[1])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean and max milliseconds per span name"""
+        totals: Dict[str, List[int]] = {}
+        for name, _, duration, _, _ in self.spans():
+            totals.setdefault(name, []).append(duration)
+        return {
+            name: {
+                "count": len(durations),
+                "total_ms": round(sum(durations) / 1e6, 3),
+                "mean_ms": round(sum(durations) / len(durations) / 1e6, 3),
+                "max_ms": round(max(durations) / 1e6, 3),
+            }
+            for name, durations in totals.items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON view: spans with start offsets and durations in microseconds"""
+        threads = _thread_names()
+        return {
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "dropped": max(0, self.recorded - self.capacity),
+            "started": datetime.fromtimestamp(self._wall_origin).isoformat(timespec="seconds"),
+            "summary": self.summary(),
+            "spans": [
+                {
+                    "name": name,
+                    "start_us": (start - self._origin) // 1000,
+                    "duration_us": duration / 1000,
+                    "thread": threads.get(thread, str(thread)),
+                    "args": args or {},
+                }
+                for name, start, duration, thread, args in self.spans()
+            ],
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format: complete ("X") events plus thread names"""
+        pid = os.getpid()
+        spans = self.spans()
+        threads = _thread_names()
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread,
+             "args": {"name": threads.get(thread, str(thread))}}
+            for thread in sorted({span[3] for span in spans})
+        ]
+        events.extend(
+            {"name": name, "cat": "monitor", "ph": "X", "pid": pid, "tid": thread,
+             "ts": (start - self._origin) / 1000, "dur": duration / 1000, "args": args or {}}
+            for name, start, duration, thread, args in spans
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dumps(self, fmt: str = "json") -> str:
+        """Serialize the buffer as "json" or "chrome" """
+        if fmt == "chrome":
+            return json.dumps(self.chrome_trace())
+        if fmt == "json":
+            return json.dumps(self.to_dict())
+        raise ValueError(f"Unknown span format {fmt!r}; expected json or chrome")
+
+    def dump(self, path: str, fmt: str = "chrome") -> str:
+        """Write the buffer to path and return it"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.dumps(fmt))
+        return path
+
+
+def _thread_names() -> Dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate() if thread.ident is not None}
+
+
+def install_dump_signal(recorder: SpanRecorder, directory: str) -> bool:
+    """Dump a Chrome trace to directory whenever the process gets SIGUSR1
+
+    Returns False where SIGUSR1 does not exist (Windows) or when not
+    called from the main thread.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+
+    def handle(signum, frame):
+        name = f"spans-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            path = recorder.dump(os.path.join(directory, name))
+            logger.info(f"Spans written to {path}")
+        except OSError as e:
+            logger.error(f"Could not write spans: {e}")
+
+    try:
+        signal.signal(signal.SIGUSR1, handle)
+    except ValueError:
+        return False
+    return True
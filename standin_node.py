@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Stand-in Node
+Copyright (c) 2025 Satoxcoin Core Developers
+
+A local fake Satox Core for end-to-end and load tests. It keeps a small
+in-memory chain, mempool and wallet and answers the RPC subset the
+monitor, its ingestion modes and backfill use:
+
+    getinfo, getblockchaininfo, getblockcount, getbestblockhash, getblockhash,
+    getblock (verbosity 1 and 2), listtransactions, listsinceblock,
+    gettransaction, getrawtransaction, getrawmempool, getbalance,
+    getaddressdeltas, getaddressmempool
+
+Blocks are mined on an accelerated clock (one block every block_interval
+wall-clock seconds, stamped 60 simulated seconds apart), reorgs can be
+triggered or scheduled at a height, latency and errors can be injected,
+and donation load comes from Poisson, raid-burst and dust-spam generators.
+Amounts are written as exact 8-decimal literals like the real node.
+
+start_p2p() adds a minimal P2P front-end for the p2p ingestion mode: it
+completes the version handshake, answers mempool and getdata requests and
+announces every broadcast to connected peers with an inv.
+
+Usage:
+    python standin_node.py [--listen 127.0.0.1:7777] [--p2p-listen 127.0.0.1:7778] [--block-interval 1]
+        [--address S... --rate 0.5]
+"""
+
+import argparse
+import base64
+import hashlib
+import inspect
+import json
+import logging
+import random
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from amounts import COIN, DECIMALS
+from chain_decode import encode_varint, p2pkh_script
+from p2p_listener import MSG_TX, ProtocolError, pack_inventory, pack_message, parse_inventory, read_message
+from rpc_proxy import dumps_rpc_json
+from satox_address import decode_address, double_sha256
+
+logger = logging.getLogger(__name__)
+
+BLOCK_TIME = 60                  # Simulated seconds between blocks
+GENESIS_TIME = 1700000000
+DUST_AMOUNT = 546                # Base units
+CORE_VERSION = 40100
+P2P_PROTOCOL_VERSION = 70028
+P2P_MAGIC = b"SATX"              # Stand-in network magic, not a real network's
+
+# (offset in seconds from the start of the load, address, amount in base units)
+ScheduledDonation = Tuple[float, str, int]
+
+
+class RPCError(Exception):
+    """An error returned to the client as a JSON-RPC error object"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def to_amount(units: int) -> Decimal:
+    """Base units as an exact decimal rendered with 8 places"""
+    return Decimal(units).scaleb(-DECIMALS)
+
+
+# -- donation generators -----------------------------------------------------
+
+def poisson_donations(rate: float, duration: float, addresses: Sequence[str],
+                      amounts: Tuple[int, int] = (COIN, 100 * COIN),
+                      rng: Optional[random.Random] = None) -> List[ScheduledDonation]:
+    """Donations arriving as a Poisson process of rate per second"""
+    rng = rng or random.Random()
+    schedule: List[ScheduledDonation] = []
+    offset = rng.expovariate(rate) if rate > 0 else duration
+    while offset < duration:
+        schedule.append((offset, rng.choice(addresses), rng.randint(*amounts)))
+        offset += rng.expovariate(rate)
+    return schedule
+
+
+def raid_burst(count: int, addresses: Sequence[str], amounts: Tuple[int, int] = (COIN, 10 * COIN),
+               start: float = 0.0, spread: float = 1.0,
+               rng: Optional[random.Random] = None) -> List[ScheduledDonation]:
+    """count donations landing within spread seconds, as when a raid arrives"""
+    rng = rng or random.Random()
+    return sorted((start + rng.uniform(0, spread), rng.choice(addresses), rng.randint(*amounts))
+                  for _ in range(count))
+
+
+def dust_spam(rate: float, duration: float, addresses: Sequence[str],
+              amount: int = DUST_AMOUNT) -> List[ScheduledDonation]:
+    """Evenly spaced dust payments, well below any minimum donation"""
+    if rate <= 0:
+        return []
+    return [(i / rate, addresses[i % len(addresses)], amount) for i in range(int(duration * rate))]
+
+
+# -- chain model -------------------------------------------------------------
+
+class StandInTransaction:
+    """A wallet-visible transaction paying one or more addresses"""
+
+    __slots__ = ('txid', 'hex', 'outputs', 'time', 'blockhash', 'conflicted')
+
+    def __init__(self, outputs: List[Tuple[str, int]], serial: int, created: int):
+        raw = bytearray(struct.pack('<I', 2) + b'\x01' + bytes(32) + struct.pack('<I', serial)
+                        + b'\x00\xff\xff\xff\xff' + encode_varint(len(outputs)))
+        for address, amount in outputs:
+            script = p2pkh_script(decode_address(address)[1])
+            raw += struct.pack('<Q', amount) + encode_varint(len(script)) + script
+        raw += bytes(4)
+        self.txid = double_sha256(bytes(raw))[::-1].hex()
+        self.hex = bytes(raw).hex()
+        self.outputs = outputs
+        self.time = created
+        self.blockhash: Optional[str] = None
+        self.conflicted = False
+
+
+class StandInBlock:
+    __slots__ = ('hash', 'height', 'time', 'previousblockhash', 'txids')
+
+    def __init__(self, height: int, previous: Optional[str], txids: List[str], salt: int):
+        self.height = height
+        self.previousblockhash = previous
+        self.time = GENESIS_TIME + height * BLOCK_TIME
+        self.txids = txids
+        self.hash = hashlib.sha256(f"{previous}:{height}:{salt}".encode()).hexdigest()
+
+
+class StandInNode:
+    """In-memory chain, mempool and wallet served over JSON-RPC
+
+    wallet_addresses limits which payments appear in the wallet calls
+    (listtransactions, gettransaction, ...); by default every payment
+    does. Raw transaction, block and address index calls see everything.
+    """
+
+    def __init__(self, wallet_addresses: Optional[Iterable[str]] = None, height: int = 100,
+                 block_interval: float = 0.0, latency: float = 0.0, error_rate: float = 0.0,
+                 rpc_user: Optional[str] = None, rpc_password: Optional[str] = None,
+                 seed: Optional[int] = None):
+        self.wallet_addresses = set(wallet_addresses) if wallet_addresses is not None else None
+        self.block_interval = block_interval
+        self.latency = latency
+        self.error_rate = error_rate
+        self.down = False
+        self.rng = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self.broadcast_times: Dict[str, float] = {}
+        self.errors: Dict[str, RPCError] = {}
+        self._auth = None
+        if rpc_user is not None:
+            self._auth = "Basic " + base64.b64encode(f"{rpc_user}:{rpc_password or ''}".encode()).decode()
+
+        self.blocks: Dict[str, StandInBlock] = {}       # every block ever mined, orphans included
+        self.chain: List[StandInBlock] = []              # active chain by height
+        self.transactions: Dict[str, StandInTransaction] = {}
+        self.mempool: Dict[str, None] = {}               # insertion-ordered set of txids
+        self.scheduled_reorgs: Dict[int, int] = {}       # height -> depth
+        self._serial = 0
+        self._salt = 0
+        self._lock = threading.RLock()
+        self._last_block = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url: Optional[str] = None
+        self._p2p_server: Optional[socketserver.ThreadingTCPServer] = None
+        self._p2p_peers: Dict["StandInPeerHandler", None] = {}
+        self.p2p_magic = P2P_MAGIC
+        self.p2p_port: Optional[int] = None
+
+        previous = None
+        for block_height in range(height + 1):
+            previous = self._append_block(block_height, previous, []).hash
+
+    # -- chain control ------------------------------------------------------
+
+    @property
+    def height(self) -> int:
+        return len(self.chain) - 1
+
+    @property
+    def tip(self) -> StandInBlock:
+        return self.chain[-1]
+
+    def _append_block(self, height: int, previous: Optional[str], txids: List[str]) -> StandInBlock:
+        self._salt += 1
+        block = StandInBlock(height, previous, txids, self._salt)
+        self.blocks[block.hash] = block
+        self.chain.append(block)
+        for txid in txids:
+            self.transactions[txid].blockhash = block.hash
+        return block
+
+    def broadcast(self, address: str, amount: int, *extra_outputs: Tuple[str, int]) -> str:
+        """Add a transaction paying amount (base units) to address to the mempool"""
+        with self._lock:
+            self._serial += 1
+            tx = StandInTransaction([(address, amount)] + list(extra_outputs), self._serial,
+                                    self.tip.time + BLOCK_TIME // 2)
+            self.transactions[tx.txid] = tx
+            self.mempool[tx.txid] = None
+            self.broadcast_times[tx.txid] = time.monotonic()
+            peers = list(self._p2p_peers)
+        for peer in peers:
+            peer.announce([tx.txid])
+        return tx.txid
+
+    def mine(self, count: int = 1) -> List[str]:
+        """Mine count blocks; the first one takes the whole mempool"""
+        hashes = []
+        with self._lock:
+            for _ in range(count):
+                txids = list(self.mempool)
+                self.mempool.clear()
+                hashes.append(self._append_block(self.height + 1, self.tip.hash, txids).hash)
+                depth = self.scheduled_reorgs.pop(self.height, None)
+                if depth:
+                    self.reorg(depth)
+            self._last_block = time.monotonic()
+        return hashes
+
+    def reorg(self, depth: int, drop: Iterable[str] = ()) -> List[str]:
+        """Replace the top depth blocks with depth + 1 new ones
+
+        Transactions from the orphaned blocks go back to the mempool and are
+        mined again in the first replacement block, except those in drop,
+        which are treated as double-spent (confirmations -1 in the wallet).
+        """
+        drop = set(drop)
+        with self._lock:
+            orphaned = self.chain[-depth:]
+            del self.chain[-depth:]
+            returned = []
+            for block in orphaned:
+                for txid in block.txids:
+                    tx = self.transactions[txid]
+                    tx.blockhash = None
+                    if txid in drop:
+                        tx.conflicted = True
+                    else:
+                        returned.append(txid)
+            for txid in drop:
+                if txid in self.mempool:
+                    self.transactions[txid].conflicted = True
+            self.mempool = dict.fromkeys(returned + [txid for txid in self.mempool if txid not in drop])
+            logger.info(f"Stand-in reorg: orphaned {depth} block(s) at height {orphaned[0].height}")
+            return self.mine(depth + 1)
+
+    def schedule_reorg(self, height: int, depth: int) -> None:
+        """Reorg depth blocks as soon as the chain reaches height"""
+        with self._lock:
+            self.scheduled_reorgs[height] = depth
+
+    def fail(self, method: str, code: int = -32603, message: str = "Injected failure") -> None:
+        """Make every call to method return an RPC error until cleared"""
+        self.errors[method] = RPCError(code, message)
+
+    def clear_failures(self) -> None:
+        self.errors.clear()
+
+    def _tick(self) -> None:
+        """Mine blocks that are due on the accelerated clock"""
+        if self.block_interval <= 0:
+            return
+        with self._lock:
+            due = int((time.monotonic() - self._last_block) / self.block_interval)
+            if due > 0:
+                self.mine(due)
+
+    # -- load ----------------------------------------------------------------
+
+    def run_load(self, schedule: List[ScheduledDonation]) -> threading.Thread:
+        """Broadcast a donation schedule in real time on a background thread"""
+        def play():
+            started = time.monotonic()
+            for offset, address, amount in sorted(schedule):
+                delay = started + offset - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self.broadcast(address, amount)
+
+        thread = threading.Thread(target=play, name="standin-load", daemon=True)
+        thread.start()
+        return thread
+
+    # -- wallet views --------------------------------------------------------
+
+    def _confirmations(self, tx: StandInTransaction) -> int:
+        if tx.conflicted:
+            return -1
+        if tx.blockhash is None:
+            return 0
+        return self.height - self.blocks[tx.blockhash].height + 1
+
+    def _in_wallet(self, address: str) -> bool:
+        return self.wallet_addresses is None or address in self.wallet_addresses
+
+    def _wallet_entries(self, tx: StandInTransaction) -> List[Dict[str, Any]]:
+        entries = []
+        confirmations = self._confirmations(tx)
+        for vout, (address, amount) in enumerate(tx.outputs):
+            if not self._in_wallet(address):
+                continue
+            entry = {"address": address, "category": "receive", "amount": to_amount(amount), "label": "",
+                     "vout": vout, "confirmations": confirmations, "txid": tx.txid, "time": tx.time,
+                     "timereceived": tx.time}
+            if tx.blockhash is not None and confirmations > 0:
+                block = self.blocks[tx.blockhash]
+                entry.update(blockhash=block.hash, blockheight=block.height, blocktime=block.time)
+            entries.append(entry)
+        return entries
+
+    def _wallet_history(self) -> List[StandInTransaction]:
+        """Wallet transactions oldest first"""
+        return [tx for tx in self.transactions.values() if any(self._in_wallet(a) for a, _ in tx.outputs)]
+
+    def _decoded(self, tx: StandInTransaction) -> Dict[str, Any]:
+        vout = [{"value": to_amount(amount), "n": n,
+                 "scriptPubKey": {"type": "pubkeyhash", "addresses": [address]}}
+                for n, (address, amount) in enumerate(tx.outputs)]
+        decoded = {"txid": tx.txid, "hash": tx.txid, "version": 2, "hex": tx.hex, "vout": vout, "time": tx.time}
+        confirmations = self._confirmations(tx)
+        if confirmations > 0:
+            decoded.update(blockhash=tx.blockhash, confirmations=confirmations,
+                           blocktime=self.blocks[tx.blockhash].time)
+        return decoded
+
+    def _block_view(self, block: StandInBlock, verbosity: int) -> Dict[str, Any]:
+        active = block.height <= self.height and self.chain[block.height] is block
+        view = {"hash": block.hash, "height": block.height, "time": block.time,
+                "confirmations": self.height - block.height + 1 if active else -1,
+                "tx": ([self._decoded(self.transactions[txid]) for txid in block.txids]
+                       if verbosity >= 2 else list(block.txids))}
+        if block.previousblockhash:
+            view["previousblockhash"] = block.previousblockhash
+        if active and block.height < self.height:
+            view["nextblockhash"] = self.chain[block.height + 1].hash
+        return view
+
+    # -- RPC dispatch --------------------------------------------------------
+
+    def dispatch(self, method: str, params: List[Any]) -> Any:
+        """Answer one RPC call; raises RPCError like the real node"""
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if method in self.errors:
+            raise self.errors[method]
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise RPCError(-32603, "Injected random failure")
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            raise RPCError(-32601, "Method not found")
+        try:
+            inspect.signature(handler).bind(*params)
+        except TypeError:
+            raise RPCError(-1, f"Invalid parameters for {method}")
+        self._tick()
+        with self._lock:
+            # Errors raised by the handler itself are bugs in the stand-in, not bad parameters
+            return handler(*params)
+
+    def rpc_getinfo(self) -> Dict[str, Any]:
+        return {"version": CORE_VERSION, "protocolversion": 70028, "blocks": self.height, "connections": 8,
+                "testnet": False, "errors": ""}
+
+    def rpc_getblockchaininfo(self) -> Dict[str, Any]:
+        return {"chain": "main", "blocks": self.height, "headers": self.height, "bestblockhash": self.tip.hash,
+                "initialblockdownload": False}
+
+    def rpc_getblockcount(self) -> int:
+        return self.height
+
+    def rpc_getbestblockhash(self) -> str:
+        return self.tip.hash
+
+    def rpc_getblockhash(self, height: int) -> str:
+        if not 0 <= height <= self.height:
+            raise RPCError(-8, "Block height out of range")
+        return self.chain[height].hash
+
+    def rpc_getblock(self, block_hash: str, verbosity: int = 1) -> Dict[str, Any]:
+        block = self.blocks.get(block_hash)
+        if block is None:
+            raise RPCError(-5, "Block not found")
+        if verbosity == 0:
+            raise RPCError(-8, "Serialized blocks are not supported by the stand-in node")
+        return self._block_view(block, verbosity)
+
+    def rpc_getrawmempool(self, verbose: bool = False) -> List[str]:
+        return list(self.mempool)
+
+    def rpc_getrawtransaction(self, txid: str, verbose: Any = False) -> Any:
+        tx = self.transactions.get(txid)
+        if tx is None or tx.conflicted:
+            raise RPCError(-5, "No such mempool or blockchain transaction")
+        return self._decoded(tx) if verbose else tx.hex
+
+    def rpc_gettransaction(self, txid: str, include_watchonly: bool = True) -> Dict[str, Any]:
+        tx = self.transactions.get(txid)
+        details = self._wallet_entries(tx) if tx is not None else []
+        if not details:
+            raise RPCError(-5, "Invalid or non-wallet transaction id")
+        result = {"amount": to_amount(sum(amount for a, amount in tx.outputs if self._in_wallet(a))),
+                  "confirmations": self._confirmations(tx), "txid": txid, "time": tx.time,
+                  "timereceived": tx.time, "details": details,
+                  "hex": tx.hex}
+        for key in ("blockhash", "blockheight", "blocktime"):
+            if key in details[0]:
+                result[key] = details[0][key]
+        return result
+
+    def rpc_listtransactions(self, label: str = "*", count: int = 10, skip: int = 0,
+                             include_watchonly: bool = True) -> List[Dict[str, Any]]:
+        entries = [entry for tx in self._wallet_history() for entry in self._wallet_entries(tx)]
+        end = len(entries) - skip
+        return entries[max(0, end - count):max(0, end)]
+
+    def rpc_listsinceblock(self, block_hash: str = "", target_confirmations: int = 1,
+                           include_watchonly: bool = True) -> Dict[str, Any]:
+        since_height = -1
+        removed: List[Dict[str, Any]] = []
+        if block_hash:
+            block = self.blocks.get(block_hash)
+            if block is None:
+                raise RPCError(-5, "Block not found")
+            # Walk back from an orphaned block to the active chain
+            while self.chain[block.height] is not block:
+                for txid in block.txids:
+                    removed.extend(self._wallet_entries(self.transactions[txid]))
+                block = self.blocks[block.previousblockhash]
+            since_height = block.height
+        transactions = [entry for tx in self._wallet_history() for entry in self._wallet_entries(tx)
+                        if tx.blockhash is None and not tx.conflicted
+                        or tx.blockhash is not None and self.blocks[tx.blockhash].height > since_height]
+        last = self.chain[max(0, self.height - target_confirmations + 1)].hash
+        return {"transactions": transactions, "removed": removed, "lastblock": last}
+
+    def rpc_getbalance(self, account: str = "*", minconf: int = 1, include_watchonly: bool = True) -> Decimal:
+        total = sum(amount for tx in self._wallet_history() if self._confirmations(tx) >= max(minconf, 0)
+                    and not tx.conflicted for address, amount in tx.outputs if self._in_wallet(address))
+        return to_amount(total)
+
+    def rpc_getaddressdeltas(self, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        addresses = set(options.get("addresses", ()))
+        start = options.get("start", 0)
+        end = options.get("end", self.height)
+        deltas = []
+        for block in self.chain[max(0, start):end + 1]:
+            for txid in block.txids:
+                for n, (address, amount) in enumerate(self.transactions[txid].outputs):
+                    if address in addresses:
+                        deltas.append({"satoshis": amount, "txid": txid, "index": n,
+                                       "height": block.height, "address": address})
+        return deltas
+
+    def rpc_getaddressmempool(self, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        addresses = set(options.get("addresses", ()))
+        return [{"address": address, "txid": txid, "index": n, "satoshis": amount,
+                 "timestamp": self.transactions[txid].time}
+                for txid in self.mempool
+                for n, (address, amount) in enumerate(self.transactions[txid].outputs) if address in addresses]
+
+    # -- HTTP ----------------------------------------------------------------
+
+    def start(self, listen: str = "127.0.0.1:0") -> str:
+        """Serve RPC on a background thread and return the URL"""
+        host, _, port = listen.rpartition(":")
+        self._server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), StandInHandler)
+        self._server.daemon_threads = True
+        self._server.node = self
+        self._last_block = time.monotonic()
+        self.url = f"http://{self._server.server_address[0]}:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), name="standin-node", daemon=True).start()
+        return self.url
+
+    def start_p2p(self, listen: str = "127.0.0.1:0", magic: bytes = P2P_MAGIC) -> int:
+        """Serve the P2P front-end on a background thread and return its port"""
+        host, _, port = listen.rpartition(":")
+        self.p2p_magic = magic
+        self._p2p_server = socketserver.ThreadingTCPServer((host or "127.0.0.1", int(port)), StandInPeerHandler)
+        self._p2p_server.daemon_threads = True
+        self._p2p_server.node = self
+        self.p2p_port = self._p2p_server.server_address[1]
+        threading.Thread(target=self._p2p_server.serve_forever, args=(0.05,), name="standin-p2p", daemon=True).start()
+        return self.p2p_port
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._p2p_server is not None:
+            self._p2p_server.shutdown()
+            self._p2p_server.server_close()
+            self._p2p_server = None
+            with self._lock:
+                peers = list(self._p2p_peers)
+            for peer in peers:
+                peer.close()
+
+    def __enter__(self) -> "StandInNode":
+        if self._server is None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class StandInPeerHandler(socketserver.BaseRequestHandler):
+    """One P2P client: handshake, then mempool and getdata requests plus inv announcements"""
+
+    def setup(self) -> None:
+        self._send_lock = threading.Lock()
+
+    def handle(self) -> None:
+        node: StandInNode = self.server.node
+        try:
+            while True:
+                command, payload = read_message(self.request, node.p2p_magic)
+                if command == "version":
+                    self.send("version", struct.pack("<i", P2P_PROTOCOL_VERSION) + bytes(80))
+                    self.send("verack")
+                elif command == "verack":
+                    with node._lock:
+                        node._p2p_peers[self] = None
+                elif command == "mempool":
+                    with node._lock:
+                        txids = list(node.mempool)
+                    self.announce(txids)
+                elif command == "getdata":
+                    for kind, item in parse_inventory(payload):
+                        tx = node.transactions.get(item[::-1].hex())
+                        if kind == MSG_TX and tx is not None:
+                            self.send("tx", bytes.fromhex(tx.hex))
+                elif command == "ping":
+                    self.send("pong", payload[:8])
+        except (OSError, ProtocolError):
+            pass
+        finally:
+            with node._lock:
+                node._p2p_peers.pop(self, None)
+
+    def send(self, command: str, payload: bytes = b"") -> None:
+        with self._send_lock:
+            self.request.sendall(pack_message(self.server.node.p2p_magic, command, payload))
+
+    def announce(self, txids: List[str]) -> None:
+        if not txids:
+            return
+        try:
+            self.send("inv", pack_inventory([(MSG_TX, bytes.fromhex(txid)[::-1]) for txid in txids]))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """JSON-RPC over HTTP the way Satox Core serves it"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        node: StandInNode = self.server.node
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if node.down:
+            self._send(503, "")
+            return
+        if node._auth is not None and self.headers.get("Authorization") != node._auth:
+            self._send(401, "")
+            return
+        if node.latency:
+            time.sleep(node.latency)
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self._send(500, json.dumps({"result": None, "error": {"code": -32700, "message": "Parse error"},
+                                        "id": None}))
+            return
+        if isinstance(request, list):
+            self._send(200, dumps_rpc_json([self._answer(node, call)[1] for call in request]))
+        else:
+            status, reply = self._answer(node, request)
+            self._send(status, dumps_rpc_json(reply))
+
+    @staticmethod
+    def _answer(node: StandInNode, call: Any) -> Tuple[int, Dict[str, Any]]:
+        call_id = call.get("id") if isinstance(call, dict) else None
+        try:
+            if not isinstance(call, dict) or not isinstance(call.get("method"), str):
+                raise RPCError(-32600, "Invalid request")
+            result = node.dispatch(call["method"], list(call.get("params") or []))
+        except RPCError as e:
+            status = 404 if e.code == -32601 else 500
+            return status, {"result": None, "error": {"code": e.code, "message": e.message}, "id": call_id}
+        return 200, {"result": result, "error": None, "id": call_id}
+
+    def _send(self, status: int, text: str) -> None:
+        encoded = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Stand-in Satox Core node for testing")
+    parser.add_argument("--listen", default="127.0.0.1:7777", help="host:port to serve RPC on")
+    parser.add_argument("--p2p-listen", help="host:port to serve the P2P front-end on (magic 53415458)")
+    parser.add_argument("--height", type=int, default=100, help="Initial chain height")
+    parser.add_argument("--block-interval", type=float, default=1.0,
+                        help="Wall-clock seconds per block (0 = only on demand)")
+    parser.add_argument("--address", action="append", default=[], help="Donation address to generate load for")
+    parser.add_argument("--rate", type=float, default=0.0, help="Poisson donations per second")
+    parser.add_argument("--raid", type=int, default=0, help="Donations in one burst at startup")
+    parser.add_argument("--dust", type=float, default=0.0, help="Dust payments per second")
+    parser.add_argument("--duration", type=float, default=3600.0, help="Seconds of generated load")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every RPC request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--user", help="Require this RPC user")
+    parser.add_argument("--password", help="Require this RPC password")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible load")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    node = StandInNode(height=args.height, block_interval=args.block_interval, latency=args.latency,
+                       error_rate=args.error_rate, rpc_user=args.user, rpc_password=args.password, seed=args.seed)
+    if (args.rate or args.raid or args.dust) and not args.address:
+        print("❌ --address is required to generate donations")
+        return 1
+    try:
+        url = node.start(args.listen)
+        if args.p2p_listen:
+            node.start_p2p(args.p2p_listen)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not listen: {e}")
+        return 1
+
+    schedule: List[ScheduledDonation] = []
+    if args.address:
+        schedule += poisson_donations(args.rate, args.duration, args.address, rng=node.rng)
+        schedule += raid_burst(args.raid, args.address, rng=node.rng)
+        schedule += dust_spam(args.dust, args.duration, args.address)
+    if schedule:
+        node.run_load(schedule)
+    print(f"🧪 Stand-in Satox Core at {url} (height {node.height}, {len(schedule)} donations scheduled)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n👋 Stand-in node stopped")
+    finally:
+        node.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
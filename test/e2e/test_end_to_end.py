@@ -10,14 +10,18 @@ import os
 import time
 import subprocess
 import requests
-import json
+import shutil
+import tempfile
 import threading
 from pathlib import Path
-from unittest.mock import patch, Mock
 
 # Add the parent directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
+from standin_node import StandInNode, dust_spam, raid_burst
+
+DONATION_ADDRESS = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+
 class TestEndToEndWorkflow(unittest.TestCase):
     """End-to-end workflow tests"""
     
@@ -27,6 +31,9 @@ class TestEndToEndWorkflow(unittest.TestCase):
         self.test_port = 8080
         self.server_process = None
         self.monitor_process = None
+        self.node = StandInNode(wallet_addresses=[DONATION_ADDRESS], seed=1)
+        self.node.start()
+        self.temp_dir = tempfile.TemporaryDirectory()
     
     def tearDown(self):
         """Clean up after tests"""
@@ -37,6 +44,26 @@ class TestEndToEndWorkflow(unittest.TestCase):
         if self.monitor_process:
             self.monitor_process.terminate()
             self.monitor_process.wait()
+        self.node.stop()
+        self.temp_dir.cleanup()
+    
+    def make_monitor(self, **settings):
+        """Create a monitor polling the stand-in node, writing into the temp dir"""
+        from wallet_monitor import SatoxWalletMonitor
+        
+        config = {
+            'wallet_address': DONATION_ADDRESS,
+            'rpc_url': self.node.url,
+            'check_interval': 30,
+            'alert_duration': 5,
+            'log_file': os.path.join(self.temp_dir.name, 'donations.log'),
+            'tx_cache_path': '',
+            'min_donation': 1.0
+        }
+        config.update(settings)
+        monitor = SatoxWalletMonitor(config)
+        monitor.alert_file = os.path.join(self.temp_dir.name, 'alert.txt')
+        return monitor
     
     def test_complete_donation_workflow(self):
         """Test the complete donation workflow from start to finish"""
@@ -75,6 +102,25 @@ class TestEndToEndWorkflow(unittest.TestCase):
             self.assertEqual(response.status_code, 200)
             self.assertIn('audio/mpeg', response.headers.get('content-type', ''))
             
+            # Test 5: A donation broadcast to the node reaches the overlay's alert.txt
+            self.server_process.terminate()
+            self.server_process.wait()
+            shutil.copy(self.base_dir / 'alert.html', self.temp_dir.name)
+            self.server_process = subprocess.Popen(
+                [sys.executable, '-m', 'http.server', str(self.test_port), '--directory', self.temp_dir.name],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            monitor = self.make_monitor()
+            self.assertTrue(monitor.test_connection())
+            self.node.broadcast(DONATION_ADDRESS, 15000000000)
+            monitor.check_for_donations()
+            time.sleep(2)
+            
+            response = requests.get(f'http://localhost:{self.test_port}/alert.txt', timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, f"{DONATION_ADDRESS[:8]}... donated 150.00 SATOX!")
+            
         except requests.exceptions.RequestException as e:
             self.fail(f"End-to-end workflow test failed: {e}")
         except Exception as e:
@@ -82,31 +128,33 @@ class TestEndToEndWorkflow(unittest.TestCase):
     
     def test_wallet_monitor_integration(self):
         """Test wallet monitor integration with the overlay system"""
-        # Test that wallet monitor can be imported and initialized
+        # Test that wallet monitor can be initialized against a node and alert on donations
         try:
-            from wallet_monitor import SatoxWalletMonitor
-            
-            config = {
-                'wallet_address': 'S8f3test1234567890abcdef',
-                'rpc_url': 'http://localhost:8332',
-                'check_interval': 30,
-                'alert_duration': 5,
-                'log_file': 'test_e2e_monitor.log'
-            }
-            
-            monitor = SatoxWalletMonitor(config)
+            monitor = self.make_monitor()
             
             # Test basic functionality
-            self.assertEqual(monitor.wallet_address, config['wallet_address'])
-            self.assertEqual(monitor.rpc_url, config['rpc_url'])
+            self.assertEqual(monitor.wallet_address, DONATION_ADDRESS)
+            self.assertEqual(monitor.rpc_url, self.node.url)
+            self.assertTrue(monitor.test_connection())
             
             # Test address validation
-            self.assertTrue(monitor.validate_address(config['wallet_address']))
+            self.assertTrue(monitor.validate_address(DONATION_ADDRESS))
+            self.assertFalse(monitor.validate_address('S8f3test1234567890abcdef'))
             
             # Test address obfuscation
-            obfuscated = monitor.obfuscate_address(config['wallet_address'])
+            obfuscated = monitor.obfuscate_address(DONATION_ADDRESS)
             self.assertIn('****', obfuscated)
             
+            # Test detection, confirmation and balance against the stand-in node
+            txid = self.node.broadcast(DONATION_ADDRESS, 250000001)
+            monitor.check_for_donations()
+            self.assertIn((txid, DONATION_ADDRESS), monitor.processed_txs)
+            self.assertEqual(monitor.totals.total, 250000001)
+            self.node.mine(6)
+            self.assertEqual(monitor.get_wallet_balance(), 250000001)
+            with open(monitor.log_file, encoding='utf-8') as f:
+                self.assertIn('Donation: 2.50 SATOX', f.read())
+            
         except ImportError as e:
             self.fail(f"Could not import wallet monitor: {e}")
         except Exception as e:
@@ -185,20 +233,33 @@ class TestEndToEndWorkflow(unittest.TestCase):
         """Test error handling in the end-to-end system"""
         # Test with invalid wallet address
         try:
-            from wallet_monitor import SatoxWalletMonitor
-            
-            config = {
-                'wallet_address': 'invalid_address',
-                'rpc_url': 'http://localhost:8332',
-                'check_interval': 30,
-                'alert_duration': 5,
-                'log_file': 'test_error_handling.log'
-            }
-            
-            monitor = SatoxWalletMonitor(config)
+            monitor = self.make_monitor(wallet_address='invalid_address')
             
             # Should handle invalid address gracefully
             self.assertFalse(monitor.validate_address('invalid_address'))
+            self.assertNotIn('invalid_address', monitor.watched_addresses)
+            
+            # Node errors and outages are survived; nothing is lost once it recovers
+            monitor = self.make_monitor()
+            self.node.fail('listtransactions')
+            self.node.broadcast(DONATION_ADDRESS, 500000000)
+            monitor.check_for_donations()
+            self.assertEqual(monitor.totals.count, 0)
+            self.node.clear_failures()
+            self.node.down = True
+            for _ in range(10):
+                monitor.check_for_donations()
+                if not monitor.nodes.available:
+                    break
+            self.assertFalse(monitor.nodes.available)
+            self.assertFalse(monitor.test_connection())
+            self.node.down = False
+            # Once the breaker's cooldown passes, its half-open probe reaches the recovered node
+            deadline = time.monotonic() + 10
+            while not monitor.nodes.available and time.monotonic() < deadline:
+                time.sleep(0.05)
+            monitor.check_for_donations()
+            self.assertEqual(monitor.totals.count, 1)
             
         except ImportError:
             self.skipTest("Wallet monitor not available")
@@ -208,6 +269,20 @@ class TestEndToEndWorkflow(unittest.TestCase):
     def test_performance_under_load(self):
         """Test system performance under simulated load"""
         try:
+            # A raid burst mixed with dust spam: every real donation is alerted once, no dust
+            monitor = self.make_monitor(ingestion_mode='mempool')
+            monitor.check_mempool()
+            schedule = raid_burst(40, [DONATION_ADDRESS], spread=0.5, rng=self.node.rng)
+            schedule += dust_spam(40, 0.5, [DONATION_ADDRESS])
+            load = self.node.run_load(schedule)
+            deadline = time.monotonic() + 10
+            while load.is_alive() and time.monotonic() < deadline:
+                monitor.check_mempool()
+                time.sleep(0.05)
+            monitor.check_mempool()
+            self.assertEqual(monitor.totals.count, 40)
+            self.assertEqual(monitor.totals.total, sum(amount for _, _, amount in schedule[:40]))
+            
             # Start the web server
             self.server_process = subprocess.Popen(
                 [sys.executable, '-m', 'http.server', str(self.test_port)],
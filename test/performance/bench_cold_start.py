@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Benchmark for Satoxcoin Stream Donation Overlay
+Measures how long a restarted monitor takes to alert again
+
+Each run starts a fresh interpreter that imports wallet_monitor, builds a
+monitor against the stand-in node and polls until it has alerted a
+donation that was waiting in the node's wallet, timestamping:
+
+    spawn -> imported -> monitor built -> first successful poll
+
+A separate `python -X importtime` run gives the per-module import
+breakdown, so a slow start can be traced to the import that caused it.
+Medians over --runs are compared against a committed baseline.
+
+Usage:
+    python test/performance/bench_cold_start.py [--runs 5] [--output results.json] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to the path to import the stand-in node
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from amounts import COIN
+from standin_node import StandInNode
+
+ADDRESS = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+PHASES = ('import', 'construct', 'first_poll', 'total')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'cold_start.json')
+
+# A phase regresses when its median exceeds baseline * (1 + TOLERANCE) + SLACK_MS
+TOLERANCE = 0.5
+SLACK_MS = 50.0
+
+# Runs in the fresh interpreter; argv: root, rpc url, temp dir
+CHILD = r"""
+import json, sys, time
+started = time.time()
+sys.path.insert(0, sys.argv[1])
+import wallet_monitor
+imported = time.time()
+requests_at_import = 'requests' in sys.modules
+monitor = wallet_monitor.SatoxWalletMonitor({
+    'wallet_address': %(address)r, 'rpc_url': sys.argv[2], 'tx_cache_path': '',
+    'log_file': sys.argv[3] + '/donations.log',
+})
+monitor.alert_file = sys.argv[3] + '/alert.txt'
+built = time.time()
+deadline = built + 10
+while monitor.totals.count == 0 and time.time() < deadline:
+    monitor.run_cycle(time.monotonic())
+    monitor._next_poll = 0.0
+print(json.dumps({'started': started, 'imported': imported, 'built': built, 'polled': time.time(),
+                  'alerted': monitor.totals.count, 'requests_at_import': requests_at_import}))
+""" % {'address': ADDRESS}
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def import_breakdown(module: str = 'wallet_monitor', limit: int = 10) -> Dict[str, Any]:
+    """Per-module import times (ms) for module from `python -X importtime`
+
+    The import runs once beforehand so bytecode caches are warm, as on
+    any restart after the first.
+    """
+    command = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+    subprocess.run(command, cwd=ROOT, capture_output=True, check=True)
+    stderr = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append({'module': name.strip(), 'depth': depth,
+                        'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    target = next((entry for entry in reversed(modules) if entry['module'] == module), None)
+    # importtime lists a module after everything it imported: walk back from
+    # the target to its previous sibling to find its direct imports
+    children = []
+    if target is not None:
+        index = modules.index(target)
+        for entry in reversed(modules[:index]):
+            if entry['depth'] <= target['depth']:
+                break
+            if entry['depth'] == target['depth'] + 1:
+                children.append(entry)
+    return {
+        'total_ms': target['cumulative_ms'] if target else None,
+        'modules': len(modules),
+        'imports': sorted({entry['module'] for entry in modules}),
+        'slowest': [{key: entry[key] for key in ('module', 'self_ms', 'cumulative_ms')}
+                    for entry in sorted(children, key=lambda e: -e['cumulative_ms'])[:limit]],
+    }
+
+
+def time_to_first_poll(url: str) -> Dict[str, Any]:
+    """One cold start, phase durations in milliseconds"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        spawned = time.time()
+        result = subprocess.run([sys.executable, '-c', CHILD, ROOT, url, temp_dir], cwd=temp_dir,
+                                capture_output=True, text=True, check=True)
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        'import': (marks['imported'] - spawned) * 1000,
+        'construct': (marks['built'] - marks['imported']) * 1000,
+        'first_poll': (marks['polled'] - marks['built']) * 1000,
+        'total': (marks['polled'] - spawned) * 1000,
+        'alerted': marks['alerted'],
+        'requests_at_import': marks['requests_at_import'],
+    }
+
+
+def run_benchmark(runs: int = 5) -> Dict[str, Any]:
+    """Cold-start phases (median of runs) plus the import breakdown"""
+    node = StandInNode(wallet_addresses=[ADDRESS], seed=42)
+    url = node.start()
+    try:
+        node.broadcast(ADDRESS, 5 * COIN)
+        node.mine()
+        samples = [time_to_first_poll(url) for _ in range(runs)]
+    finally:
+        node.stop()
+    return {
+        'python': platform.python_version(),
+        'platform': f"{platform.system()} {platform.machine()}",
+        'runs': runs,
+        'phases': {phase: round(median([sample[phase] for sample in samples]), 2) for phase in PHASES},
+        'alerted': all(sample['alerted'] == 1 for sample in samples),
+        'requests_at_import': any(sample['requests_at_import'] for sample in samples),
+        'imports': import_breakdown(),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable regressions of results against baseline (empty if none)"""
+    failures = []
+    if not results['alerted']:
+        failures.append("a cold start did not alert the waiting donation")
+    for phase in PHASES:
+        old, new = baseline['phases'].get(phase), results['phases'].get(phase)
+        if old is None or new is None:
+            continue
+        limit = old * (1 + TOLERANCE) + SLACK_MS
+        if new > limit:
+            failures.append(f"{phase}: {new:.1f}ms > {limit:.1f}ms (baseline {old:.1f}ms)")
+    return failures
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\nCold start, median of {report['runs']} runs:")
+    for phase in PHASES:
+        print(f"  {phase:<12}{report['phases'][phase]:>10.1f} ms")
+    imports = report['imports']
+    print(f"\nimport wallet_monitor: {imports['total_ms']:.1f} ms over {imports['modules']} modules")
+    for entry in imports['slowest']:
+        print(f"  {entry['module']:<24}{entry['cumulative_ms']:>8.1f} ms  (self {entry['self_ms']:.1f})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for wallet_monitor.py")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to take the median of")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    args = parser.parse_args(argv)
+
+    print("🧊 Running cold-start benchmark...")
+    report = run_benchmark(args.runs)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        failures = compare(report, json.load(f))
+    if failures:
+        print("❌ FAIL")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("✅ PASS: no regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+End-to-End Latency Benchmark for Satoxcoin Stream Donation Overlay
+Measures broadcast-to-overlay latency per pipeline stage for each ingestion mode
+
+For every mode the stand-in node, a running monitor and a file-polling
+overlay client (the way alert.html reads alert.txt) are started, donations
+are injected as a Poisson process and every donation is timestamped at:
+
+    broadcast -> detected -> alert started -> enriched -> written -> seen by client
+
+giving the detection, queueing, enrichment and delivery stages plus the
+total. A burst phase then measures the throughput ceiling. Results are
+written as JSON and compared against a committed baseline.
+
+Usage:
+    python test/performance/bench_e2e_latency.py [--modes wallet,mempool,addressindex,p2p]
+        [--duration 10] [--rate 2] [--output results.json] [--update-baseline]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to the path to import the monitor and stand-in node
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from standin_node import P2P_MAGIC, StandInNode, poisson_donations
+from wallet_monitor import SatoxWalletMonitor
+
+ADDRESS = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+MODES = ('wallet', 'mempool', 'addressindex', 'p2p')
+STAGES = ('detection', 'queueing', 'enrichment', 'delivery', 'total')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'e2e_latency.json')
+
+# A stage regresses when its p95 exceeds baseline * (1 + TOLERANCE) + SLACK_MS
+TOLERANCE = 0.5
+SLACK_MS = 25.0
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None without samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Percentiles of samples in seconds, reported in milliseconds"""
+    result: Dict[str, Any] = {'count': len(samples)}
+    for pct in (50, 95, 99):
+        value = percentile(samples, pct)
+        result[f'p{pct}'] = round(value * 1000, 2) if value is not None else None
+    return result
+
+
+class FilePollingClient:
+    """Headless overlay: polls alert.txt and timestamps every new message"""
+
+    def __init__(self, path: str, interval: float = 0.005):
+        self.path = path
+        self.interval = interval
+        self.received: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, name='overlay-client', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _poll(self) -> None:
+        last = None
+        while not self._stop.is_set():
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    message = f.read()
+            except OSError:
+                message = None
+            if message and message != last:
+                self.received.setdefault(message, time.monotonic())
+                last = message
+            self._stop.wait(self.interval)
+
+
+class LatencyProbe:
+    """Timestamps each donation as it moves through a monitor's pipeline"""
+
+    def __init__(self, monitor: SatoxWalletMonitor):
+        self.detected: Dict[str, float] = {}
+        self.alert_started: Dict[str, float] = {}
+        self.enriched: Dict[str, float] = {}
+        self.written: Dict[str, float] = {}
+        self.messages: Dict[str, str] = {}
+        self._current: Optional[str] = None
+        self._wrap(monitor)
+
+    def _wrap(self, monitor: SatoxWalletMonitor) -> None:
+        handle_donation = monitor.handle_donation
+        deliver_alert = monitor.deliver_alert
+        get_sender_address = monitor.get_sender_address
+        write_alert = monitor.write_alert
+
+        def probed_handle_donation(txid, *args, **kwargs):
+            if txid:
+                self.detected.setdefault(txid, time.monotonic())
+            return handle_donation(txid, *args, **kwargs)
+
+        def probed_deliver_alert(txid, *args, **kwargs):
+            self.alert_started.setdefault(txid, time.monotonic())
+            self._current = txid
+            try:
+                return deliver_alert(txid, *args, **kwargs)
+            finally:
+                self._current = None
+
+        def probed_get_sender_address(txid):
+            try:
+                return get_sender_address(txid)
+            finally:
+                self.enriched.setdefault(txid, time.monotonic())
+
+        def probed_write_alert(message):
+            write_alert(message)
+            if self._current is not None:
+                self.written.setdefault(self._current, time.monotonic())
+                self.messages.setdefault(self._current, message)
+
+        monitor.handle_donation = probed_handle_donation
+        monitor.deliver_alert = probed_deliver_alert
+        monitor.get_sender_address = probed_get_sender_address
+        monitor.write_alert = probed_write_alert
+
+
+def stage_samples(node: StandInNode, probe: LatencyProbe, client: FilePollingClient,
+                  txids: List[str]) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for txid in txids:
+        broadcast = node.broadcast_times.get(txid)
+        detected = probe.detected.get(txid)
+        started = probe.alert_started.get(txid)
+        enriched = probe.enriched.get(txid)
+        written = probe.written.get(txid)
+        received = client.received.get(probe.messages.get(txid, ''))
+        pairs = (('detection', broadcast, detected), ('queueing', detected, started),
+                 ('enrichment', started, enriched), ('delivery', written, received),
+                 ('total', broadcast, received))
+        for stage, start, end in pairs:
+            if start is not None and end is not None:
+                samples[stage].append(max(0.0, end - start))
+    return samples
+
+
+def run_mode(mode: str, duration: float, rate: float, burst: int, poll_interval: float,
+             mempool_interval: float, seed: int) -> Dict[str, Any]:
+    """Benchmark one ingestion mode against a fresh stand-in node"""
+    node = StandInNode(wallet_addresses=[ADDRESS], block_interval=5.0, seed=seed)
+    node.start()
+    # p2p mode streams the mempool from the stand-in node's P2P front-end
+    p2p_port = node.start_p2p() if mode == 'p2p' else None
+    temp_dir = tempfile.TemporaryDirectory()
+    monitor = SatoxWalletMonitor({
+        'wallet_address': ADDRESS,
+        'rpc_url': node.url,
+        'ingestion_mode': mode,
+        'poll_interval': poll_interval,
+        'mempool_interval': mempool_interval,
+        'index_start_height': node.height + 1,
+        'p2p_host': '127.0.0.1',
+        'p2p_port': p2p_port,
+        'p2p_magic': P2P_MAGIC.hex(),
+        'min_donation': 1.0,
+        'tx_cache_path': '',
+        'log_file': os.path.join(temp_dir.name, 'donations.log'),
+    })
+    monitor.alert_file = os.path.join(temp_dir.name, 'alert.txt')
+    probe = LatencyProbe(monitor)
+    client = FilePollingClient(monitor.alert_file)
+    runner = threading.Thread(target=monitor.run, name=f'monitor-{mode}', daemon=True)
+    settle = 2 * max(poll_interval, mempool_interval) + 1.0
+
+    try:
+        client.start()
+        runner.start()
+        time.sleep(settle)
+
+        # Latency phase: unique amounts (to the cent) let the client match alerts to donations
+        schedule = [(offset, ADDRESS, COIN + index * COIN // 100)
+                    for index, (offset, _, _) in
+                    enumerate(poisson_donations(rate, duration, [ADDRESS], rng=random.Random(seed)))]
+        first = len(node.broadcast_times)
+        node.run_load(schedule).join()
+        deadline = time.monotonic() + settle + 5
+        while time.monotonic() < deadline and len(probe.written) < len(schedule):
+            time.sleep(0.05)
+        time.sleep(0.1)
+        txids = list(node.broadcast_times)[first:]
+        samples = stage_samples(node, probe, client, txids)
+
+        # Throughput phase: a burst injected at once, timed until the last alert is written
+        first = len(node.broadcast_times)
+        burst_start = time.monotonic()
+        for index in range(burst):
+            node.broadcast(ADDRESS, 2 * COIN + index)
+        burst_txids = list(node.broadcast_times)[first:]
+        deadline = time.monotonic() + settle + 30
+        while time.monotonic() < deadline and not all(txid in probe.written for txid in burst_txids):
+            time.sleep(0.02)
+        done = [probe.written[txid] for txid in burst_txids if txid in probe.written]
+        elapsed = (max(done) - burst_start) if done else None
+    finally:
+        monitor.stop()
+        runner.join(10)
+        client.stop()
+        node.stop()
+        temp_dir.cleanup()
+
+    return {
+        'injected': len(txids),
+        'alerted': sum(1 for txid in txids if txid in probe.written),
+        'delivered': len(samples['total']),
+        'stages': {stage: summarize(values) for stage, values in samples.items()},
+        'throughput': round(len(done) / elapsed, 1) if elapsed else None,
+        'rpc_calls': sum(node.calls.values()),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return one line per regression against baseline; empty means pass"""
+    failures = []
+    for mode, current in results['modes'].items():
+        expected = baseline.get('modes', {}).get(mode)
+        if expected is None:
+            continue
+        if current['alerted'] < current['injected']:
+            failures.append(f"{mode}: only {current['alerted']}/{current['injected']} donations alerted")
+        for stage in STAGES:
+            was = expected['stages'].get(stage, {}).get('p95')
+            now = current['stages'][stage]['p95']
+            if was is not None and now is not None and now > was * (1 + TOLERANCE) + SLACK_MS:
+                failures.append(f"{mode}: {stage} p95 {now:.1f} ms > baseline {was:.1f} ms")
+        was, now = expected.get('throughput'), current.get('throughput')
+        if was and (now is None or now < was / (1 + TOLERANCE)):
+            failures.append(f"{mode}: throughput {now} donations/sec < baseline {was}")
+    return failures
+
+
+def run_benchmark(modes=MODES, duration: float = 10.0, rate: float = 2.0, burst: int = 45,
+                  poll_interval: float = 0.5, mempool_interval: float = 0.1, seed: int = 42) -> Dict[str, Any]:
+    """Run every mode and return the JSON-serialisable report"""
+    report: Dict[str, Any] = {
+        'config': {'duration': duration, 'rate': rate, 'burst': burst, 'poll_interval': poll_interval,
+                   'mempool_interval': mempool_interval, 'seed': seed},
+        'platform': {'python': platform.python_version(), 'system': platform.system()},
+        'modes': {},
+    }
+    for mode in modes:
+        report['modes'][mode] = run_mode(mode, duration, rate, burst, poll_interval, mempool_interval, seed)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'mode':<14}{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for mode, result in report['modes'].items():
+        for stage in STAGES:
+            summary = result['stages'][stage]
+            cells = ''.join(f"{summary[key] if summary[key] is not None else '-':>10}" for key in ('p50', 'p95', 'p99'))
+            print(f"{mode:<14}{stage:<12}{cells}")
+        print(f"{mode:<14}{'throughput':<12}{result['throughput'] or '-':>10} donations/sec "
+              f"({result['alerted']}/{result['injected']} alerted, {result['delivered']} seen by client)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end donation latency benchmark")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated ingestion modes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of Poisson load per mode")
+    parser.add_argument("--rate", type=float, default=2.0, help="Donations per second during the load")
+    parser.add_argument("--burst", type=int, default=45, help="Donations in the throughput burst (wallet mode sees 50 per poll)")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Wallet poll interval (seconds)")
+    parser.add_argument("--mempool-interval", type=float, default=0.1, help="Mempool diff interval (seconds)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        print(f"❌ Unknown modes: {', '.join(sorted(unknown))}")
+        return 2
+
+    print("⏱️  Running end-to-end latency benchmark...")
+    report = run_benchmark(modes, args.duration, args.rate, args.burst, args.poll_interval,
+                           args.mempool_interval, args.seed)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        failures = compare(report, json.load(f))
+    if failures:
+        print("❌ FAIL")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("✅ PASS: no regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
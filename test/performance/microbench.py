@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark Harness for Satoxcoin Stream Donation Overlay
+Times hot-path operations with warmup, calibrated loop counts and GC isolation
+
+Each benchmark is a setup function returning a zero-argument operation.
+The operation is warmed up, then the loop count is doubled until one
+repeat takes at least --min-time; every repeat is timed with
+perf_counter_ns with the garbage collector disabled. Per-operation times
+have the cost of calling an empty function subtracted and are reported
+as median and interquartile range.
+
+Results are also expressed relative to a fixed pure-Python reference
+workload measured in the same run, so a baseline recorded on one machine
+can be compared on another. A benchmark regresses when its median grew
+by more than the threshold AND its interquartile ranges no longer
+overlap, so noise alone does not fail a run.
+
+Usage:
+    python test/performance/microbench.py run [--output results.json] [--history history.jsonl]
+    python test/performance/microbench.py compare OLD.json NEW.json [--threshold 0.25] [--absolute]
+    python test/performance/microbench.py run --update-baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the parent directory to the path to import the overlay modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'microbench.json')
+REFERENCE = '_reference'
+
+Operation = Callable[[], Any]
+
+BENCHMARKS: Dict[str, Callable[[], Operation]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function returning the operation to time"""
+    def register(setup: Callable[[], Operation]) -> Callable[[], Operation]:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def quantile(ordered: List[float], q: float) -> float:
+    """Linearly interpolated quantile of a sorted list"""
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _time_loops(operation: Operation, loops: int) -> int:
+    """Nanoseconds for loops calls of operation with GC disabled"""
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        iterations = range(loops)
+        start = time.perf_counter_ns()
+        for _ in iterations:
+            operation()
+        return time.perf_counter_ns() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def calibrate(operation: Operation, min_time_ns: int) -> int:
+    """Smallest power-of-two loop count whose run takes at least min_time_ns"""
+    loops = 1
+    while loops < 1 << 30:
+        if _time_loops(operation, loops) >= min_time_ns:
+            return loops
+        loops *= 2
+    return loops
+
+
+def measure(operation: Operation, repeats: int = 15, min_time: float = 0.01,
+            warmup: int = 2, overhead_ns: float = 0.0) -> Dict[str, Any]:
+    """Time operation and return median/IQR statistics per call in nanoseconds"""
+    min_time_ns = int(min_time * 1e9)
+    loops = calibrate(operation, min_time_ns)
+    for _ in range(warmup):
+        _time_loops(operation, loops)
+    samples = sorted(max(0.0, _time_loops(operation, loops) / loops - overhead_ns) for _ in range(repeats))
+    median = quantile(samples, 0.5)
+    q1, q3 = quantile(samples, 0.25), quantile(samples, 0.75)
+    return {
+        'median_ns': round(median, 2),
+        'q1_ns': round(q1, 2),
+        'q3_ns': round(q3, 2),
+        'iqr_ns': round(q3 - q1, 2),
+        'min_ns': round(samples[0], 2),
+        'ops_per_sec': round(1e9 / median) if median > 0 else None,
+        'loops': loops,
+        'repeats': repeats,
+    }
+
+
+# -- benchmarks --------------------------------------------------------------
+
+WATCHED = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+
+
+@benchmark(REFERENCE)
+def _reference_workload() -> Operation:
+    # Fixed pure-Python work used to normalise results across machines
+    values = list(range(64))
+    return lambda: sum(value * value for value in values)
+
+
+@benchmark('alert_creation')
+def _alert_creation() -> Operation:
+    from wallet_monitor import DonationAlert
+    return lambda: DonationAlert(15000000000, WATCHED)
+
+
+@benchmark('alert_serialization')
+def _alert_serialization() -> Operation:
+    from wallet_monitor import DonationAlert
+    alert = DonationAlert(15000000000, WATCHED)
+    return lambda: json.dumps(alert.to_dict())
+
+
+@benchmark('alert_rendering')
+def _alert_rendering() -> Operation:
+    from wallet_monitor import SatoxWalletMonitor
+    monitor = SatoxWalletMonitor({'wallet_address': WATCHED, 'tx_cache_path': ''})
+    return lambda: monitor.render_alert(WATCHED, 15075000000)
+
+
+@benchmark('address_validation')
+def _address_validation() -> Operation:
+    from satox_address import AddressValidator
+    validate = AddressValidator(cache_size=0).validate
+    return lambda: validate(WATCHED)
+
+
+@benchmark('address_validation_cached')
+def _address_validation_cached() -> Operation:
+    from satox_address import AddressValidator
+    validate = AddressValidator().validate
+    return lambda: validate(WATCHED)
+
+
+@benchmark('address_obfuscation')
+def _address_obfuscation() -> Operation:
+    from wallet_monitor import SatoxWalletMonitor
+    monitor = SatoxWalletMonitor({'wallet_address': WATCHED, 'tx_cache_path': ''})
+    return lambda: monitor.obfuscate_address(WATCHED)
+
+
+@benchmark('dedup_lookup')
+def _dedup_lookup() -> Operation:
+    processed = {f"{i:064x}" for i in range(100000)}
+    probes = [f"{i * 2:064x}" for i in range(1024)]   # half hits, half misses
+    state = [0]
+
+    def lookup():
+        state[0] = (state[0] + 1) & 1023
+        return probes[state[0]] in processed
+    return lookup
+
+
+@benchmark('amount_parsing')
+def _amount_parsing() -> Operation:
+    from decimal import Decimal
+    from rpc_client import decode_reply
+    payload = {"jsonrpc": "1.0", "id": 1, "method": "gettransaction", "params": ["aa" * 32]}
+    text = ('{"result": {"amount": 123.45678901, "confirmations": 3, "txid": "' + "aa" * 32 + '"}, '
+            '"error": null, "id": 1}')
+    return lambda: decode_reply(json.loads(text, parse_float=Decimal), payload)
+
+
+def run_suite(names: Optional[List[str]] = None, repeats: int = 15, min_time: float = 0.01) -> Dict[str, Any]:
+    """Run the selected benchmarks (all by default) and return a report"""
+    selected = [name for name in BENCHMARKS if names is None or name in names or name == REFERENCE]
+    overhead = measure(lambda: None, repeats=repeats, min_time=min_time)['median_ns']
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in selected:
+        results[name] = measure(BENCHMARKS[name](), repeats=repeats, min_time=min_time, overhead_ns=overhead)
+    reference = results[REFERENCE]['median_ns'] or 1.0
+    for result in results.values():
+        result['relative'] = round(result['median_ns'] / reference, 6)
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': f"{platform.system()} {platform.machine()}",
+        'call_overhead_ns': overhead,
+        'benchmarks': results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.25,
+            relative: bool = True) -> List[Tuple[str, float, float, float, str]]:
+    """Compare two reports: (name, old, new, ratio, verdict) per shared benchmark
+
+    verdict is "regression", "improvement" or "same". With relative set,
+    times are normalised by each report's reference workload.
+    """
+    rows = []
+    old_ref = old['benchmarks'][REFERENCE]['median_ns'] if relative else 1.0
+    new_ref = new['benchmarks'][REFERENCE]['median_ns'] if relative else 1.0
+    for name, after in new['benchmarks'].items():
+        before = old['benchmarks'].get(name)
+        if name == REFERENCE or before is None or not before['median_ns']:
+            continue
+        scale_old, scale_new = 1.0 / old_ref, 1.0 / new_ref
+        was, now = before['median_ns'] * scale_old, after['median_ns'] * scale_new
+        ratio = now / was
+        overlap = after['q1_ns'] * scale_new <= before['q3_ns'] * scale_old \
+            and before['q1_ns'] * scale_old <= after['q3_ns'] * scale_new
+        if ratio > 1 + threshold and not overlap:
+            verdict = 'regression'
+        elif ratio < 1 / (1 + threshold) and not overlap:
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        rows.append((name, was, now, ratio, verdict))
+    return rows
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'benchmark':<28}{'median ns':>12}{'IQR ns':>10}{'ops/sec':>14}{'loops':>10}")
+    for name, result in report['benchmarks'].items():
+        print(f"{name:<28}{result['median_ns']:>12.1f}{result['iqr_ns']:>10.1f}"
+              f"{result['ops_per_sec'] or 0:>14,}{result['loops']:>10}")
+
+
+def print_comparison(rows: List[Tuple[str, float, float, float, str]], relative: bool) -> bool:
+    """Print a comparison table; returns True when nothing regressed"""
+    unit = 'x ref' if relative else 'ns'
+    print(f"{'benchmark':<28}{'old ' + unit:>12}{'new ' + unit:>12}{'change':>10}  verdict")
+    for name, was, now, ratio, verdict in rows:
+        marker = {'regression': '❌', 'improvement': '🚀'}.get(verdict, '  ')
+        print(f"{name:<28}{was:>12.3f}{now:>12.3f}{(ratio - 1) * 100:>+9.1f}%  {marker} {verdict}")
+    return not any(row[4] == 'regression' for row in rows)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the donation monitor hot paths")
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run = commands.add_parser('run', help='Run the benchmarks')
+    run.add_argument('--filter', help='Comma-separated benchmark names')
+    run.add_argument('--repeats', type=int, default=15)
+    run.add_argument('--min-time', type=float, default=0.01, help='Minimum seconds per timed repeat')
+    run.add_argument('--output', help='Write the results JSON here')
+    run.add_argument('--history', help='Append the results as one JSON line to this file')
+    run.add_argument('--baseline', default=DEFAULT_BASELINE, help='Compare against this report')
+    run.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before failing')
+    run.add_argument('--update-baseline', action='store_true', help='Overwrite the baseline with these results')
+
+    diff = commands.add_parser('compare', help='Compare two result files')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before failing')
+    diff.add_argument('--absolute', action='store_true', help='Compare raw times instead of reference-relative')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        relative = not args.absolute
+        ok = print_comparison(compare(load(args.old), load(args.new), args.threshold, relative), relative)
+        print("✅ PASS" if ok else "❌ FAIL")
+        return 0 if ok else 1
+
+    names = [name.strip() for name in args.filter.split(',')] if args.filter else None
+    report = run_suite(names, repeats=args.repeats, min_time=args.min_time)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.history:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report) + "\n")
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    print()
+    ok = print_comparison(compare(load(args.baseline), report, args.threshold), True)
+    print("✅ PASS" if ok else "❌ FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Accelerated-Time Soak Test for Satoxcoin Stream Donation Overlay
+Runs a full stream's worth of donations through the monitor in minutes and checks for drift
+
+The monitor runs its normal ingestion cycle (SatoxWalletMonitor.run_cycle)
+against the stand-in node, but driven by a virtual clock: each cycle
+advances the clock by the poll interval, injects the donations, dust and
+raids that were due in that window, mines a block every BLOCK_TIME virtual
+seconds and reorgs now and then. 24 hours of stream therefore takes as long
+as its 17,280 wallet polls, with no sleeping in between.
+
+The node runs in a child process so its ever-growing chain does not count
+against the monitor. Every --sample-every virtual seconds the soak records
+resident memory, tracemalloc's traced size and top allocation sites, open
+file descriptors and the median/p95 cycle latency. After a warmup, a
+least-squares trend is fitted to each metric; the run fails when the
+projected growth over the measured span exceeds that metric's threshold.
+
+Usage:
+    python test/performance/soak.py [--hours 24] [--mode mempool] [--rate 0.5] [--output soak.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the parent directory to the path to import the monitor and stand-in node
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from standin_node import BLOCK_TIME, StandInNode, dust_spam, poisson_donations, raid_burst
+from wallet_monitor import SatoxWalletMonitor
+
+ADDRESS = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+MODES = ('wallet', 'mempool', 'addressindex')
+
+# metric: (relative growth allowed over the measured span, absolute floor)
+# A metric fails when its fitted growth exceeds both.
+THRESHOLDS: Dict[str, Tuple[float, float]] = {
+    'rss_mb': (0.10, 8.0),
+    'traced_mb': (0.50, 2.0),
+    'open_fds': (0.0, 2.0),
+    'cycle_p50_ms': (0.50, 1.0),
+    'cycle_p95_ms': (1.00, 5.0),
+}
+
+
+class VirtualClock:
+    """Monotonic time that only moves when advanced"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, seconds: float) -> float:
+        self.now += seconds
+        return self.now
+
+
+class NodeManager(BaseManager):
+    """Hosts the stand-in node in a child process"""
+
+
+NodeManager.register('StandInNode', StandInNode)
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size of this process, None where unsupported"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current, but still shows growth; macOS reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def open_fds() -> Optional[int]:
+    """Number of open file descriptors, None where unsupported"""
+    for path in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = 5) -> List[Dict[str, Any]]:
+    """Largest allocation sites outside the tracing machinery"""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    return [
+        {'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+         'kb': round(stat.size / 1024, 1), 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None without samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def trend(points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Least-squares fit of (x, y) points, returned as (intercept, slope)"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return mean_y, 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    return mean_y - slope * mean_x, slope
+
+
+def analyse(samples: List[Dict[str, Any]], warmup: float = 0.25,
+            thresholds: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Fitted growth per metric over the post-warmup samples, with a verdict"""
+    thresholds = thresholds or THRESHOLDS
+    measured = samples[int(len(samples) * warmup):]
+    results: Dict[str, Dict[str, Any]] = {}
+    for metric, (relative, floor) in thresholds.items():
+        points = [(sample['hours'], sample[metric]) for sample in measured if sample.get(metric) is not None]
+        if len(points) < 3:
+            continue
+        intercept, slope = trend(points)
+        span = points[-1][0] - points[0][0]
+        start = intercept + slope * points[0][0]
+        growth = slope * span
+        limit = max(relative * abs(start), floor)
+        results[metric] = {
+            'start': round(start, 3),
+            'growth': round(growth, 3),
+            'per_hour': round(slope, 4),
+            'limit': round(limit, 3),
+            'ok': growth <= limit,
+        }
+    return results
+
+
+def build_schedule(hours: float, rate: float, raid_every: float, raid_size: int,
+                   dust_rate: float, rng: random.Random) -> List[Tuple[float, str, int]]:
+    """Donations, raids and dust over the whole stream, sorted by virtual time"""
+    duration = hours * 3600
+    schedule = poisson_donations(rate / 60.0, duration, [ADDRESS], rng=rng)
+    if raid_every > 0:
+        offset = raid_every * 3600
+        while offset < duration:
+            schedule.extend(raid_burst(raid_size, [ADDRESS], start=offset, spread=30, rng=rng))
+            offset += raid_every * 3600
+    schedule.extend(dust_spam(dust_rate / 60.0, duration, [ADDRESS]))
+    return sorted(schedule)
+
+
+def run_soak(hours: float = 24.0, mode: str = 'mempool', rate: float = 0.5, raid_every: float = 4.0,
+             raid_size: int = 40, dust_rate: float = 2.0, reorg_every: float = 6.0,
+             poll_interval: float = 5.0, sample_every: float = 1800.0, warmup: float = 0.25,
+             seed: int = 42, progress: bool = False) -> Dict[str, Any]:
+    """Soak the monitor for hours of virtual time and return samples and trends
+
+    rate and dust_rate are per virtual minute; raid_every and reorg_every are
+    in virtual hours (0 disables).
+    """
+    rng = random.Random(seed)
+    schedule = build_schedule(hours, rate, raid_every, raid_size, dust_rate, rng)
+    manager = NodeManager()
+    manager.start()
+    temp_dir = tempfile.TemporaryDirectory()
+    try:
+        node = manager.StandInNode(wallet_addresses=[ADDRESS], seed=seed)
+        url = node.start()
+        monitor = SatoxWalletMonitor({
+            'wallet_address': ADDRESS,
+            'rpc_url': url,
+            'rpc_rate': 0,
+            'tx_cache_path': '',
+            'min_donation': COIN,
+            'ingestion_mode': mode,
+            'index_start_height': node.dispatch('getblockcount', []) + 1,
+            'alert_policy': 'both',
+            'confirmations': 2,
+            'poll_interval': poll_interval,
+            'log_file': os.path.join(temp_dir.name, 'donations.log'),
+        })
+        monitor.alert_file = os.path.join(temp_dir.name, 'alert.txt')
+
+        clock = VirtualClock()
+        end = hours * 3600
+        next_block = BLOCK_TIME
+        next_reorg = reorg_every * 3600 if reorg_every > 0 else end + 1
+        next_sample = sample_every
+        pending = 0
+        samples: List[Dict[str, Any]] = []
+        latencies: List[float] = []
+        reorgs = 0
+        tracemalloc.start()
+        started = time.perf_counter()
+        while clock.now < end:
+            now = clock.advance(poll_interval)
+            while pending < len(schedule) and schedule[pending][0] <= now:
+                _, address, amount = schedule[pending]
+                node.broadcast(address, amount)
+                pending += 1
+            while next_block <= now:
+                node.mine()
+                next_block += BLOCK_TIME
+            if next_reorg <= now:
+                node.reorg(2)
+                reorgs += 1
+                next_reorg += reorg_every * 3600
+
+            cycle_start = time.perf_counter()
+            monitor.run_cycle(now)
+            latencies.append(time.perf_counter() - cycle_start)
+
+            if now >= next_sample:
+                snapshot = tracemalloc.take_snapshot()
+                sample = {
+                    'hours': round(now / 3600, 3),
+                    'rss_mb': rss_mb(),
+                    'traced_mb': round(tracemalloc.get_traced_memory()[0] / 1e6, 3),
+                    'open_fds': open_fds(),
+                    'cycle_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                    'cycle_p95_ms': round(percentile(latencies, 95) * 1000, 3),
+                    'cycles': len(latencies),
+                    'donations': monitor.totals.count,
+                    'processed_txs': len(monitor.processed_txs),
+                    'top_allocations': top_allocations(snapshot),
+                }
+                if sample['rss_mb'] is not None:
+                    sample['rss_mb'] = round(sample['rss_mb'], 2)
+                samples.append(sample)
+                del snapshot
+                latencies = []
+                next_sample += sample_every
+                if progress:
+                    print(f"  {sample['hours']:6.2f}h  rss {sample['rss_mb']} MB  traced {sample['traced_mb']} MB  "
+                          f"fds {sample['open_fds']}  cycle p50 {sample['cycle_p50_ms']} ms  "
+                          f"donations {sample['donations']}")
+        elapsed = time.perf_counter() - started
+        tracemalloc.stop()
+        node.stop()
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        manager.shutdown()
+        temp_dir.cleanup()
+
+    trends = analyse(samples, warmup)
+    return {
+        'python': platform.python_version(),
+        'platform': f"{platform.system()} {platform.machine()}",
+        'mode': mode,
+        'virtual_hours': hours,
+        'wall_seconds': round(elapsed, 1),
+        'speedup': round(hours * 3600 / elapsed) if elapsed else None,
+        'scheduled': len(schedule),
+        'reorgs': reorgs,
+        'samples': samples,
+        'trends': trends,
+        'passed': all(result['ok'] for result in trends.values()),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['virtual_hours']}h of {report['mode']} stream in {report['wall_seconds']}s "
+          f"({report['speedup']}x), {report['scheduled']} payments, {report['reorgs']} reorgs")
+    print(f"{'metric':<16}{'start':>10}{'growth':>10}{'per hour':>10}{'limit':>10}")
+    for metric, result in report['trends'].items():
+        marker = '✅' if result['ok'] else '❌'
+        print(f"{metric:<16}{result['start']:>10}{result['growth']:>10}{result['per_hour']:>10}"
+              f"{result['limit']:>10}  {marker}")
+    if report['samples']:
+        print("Top allocation sites at the end:")
+        for site in report['samples'][-1]['top_allocations']:
+            print(f"  {site['kb']:>10} KB  {site['count']:>7}  {site['site']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Accelerated-time soak test for the donation monitor")
+    parser.add_argument("--hours", type=float, default=24.0, help="Virtual hours of stream")
+    parser.add_argument("--mode", default="mempool", choices=MODES, help="Ingestion mode")
+    parser.add_argument("--rate", type=float, default=0.5, help="Donations per virtual minute")
+    parser.add_argument("--raid-every", type=float, default=4.0, help="Virtual hours between raids (0 = none)")
+    parser.add_argument("--raid-size", type=int, default=40, help="Donations per raid")
+    parser.add_argument("--dust-rate", type=float, default=2.0, help="Dust payments per virtual minute")
+    parser.add_argument("--reorg-every", type=float, default=6.0, help="Virtual hours between reorgs (0 = none)")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Virtual seconds per monitor cycle")
+    parser.add_argument("--sample-every", type=float, default=1800.0, help="Virtual seconds between samples")
+    parser.add_argument("--warmup", type=float, default=0.25, help="Fraction of samples ignored by the trend fit")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write samples and trends as JSON here")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"🕰️  Soaking {args.hours}h of virtual stream time...")
+    report = run_soak(args.hours, args.mode, args.rate, args.raid_every, args.raid_size, args.dust_rate,
+                      args.reorg_every, args.poll_interval, args.sample_every, args.warmup, args.seed,
+                      progress=True)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if not report['passed']:
+        print("❌ FAIL: upward trend beyond threshold")
+        return 1
+    print("✅ PASS: no upward trends")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,7 @@ import os
 import time
 import tempfile
 import json
+import random
 from unittest.mock import Mock, patch, MagicMock
 
 # Add the parent directory to the path to import the wallet monitor
@@ -17,6 +18,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 try:
     from wallet_monitor import SatoxWalletMonitor, DonationAlert
+    from decimal import Decimal
+    from amounts import COIN, DonationTotals
+    from rpc_client import decode_reply
+    from standin_node import StandInNode, poisson_donations
+    import bench_cold_start
+    import bench_e2e_latency
+    import microbench
+    import soak
 except ImportError:
     print("Warning: Could not import wallet_monitor. Make sure you're in the correct directory.")
     sys.exit(1)
@@ -26,64 +35,47 @@ class TestPerformance(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures"""
+        self.node = StandInNode(seed=42)
+        self.node.start()
         self.test_config = {
             'wallet_address': 'S8f3test1234567890abcdef',
-            'rpc_url': 'http://localhost:8332',
+            'rpc_url': self.node.url,
             'check_interval': 30,
             'alert_duration': 5,
-            'log_file': 'test_performance.log'
+            'log_file': 'test_performance.log',
+            'tx_cache_path': '',
+            'rpc_rate': 0
         }
         self.monitor = SatoxWalletMonitor(self.test_config)
     
-    def test_address_obfuscation_performance(self):
-        """Test performance of address obfuscation"""
-        test_address = "S8f3test1234567890abcdef"
-        iterations = 10000
-        
-        start_time = time.time()
-        for _ in range(iterations):
-            obfuscated = self.monitor.obfuscate_address(test_address)
-        end_time = time.time()
-        
-        duration = end_time - start_time
-        ops_per_second = iterations / duration
-        
-        print(f"Address obfuscation: {ops_per_second:.0f} ops/sec")
-        self.assertGreater(ops_per_second, 1000)  # Should be very fast
-    
-    def test_alert_creation_performance(self):
-        """Test performance of alert creation"""
-        iterations = 1000
-        
-        start_time = time.time()
-        alerts = []
-        for i in range(iterations):
-            alert = DonationAlert(amount=float(i), address=f"S8f3test{i:06d}")
-            alerts.append(alert)
-        end_time = time.time()
-        
-        duration = end_time - start_time
-        ops_per_second = iterations / duration
-        
-        print(f"Alert creation: {ops_per_second:.0f} ops/sec")
-        self.assertGreater(ops_per_second, 100)  # Should be reasonably fast
+    def tearDown(self):
+        """Stop the stand-in node"""
+        self.node.stop()
     
-    def test_alert_serialization_performance(self):
-        """Test performance of alert serialization"""
-        alert = DonationAlert(amount=150.0, address="S8f3test1234567890abcdef")
-        iterations = 10000
+    def test_micro_benchmarks(self):
+        """Run the micro-benchmark harness once and check its comparison logic
         
-        start_time = time.time()
-        for _ in range(iterations):
-            data = alert.to_dict()
-            json_str = json.dumps(data)
-        end_time = time.time()
+        Timings are compared with the committed baseline by microbench.py
+        itself; here only the harness and the verdicts are checked.
+        """
+        report = microbench.run_suite(repeats=3, min_time=0.001)
+        microbench.print_report(report)
+        self.assertEqual(set(report['benchmarks']), set(microbench.BENCHMARKS))
+        for result in report['benchmarks'].values():
+            self.assertGreater(result['median_ns'], 0)
+        baseline = microbench.load(microbench.DEFAULT_BASELINE)
+        self.assertEqual(set(baseline['benchmarks']), set(microbench.BENCHMARKS))
         
-        duration = end_time - start_time
-        ops_per_second = iterations / duration
+        rows = microbench.compare(report, report, threshold=1.0)
+        self.assertEqual({row[0] for row in rows}, set(microbench.BENCHMARKS) - {microbench.REFERENCE})
+        self.assertEqual({row[4] for row in rows}, {'same'})
         
-        print(f"Alert serialization: {ops_per_second:.0f} ops/sec")
-        self.assertGreater(ops_per_second, 1000)  # Should be very fast
+        slower = json.loads(json.dumps(report))
+        for result in slower['benchmarks'].values():
+            if result is not slower['benchmarks'][microbench.REFERENCE]:
+                result.update({key: result[key] * 3 for key in ('median_ns', 'q1_ns', 'q3_ns')})
+        verdicts = {row[4] for row in microbench.compare(report, slower, threshold=1.0)}
+        self.assertEqual(verdicts, {'regression'})
     
     def test_file_write_performance(self):
         """Test performance of alert file writing"""
@@ -111,28 +103,133 @@ class TestPerformance(unittest.TestCase):
                 os.unlink(temp_filename)
     
     def test_rpc_call_performance(self):
-        """Test performance of RPC calls (mocked)"""
+        """Test performance of RPC calls against the stand-in node"""
         iterations = 100
+        self.node.broadcast('SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ', 15075000000)
+        self.node.mine()
         
-        # Mock the RPC response
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            'result': 150.75,
-            'error': None
-        }
-        mock_response.status_code = 200
+        start_time = time.time()
+        for _ in range(iterations):
+            result = self.monitor.rpc_call('getbalance')
+        end_time = time.time()
         
-        with patch('requests.post', return_value=mock_response):
-            start_time = time.time()
-            for _ in range(iterations):
-                result = self.monitor.rpc_call('getbalance')
-            end_time = time.time()
-            
-            duration = end_time - start_time
-            ops_per_second = iterations / duration
+        duration = end_time - start_time
+        ops_per_second = iterations / duration
+        
+        print(f"RPC call performance (stand-in node): {ops_per_second:.0f} ops/sec")
+        self.assertEqual(result, 15075000000)
+        self.assertEqual(self.node.calls['getbalance'], iterations)
+        self.assertGreater(ops_per_second, 50)  # Should be reasonably fast
+    
+    def test_detection_throughput(self):
+        """Benchmark wallet-poll detection over a backlog of Poisson-distributed donations"""
+        address = 'SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ'
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address, min_donation=1.0))
+        schedule = poisson_donations(50, 10, [address], rng=random.Random(42))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            monitor.log_file = os.path.join(temp_dir, 'donations.log')
             
-            print(f"RPC call performance (mocked): {ops_per_second:.0f} ops/sec")
-            self.assertGreater(ops_per_second, 50)  # Should be reasonably fast
+            polls = 0
+            start_time = time.perf_counter()
+            for offset in range(0, len(schedule), 40):
+                # Arrivals between two polls, up to the 50 listtransactions returns
+                for _, donor, amount in schedule[offset:offset + 40]:
+                    self.node.broadcast(donor, amount)
+                monitor.check_for_donations()
+                polls += 1
+            duration = time.perf_counter() - start_time
+        
+        donations_per_second = len(schedule) / duration
+        print(f"Detection throughput: {donations_per_second:.0f} donations/sec over {polls} polls")
+        self.assertEqual(monitor.totals.count, len(schedule))
+        self.assertGreater(donations_per_second, 50)
+    
+    def test_benchmark_baselines(self):
+        """The committed end-to-end and cold-start baselines pass against themselves and flag a slowdown"""
+        with open(bench_e2e_latency.DEFAULT_BASELINE) as f:
+            baseline = json.load(f)
+        self.assertEqual(bench_e2e_latency.compare(baseline, baseline), [])
+        slower = json.loads(json.dumps(baseline))
+        slower['modes']['mempool']['stages']['detection']['p95'] = 1e6
+        self.assertEqual(len(bench_e2e_latency.compare(slower, baseline)), 1)
+        
+        with open(bench_cold_start.DEFAULT_BASELINE) as f:
+            baseline = json.load(f)
+        self.assertEqual(bench_cold_start.compare(baseline, baseline), [])
+        slower = json.loads(json.dumps(baseline))
+        slower['phases']['first_poll'] = 1e6
+        self.assertEqual(len(bench_cold_start.compare(slower, baseline)), 1)
+    
+    def test_import_has_no_requests(self):
+        """Importing wallet_monitor does not pull in requests"""
+        breakdown = bench_cold_start.import_breakdown()
+        self.assertNotIn('requests', breakdown['imports'])
+        self.assertTrue(breakdown['slowest'])
+    
+    def test_soak_trend_analysis(self):
+        """Soak trend fitting flags upward drift and accepts flat samples"""
+        leaking = [{'hours': i, 'traced_mb': 1 + 0.5 * i, 'open_fds': 8 + i} for i in range(10)]
+        trends = soak.analyse(leaking, warmup=0)
+        self.assertFalse(trends['traced_mb']['ok'])
+        self.assertFalse(trends['open_fds']['ok'])
+        self.assertAlmostEqual(trends['traced_mb']['per_hour'], 0.5)
+        
+        flat = [{'hours': i, 'traced_mb': 2.0, 'open_fds': 8} for i in range(10)]
+        trends = soak.analyse(flat, warmup=0)
+        self.assertTrue(trends['traced_mb']['ok'])
+        self.assertTrue(trends['open_fds']['ok'])
+    
+    def test_amount_aggregation_performance(self):
+        """Benchmark integer base-unit aggregation against the float path"""
+        iterations = 1000000
+        units = [(i * 7919) % 5000000000 + 1 for i in range(iterations)]
+        floats = [u / COIN for u in units]
+        
+        start_time = time.perf_counter()
+        int_total = 0
+        for amount in units:
+            int_total += amount
+        int_duration = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        float_total = 0.0
+        for amount in floats:
+            float_total += amount
+        float_duration = time.perf_counter() - start_time
+        
+        int_ops = iterations / int_duration
+        float_ops = iterations / float_duration
+        drift = abs(float_total * COIN - int_total)
+        print(f"Aggregation (1M donations): int {int_ops:.0f} ops/sec, float {float_ops:.0f} ops/sec, "
+              f"float drift {drift:.0f} base units")
+        
+        self.assertEqual(int_total, sum(units))
+        self.assertGreater(int_ops, float_ops * 0.25)
+    
+    def test_amount_parsing_performance(self):
+        """Benchmark decoding listtransactions replies and totalling their amounts"""
+        iterations = 100000
+        page = 50
+        payload = {"jsonrpc": "1.0", "id": 1, "method": "listtransactions", "params": ["*", page, 0, True]}
+        replies = []
+        for first in range(0, iterations, page):
+            entries = ", ".join(f'{{"category": "receive", "amount": {i % 1000}.{i % 100000000:08d}, '
+                                f'"confirmations": 1}}' for i in range(first, first + page))
+            replies.append(f'{{"result": [{entries}], "error": null, "id": 1}}')
+        
+        start_time = time.perf_counter()
+        totals = DonationTotals()
+        for text in replies:
+            for tx in decode_reply(json.loads(text, parse_float=Decimal), payload)["result"]:
+                totals.add("S8f3", tx["amount"])
+        duration = time.perf_counter() - start_time
+        
+        ops_per_second = iterations / duration
+        print(f"Amount decode + aggregate: {ops_per_second:.0f} ops/sec")
+        self.assertEqual(totals.count, iterations)
+        self.assertEqual(totals.total, sum((i % 1000) * COIN + i % 100000000 for i in range(iterations)))
+        self.assertGreater(ops_per_second, 10000)
     
     def test_memory_usage(self):
         """Test memory usage with many alerts"""
@@ -141,7 +238,7 @@ class TestPerformance(unittest.TestCase):
         
         # Create many alerts
         for i in range(iterations):
-            alert = DonationAlert(amount=float(i), address=f"S8f3test{i:06d}")
+            alert = DonationAlert(amount=i * 1000000, address=f"S8f3test{i:06d}")
             alerts.append(alert)
         
         # Check that we can still process them
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Fixed-Point Donation Amounts
+Tests parsing, RPC decoding, formatting and exact totals
+"""
+
+import unittest
+import sys
+import os
+import json
+from decimal import Decimal
+
+# Add the parent directory to the path to import the amounts module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import (
+    COIN, DonationTotals, coerce_amount, format_amount, parse_amount, rpc_amount_units
+)
+
+
+class TestAmountParsing(unittest.TestCase):
+    """Tests for converting SATOX values to base units"""
+
+    def test_parse_amount(self):
+        """Test exact conversion of strings, Decimals and floats"""
+        self.assertEqual(parse_amount("1.0"), COIN)
+        self.assertEqual(parse_amount("0.00000001"), 1)
+        self.assertEqual(parse_amount(Decimal("12.5")), 1250000000)
+        self.assertEqual(parse_amount(0.1), 10000000)
+        self.assertEqual(parse_amount("-2.25"), -225000000)
+
+    def test_parse_amount_rejects_excess_precision(self):
+        """Test that sub-unit precision and garbage are rejected"""
+        for value in ["0.000000001", "abc", "", "NaN", "Infinity"]:
+            with self.assertRaises(ValueError):
+                parse_amount(value)
+
+    def test_coerce_amount(self):
+        """Test that ints pass through and other types are SATOX values"""
+        self.assertEqual(coerce_amount(42), 42)
+        self.assertEqual(coerce_amount(1.5), 150000000)
+        with self.assertRaises(TypeError):
+            coerce_amount(True)
+
+    def test_rpc_amount_units(self):
+        """Test converting amounts of replies decoded with parse_float=Decimal"""
+        self.assertEqual(rpc_amount_units(Decimal("150.75000000")), 15075000000)
+        self.assertEqual(rpc_amount_units(Decimal("-0.50000000")), -50000000)
+        self.assertEqual(rpc_amount_units(Decimal("1e-05")), 1000)
+        self.assertEqual(rpc_amount_units(Decimal("1.5E+2")), 15000000000)
+        self.assertEqual(rpc_amount_units(Decimal("0.123456789")), 12345679)
+        self.assertEqual(rpc_amount_units(5), 5 * COIN)
+
+        decoded = json.loads('{"amount": 0.1, "confirmations": 3}', parse_float=Decimal)
+        self.assertEqual(rpc_amount_units(decoded["amount"]), 10000000)
+
+    def test_format_amount(self):
+        """Test rendering base units as SATOX"""
+        self.assertEqual(format_amount(1200000000), "12.00")
+        self.assertEqual(format_amount(1, 8), "0.00000001")
+        self.assertEqual(format_amount(-225000000), "-2.25")
+
+
+class TestDonationTotals(unittest.TestCase):
+    """Tests for exact donation aggregation"""
+
+    def test_totals_do_not_drift(self):
+        """Test that many small donations sum exactly"""
+        totals = DonationTotals(goal=parse_amount("1000"))
+        for _ in range(10000):
+            totals.add("S1", rpc_amount_units(Decimal("0.1")))
+
+        self.assertEqual(totals.total, 1000 * COIN)
+        self.assertEqual(totals.goal_progress(), 1.0)
+        self.assertNotEqual(sum(0.1 for _ in range(10000)), 1000.0)
+
+    def test_remove(self):
+        """Test reversing donations"""
+        totals = DonationTotals()
+        totals.add("S1", 5)
+        totals.add("S2", 7)
+        totals.remove("S1", 5)
+
+        self.assertEqual(totals.to_dict(), {'total': 7, 'count': 1, 'goal': None, 'by_address': {"S2": 7}})
+        self.assertIsNone(totals.goal_progress())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Historical Backfill
+Tests range splitting, ordered merging, totals and checkpoint resume
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path to import the backfill module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backfill import BackfillError, Checkpoint, run_backfill, split_range
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+TIP = 120
+
+
+def make_block(height):
+    """Every 10th block pays the watched address height SATOX"""
+    outputs = [{"value": "0.50000000", "scriptPubKey": {"addresses": [OTHER]}}]
+    if height % 10 == 0:
+        outputs.append({"value": f"{height}.00000000", "scriptPubKey": {"addresses": [WATCHED]}})
+    return {"hash": f"h{height}", "height": height, "time": 1700000000 + height * 60,
+            "tx": [{"txid": f"tx{height}", "vout": outputs}]}
+
+
+class BlockHandler(BaseHTTPRequestHandler):
+    """JSON-RPC handler for getblockhash / getblock (amounts as raw decimals)"""
+
+    # Heights whose getblock fails
+    missing = set()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        calls = request if isinstance(request, list) else [request]
+        replies = []
+        for call in calls:
+            method, params = call["method"], call["params"]
+            if method == "getblockhash":
+                result = f"h{params[0]}"
+            elif method == "getblock":
+                height = int(params[0][1:])
+                result = None if height in self.missing else make_block(height)
+            else:
+                result = TIP
+            replies.append({"id": call["id"], "result": result, "error": None})
+        # Amounts are written as JSON decimals like Satox Core does
+        body = json.dumps(replies if isinstance(request, list) else replies[0])
+        body = body.replace('"value": "', '"value": ').replace('0000000"', '0000000')
+        encoded = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestBackfill(unittest.TestCase):
+    """Tests for run_backfill"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), BlockHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.rpc_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.temp_dir.name, "checkpoint.json")
+        self.monitor = SatoxWalletMonitor({
+            'wallet_address': WATCHED,
+            'rpc_url': self.rpc_url,
+            'log_file': os.path.join(self.temp_dir.name, 'donations.log'),
+            'ledger_path': 'donations.jsonl'
+        })
+
+    def tearDown(self):
+        BlockHandler.missing = set()
+        self.monitor.close()
+        self.temp_dir.cleanup()
+
+    def test_split_range(self):
+        """Test that chunks cover the range exactly once"""
+        self.assertEqual(split_range(1, 10, 4), [(1, 4), (5, 8), (9, 10)])
+        self.assertEqual(split_range(5, 5, 100), [(5, 5)])
+
+    def test_parallel_backfill_merges_in_order(self):
+        """Test totals, ordered store writes and the final checkpoint"""
+        messages = []
+        checkpoint = run_backfill(self.monitor, 1, TIP, workers=3, chunk_size=7,
+                                  checkpoint_path=self.checkpoint_path, progress=messages.append)
+
+        expected = sum(range(10, TIP + 1, 10)) * 100000000
+        self.assertEqual(checkpoint.totals.total, expected)
+        self.assertEqual(checkpoint.totals.count, 12)
+        self.assertTrue(checkpoint.complete)
+        self.assertTrue(any("blocks/s" in message for message in messages))
+
+        with open(self.monitor.log_file) as f:
+            amounts = [float(line.split("Donation: ")[1].split(" ")[0]) for line in f]
+        self.assertEqual(amounts, [float(h) for h in range(10, TIP + 1, 10)])
+
+        with open(self.checkpoint_path) as f:
+            self.assertEqual(json.load(f)["next_height"], TIP + 1)
+
+    def test_resume_from_checkpoint(self):
+        """Test that a matching checkpoint skips already-merged blocks"""
+        checkpoint = Checkpoint(self.checkpoint_path, 1, TIP, [WATCHED])
+        checkpoint.next_height = 101
+        checkpoint.totals.add(WATCHED, 123)
+        checkpoint.save()
+
+        result = run_backfill(self.monitor, 1, TIP, workers=2, chunk_size=5,
+                              checkpoint_path=self.checkpoint_path, progress=lambda message: None)
+
+        self.assertEqual(result.totals.count, 3)
+        self.assertEqual(result.totals.total, 123 + (110 + 120) * 100000000)
+
+    def test_unreachable_block_stops_with_checkpoint(self):
+        """Test that a failed chunk is reported and resume starts at it"""
+        BlockHandler.missing = {57}
+        with self.assertRaises(BackfillError) as raised:
+            run_backfill(self.monitor, 1, TIP, workers=1, chunk_size=10,
+                         checkpoint_path=self.checkpoint_path, progress=lambda message: None)
+        self.assertEqual((raised.exception.start, raised.exception.end), (51, 60))
+
+        checkpoint = Checkpoint(self.checkpoint_path, 1, TIP, [WATCHED])
+        self.assertTrue(checkpoint.load())
+        self.assertEqual(checkpoint.next_height, 51)
+        self.assertEqual(checkpoint.totals.count, 5)
+
+        BlockHandler.missing = set()
+        result = run_backfill(self.monitor, 1, TIP, workers=1, chunk_size=10,
+                              checkpoint_path=self.checkpoint_path, progress=lambda message: None)
+        self.assertEqual(result.totals.count, 12)
+        self.monitor.close()
+        with open(os.path.join(self.temp_dir.name, 'donations.jsonl')) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual(len({event["txid"] for event in events}), len(events))
+        self.assertEqual({event["donor"] for event in events}, {"Unknown"})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Block File Scanner
+Tests binary decoding and donation matching against synthetic blk*.dat files
+"""
+
+import unittest
+import sys
+import os
+import io
+import struct
+import tempfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+# Add the parent directory to the path to import the scanner modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from blockfile_scanner import BlockFileScanner, main, read_network_magic
+from chain_decode import encode_varint, p2pkh_script, parse_transaction, read_varint
+from satox_address import decode_address, double_sha256
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+MAGIC = b"SATX"
+COIN = 100000000
+
+
+def script_for(address):
+    return p2pkh_script(decode_address(address)[1])
+
+
+def build_tx(outputs, inputs=1, segwit=False, tag=0):
+    """Serialize a transaction paying [(script, value)]"""
+    body = encode_varint(inputs)
+    for i in range(inputs):
+        script_sig = bytes([tag & 0xff]) * 40
+        body += bytes(32) + struct.pack('<I', i) + encode_varint(len(script_sig)) + script_sig + b'\xff\xff\xff\xff'
+    body += encode_varint(len(outputs))
+    for script, value in outputs:
+        body += struct.pack('<Q', value) + encode_varint(len(script)) + script
+    version, locktime = struct.pack('<I', 2), struct.pack('<I', tag)
+    txid = double_sha256(version + body + locktime)[::-1].hex()
+    if segwit:
+        witness = b''.join(b'\x02' + b'\x03abc' + b'\x01z' for _ in range(inputs))
+        return version + b'\x00\x01' + body + witness + locktime, txid
+    return version + body + locktime, txid
+
+
+def build_block(height, transactions, block_time=None):
+    """Serialize a block with a 120-byte KawPoW header"""
+    block_time = 1700000000 + height * 60 if block_time is None else block_time
+    header = (struct.pack('<I', 0x20000000) + bytes(32) + bytes(32) + struct.pack('<II', block_time, 0x1d00ffff)
+              + struct.pack('<I', height) + struct.pack('<Q', height) + bytes(32))
+    return header + encode_varint(len(transactions)) + b''.join(transactions)
+
+
+def write_block_file(path, blocks, padding=0):
+    with open(path, 'wb') as f:
+        for block in blocks:
+            f.write(MAGIC + struct.pack('<I', len(block)) + block)
+        f.write(bytes(padding))
+
+
+class TestChainDecode(unittest.TestCase):
+    """Tests for the binary decoders"""
+
+    def test_varint_round_trip(self):
+        """Test CompactSize encoding boundaries"""
+        for value in (0, 0xfc, 0xfd, 0xffff, 0x10000, 0xffffffff, 0x100000000):
+            encoded = encode_varint(value)
+            self.assertEqual(read_varint(memoryview(encoded), 0), (value, len(encoded)))
+
+    def test_transaction_txid_and_outputs(self):
+        """Test legacy and segwit transactions decode to the same txid"""
+        outputs = [(script_for(WATCHED), 5 * COIN), (b'\x6a\x04test', 0)]
+        legacy, txid = build_tx(outputs, inputs=2)
+        segwit, segwit_txid = build_tx(outputs, inputs=2, segwit=True)
+        self.assertEqual(txid, segwit_txid)
+
+        for raw in (legacy, segwit):
+            tx = parse_transaction(memoryview(raw), 0)
+            self.assertEqual(tx.end, len(raw))
+            self.assertEqual(tx.txid, txid)
+            self.assertEqual([(bytes(script), value) for value, script in tx.outputs], outputs)
+
+
+class TestBlockFileScanner(unittest.TestCase):
+    """Tests for BlockFileScanner"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.blocks_dir = self.temp_dir.name
+        self.expected = []
+        self.raw = {}
+
+        blocks = []
+        for height in range(1, 41):
+            txs = [build_tx([(script_for(OTHER), 50 * COIN)], tag=height)[0]]
+            if height % 10 == 0:
+                raw, txid = build_tx([(script_for(WATCHED), height * COIN), (script_for(OTHER), 1),
+                                      (script_for(WATCHED), 7)], segwit=height == 20, tag=height)
+                txs.append(raw)
+                self.raw[height] = raw
+                self.expected.append((height, 1700000000 + height * 60, txid, WATCHED, height * COIN + 7))
+            blocks.append(build_block(height, txs))
+
+        # Two files, the second with pre-allocated zero padding
+        write_block_file(os.path.join(self.blocks_dir, 'blk00000.dat'), blocks[:25])
+        write_block_file(os.path.join(self.blocks_dir, 'blk00001.dat'), blocks[25:], padding=4096)
+        open(os.path.join(self.blocks_dir, 'rev00000.dat'), 'wb').close()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_magic_is_read_from_first_file(self):
+        """Test network magic auto-detection"""
+        self.assertEqual(read_network_magic(self.blocks_dir), MAGIC)
+
+    def test_scan_finds_all_donations(self):
+        """Test that every watched payment is found across files"""
+        scanner = BlockFileScanner(self.blocks_dir, [WATCHED])
+        self.assertEqual(sorted(scanner.scan()), self.expected)
+        self.assertEqual(scanner.blocks, 40)
+        self.assertEqual(scanner.transactions, 44)
+        self.assertEqual(scanner.errors, 0)
+
+    def test_height_range(self):
+        """Test filtering by KawPoW header height"""
+        scanner = BlockFileScanner(self.blocks_dir, [WATCHED])
+        found = list(scanner.scan(start_height=15, end_height=30))
+        self.assertEqual([d[0] for d in found], [20, 30])
+        self.assertEqual(scanner.blocks, 16)
+
+    def test_truncated_and_corrupt_records(self):
+        """Test recovery from garbage and a partially written last block"""
+        path = os.path.join(self.blocks_dir, 'blk00001.dat')
+        with open(path, 'rb') as f:
+            data = f.read().rstrip(b'\x00')
+        with open(path, 'wb') as f:
+            f.write(b'garbage' + data[:-10])
+
+        scanner = BlockFileScanner(self.blocks_dir, [WATCHED])
+        found = sorted(scanner.scan())
+        # The last block (height 40) is cut off; everything else survives
+        self.assertEqual(found, self.expected[:3])
+        self.assertEqual(scanner.blocks, 39)
+        self.assertEqual(scanner.errors, 1)
+
+    def test_payment_in_stale_block_reported_once(self):
+        """Test that a payment mined in a stale block and its replacement is not double counted"""
+        stale = build_block(30, [build_tx([(script_for(OTHER), 50 * COIN)], tag=99)[0], self.raw[30]],
+                            block_time=1700000000 + 30 * 60 + 5)
+        write_block_file(os.path.join(self.blocks_dir, 'blk00002.dat'), [stale])
+        scanner = BlockFileScanner(self.blocks_dir, [WATCHED])
+        self.assertEqual(sorted(scanner.scan()), self.expected)
+        self.assertEqual(scanner.duplicates, 1)
+        self.assertEqual(scanner.blocks, 41)
+
+    def test_main_scans_without_building_a_monitor(self):
+        """Test that a plain scan only needs the settings"""
+        output = io.StringIO()
+        with patch('wallet_monitor.SatoxWalletMonitor', side_effect=AssertionError("monitor built")), \
+                redirect_stdout(output):
+            code = main(["--blocks-dir", self.blocks_dir, "--address", WATCHED, "--magic", MAGIC.hex()])
+        self.assertEqual(code, 0)
+        self.assertIn("Donations: 4", output.getvalue())
+
+    def test_address_option_replaces_configured_addresses(self):
+        """Test that --address scans only the given addresses"""
+        output = io.StringIO()
+        with patch.dict(os.environ, {'SATOX_DONATION_ADDRESS': OTHER}), redirect_stdout(output):
+            code = main(["--blocks-dir", self.blocks_dir, "--address", WATCHED, "--magic", MAGIC.hex()])
+        self.assertEqual(code, 0)
+        self.assertIn("Addresses: 1", output.getvalue())
+        self.assertNotIn(OTHER, output.getvalue())
+
+        output = io.StringIO()
+        with patch.dict(os.environ, {'SATOX_DONATION_ADDRESS': OTHER, 'SATOX_WATCH_ADDRESSES': WATCHED}), \
+                redirect_stdout(output):
+            self.assertEqual(main(["--blocks-dir", self.blocks_dir, "--magic", MAGIC.hex()]), 0)
+        self.assertIn("Addresses: 2", output.getvalue())
+
+    def test_unwatched_addresses_match_nothing(self):
+        """Test that nothing is reported without watched addresses"""
+        scanner = BlockFileScanner(self.blocks_dir, ["not-an-address"])
+        self.assertEqual(list(scanner.scan()), [])
+        self.assertEqual(scanner.blocks, 40)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
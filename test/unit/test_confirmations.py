@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Confirmation Tracking
+Tests maturity scheduling, reorg retraction and re-confirmation
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path to import the tracker
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from confirmations import (
+    CONFIRMED, RECONFIRMED, RETRACTED, SEEN, ConfirmationTracker
+)
+
+
+class FakeChain:
+    """Minimal block store answering getblock-style lookups"""
+
+    def __init__(self):
+        self.blocks = {}
+        self.tip = None
+        self.lookups = 0
+
+    def build(self, start_height, count, prefix, parent=None):
+        """Append count blocks on top of parent, returning the tip hash"""
+        for offset in range(count):
+            height = start_height + offset
+            block_hash = f"{prefix}{height}"
+            self.blocks[block_hash] = {'height': height, 'previousblockhash': parent}
+            parent = block_hash
+        self.tip = parent
+        return parent
+
+    def get_block(self, block_hash):
+        self.lookups += 1
+        return self.blocks.get(block_hash)
+
+
+def kinds(events):
+    return [event.kind for event in events]
+
+
+class TestConfirmationTracker(unittest.TestCase):
+    """Tests for ConfirmationTracker"""
+
+    def setUp(self):
+        self.tracker = ConfirmationTracker(required_confirmations=3)
+        self.chain = FakeChain()
+        self.chain.build(1, 100, "a")
+        # The monitor has been following the chain for a while
+        for height in range(90, 101):
+            self.tracker.connect_block(height, f"a{height}")
+
+    def test_seen_then_confirmed(self):
+        """Test that a donation confirms exactly when it matures"""
+        self.assertEqual(kinds(self.tracker.observe("tx1", "S1", 5, None)), [SEEN])
+        self.assertEqual(kinds(self.tracker.observe("tx1", "S1", 5, None)), [])
+        self.assertEqual(kinds(self.tracker.observe("tx1", "S1", 5, 101)), [])
+        self.assertEqual(self.tracker.pending_count, 1)
+
+        self.assertEqual(kinds(self.tracker.connect_block(102, "a102")), [])
+        self.assertEqual(kinds(self.tracker.connect_block(103, "a103")), [CONFIRMED])
+        self.assertEqual(self.tracker.pending_count, 0)
+
+    def test_already_mature_on_sighting(self):
+        """Test that a deeply buried donation confirms immediately"""
+        self.assertEqual(kinds(self.tracker.observe("tx1", "S1", 5, 90)), [SEEN, CONFIRMED])
+
+    def test_block_only_touches_maturing_bucket(self):
+        """Test that pending donations are bucketed by maturity height"""
+        for i in range(50):
+            self.tracker.observe(f"tx{i}", "S1", 5, 101 + i)
+        events = self.tracker.connect_block(103, "a103")
+        self.assertEqual([event.donation.txid for event in events], ["tx0"])
+        self.assertEqual(self.tracker.pending_count, 49)
+
+    def test_reorg_retracts_and_reconfirms(self):
+        """Test that orphaned donations are retracted and re-confirmed"""
+        self.tracker.observe("deep", "S1", 5, 95)
+        self.tracker.observe("orphaned", "S1", 7, 98)
+        self.assertTrue(self.tracker._donations[("orphaned", "S1")].confirmed)
+
+        # Replace blocks 98-100 with a longer competing branch
+        fork_tip = self.chain.build(98, 4, "b", parent="a97")
+        events = self.tracker.update_tip(fork_tip, self.chain.get_block)
+        self.assertEqual(kinds(events), [RETRACTED])
+        self.assertEqual(events[0].donation.txid, "orphaned")
+        self.assertEqual(self.tracker.tip_height, 101)
+        self.assertTrue(self.tracker._donations[("deep", "S1")].confirmed)
+
+        # The transaction is mined again in the new branch
+        self.assertEqual(kinds(self.tracker.observe("orphaned", "S1", 7, 100)), [])
+        self.assertEqual(kinds(self.tracker.connect_block(102, "b102")), [RECONFIRMED])
+
+    def test_linear_extension_costs_one_lookup(self):
+        """Test that a normal new block needs a single getblock"""
+        self.chain.lookups = 0
+        tip = self.chain.build(101, 1, "a", parent="a100")
+        self.tracker.update_tip(tip, self.chain.get_block)
+        self.assertEqual(self.chain.lookups, 1)
+        self.assertEqual(self.tracker.update_tip(tip, self.chain.get_block), [])
+        self.assertEqual(self.chain.lookups, 1)
+
+    def test_pruning(self):
+        """Test that donations deeper than the reorg window are forgotten"""
+        tracker = ConfirmationTracker(required_confirmations=1, max_reorg_depth=10)
+        tracker.connect_block(100)
+        tracker.observe("old", "S1", 5, 100)
+        self.assertIn(("old", "S1"), tracker)
+        tracker.connect_block(111)
+        self.assertNotIn(("old", "S1"), tracker)
+
+    def test_reorg_window_covers_confirmations(self):
+        """Test that pending donations are never pruned before they mature"""
+        tracker = ConfirmationTracker(required_confirmations=20, max_reorg_depth=5)
+        self.assertEqual(tracker.max_reorg_depth, 20)
+        tracker.connect_block(100)
+        tracker.observe("slow", "S1", 5, 101)
+        for height in range(101, 121):
+            events = tracker.connect_block(height)
+        self.assertEqual(kinds(events), [CONFIRMED])
+
+    def test_unmined_donations_expire(self):
+        """Test that donations no source reports any more are forgotten"""
+        tracker = ConfirmationTracker(required_confirmations=1, max_reorg_depth=10)
+        # Seen before the first tip: the window starts at that tip
+        tracker.observe("early", "S1", 5, None)
+        tracker.connect_block(100)
+        self.assertIn(("early", "S1"), tracker)
+        tracker.observe("dropped", "S1", 5, None)
+        tracker.observe("waiting", "S1", 5, None)
+        tracker.connect_block(105)
+        tracker.observe("waiting", "S1", 5, None)
+        tracker.connect_block(111)
+        self.assertNotIn(("dropped", "S1"), tracker)
+        self.assertNotIn(("early", "S1"), tracker)
+        self.assertIn(("waiting", "S1"), tracker)
+        tracker.connect_block(116)
+        self.assertNotIn(("waiting", "S1"), tracker)
+        self.assertEqual(kinds(tracker.observe("waiting", "S1", 5, 116)), [SEEN, CONFIRMED])
+
+    def test_one_transaction_paying_two_addresses(self):
+        """Test that each watched address paid by a transaction is tracked"""
+        self.assertEqual(kinds(self.tracker.observe("split", "S1", 5, 101)), [SEEN])
+        self.assertEqual(kinds(self.tracker.observe("split", "S2", 3, 101)), [SEEN])
+        events = self.tracker.connect_block(103, "a103")
+        self.assertEqual(sorted((event.donation.address, event.donation.amount) for event in events),
+                         [("S1", 5), ("S2", 3)])
+
+    def test_height_of_recent_blocks(self):
+        """Test the reverse lookup of recorded main chain hashes"""
+        self.assertEqual(self.tracker.height_of("a95"), 95)
+        self.assertIsNone(self.tracker.height_of("b95"))
+
+        # Blocks replaced by a reorg are no longer on the main chain
+        fork_tip = self.chain.build(98, 4, "b", parent="a97")
+        self.tracker.update_tip(fork_tip, self.chain.get_block)
+        self.assertIsNone(self.tracker.height_of("a99"))
+        self.assertEqual(self.tracker.height_of("b99"), 99)
+        self.assertEqual(self.tracker.height_of("a97"), 97)
+
+        # Hashes older than the reorg window are pruned
+        tracker = ConfirmationTracker(required_confirmations=1, max_reorg_depth=10)
+        for height in range(1, 30):
+            tracker.connect_block(height, f"a{height}")
+        self.assertIsNone(tracker.height_of("a5"))
+        self.assertEqual(tracker.height_of("a25"), 25)
+        self.assertEqual(len(tracker._block_heights), len(tracker._block_hashes))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Donation Ledger
+Tests appending, the sparse time index, windowed queries, crash recovery and the CLI
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Add the parent directory to the path to import the donation ledger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from donation_ledger import (
+    INDEX_ENTRY, DonationLedger, LedgerReader, main, parse_time, read_index, summarize, top
+)
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+START = 1735689600.0  # 2025-01-01 00:00 UTC
+
+
+class TestDonationLedger(unittest.TestCase):
+    """Tests for writing and querying the ledger"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "donations.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fill(self, count, block_records=16, step=60.0):
+        ledger = DonationLedger(self.path, block_records=block_records)
+        for index in range(count):
+            ledger.append("confirmed", f"{index:064x}", WATCHED, f"donor{index % 5}", (index + 1) * COIN,
+                          timestamp=START + index * step)
+        ledger.close()
+
+    def test_append_writes_json_lines(self):
+        ledger = DonationLedger(self.path)
+        record = ledger.append("confirmed", "ab" * 32, WATCHED, "Sdonor", 5 * COIN, timestamp=START)
+        ledger.close()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline()), record)
+        self.assertEqual(record["amount"], 500000000)
+
+    def test_sparse_index_blocks(self):
+        self.fill(100)
+        size = os.path.getsize(self.path)
+        index = read_index(self.path + ".idx", size)
+        self.assertEqual(len(index), 6)
+        self.assertEqual(index[0][0], 0)
+        self.assertEqual([entry[0] for entry in index[1:]], [entry[1] for entry in index[:-1]])
+        self.assertEqual(index[0][2:], (START, START + 15 * 60))
+
+    def test_window_reads_only_overlapping_blocks(self):
+        self.fill(1000)
+        with LedgerReader(self.path) as reader:
+            events = list(reader.events(START + 500 * 60, START + 510 * 60))
+            self.assertEqual([event["txid"] for event in events], [f"{index:064x}" for index in range(500, 510)])
+            self.assertLess(reader.bytes_read, reader.size / 20)
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(list(reader.events())), 1000)
+            self.assertEqual(reader.bytes_read, reader.size)
+
+    def test_out_of_order_backfill_is_found(self):
+        self.fill(64)
+        ledger = DonationLedger(self.path, block_records=16)
+        ledger.append("confirmed", "ff" * 32, WATCHED, "old", COIN, timestamp=START - 86400)
+        ledger.close()
+        with LedgerReader(self.path) as reader:
+            events = list(reader.events(START - 86400 - 1, START - 86400 + 1))
+        self.assertEqual([event["donor"] for event in events], ["old"])
+
+    def test_reopen_continues_block(self):
+        self.fill(10)
+        self.fill(10)
+        index = read_index(self.path + ".idx", os.path.getsize(self.path))
+        self.assertEqual(len(index), 1)
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(list(reader.events())), 20)
+
+    def test_recovers_from_torn_write(self):
+        self.fill(20)
+        with open(self.path, "ab") as f:
+            f.write(b'{"time":17356')
+        with open(self.path + ".idx", "ab") as f:
+            f.write(INDEX_ENTRY.pack(10 ** 9, 10 ** 9 + 5, 0, 0)[:10])
+        ledger = DonationLedger(self.path, block_records=16)
+        ledger.append("confirmed", "ee" * 32, WATCHED, "after", COIN, timestamp=START + 99999)
+        ledger.close()
+        self.assertEqual(os.path.getsize(self.path + ".idx"), INDEX_ENTRY.size)
+        with LedgerReader(self.path) as reader:
+            events = list(reader.events())
+        self.assertEqual(len(events), 21)
+        self.assertEqual(events[-1]["donor"], "after")
+
+    def test_summarize_and_top_net_retractions(self):
+        events = [
+            {"time": START, "event": "confirmed", "donor": "a", "address": WATCHED, "amount": 5 * COIN},
+            {"time": START + 1, "event": "confirmed", "donor": "b", "address": WATCHED, "amount": 3 * COIN},
+            {"time": START + 2, "event": "confirmed", "donor": "a", "address": WATCHED, "amount": 1 * COIN},
+            {"time": START + 3, "event": "retracted", "donor": "b", "address": WATCHED, "amount": 3 * COIN},
+        ]
+        stats = summarize(iter(events))
+        self.assertEqual((stats["donations"], stats["retracted"], stats["total"], stats["donors"]), (2, 1, 6 * COIN, 1))
+        self.assertEqual(stats["largest"]["amount"], 5 * COIN)
+        self.assertEqual(stats["average"], 3 * COIN)
+        self.assertEqual(top(iter(events)), [("a", 6 * COIN, 2)])
+
+    def test_reconfirmed_donation_counted_once(self):
+        events = [
+            {"time": START, "event": "confirmed", "donor": "a", "address": WATCHED, "amount": 5 * COIN},
+            {"time": START + 1, "event": "retracted", "donor": "a", "address": WATCHED, "amount": 5 * COIN},
+            {"time": START + 2, "event": "reconfirmed", "donor": "a", "address": WATCHED, "amount": 5 * COIN},
+        ]
+        stats = summarize(iter(events))
+        self.assertEqual((stats["donations"], stats["total"], stats["donors"]), (1, 5 * COIN, 1))
+        self.assertEqual(top(iter(events)), [("a", 5 * COIN, 1)])
+
+    def test_parse_time(self):
+        self.assertEqual(parse_time("24h", now=START), START - 86400)
+        self.assertEqual(parse_time("7d", now=START), START - 7 * 86400)
+        self.assertEqual(parse_time("2025-01-31T18:00"), datetime(2025, 1, 31, 18).timestamp())
+        self.assertEqual(parse_time("1735689600"), START)
+        with self.assertRaises(ValueError):
+            parse_time("yesterday")
+
+    def test_cli(self):
+        self.fill(50)
+        since = datetime.fromtimestamp(START + 10 * 60).isoformat()
+        until = datetime.fromtimestamp(START + 20 * 60).isoformat()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(["--ledger", self.path, "stats", "--since", since, "--until", until]), 0)
+            self.assertEqual(main(["--ledger", self.path, "top", "-n", "2"]), 0)
+            self.assertEqual(main(["--ledger", self.path, "range", "--since", since, "--until", until, "--json"]), 0)
+        text = output.getvalue()
+        self.assertIn("Donations: 10 from 5 donors", text)
+        self.assertIn("Total: 155.00000000 SATOX", text)
+        self.assertIn("   1. donor4", text)
+        self.assertEqual(len([line for line in text.splitlines() if line.startswith('{"time"')]), 10)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["--ledger", os.path.join(self.temp_dir.name, "missing.jsonl"), "stats"]), 1)
+
+
+class TestMonitorLedger(unittest.TestCase):
+    """Tests for the events the monitor records"""
+
+    def test_confirmed_and_retracted_events(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({
+                'wallet_address': WATCHED, 'tx_cache_path': '', 'log_file': os.path.join(temp_dir, 'donations.log')
+            })
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            monitor.get_sender_address = lambda txid: "Sdonor1234567890"
+            monitor._apply_event("confirmed", "aa" * 32, WATCHED, 5 * COIN)
+            monitor._apply_event("retracted", "aa" * 32, WATCHED, 5 * COIN)
+            monitor.close()
+            with LedgerReader(os.path.join(temp_dir, "donations.jsonl")) as reader:
+                events = list(reader.events())
+        self.assertEqual([(event["event"], event["donor"]) for event in events],
+                         [("confirmed", "Sdonor1234567890"), ("retracted", "Sdonor1234567890")])
+        self.assertEqual(summarize(iter(events))["total"], 0)
+
+    def test_ledger_disabled(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({
+                'tx_cache_path': '', 'ledger_path': '', 'log_file': os.path.join(temp_dir, 'donations.log')
+            })
+            monitor.record_donation("confirmed", "aa" * 32, WATCHED, WATCHED, COIN)
+            self.assertEqual(os.listdir(temp_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
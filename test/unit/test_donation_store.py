@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Donation Store
+Tests batched writes, WAL mode, the indexes, materialized daily totals, queries and the CLI
+"""
+
+import unittest
+import sys
+import os
+import io
+import sqlite3
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+# Add the parent directory to the path to import the donation store
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from donation_ledger import DonationLedger
+from donation_store import DAY, DonationStore, day_of, import_ledger, main
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SXqBzRtn8JbXgZfEWN3vjMMTaS3yvmLDRU"
+START = 1735689600.0  # 2025-01-01 00:00 UTC
+
+
+def brute_force(events, since, until, address=None):
+    """Reference totals computed from the raw events"""
+    selected = [e for e in events if since <= e[5] < until and (address is None or e[2] == address)]
+    signed = [(-1 if e[0] == "retracted" else 1, e[4]) for e in selected]
+    return {
+        "donations": sum(sign for sign, _ in signed),
+        "retracted": sum(1 for sign, _ in signed if sign < 0),
+        "total": sum(sign * amount for sign, amount in signed),
+        "largest": max([amount for sign, amount in signed if sign > 0] or [0]),
+    }
+
+
+class TestDonationStore(unittest.TestCase):
+    """Tests for writing and querying the store"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "donations.db")
+        self.store = DonationStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def fill(self, count, step=3600.0):
+        events = []
+        for index in range(count):
+            event = "retracted" if index % 7 == 6 else "confirmed"
+            events.append((event, f"{index:064x}", WATCHED if index % 3 else OTHER, f"donor{index % 5}",
+                           (index % 11 + 1) * COIN, START + index * step))
+        for event in events:
+            self.store.add(*event[:5], timestamp=event[5])
+        self.store.flush()
+        return events
+
+    def test_schema_and_wal(self):
+        db = sqlite3.connect(self.path)
+        self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("donations_address_time", indexes)
+        self.assertIn("donations_donor_time", indexes)
+        db.close()
+
+    def test_commit_writes_one_batch_off_thread(self):
+        writers = []
+        original = self.store._write_batches
+        self.store._write_batches = lambda: (writers.append(threading.current_thread()), original())
+        for index in range(5):
+            self.store.add("confirmed", f"{index:064x}", WATCHED, "donor", COIN, timestamp=START + index)
+        self.assertEqual(self.store.pending, 5)
+        self.assertEqual(self.store.totals()["donations"], 0)
+        self.assertEqual(self.store.commit(), 5)
+        self.store.flush()
+        self.assertEqual((self.store.batches, self.store.inserted), (1, 5))
+        self.assertNotIn(threading.current_thread(), writers)
+        self.assertEqual(self.store.totals()["donations"], 5)
+        self.assertEqual(self.store.commit(), 0)
+
+    def test_full_batch_committed_early(self):
+        store = DonationStore(os.path.join(self.temp_dir.name, "small.db"), max_batch=4)
+        for index in range(10):
+            store.add("confirmed", f"{index:064x}", WATCHED, "donor", COIN, timestamp=START + index)
+        self.assertEqual(store.pending, 2)
+        store.close()
+        self.assertEqual(store.batches, 3)
+        self.assertEqual(store.inserted, 10)
+
+    def test_daily_totals_maintained_on_insert(self):
+        self.store.add("confirmed", "aa" * 32, WATCHED, "a", 5 * COIN, timestamp=START + 10)
+        self.store.add("confirmed", "bb" * 32, WATCHED, "b", 3 * COIN, timestamp=START + 20)
+        self.store.add("retracted", "bb" * 32, WATCHED, "b", 3 * COIN, timestamp=START + 30)
+        self.store.add("confirmed", "cc" * 32, WATCHED, "a", 2 * COIN, timestamp=START + DAY)
+        self.store.flush()
+        self.assertEqual(self.store.daily(), [("2025-01-01", 1, 1, 5 * COIN), ("2025-01-02", 1, 0, 2 * COIN)])
+        self.assertEqual(day_of(START + DAY - 1), "2025-01-01")
+
+    def test_reconfirmed_donation_counted_once(self):
+        for offset, event in enumerate(("confirmed", "retracted", "reconfirmed")):
+            self.store.add(event, "aa" * 32, WATCHED, "a", 5 * COIN, timestamp=START + offset)
+        self.store.flush()
+        totals = self.store.totals()
+        self.assertEqual((totals["donations"], totals["retracted"], totals["total"]), (1, 1, 5 * COIN))
+        self.assertEqual(self.store.totals(START, START + 10, WATCHED)["donations"], 1)
+        self.assertEqual(self.store.daily(), [("2025-01-01", 1, 1, 5 * COIN)])
+        self.assertEqual(self.store.top(), [("a", 5 * COIN, 1)])
+
+    def test_duplicate_backfill_ignored(self):
+        for _ in range(2):
+            self.store.add("confirmed", "aa" * 32, WATCHED, "a", 5 * COIN, timestamp=START)
+            self.store.flush()
+        self.assertEqual(self.store.inserted, 1)
+        self.assertEqual(self.store.totals()["total"], 5 * COIN)
+
+    def test_totals_match_raw_events(self):
+        events = self.fill(24 * 10, step=3600.0 / 4 + 7)
+        windows = [
+            (None, None), (START + 5000, START + 2 * DAY + 123), (START + DAY, START + 2 * DAY),
+            (START + 100, START + 200), (None, START + DAY + 5), (START + DAY / 2, None),
+        ]
+        for since, until in windows:
+            for address in (None, OTHER):
+                expected = brute_force(events, since if since is not None else float("-inf"),
+                                       until if until is not None else float("inf"), address)
+                result = self.store.totals(since, until, address)
+                self.assertEqual({key: result[key] for key in expected}, expected, (since, until, address))
+
+    def test_top_and_history(self):
+        self.store.add("confirmed", "aa" * 32, WATCHED, "a", 5 * COIN, timestamp=START)
+        self.store.add("confirmed", "bb" * 32, WATCHED, "b", 3 * COIN, timestamp=START + 1)
+        self.store.add("confirmed", "cc" * 32, OTHER, "a", 1 * COIN, timestamp=START + 2)
+        self.store.add("retracted", "bb" * 32, WATCHED, "b", 3 * COIN, timestamp=START + 3)
+        self.store.flush()
+        self.assertEqual(self.store.top(), [("a", 6 * COIN, 2)])
+        self.assertEqual(self.store.top(by="address"), [(WATCHED, 5 * COIN, 1), (OTHER, COIN, 1)])
+        self.assertEqual(self.store.top(since=START + 1), [("a", COIN, 1)])
+        self.assertEqual([event["txid"] for event in self.store.history("a")], ["cc" * 32, "aa" * 32])
+
+    def test_import_ledger_and_cli(self):
+        ledger_path = os.path.join(self.temp_dir.name, "donations.jsonl")
+        ledger = DonationLedger(ledger_path)
+        for index in range(48):
+            ledger.append("confirmed", f"{index:064x}", WATCHED, f"donor{index % 4}", (index + 1) * COIN,
+                          timestamp=START + index * 3600)
+        ledger.close()
+        db_path = os.path.join(self.temp_dir.name, "imported.db")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(["--db", db_path, "import", "--ledger", ledger_path]), 0)
+            self.assertEqual(main(["--db", db_path, "import", "--ledger", ledger_path]), 0)
+            self.assertEqual(main(["--db", db_path, "stats", "--since", str(START + DAY)]), 0)
+            self.assertEqual(main(["--db", db_path, "top", "-n", "1"]), 0)
+            self.assertEqual(main(["--db", db_path, "daily"]), 0)
+        text = output.getvalue()
+        self.assertIn("Imported 48 new events", text)
+        self.assertIn("Imported 0 new events", text)
+        self.assertIn("Donations: 24", text)
+        self.assertIn("Total: 876.00000000 SATOX", text)
+        self.assertIn("   1. donor3", text)
+        self.assertIn("2025-01-02      24 donations", text)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["--db", os.path.join(self.temp_dir.name, "missing.db"), "stats"]), 1)
+
+
+class TestMonitorDonationStore(unittest.TestCase):
+    """Tests for the events the monitor stores"""
+
+    def test_events_committed_per_cycle(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({
+                'wallet_address': WATCHED, 'tx_cache_path': '', 'ledger_path': '', 'donation_db': 'donations.db',
+                'log_file': os.path.join(temp_dir, 'donations.log')
+            })
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            monitor.get_sender_address = lambda txid: "Sdonor1234567890"
+            monitor.check_for_donations = lambda: (
+                monitor._apply_event("confirmed", "aa" * 32, WATCHED, 5 * COIN),
+                monitor._apply_event("retracted", "aa" * 32, WATCHED, 5 * COIN),
+            )
+            monitor.run_cycle(0)
+            store = monitor.donation_store
+            self.assertEqual(store.pending, 0)
+            store.flush()
+            self.assertEqual(store.batches, 1)
+            self.assertEqual(store.history("Sdonor1234567890")[0]["event"], "retracted")
+            self.assertEqual(store.totals()["total"], 0)
+            monitor.close()
+            self.assertEqual(sorted(os.listdir(temp_dir))[:2], ['alert.txt', 'donations.db'])
+
+    def test_ledger_import_skips_live_events(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({
+                'wallet_address': WATCHED, 'tx_cache_path': '', 'ledger_path': 'donations.jsonl',
+                'donation_db': 'donations.db', 'log_file': os.path.join(temp_dir, 'donations.log')
+            })
+            for index in range(5):
+                monitor.record_donation("confirmed", f"{index:064x}", WATCHED, "donor", COIN)
+            monitor.commit_donations()
+            monitor.donation_store.flush()
+            self.assertEqual(import_ledger(monitor.donation_store, os.path.join(temp_dir, 'donations.jsonl')), 0)
+            self.assertEqual(monitor.donation_store.totals()["total"], 5 * COIN)
+            monitor.close()
+
+    def test_store_disabled_by_default(self):
+        monitor = SatoxWalletMonitor({'tx_cache_path': '', 'ledger_path': ''})
+        monitor.record_donation("confirmed", "aa" * 32, WATCHED, WATCHED, COIN)
+        monitor.commit_donations()
+        self.assertIsNone(monitor.donation_store)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Donation Ingestion Sources
+Tests mempool diffing, address index queries and output matching
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path to import the ingestion module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from ingestion import AddressIndexSource, MempoolWatcher, match_outputs
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+
+
+def make_tx(txid, *outputs):
+    """Build a getrawtransaction-style decoded transaction"""
+    return {
+        'txid': txid,
+        'vout': [
+            {'value': value, 'n': n, 'scriptPubKey': {'addresses': addresses}}
+            for n, (addresses, value) in enumerate(outputs)
+        ]
+    }
+
+
+class FakeMempoolNode:
+    """Answers getrawmempool and batched getrawtransaction calls"""
+
+    def __init__(self):
+        self.mempool = {}
+        self.fetched = []
+
+    def rpc_call(self, method, params=None):
+        assert method == "getrawmempool"
+        return list(self.mempool)
+
+    def rpc_batch(self, calls):
+        results = []
+        for method, params in calls:
+            assert method == "getrawtransaction" and params[1] == 1
+            self.fetched.append(params[0])
+            results.append(self.mempool.get(params[0]))
+        return results
+
+
+class TestMatchOutputs(unittest.TestCase):
+    """Tests for matching decoded outputs against watched addresses"""
+
+    def test_sums_outputs_per_address(self):
+        """Test that several outputs to one address form one payment"""
+        tx = make_tx("t1", ([WATCHED], 100), ([OTHER], 5), ([WATCHED], 50))
+        self.assertEqual(match_outputs(tx, {WATCHED}), [("t1", WATCHED, 150, None)])
+
+    def test_ignores_multisig_and_unwatched(self):
+        """Test that multisig and unrelated outputs are ignored"""
+        tx = make_tx("t1", ([WATCHED, OTHER], 100), ([OTHER], 5))
+        self.assertEqual(match_outputs(tx, {WATCHED}), [])
+
+
+class TestMempoolWatcher(unittest.TestCase):
+    """Tests for MempoolWatcher"""
+
+    def setUp(self):
+        self.node = FakeMempoolNode()
+        self.node.mempool["old"] = make_tx("old", ([WATCHED], 100))
+        self.watcher = MempoolWatcher(self.node.rpc_call, self.node.rpc_batch, {WATCHED})
+
+    def test_primes_without_fetching(self):
+        """Test that the startup mempool is recorded but not fetched"""
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(self.node.fetched, [])
+        self.assertEqual(self.watcher.known, {"old"})
+
+    def test_only_new_txids_are_fetched(self):
+        """Test incremental set-based diffing between ticks"""
+        self.watcher.poll()
+        self.node.mempool["new"] = make_tx("new", ([WATCHED], 700))
+        self.node.mempool["noise"] = make_tx("noise", ([OTHER], 1))
+
+        payments = self.watcher.poll()
+        self.assertEqual(payments, [("new", WATCHED, 700, None)])
+        self.assertEqual(sorted(self.node.fetched), ["new", "noise"])
+
+        # Nothing changed: nothing is fetched
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(len(self.node.fetched), 2)
+
+        # Mined transactions simply leave the known set
+        del self.node.mempool["new"]
+        self.watcher.poll()
+        self.assertNotIn("new", self.watcher.known)
+
+    def test_fetch_cap_and_backlog(self):
+        """Test that large bursts are spread over ticks and batched"""
+        watcher = MempoolWatcher(self.node.rpc_call, self.node.rpc_batch, {WATCHED},
+                                 batch_size=10, max_fetch_per_tick=25)
+        watcher.poll()
+        for i in range(60):
+            self.node.mempool[f"tx{i}"] = make_tx(f"tx{i}", ([OTHER], i))
+
+        watcher.poll()
+        self.assertEqual(len(self.node.fetched), 25)
+        self.assertEqual(watcher.backlog_size, 35)
+
+        # Backlogged transactions that were mined meanwhile are skipped
+        for i in range(30, 60):
+            del self.node.mempool[f"tx{i}"]
+        watcher.poll()
+        survivors = {f"tx{i}" for i in range(30)}
+        self.assertTrue(set(self.node.fetched[25:]) <= survivors)
+        self.assertTrue(survivors <= set(self.node.fetched))
+        self.assertEqual(watcher.backlog_size, 0)
+
+
+
+class FakeIndexNode:
+    """Answers getblockcount, getaddressdeltas and getaddressmempool"""
+
+    def __init__(self):
+        self.height = 100
+        self.deltas = []
+        self.mempool = []
+        self.calls = []
+
+    def rpc_call(self, method, params=None):
+        self.calls.append((method, params))
+        if method == "getblockcount":
+            return self.height
+        query = params[0]
+        if method == "getaddressdeltas":
+            return [d for d in self.deltas
+                    if d["address"] in query["addresses"] and query["start"] <= d["height"] <= query["end"]]
+        if method == "getaddressmempool":
+            return [d for d in self.mempool if d["address"] in query["addresses"]]
+        raise AssertionError(method)
+
+
+class TestAddressIndexSource(unittest.TestCase):
+    """Tests for AddressIndexSource"""
+
+    def setUp(self):
+        self.node = FakeIndexNode()
+        self.watched = {WATCHED, OTHER}
+        self.source = AddressIndexSource(self.node.rpc_call, self.watched, rescan_depth=2)
+
+    def test_follows_tip_with_single_query_for_all_addresses(self):
+        """Test that one deltas query covers every watched address"""
+        self.assertEqual(self.source.poll(), [])
+        self.assertEqual(self.source.next_height, 101)
+
+        self.node.height = 102
+        self.node.deltas = [
+            {"txid": "t1", "address": WATCHED, "satoshis": 500, "height": 101, "index": 0},
+            {"txid": "t2", "address": OTHER, "satoshis": 900, "height": 102, "index": 1},
+            {"txid": "t0", "address": WATCHED, "satoshis": 1, "height": 50, "index": 0}
+        ]
+        payments = self.source.poll()
+
+        self.assertEqual(sorted(payments), [("t1", WATCHED, 500, 101), ("t2", OTHER, 900, 102)])
+        queries = [params[0] for method, params in self.node.calls if method == "getaddressdeltas"]
+        self.assertEqual(queries[-1]["addresses"], sorted(self.watched))
+        self.assertEqual((queries[-1]["start"], queries[-1]["end"]), (99, 102))
+
+    def test_change_is_netted_out(self):
+        """Test that change returned to a watched address is not a donation"""
+        self.source.next_height = 101
+        self.node.height = 101
+        self.node.deltas = [
+            {"txid": "spend", "address": WATCHED, "satoshis": -1000, "height": 101},
+            {"txid": "spend", "address": WATCHED, "satoshis": 400, "height": 101}
+        ]
+        self.assertEqual(self.source.poll(), [])
+
+    def test_mempool_reports_each_payment_once(self):
+        """Test that unconfirmed payments are reported once while pending"""
+        self.source.next_height = 101
+        self.node.mempool = [{"txid": "m1", "address": WATCHED, "satoshis": 700, "index": 0}]
+
+        self.assertEqual(self.source.poll(), [("m1", WATCHED, 700, None)])
+        self.assertEqual(self.source.poll(), [])
+
+    def test_large_ranges_are_chunked(self):
+        """Test that catch-up queries are split into bounded ranges"""
+        source = AddressIndexSource(self.node.rpc_call, self.watched, start_height=1, rescan_depth=0, max_range=40)
+        source.poll_confirmed(sorted(self.watched))
+        ranges = [(p[0]["start"], p[0]["end"]) for m, p in self.node.calls if m == "getaddressdeltas"]
+        self.assertEqual(ranges, [(1, 40), (41, 80), (81, 100)])
+        self.assertEqual(source.next_height, 101)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Log Pipeline
+Tests queued logging, size and age rotation with gzip, repeat collapsing and the donation log
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import logging
+import tempfile
+import threading
+
+# Add the parent directory to the path to import the log pipeline
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import wallet_monitor
+from log_pipeline import LogPipeline, RepeatFilter, RotatingGzipFileHandler
+from wallet_monitor import SatoxWalletMonitor
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(message, level=logging.ERROR, name="wallet_monitor"):
+    return logging.LogRecord(name, level, __file__, 0, message, None, None)
+
+
+class TestRotatingGzipFileHandler(unittest.TestCase):
+    """Tests for size and age based rotation"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "monitor.log")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_segments(self, handler):
+        contents = []
+        for segment in handler.segments():
+            with gzip.open(segment, "rt", encoding="utf-8") as f:
+                contents.append(f.read())
+        return contents
+
+    def test_rotates_by_size_and_compresses(self):
+        handler = RotatingGzipFileHandler(self.path, max_bytes=100, interval=0, backup_count=0)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for index in range(10):
+            handler.emit(make_record(f"line {index:02d} " + "x" * 30))
+        handler.close()
+        segments = self.read_segments(handler)
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(len(segment) <= 100 for segment in segments))
+        with open(self.path, encoding="utf-8") as f:
+            lines = "".join(segments).splitlines() + f.read().splitlines()
+        self.assertEqual([line[:7] for line in lines], [f"line {index:02d}" for index in range(10)])
+        # Only compressed segments and the live file remain
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)),
+                         sorted([os.path.basename(p) for p in handler.segments()] + ["monitor.log"]))
+
+    def test_rotates_by_age(self):
+        clock = FakeClock()
+        handler = RotatingGzipFileHandler(self.path, max_bytes=0, interval=3600, clock=clock)
+        handler.emit(make_record("before"))
+        clock.now += 1800
+        handler.emit(make_record("still the same hour"))
+        self.assertEqual(handler.segments(), [])
+        clock.now += 1800
+        handler.emit(make_record("next hour"))
+        handler.close()
+        self.assertEqual(len(handler.segments()), 1)
+        self.assertIn("still the same hour", self.read_segments(handler)[0])
+
+    def test_keeps_backup_count(self):
+        handler = RotatingGzipFileHandler(self.path, max_bytes=20, interval=0, backup_count=2)
+        for index in range(6):
+            handler.emit(make_record(f"segment {index} line"))
+            handler.wait_for_compression()
+        handler.close()
+        self.assertEqual(len(handler.segments()), 2)
+        self.assertIn("segment 4", self.read_segments(handler)[-1])
+
+
+class TestRepeatFilter(unittest.TestCase):
+    """Tests for collapsing repeated error lines"""
+
+    def test_collapses_within_window(self):
+        clock = FakeClock()
+        repeat = RepeatFilter(window=60, clock=clock)
+        self.assertTrue(repeat.filter(make_record("RPC Error: connection refused")))
+        for _ in range(5):
+            clock.now += 5
+            self.assertFalse(repeat.filter(make_record("RPC Error: connection refused")))
+        self.assertTrue(repeat.filter(make_record("RPC Error: timeout")))
+        self.assertTrue(repeat.filter(make_record("RPC Error: connection refused", level=logging.INFO)))
+
+        clock.now += 60
+        record = make_record("RPC Error: connection refused")
+        self.assertTrue(repeat.filter(record))
+        self.assertEqual(record.getMessage(), "RPC Error: connection refused (5 identical messages suppressed)")
+        self.assertEqual(repeat.suppressed, 5)
+
+    def test_disabled_with_zero_window(self):
+        repeat = RepeatFilter(window=0)
+        self.assertTrue(all(repeat.filter(make_record("same")) for _ in range(3)))
+
+
+class TestLogPipeline(unittest.TestCase):
+    """Tests for the queue, listener thread and donation lines"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "monitor.log")
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        wallet_monitor.shutdown_logging()
+        logging.getLogger().setLevel(self.root_level)
+        self.temp_dir.cleanup()
+
+    def read_log(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_records_written_by_listener_thread(self):
+        pipeline = LogPipeline(self.path, console=False)
+        writers = []
+        original_emit = pipeline.file_handler.emit
+        pipeline.file_handler.emit = lambda record: (writers.append(threading.current_thread()), original_emit(record))
+        pipeline.start()
+        try:
+            logging.getLogger("wallet_monitor").info("queued line")
+            for _ in range(3):
+                logging.getLogger("wallet_monitor").error("RPC Error: node down")
+            pipeline.append("[2025-01-01 00:00:00] Donation: 5.00 SATOX from Sxyz****")
+            pipeline.flush()
+        finally:
+            pipeline.stop()
+        self.assertNotIn(threading.current_thread(), writers)
+        lines = self.read_log().splitlines()
+        self.assertTrue(lines[0].endswith(" - INFO - queued line"))
+        self.assertEqual(sum("RPC Error: node down" in line for line in lines), 1)
+        self.assertEqual(lines[-1], "[2025-01-01 00:00:00] Donation: 5.00 SATOX from Sxyz****")
+        self.assertNotIn(pipeline.handler, logging.getLogger().handlers)
+
+    def test_monitor_donation_lines_share_rotating_log(self):
+        wallet_monitor.setup_logging(self.path)
+        monitor = SatoxWalletMonitor({'tx_cache_path': '', 'log_file': self.path})
+        monitor.log_donation(500000000, "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ", timestamp=1735689600)
+        self.assertIsNone(monitor._donation_log)
+        wallet_monitor.log_pipeline.flush()
+        log = self.read_log()
+        self.assertIn("] Donation: 5.00 SATOX from SiGA****\n", log)
+        self.assertIn(" - INFO - Donation logged: 5.00000000 SATOX from SiGA****", log)
+
+    def test_separate_donation_log_opened_once(self):
+        donations = os.path.join(self.temp_dir.name, "donations.log")
+        monitor = SatoxWalletMonitor({'tx_cache_path': '', 'log_file': donations})
+        monitor.log_donation(100000000, "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ")
+        handle = monitor._donation_log
+        monitor.log_donation(200000000, "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ")
+        self.assertIs(monitor._donation_log, handle)
+        with open(donations, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        monitor.close()
+        self.assertTrue(handle.closed)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
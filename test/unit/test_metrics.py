@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Metrics
+Tests the sharded counters and histograms, the text exposition format and the monitor's metrics
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path to import the metrics module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from metrics import MetricsRegistry
+from standin_node import StandInNode
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+
+
+def sample_lines(text, name):
+    """Exposition lines for one metric name, without the HELP/TYPE comments"""
+    return [line for line in text.splitlines() if line.startswith(name) and not line.startswith("#")]
+
+
+class TestMetricTypes(unittest.TestCase):
+    """Tests for counters, histograms and callbacks"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_with_labels(self):
+        calls = self.registry.counter("rpc_calls_total", "RPC calls", ("method", "outcome"))
+        calls.inc("getinfo", "ok")
+        calls.inc("getinfo", "ok")
+        calls.inc("getblock", "error", amount=3)
+        self.assertEqual(calls.value("getinfo", "ok"), 2)
+        text = self.registry.render()
+        self.assertIn("# TYPE rpc_calls_total counter", text)
+        self.assertEqual(sample_lines(text, "rpc_calls_total"), [
+            'rpc_calls_total{method="getblock",outcome="error"} 3',
+            'rpc_calls_total{method="getinfo",outcome="ok"} 2',
+        ])
+
+    def test_counter_shards_merge_across_threads(self):
+        counter = self.registry.counter("events_total", "Events")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value(), 8000)
+        self.assertEqual(sample_lines(self.registry.render(), "events_total"), ["events_total 8000"])
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = self.registry.histogram("latency_seconds", "Latency", ("method",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, "getinfo")
+        self.assertEqual(latency.count("getinfo"), 4)
+        self.assertEqual(sample_lines(self.registry.render(), "latency_seconds"), [
+            'latency_seconds_bucket{method="getinfo",le="0.1"} 2',
+            'latency_seconds_bucket{method="getinfo",le="1.0"} 3',
+            'latency_seconds_bucket{method="getinfo",le="+Inf"} 4',
+            'latency_seconds_sum{method="getinfo"} 3.65',
+            'latency_seconds_count{method="getinfo"} 4',
+        ])
+
+    def test_callbacks_read_at_scrape(self):
+        queue = {"detection": 0}
+        self.registry.gauge("queue_depth", "Waiting calls", lambda: {(k,): v for k, v in queue.items()}, ("priority",))
+        self.registry.counter_callback("hits_total", "Hits", lambda: 7)
+        queue["detection"] = 5
+        text = self.registry.render()
+        self.assertIn('queue_depth{priority="detection"} 5', text)
+        self.assertIn("# TYPE hits_total counter", text)
+        self.assertIn("hits_total 7", text)
+
+    def test_label_escaping(self):
+        self.registry.counter("errors_total", "Errors", ("message",)).inc('bad "quote"\n')
+        self.assertIn('errors_total{message="bad \\"quote\\"\\n"} 1', self.registry.render())
+
+    def test_duplicate_name_rejected(self):
+        self.registry.counter("events_total", "Events")
+        with self.assertRaises(ValueError):
+            self.registry.counter("events_total", "Events again")
+
+
+class TestMonitorMetrics(unittest.TestCase):
+    """Tests for the metrics the monitor updates while polling"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.node = StandInNode(wallet_addresses=[WATCHED])
+        self.node.start()
+        self.monitor = SatoxWalletMonitor({
+            'wallet_address': WATCHED, 'rpc_url': self.node.url, 'tx_cache_path': '', 'min_donation': COIN
+        })
+        self.monitor.alert_file = os.path.join(self.temp_dir.name, 'alert.txt')
+        self.monitor.log_file = os.path.join(self.temp_dir.name, 'donations.log')
+
+    def tearDown(self):
+        self.node.stop()
+        self.temp_dir.cleanup()
+
+    def test_cycle_updates_metrics(self):
+        self.node.broadcast(WATCHED, 5 * COIN)
+        self.monitor.run_cycle(time.monotonic())
+        text = self.monitor.metrics.render()
+        self.assertIn('satox_rpc_calls_total{method="listtransactions",outcome="ok"} 1', text)
+        self.assertIn('satox_rpc_latency_seconds_count{method="listtransactions"} 1', text)
+        self.assertIn('satox_donations_detected_total{event="confirmed"} 1', text)
+        self.assertIn('satox_alerts_delivered_total{state="confirmed"} 1', text)
+        self.assertIn("satox_cycle_duration_seconds_count 1", text)
+        self.assertIn("satox_dedup_entries 1", text)
+        self.assertIn('satox_rpc_queue_depth{priority="detection"} 0', text)
+        self.assertIn('satox_cache_lookups_total{cache="tx",result="miss"} 1', text)
+
+    def test_unavailable_node_counted(self):
+        self.node.stop()
+        self.monitor.rpc_call("getinfo")
+        self.assertEqual(self.monitor._rpc_calls.value("getinfo", "unavailable"), 1)
+        self.node.start()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Overlay Server
+Tests static overlay serving, private file protection, metrics and the debug endpoints
+"""
+
+import unittest
+import sys
+import os
+import socket
+import tempfile
+import time
+
+import requests
+
+# Add the parent directory to the path to import the overlay server
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from metrics import MetricsRegistry
+from overlay_server import OverlayServer, parse_listen
+from profiler import SamplingProfiler
+from spans import SpanRecorder
+
+
+class TestOverlayServer(unittest.TestCase):
+    """Tests for the HTTP server hosting the overlay"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        for name, content in (('alert.txt', 'Sxyz... donated 5.00 SATOX!'), ('alert.html', '<html></html>'),
+                              ('.env', 'SATOX_RPC_PASSWORD=hunter2'), ('wallet_monitor.py', 'import os'),
+                              ('donation_monitor.log', 'log line')):
+            with open(os.path.join(self.temp_dir.name, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        self.spans = SpanRecorder(16)
+        with self.spans.span("cycle"):
+            pass
+        self.metrics = MetricsRegistry()
+        self.metrics.counter("satox_test_total", "Test counter").inc()
+        self.server = OverlayServer(self.temp_dir.name, "127.0.0.1:0", spans=self.spans, metrics=self.metrics,
+                                    profiler=SamplingProfiler(interval=0.002))
+        self.url = self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def test_parse_listen(self):
+        self.assertEqual(parse_listen("0.0.0.0:9000"), ("0.0.0.0", 9000))
+        self.assertEqual(parse_listen("8080"), ("127.0.0.1", 8080))
+
+    def test_serves_overlay_files_uncached(self):
+        response = requests.get(f"{self.url}/alert.txt", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, 'Sxyz... donated 5.00 SATOX!')
+        self.assertEqual(response.headers["Cache-Control"], "no-store")
+        self.assertEqual(requests.get(f"{self.url}/alert.html", timeout=5).status_code, 200)
+
+    def test_private_files_are_hidden(self):
+        for name in ('.env', 'wallet_monitor.py', 'donation_monitor.log', 'missing.html'):
+            self.assertEqual(requests.get(f"{self.url}/{name}", timeout=5).status_code, 404, name)
+        self.assertEqual(requests.head(f"{self.url}/.env", timeout=5).status_code, 404)
+        self.assertEqual(requests.get(f"{self.url}/", timeout=5).status_code, 404)
+
+    def test_debug_spans(self):
+        data = requests.get(f"{self.url}/debug/spans", timeout=5).json()
+        self.assertEqual([span["name"] for span in data["spans"]], ["cycle"])
+        trace = requests.get(f"{self.url}/debug/spans?format=chrome", timeout=5).json()
+        self.assertIn("cycle", [event["name"] for event in trace["traceEvents"]])
+        self.assertEqual(requests.get(f"{self.url}/debug/spans?format=xml", timeout=5).status_code, 400)
+
+    def test_debug_spans_without_recorder(self):
+        self.server.spans = None
+        self.assertEqual(requests.get(f"{self.url}/debug/spans", timeout=5).status_code, 404)
+
+    def test_metrics(self):
+        response = requests.get(f"{self.url}/metrics", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("satox_test_total 1", response.text)
+        self.assertIn("# TYPE satox_overlay_clients gauge", response.text)
+
+    def test_connected_clients(self):
+        host, port = self.server.server_address[:2]
+        with requests.Session() as session:
+            session.get(f"{self.url}/alert.txt", timeout=5)
+            with socket.create_connection((host, port), timeout=5):
+                # The idle connection is counted once its handler thread starts
+                deadline = time.monotonic() + 5
+                while self.server.clients < 2 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                text = session.get(f"{self.url}/metrics", timeout=5).text
+        self.assertIn("satox_overlay_clients 2", text)
+
+    def test_metrics_without_registry(self):
+        self.server.metrics = None
+        self.assertEqual(requests.get(f"{self.url}/metrics", timeout=5).status_code, 404)
+
+    def test_debug_profile(self):
+        response = requests.get(f"{self.url}/debug/profile?seconds=0.1", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        # The handler thread serving this request is among the sampled stacks
+        self.assertIn("_send_profile (overlay_server.py:", response.text)
+        for seconds in ("0", "abc", "1000"):
+            self.assertEqual(requests.get(f"{self.url}/debug/profile?seconds={seconds}", timeout=5).status_code,
+                             400, seconds)
+        self.server.profiler = None
+        self.assertEqual(requests.get(f"{self.url}/debug/profile", timeout=5).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the P2P Mempool Listener
+Tests the handshake, inv/getdata exchange and payment matching against a stand-in peer
+"""
+
+import unittest
+import sys
+import os
+import socket
+import struct
+import threading
+import time
+
+# Add the parent directory to the path to import the listener module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from chain_decode import encode_varint, p2pkh_script
+from p2p_listener import (
+    MSG_TX, P2PMempoolListener, ProtocolError, pack_inventory, pack_message,
+    parse_inventory, read_message, resolve_network_magic
+)
+from satox_address import decode_address, double_sha256
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+MAGIC = b"SATX"
+
+
+def build_tx(address, value, tag):
+    """Serialize a one-input transaction paying value to address"""
+    script = p2pkh_script(decode_address(address)[1])
+    raw = (struct.pack('<I', 2) + b'\x01' + bytes(32) + struct.pack('<I', tag) + b'\x00\xff\xff\xff\xff'
+           + b'\x01' + struct.pack('<Q', value) + encode_varint(len(script)) + script + bytes(4))
+    return raw, double_sha256(raw)
+
+
+class StandInPeer:
+    """Speaks just enough of the protocol to relay a mempool to one client"""
+
+    def __init__(self, mempool):
+        self.mempool = mempool              # {txid bytes: raw tx}
+        self.received = []
+        self.pong = threading.Event()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        try:
+            conn, _ = self.server.accept()
+        except OSError:
+            return
+        with conn:
+            send = lambda command, payload=b"": conn.sendall(pack_message(MAGIC, command, payload))
+            try:
+                while True:
+                    command, payload = read_message(conn, MAGIC)
+                    self.received.append(command)
+                    if command == "version":
+                        send("version", struct.pack('<i', 70028) + bytes(80))
+                        send("verack")
+                    elif command == "mempool":
+                        send("ping", b"12345678")
+                        # Announce everything, one entry twice
+                        items = [(MSG_TX, txid) for txid in self.mempool]
+                        send("inv", pack_inventory(items + items[:1] + [(2, bytes(32))]))
+                    elif command == "getdata":
+                        for kind, txid in parse_inventory(payload):
+                            send("tx", self.mempool[txid])
+                    elif command == "pong" and payload == b"12345678":
+                        self.pong.set()
+            except (ConnectionError, OSError):
+                pass
+
+    def close(self):
+        self.server.close()
+
+
+class TestP2PMempoolListener(unittest.TestCase):
+    """Tests for P2PMempoolListener against a stand-in peer"""
+
+    def setUp(self):
+        self.donation, self.donation_id = build_tx(WATCHED, 250000000, 1)
+        noise, noise_id = build_tx(OTHER, 100, 2)
+        self.peer = StandInPeer({self.donation_id: self.donation, noise_id: noise})
+        self.listener = P2PMempoolListener("127.0.0.1", self.peer.port, [WATCHED], MAGIC)
+
+    def tearDown(self):
+        self.listener.stop()
+        self.peer.close()
+
+    def wait_for_payments(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        payments = []
+        while time.monotonic() < deadline and not payments:
+            payments = self.listener.poll()
+            time.sleep(0.01)
+        return payments
+
+    def test_relays_matching_mempool_transactions(self):
+        """Test handshake, mempool request, getdata and output matching"""
+        self.listener.start()
+        payments = self.wait_for_payments()
+
+        self.assertEqual(payments, [(self.donation_id[::-1].hex(), WATCHED, 250000000, None)])
+        self.assertTrue(self.listener.connected.is_set())
+        self.assertTrue(self.peer.pong.wait(5))
+        self.assertEqual(self.listener.peer_version, 70028)
+        self.assertEqual(self.peer.received[:3], ["version", "verack", "mempool"])
+        # Duplicate and non-transaction inventory is not requested
+        self.assertEqual(self.peer.received.count("getdata"), 1)
+        self.assertEqual(self.listener.poll(), [])
+
+    def test_rejects_wrong_network(self):
+        """Test that frames with another network's magic are refused"""
+        left, right = socket.socketpair()
+        with left, right:
+            left.sendall(pack_message(b"RAVN", "verack"))
+            with self.assertRaises(ProtocolError):
+                read_message(right, MAGIC)
+
+
+class TestNetworkMagic(unittest.TestCase):
+    """Tests for network magic resolution"""
+
+    def test_explicit_magic(self):
+        self.assertEqual(resolve_network_magic("53415458", None), MAGIC)
+
+    def test_invalid_or_missing_magic(self):
+        with self.assertRaises(ValueError):
+            resolve_network_magic("zz", None)
+        with self.assertRaises(ValueError):
+            resolve_network_magic(None, "/nonexistent")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Sampling Profiler
+Tests stack sampling, collapsed output, the SIGUSR2 toggle and the slow-cycle watchdog
+"""
+
+import unittest
+import sys
+import os
+import signal
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path to import the profiler
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from profiler import SamplingProfiler, SlowCycleWatchdog, install_profile_signal
+from wallet_monitor import SatoxWalletMonitor
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def slow_step(seconds):
+    time.sleep(seconds)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Tests for sampling thread stacks"""
+
+    def setUp(self):
+        self.profiler = SamplingProfiler(interval=0.002)
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=busy_loop, args=(self.stop,), name="busy-worker")
+        self.worker.start()
+
+    def tearDown(self):
+        self.profiler.stop()
+        self.profiler.wait()
+        self.stop.set()
+        self.worker.join()
+
+    def test_collapsed_stacks(self):
+        stacks = self.profiler.profile(0.2)
+        self.assertGreater(self.profiler.samples, 10)
+        lines = stacks.splitlines()
+        worker = [line for line in lines if line.startswith("busy-worker;")]
+        self.assertTrue(worker, stacks)
+        self.assertTrue(any("busy_loop (test_profiler.py:" in line for line in worker))
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+        # The sampler never records itself
+        self.assertFalse(any(line.startswith("sampling-profiler;") for line in lines))
+
+    def test_one_profile_at_a_time(self):
+        self.assertTrue(self.profiler.start(5))
+        self.assertTrue(self.profiler.running)
+        self.assertIsNone(self.profiler.profile(0.1))
+        started = time.monotonic()
+        self.profiler.stop()
+        self.profiler.wait()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(self.profiler.running)
+
+    def test_writes_file(self):
+        done = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.collapsed")
+            self.profiler.start(0.1, path, on_done=done.append)
+            self.profiler.wait()
+            self.assertEqual(done, [path])
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("busy_loop", f.read())
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR2"), "SIGUSR2 is not available")
+    def test_signal_toggles_profile(self):
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                self.assertTrue(install_profile_signal(self.profiler, temp_dir, 30))
+                os.kill(os.getpid(), signal.SIGUSR2)
+                self.assertTrue(self.profiler.running)
+                time.sleep(0.05)
+                os.kill(os.getpid(), signal.SIGUSR2)
+                self.profiler.wait(5)
+                names = os.listdir(temp_dir)
+                self.assertEqual(len(names), 1)
+                self.assertTrue(names[0].startswith("profile-") and names[0].endswith(".collapsed"))
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+
+class TestSlowCycleWatchdog(unittest.TestCase):
+    """Tests for profiling cycles that overrun their deadline"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.profiler = SamplingProfiler(interval=0.002)
+
+    def tearDown(self):
+        self.profiler.stop()
+        self.profiler.wait()
+        self.temp_dir.cleanup()
+
+    def run_cycle(self, watchdog, seconds):
+        watchdog.cycle_started()
+        slow_step(seconds)
+        watchdog.cycle_finished()
+
+    def test_captures_overdue_cycle(self):
+        watchdog = SlowCycleWatchdog(self.profiler, 0.05, self.temp_dir.name, seconds=10, cooldown=60)
+        watchdog.start()
+        try:
+            started = time.monotonic()
+            self.run_cycle(watchdog, 0.3)
+            self.profiler.wait(5)
+            # Sampling ends with the cycle, not after the 10 second limit
+            self.assertLess(time.monotonic() - started, 2)
+            self.assertEqual(watchdog.captures, 1)
+            with open(watchdog.last_capture, encoding="utf-8") as f:
+                self.assertIn("slow_step (test_profiler.py:", f.read())
+            self.assertTrue(os.path.basename(watchdog.last_capture).startswith("slow-cycle-"))
+
+            # The cooldown suppresses a second capture
+            self.run_cycle(watchdog, 0.2)
+            self.assertFalse(self.profiler.running)
+            self.assertEqual(watchdog.captures, 1)
+        finally:
+            watchdog.stop()
+
+    def test_fast_cycles_not_captured(self):
+        watchdog = SlowCycleWatchdog(self.profiler, 0.5, self.temp_dir.name)
+        watchdog.cycle_started()
+        self.assertFalse(watchdog.check())
+        watchdog.cycle_finished()
+        self.assertFalse(watchdog.check())
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_disabled(self):
+        watchdog = SlowCycleWatchdog(self.profiler, 0, self.temp_dir.name)
+        watchdog.start()
+        self.assertIsNone(watchdog._thread)
+
+    def test_monitor_cycle_watchdog(self):
+        monitor = SatoxWalletMonitor({
+            'tx_cache_path': '', 'cycle_deadline': 0.05,
+            'log_file': os.path.join(self.temp_dir.name, 'donations.log')
+        })
+        monitor.profiler.interval = 0.002
+        monitor.check_for_donations = lambda: slow_step(0.3)
+        monitor.watchdog.start()
+        try:
+            monitor.run_cycle(time.monotonic())
+            monitor.profiler.wait(5)
+        finally:
+            monitor.watchdog.stop()
+        self.assertEqual(monitor.watchdog.captures, 1)
+        self.assertEqual(os.path.dirname(monitor.watchdog.last_capture), self.temp_dir.name)
+        with open(monitor.watchdog.last_capture, encoding="utf-8") as f:
+            self.assertIn("run_cycle (wallet_monitor.py:", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Multi-Node RPC Client
+Tests latency/sync-aware routing and failover against local fake nodes
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path to import the rpc client
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rpc_client import (
+    PRIORITY_BACKFILL, PRIORITY_DETECTION, CircuitBreaker, NodeEndpoint, NodePool, RetryBudget,
+    RpcScheduler, RPCThrottled, RPCUnavailable, decode_reply
+)
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+
+
+class FakeNode:
+    """State behind one fake Satox Core RPC server"""
+
+    def __init__(self, name, blocks=100, headers=100, delay=0.0):
+        self.name = name
+        self.blocks = blocks
+        self.headers = headers
+        self.delay = delay
+        self.warming_up = False
+        self.down = False
+        self.calls = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), NodeHandler)
+        self.server.node = self
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def answer(self, method, params):
+        if self.warming_up:
+            return None, {"code": -28, "message": "Loading block index..."}
+        if method == "getblockchaininfo":
+            return {"blocks": self.blocks, "headers": self.headers, "initialblockdownload": False}, None
+        if method == "getrawtransaction":
+            return None, {"code": -5, "message": "No such mempool or blockchain transaction"}
+        if method == "listtransactions":
+            return [{"txid": "aa", "category": "receive", "address": WATCHED,
+                     "amount": 2.5, "confirmations": 1}], None
+        return self.name, None
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class NodeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        node = self.server.node
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        node.calls.append(request["method"])
+        if node.down:
+            self.send_error(503)
+            return
+        time.sleep(node.delay)
+        result, error = node.answer(request["method"], request["params"])
+        body = json.dumps({"id": request["id"], "result": result, "error": error}).encode()
+        self.send_response(500 if error else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def call(method):
+    return {"jsonrpc": "1.0", "id": 1, "method": method, "params": []}
+
+
+class TestNodePool(unittest.TestCase):
+    """Tests for NodePool routing and failover"""
+
+    def setUp(self):
+        self.slow = FakeNode("slow", delay=0.05)
+        self.fast = FakeNode("fast")
+        self.nodes = [self.slow, self.fast]
+
+    def tearDown(self):
+        for node in self.nodes:
+            try:
+                node.stop()
+            except OSError:
+                pass
+
+    def test_routes_to_fastest_synced_node(self):
+        """Test that probes rank nodes by latency"""
+        pool = NodePool([self.slow.url, self.fast.url])
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "fast")
+        self.assertEqual(self.slow.calls, ["getblockchaininfo"])
+
+    def test_later_probes_do_not_delay_requests(self):
+        """Test that a due health check runs off the request path"""
+        pool = NodePool([self.slow.url, self.fast.url])
+        pool.request(call("getbestblockhash"))
+        self.slow.delay = 0.5
+        self.fast.blocks = self.fast.headers = 101
+        pool._next_health_check = 0.0
+
+        started = time.monotonic()
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "fast")
+        self.assertLess(time.monotonic() - started, 0.4)
+        health = [t for t in threading.enumerate() if t.name == "rpc-health"]
+        self.assertEqual(len(health), 1)
+        health[0].join(5)
+        self.assertEqual(self.slow.calls.count("getblockchaininfo"), 2)
+        self.assertEqual(pool.status()[1]["blocks"], 101)
+
+    def test_lagging_node_is_avoided(self):
+        """Test that a node behind the best header only serves as a fallback"""
+        self.fast.blocks = 90
+        pool = NodePool([self.fast.url, self.slow.url])
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "slow")
+        self.assertTrue(pool.status()[0]["syncing"])
+
+    def test_fails_over_within_one_call(self):
+        """Test that a dead node is skipped in the same request"""
+        pool = NodePool([self.slow.url, self.fast.url], health_interval=3600)
+        pool.request(call("getbestblockhash"))
+        self.fast.stop()
+
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "slow")
+        status = {entry["url"]: entry for entry in pool.status()}
+        self.assertFalse(status[self.fast.url]["healthy"])
+        self.assertEqual(pool.active.url, self.slow.url)
+
+    def test_warming_up_node_fails_over(self):
+        """Test that RPC_IN_WARMUP replies are treated as unavailable"""
+        self.fast.warming_up = True
+        pool = NodePool([self.fast.url, self.slow.url], health_interval=3600)
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "slow")
+
+    def test_rpc_errors_do_not_fail_over(self):
+        """Test that an ordinary RPC error is returned, not retried elsewhere"""
+        pool = NodePool([self.slow.url, self.fast.url])
+        reply = pool.request(call("getrawtransaction"))
+        self.assertEqual(reply["error"]["code"], -5)
+        self.assertEqual(self.slow.calls.count("getrawtransaction"), 0)
+
+    def test_all_nodes_down(self):
+        """Test that exhausting every endpoint raises RPCUnavailable"""
+        pool = NodePool([self.slow.url, self.fast.url])
+        self.slow.stop()
+        self.fast.stop()
+        with self.assertRaises(RPCUnavailable):
+            pool.request(call("getbestblockhash"))
+
+    def test_credentials_in_url(self):
+        """Test that per-node credentials are split out of the URL"""
+        endpoint = NodeEndpoint("http://alice:pw@127.0.0.1:7777", ("default", "default"))
+        self.assertEqual(endpoint.url, "http://127.0.0.1:7777")
+        self.assertEqual(endpoint.auth, ("alice", "pw"))
+
+    def test_failover_does_not_double_alert(self):
+        """Test that the monitor's shared dedup state survives a failover"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({
+                'wallet_address': WATCHED,
+                'rpc_urls': [self.fast.url, self.slow.url],
+                'log_file': os.path.join(temp_dir, 'donations.log')
+            })
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+
+            monitor.check_for_donations()
+            self.fast.stop()
+            monitor.check_for_donations()
+
+            with open(monitor.log_file) as f:
+                self.assertEqual(len(f.readlines()), 1)
+            self.assertEqual(monitor.totals.total, 250000000)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for CircuitBreaker and RetryBudget"""
+
+    def test_opens_probes_and_backs_off(self):
+        """Test closed -> open -> half-open transitions with growing backoff"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, base_backoff=1.0, max_backoff=3.0, clock=clock)
+        self.assertFalse(breaker.record_failure())
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertLessEqual(breaker.retry_after(), 1.0)
+
+        # One probe after the backoff; its failure doubles the backoff
+        clock.now += 1.0
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertGreaterEqual(breaker.retry_after(), 1.0)
+        self.assertLessEqual(breaker.retry_after(), 2.0)
+
+        # Backoff is capped
+        for _ in range(5):
+            clock.now += 10
+            breaker.allow()
+            breaker.record_failure()
+        self.assertLessEqual(breaker.retry_after(), 3.0)
+
+        clock.now += 10
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_success())
+        self.assertEqual(breaker.to_dict()["state"], CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.times_opened, 7)
+
+    def test_retry_budget(self):
+        """Test that sustained failures exhaust the retry budget"""
+        budget = RetryBudget(max_tokens=4, token_ratio=0.5)
+        self.assertTrue(budget.try_retry())
+        budget.on_failure()
+        budget.on_failure()
+        self.assertFalse(budget.try_retry())
+        budget.on_success()
+        self.assertTrue(budget.try_retry())
+        self.assertEqual(budget.to_dict(), {"tokens": 2.5, "retries": 2, "denied": 1})
+
+
+class TestOutageHandling(unittest.TestCase):
+    """Tests for fast failure and recovery when the node goes down"""
+
+    def setUp(self):
+        self.node = FakeNode("node")
+
+    def tearDown(self):
+        self.node.stop()
+
+    def test_open_circuit_fails_fast_and_recovers(self):
+        """Test that an outage stops network calls until a probe succeeds"""
+        pool = NodePool([self.node.url], failure_threshold=2, base_backoff=0.05, max_backoff=0.05)
+        self.node.down = True
+        for _ in range(2):
+            with self.assertRaises(RPCUnavailable):
+                pool.request(call("getbestblockhash"))
+        self.assertFalse(pool.available)
+
+        calls = len(self.node.calls)
+        with self.assertRaises(RPCUnavailable) as raised:
+            pool.request(call("getbestblockhash"))
+        self.assertGreater(raised.exception.retry_after, 0)
+        self.assertEqual(len(self.node.calls), calls)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        self.node.down = False
+        time.sleep(0.06)
+        self.assertEqual(pool.request(call("getbestblockhash"))["result"], "node")
+        self.assertEqual(pool.stats()["endpoints"][0]["breaker"]["state"], CircuitBreaker.CLOSED)
+
+    def test_monitor_tells_down_from_empty(self):
+        """Test that the monitor reports an outage instead of an empty result"""
+        monitor = SatoxWalletMonitor({'wallet_address': WATCHED, 'rpc_url': self.node.url})
+        self.assertEqual(monitor.rpc_call("listtransactions"), [{"txid": "aa", "category": "receive",
+                                                                 "address": WATCHED, "amount": 250000000,
+                                                                 "confirmations": 1}])
+        self.node.down = True
+        for _ in range(3):
+            self.assertIsNone(monitor.rpc_call("getbestblockhash"))
+        self.assertFalse(monitor.rpc_available)
+        with self.assertRaises(RPCUnavailable):
+            monitor.rpc_call("listtransactions", raise_unavailable=True)
+        self.assertEqual(monitor.rpc_status()["endpoints"][0]["failures"], 3)
+
+
+class TestRpcScheduler(unittest.TestCase):
+    """Tests for the priority token-bucket scheduler"""
+
+    def test_detection_wins_the_next_token(self):
+        """Test that a waiting detection call overtakes an earlier backfill call"""
+        scheduler = RpcScheduler(rate=10, burst=1, classes={PRIORITY_DETECTION: (1, 0.0), PRIORITY_BACKFILL: (1, 0.0)})
+        scheduler.acquire(PRIORITY_DETECTION)
+        scheduler.release(PRIORITY_DETECTION)
+        order = []
+
+        def worker(priority):
+            with scheduler.slot(priority):
+                order.append(priority)
+
+        threads = [threading.Thread(target=worker, args=(PRIORITY_BACKFILL,)),
+                   threading.Thread(target=worker, args=(PRIORITY_DETECTION,))]
+        threads[0].start()
+        time.sleep(0.03)
+        threads[1].start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, [PRIORITY_DETECTION, PRIORITY_BACKFILL])
+
+    def test_low_priority_leaves_reserve(self):
+        """Test that backfill cannot drain the bucket below its reserve"""
+        scheduler = RpcScheduler(rate=0.5, burst=4)
+        for _ in range(2):
+            self.assertTrue(scheduler.acquire(PRIORITY_BACKFILL, timeout=0.01))
+            scheduler.release(PRIORITY_BACKFILL)
+        self.assertFalse(scheduler.acquire(PRIORITY_BACKFILL, timeout=0.02))
+        for _ in range(2):
+            self.assertTrue(scheduler.acquire(PRIORITY_DETECTION, timeout=0.01))
+            scheduler.release(PRIORITY_DETECTION)
+        stats = scheduler.stats()["classes"]
+        self.assertEqual(stats[PRIORITY_BACKFILL]["timeouts"], 1)
+        self.assertEqual(stats[PRIORITY_DETECTION]["granted"], 2)
+
+    def test_per_class_concurrency(self):
+        """Test that each class is capped at its concurrency limit"""
+        scheduler = RpcScheduler(rate=0, classes={PRIORITY_DETECTION: (2, 0.0), PRIORITY_BACKFILL: (1, 0.0)})
+        with scheduler.slot(PRIORITY_BACKFILL):
+            with self.assertRaises(RPCThrottled):
+                with scheduler.slot(PRIORITY_BACKFILL, timeout=0.02):
+                    pass
+            self.assertTrue(scheduler.acquire(PRIORITY_DETECTION, timeout=0.01))
+            self.assertTrue(scheduler.acquire(PRIORITY_DETECTION, timeout=0.01))
+        self.assertTrue(scheduler.acquire(PRIORITY_BACKFILL, timeout=0.01))
+
+    def test_monitor_classifies_calls(self):
+        """Test that balance checks and enrichment use their own classes"""
+        node = FakeNode("node")
+        try:
+            monitor = SatoxWalletMonitor({'wallet_address': WATCHED, 'rpc_url': node.url})
+            monitor.get_wallet_balance()
+            monitor.get_sender_address("aa")
+            monitor.rpc_call("getbestblockhash")
+            classes = monitor.rpc_status()["scheduler"]["classes"]
+            self.assertEqual({name: c["granted"] for name, c in classes.items()},
+                             {"detection": 1, "enrichment": 1, "balance": 1, "backfill": 0})
+        finally:
+            node.stop()
+
+
+class TestReplyDecoding(unittest.TestCase):
+    """Tests for converting only amount fields to base units"""
+
+    def decode(self, text, payload):
+        return decode_reply(json.loads(text, parse_float=Decimal), payload)
+
+    def test_amount_fields_and_other_decimals(self):
+        reply = self.decode('{"id": 1, "error": null, "result": [{"amount": 5, "fee": -0.0001, '
+                            '"confirmations": 3}, {"amount": 2.50000001}]}',
+                            {"id": 1, "method": "listtransactions"})
+        self.assertEqual(reply["result"], [{"amount": 5 * 100000000, "fee": -10000, "confirmations": 3},
+                                           {"amount": 250000001}])
+        info = self.decode('{"id": 1, "error": null, "result": {"blocks": 10, "difficulty": 1234.5678, '
+                           '"verificationprogress": 0.99999}}', {"id": 1, "method": "getblockchaininfo"})
+        self.assertEqual(info["result"], {"blocks": 10, "difficulty": 1234.5678, "verificationprogress": 0.99999})
+        self.assertIsInstance(info["result"]["difficulty"], float)
+
+    def test_batch_results_matched_by_id(self):
+        payload = [{"id": 0, "method": "getblockcount"}, {"id": 1, "method": "getbalance"}]
+        replies = self.decode('[{"id": 1, "error": null, "result": 12}, {"id": 0, "error": null, "result": 12}]',
+                              payload)
+        self.assertEqual([reply["result"] for reply in replies], [12 * 100000000, 12])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Caching RPC Proxy
+Tests single-flight coalescing, finality-aware caching and credential handling against a fake node
+"""
+
+import unittest
+import sys
+import os
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the parent directory to the path to import the proxy module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rpc_proxy import CachingProxy, dumps_rpc_json, make_server
+
+AUTH = ("user", "pass")
+
+
+class FakeNode:
+    """Fake Satox Core answering a handful of chain queries"""
+
+    def __init__(self, tip=100, delay=0.0):
+        self.tip = tip
+        self.delay = delay
+        self.calls = []
+        self.paths = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), NodeHandler)
+        self.server.node = self
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def answer(self, method, params, path="/"):
+        if method == "listtransactions":
+            return [{"wallet": path}], None
+        if method == "getblockcount":
+            return self.tip, None
+        if method == "getblock":
+            height = int(params[0])
+            return {"hash": params[0], "height": height, "confirmations": self.tip - height + 1}, None
+        if method == "gettransaction":
+            return {"txid": params[0], "amount": "AMOUNT", "confirmations": int(params[0][:2], 16)}, None
+        if method == "getrawmempool":
+            return [f"tx{self.tip}"], None
+        if method == "sendtoaddress":
+            return "sent", None
+        return None, {"code": -32601, "message": "Method not found"}
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class NodeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        node = self.server.node
+        if self.headers.get("Authorization") != requests.auth._basic_auth_str(*AUTH):
+            self.send_error(401)
+            return
+        requests_ = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        batch = isinstance(requests_, list)
+        replies = []
+        for request in (requests_ if batch else [requests_]):
+            node.calls.append(request["method"])
+            node.paths.append(self.path)
+            result, error = node.answer(request["method"], request["params"], self.path)
+            replies.append({"id": request["id"], "result": result, "error": error})
+        time.sleep(node.delay)
+        # Amounts go out as exact 8-decimal literals
+        body = json.dumps(replies if batch else replies[0]).replace('"AMOUNT"', "0.10000001").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCachingProxy(unittest.TestCase):
+    """Tests for CachingProxy behind its HTTP front end"""
+
+    def setUp(self):
+        self.node = FakeNode()
+        self.proxy = CachingProxy(self.node.url, ttl=0.2, finality_depth=6)
+        self.server = make_server(self.proxy, "127.0.0.1:0")
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.node.stop()
+
+    def call(self, method, *params, auth=AUTH, path=""):
+        payload = {"jsonrpc": "1.0", "id": "mon", "method": method, "params": list(params)}
+        return requests.post(self.url + path, json=payload, auth=auth, timeout=5)
+
+    def result(self, method, *params):
+        response = self.call(method, *params)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["id"], "mon")
+        return body["result"]
+
+    def test_buried_blocks_cached_forever_with_live_confirmations(self):
+        self.result("getblockcount")
+        block = self.result("getblock", "50")
+        self.assertEqual(block["confirmations"], 51)
+        self.node.tip = 110
+        time.sleep(0.25)
+        self.assertEqual(self.result("getblockcount"), 110)
+        # Served from cache, confirmations follow the new tip
+        self.assertEqual(self.result("getblock", "50")["confirmations"], 61)
+        self.assertEqual(self.node.calls.count("getblock"), 1)
+
+    def test_shallow_blocks_not_cached(self):
+        self.result("getblockcount")
+        self.result("getblock", "99")          # 2 confirmations
+        self.result("getblock", "64")
+        self.assertEqual(self.node.calls.count("getblock"), 2)
+
+    def test_volatile_queries_expire(self):
+        self.assertEqual(self.result("getrawmempool"), ["tx100"])
+        self.node.tip = 101
+        self.assertEqual(self.result("getrawmempool"), ["tx100"])
+        time.sleep(0.25)
+        self.assertEqual(self.result("getrawmempool"), ["tx101"])
+
+    def test_writes_pass_through(self):
+        self.result("sendtoaddress")
+        self.result("sendtoaddress")
+        self.assertEqual(self.node.calls.count("sendtoaddress"), 2)
+        self.assertEqual(self.call("nosuchmethod").status_code, 404)
+
+    def test_concurrent_identical_requests_coalesced(self):
+        self.result("getblockcount")
+        self.node.delay = 0.2
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.result("gettransaction", "ff00")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.node.calls.count("gettransaction"), 1)
+        self.assertEqual(self.proxy.stats["coalesced"], 4)
+
+    def test_amounts_passed_through_exactly(self):
+        self.result("getblockcount")
+        response = self.call("gettransaction", "0100")
+        self.assertIn('"amount": 0.10000001', response.text)
+        self.assertEqual(response.json(parse_float=Decimal)["result"]["amount"], Decimal("0.10000001"))
+
+    def test_batches(self):
+        self.result("getblockcount")
+        self.result("getblock", "10")
+        batch = [{"id": i, "method": "getblock", "params": [height]} for i, height in enumerate(["10", "20"])]
+        replies = requests.post(self.url, json=batch, auth=AUTH, timeout=5).json()
+        self.assertEqual([reply["id"] for reply in replies], [0, 1])
+        self.assertEqual([reply["result"]["height"] for reply in replies], [10, 20])
+        self.assertEqual(self.node.calls.count("getblock"), 2)
+
+    def test_cache_requires_accepted_credentials(self):
+        self.result("getblockcount")
+        self.result("getblock", "10")
+        self.assertEqual(self.call("getblock", "10", auth=("user", "wrong")).status_code, 401)
+        self.assertEqual(self.call("getblock", "10", auth=None).status_code, 401)
+
+    def test_wallet_paths_forwarded_and_cached_apart(self):
+        first = self.call("listtransactions", path="/wallet/stream").json()["result"]
+        second = self.call("listtransactions", path="/wallet/other").json()["result"]
+        self.assertEqual(first, [{"wallet": "/wallet/stream"}])
+        self.assertEqual(second, [{"wallet": "/wallet/other"}])
+        self.assertEqual(self.result("listtransactions"), [{"wallet": "/"}])
+        self.assertEqual(self.call("listtransactions", path="/wallet/stream").json()["result"], first)
+        self.assertEqual(self.node.calls.count("listtransactions"), 3)
+        self.assertIn("/wallet/stream", self.node.paths)
+
+    def test_tip_follows_reorg_to_lower_height(self):
+        self.result("getblockcount")
+        self.node.tip = 98
+        time.sleep(0.25)
+        self.assertEqual(self.result("getblockcount"), 98)
+        self.assertEqual(self.proxy.tip_height, 98)
+        # A block's confirmations never lower the tip
+        self.result("getblock", "90")
+        self.assertEqual(self.proxy.tip_height, 98)
+
+    def test_stats_endpoint(self):
+        self.result("getblockcount")
+        stats = requests.get(f"{self.url}/stats", timeout=5).json()
+        self.assertEqual(stats["tip_height"], 100)
+        self.assertEqual(stats["upstream"], 1)
+
+
+class TestDumpsRpcJson(unittest.TestCase):
+    """Tests for exact decimal serialization"""
+
+    def test_decimal_literals(self):
+        encoded = dumps_rpc_json({"amount": Decimal("0.00000001"), "list": [1, None, "a"]})
+        self.assertEqual(encoded, '{"amount": 0.00000001, "list": [1, null, "a"]}')
+        self.assertEqual(json.loads(encoded, parse_float=Decimal)["amount"], Decimal("0.00000001"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for RPC Record and Replay
+Tests recording monitor traffic through the proxy and replaying it without a node
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+# Add the parent directory to the path to import the replay module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rpc_replay import Cassette, Recorder, make_recorder, make_replayer, request_key
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+
+
+class NodeHandler(BaseHTTPRequestHandler):
+    """Fake Satox Core with one incoming donation"""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request["method"] == "listtransactions":
+            result = [{"txid": "aa", "category": "receive", "address": WATCHED,
+                       "amount": "AMOUNT", "confirmations": 1}]
+        else:
+            result = {"version": 1}
+        time.sleep(0.02)
+        body = json.dumps({"id": request["id"], "result": result, "error": None})
+        body = body.replace('"AMOUNT"', "2.50000001").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WalletNodeHandler(NodeHandler):
+    """Fake Satox Core answering getwalletinfo with the wallet the request was sent to"""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"id": request["id"], "result": {"walletname": self.path}, "error": None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop(server):
+    server.shutdown()
+    server.server_close()
+
+
+class TestRecordReplay(unittest.TestCase):
+    """Tests for recording and replaying monitor traffic"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.temp_dir.name, "traffic.jsonl.gz")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_monitor(self, url):
+        monitor = SatoxWalletMonitor({'wallet_address': WATCHED, 'rpc_url': url, 'tx_cache_path': ''})
+        alerts = []
+        with patch.object(monitor, 'deliver_alert', side_effect=lambda txid, amount, **kw: alerts.append(amount)), \
+                patch.object(monitor, 'log_donation'), patch.object(monitor, 'record_donation'):
+            self.assertTrue(monitor.test_connection())
+            monitor.check_for_donations()
+        return alerts
+
+    def test_recorded_traffic_replays_without_node(self):
+        node = ThreadingHTTPServer(("127.0.0.1", 0), NodeHandler)
+        recorder = make_recorder(serve(node), self.cassette, "127.0.0.1:0")
+        try:
+            live_alerts = self.run_monitor(serve(recorder))
+        finally:
+            stop(recorder)
+            recorder.recorder.close()
+            stop(node)
+        self.assertEqual(live_alerts, [250000001])
+
+        cassette = Cassette.load(self.cassette)
+        self.assertEqual(len(cassette.exchanges), 2)
+        self.assertGreater(cassette.exchanges[1]["elapsed"], 0.015)
+        with gzip.open(self.cassette, "rt") as f:
+            self.assertNotIn("Authorization", f.read())
+
+        replayer = make_replayer(cassette, "127.0.0.1:0", speed=0)
+        try:
+            self.assertEqual(self.run_monitor(serve(replayer)), live_alerts)
+            self.assertEqual((replayer.served, replayer.unmatched), (2, 0))
+        finally:
+            stop(replayer)
+
+    def test_wallet_paths_recorded_and_replayed(self):
+        paths = ["/", "/wallet/alerts", "/wallet/cold"]
+        call = {"method": "getwalletinfo", "params": [], "id": 1}
+        node = ThreadingHTTPServer(("127.0.0.1", 0), WalletNodeHandler)
+        recorder = make_recorder(serve(node), self.cassette, "127.0.0.1:0")
+        url = serve(recorder)
+        try:
+            live = [requests.post(url + path, json=call, timeout=5).json()["result"]["walletname"]
+                    for path in paths]
+        finally:
+            stop(recorder)
+            recorder.recorder.close()
+            stop(node)
+        self.assertEqual(live, paths)
+
+        cassette = Cassette.load(self.cassette)
+        self.assertEqual([exchange["path"] for exchange in cassette.exchanges], paths)
+        replayer = make_replayer(cassette, "127.0.0.1:0", speed=0)
+        url = serve(replayer)
+        try:
+            replayed = [requests.post(url + path, json=call, timeout=5).json()["result"]["walletname"]
+                        for path in reversed(paths)]
+            missing = requests.post(url + "/wallet/other", json=call, timeout=5)
+        finally:
+            stop(replayer)
+        self.assertEqual(replayed, list(reversed(paths)))
+        self.assertEqual(missing.status_code, 500)
+
+    def test_scaled_timing_and_repeats(self):
+        recorder = Recorder(self.cassette)
+        call = {"method": "getblockcount", "params": []}
+        for count in (100, 101):
+            recorder.record(json.dumps(dict(call, id=7)), 200,
+                            json.dumps({"result": count, "error": None, "id": 7}), 0.2, 0.0)
+        recorder.close()
+
+        replayer = make_replayer(Cassette.load(self.cassette), "127.0.0.1:0", speed=4)
+        url = serve(replayer)
+        try:
+            start = time.perf_counter()
+            replies = [requests.post(url, json=dict(call, id=i), timeout=5).json() for i in range(3)]
+            elapsed = time.perf_counter() - start
+        finally:
+            stop(replayer)
+        self.assertEqual([r["result"] for r in replies], [100, 101, 101])
+        self.assertEqual([r["id"] for r in replies], [0, 1, 2])
+        self.assertGreater(elapsed, 0.14)
+        self.assertLess(elapsed, 0.5)
+
+    def test_replay_follows_recorded_arrivals(self):
+        recorder = Recorder(self.cassette)
+        call = {"method": "getbestblockhash", "params": []}
+        for offset in (5.0, 5.2, 5.6):
+            recorder.record(json.dumps(dict(call, id=1)), 200,
+                            json.dumps({"result": str(offset), "error": None, "id": 1}), 0.01, offset)
+        recorder.close()
+        cassette = Cassette.load(self.cassette)
+        self.assertAlmostEqual(cassette.duration, 0.6)
+
+        timings = {}
+        for paced in (True, False):
+            replayer = make_replayer(cassette, "127.0.0.1:0", speed=2, paced=paced)
+            url = serve(replayer)
+            try:
+                start = time.perf_counter()
+                for i in range(3):
+                    requests.post(url, json=dict(call, id=i), timeout=5)
+                timings[paced] = time.perf_counter() - start
+            finally:
+                stop(replayer)
+        self.assertGreater(timings[True], 0.3)
+        self.assertLess(timings[False], 0.25)
+
+    def test_killed_recorder_and_truncated_cassette(self):
+        call = json.dumps({"method": "getblockcount", "params": [], "id": 1})
+        recorder = Recorder(self.cassette)
+        for count in range(3):
+            recorder.record(call, 200, json.dumps({"result": count, "error": None, "id": 1}), 0.0, 0.0)
+        # Killed mid-write: the .part file is left with a torn last line
+        recorder._file.write('{"t": 0.0, "elaps')
+        recorder._file.close()
+        self.assertFalse(os.path.exists(self.cassette))
+        self.assertEqual(len(Cassette.load(self.cassette).exchanges), 3)
+
+        recorder = Recorder(self.cassette)
+        first_member = os.path.getsize(self.cassette)
+        recorder.record(call, 200, json.dumps({"result": 3, "error": None, "id": 1}), 0.0, 0.0)
+        recorder.close()
+        self.assertFalse(os.path.exists(self.cassette + ".part"))
+        self.assertEqual(len(Cassette.load(self.cassette).exchanges), 4)
+
+        with open(self.cassette, "rb") as f:
+            data = f.read()
+        with open(self.cassette, "wb") as f:
+            f.write(data[:first_member + (len(data) - first_member) // 2])
+        self.assertEqual(len(Cassette.load(self.cassette).exchanges), 3)
+
+    def test_unmatched_request(self):
+        replayer = make_replayer(Cassette([]), "127.0.0.1:0", speed=0)
+        url = serve(replayer)
+        try:
+            response = requests.post(url, json={"method": "getinfo", "params": [], "id": 1}, timeout=5)
+        finally:
+            stop(replayer)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(replayer.unmatched, 1)
+
+    def test_request_key_ignores_ids(self):
+        self.assertEqual(request_key({"id": 1, "method": "getblock", "params": ["a"]}),
+                         request_key({"id": 2, "method": "getblock", "params": ["a"], "jsonrpc": "1.0"}))
+        self.assertNotEqual(request_key([{"method": "a"}, {"method": "b"}]),
+                            request_key([{"method": "b"}, {"method": "a"}]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
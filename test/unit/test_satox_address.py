@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Satoxcoin Address Validation
+Tests Base58Check decoding, checksum verification and the batch API
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path to import the address module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from satox_address import (
+    AddressValidator, b58decode, b58encode, decode_address, encode_address,
+    validate_address, validate_many, PUBKEY_ADDRESS_VERSION
+)
+
+VALID_ADDRESS = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+BURN_ADDRESS = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+
+
+class TestBase58(unittest.TestCase):
+    """Tests for the Base58 primitives"""
+
+    def test_round_trip(self):
+        """Test encode/decode round trip including leading zero bytes"""
+        for data in [b'', b'\x00', b'\x00\x00\x01', b'hello world', bytes(range(32))]:
+            self.assertEqual(b58decode(b58encode(data)), data)
+
+    def test_invalid_character(self):
+        """Test that characters outside the alphabet are rejected"""
+        for char in '0OIl':
+            with self.assertRaises(ValueError):
+                b58decode('S' + char)
+
+
+class TestAddressValidation(unittest.TestCase):
+    """Tests for Base58Check address validation"""
+
+    def test_known_addresses(self):
+        """Test that documented addresses decode with the P2PKH version"""
+        for address in [VALID_ADDRESS, BURN_ADDRESS]:
+            version, hash160 = decode_address(address)
+            self.assertEqual(version, PUBKEY_ADDRESS_VERSION)
+            self.assertEqual(len(hash160), 20)
+            self.assertEqual(encode_address(hash160), address)
+
+    def test_checksum_mismatch(self):
+        """Test that a single changed character fails the checksum"""
+        tampered = VALID_ADDRESS[:-1] + ('d' if VALID_ADDRESS[-1] != 'd' else 'e')
+        self.assertFalse(validate_address(tampered))
+        with self.assertRaises(ValueError):
+            decode_address(tampered)
+
+    def test_wrong_version(self):
+        """Test that a checksummed address with another version byte is rejected"""
+        bitcoin_style = encode_address(b'\x11' * 20, version=0)
+        self.assertTrue(bitcoin_style.startswith('1'))
+        self.assertFalse(validate_address(bitcoin_style))
+        self.assertTrue(AddressValidator(versions={0}).validate(bitcoin_style))
+
+    def test_invalid_inputs(self):
+        """Test that malformed inputs are rejected without raising"""
+        for value in ["", None, "S", "S8f3test1234567890abcdef", VALID_ADDRESS + "1", 12345]:
+            self.assertFalse(validate_address(value))
+
+    def test_validate_many(self):
+        """Test batch validation and de-duplication"""
+        generated = [encode_address(i.to_bytes(20, 'big')) for i in range(1000)]
+        validator = AddressValidator()
+
+        results = validator.validate_many(generated + generated + ["bogus"])
+
+        self.assertEqual(len(results), 1001)
+        self.assertTrue(all(results[address] for address in generated))
+        self.assertFalse(results["bogus"])
+        self.assertEqual(validator.cache_info().misses, 1001)
+
+    def test_cache_hits(self):
+        """Test that repeated validation is served from the cache"""
+        validator = AddressValidator()
+        for _ in range(10):
+            validator.validate(VALID_ADDRESS)
+        info = validator.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 9)
+
+        validator.clear_cache()
+        self.assertEqual(validator.cache_info().currsize, 0)
+
+    def test_module_batch_api(self):
+        """Test the shared module-level batch API"""
+        results = validate_many([VALID_ADDRESS, "invalid"])
+        self.assertEqual(results, {VALID_ADDRESS: True, "invalid": False})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Span Recorder
+Tests the ring buffer, trace export, signal dumps and the monitor's pipeline spans
+"""
+
+import unittest
+import sys
+import os
+import json
+import signal
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path to import the span recorder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from spans import SpanRecorder, install_dump_signal
+from standin_node import StandInNode
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+
+
+class TestSpanRecorder(unittest.TestCase):
+    """Tests for recording and reading back spans"""
+
+    def test_span_context_manager(self):
+        recorder = SpanRecorder(8)
+        with recorder.span("poll", {"source": "wallet"}):
+            time.sleep(0.002)
+        name, start, duration, thread, args = recorder.spans()[0]
+        self.assertEqual((name, thread, args), ("poll", threading.get_ident(), {"source": "wallet"}))
+        self.assertGreaterEqual(duration, 2000000)
+
+    def test_ring_overwrites_oldest(self):
+        recorder = SpanRecorder(4)
+        for index in range(10):
+            recorder.record("parse", index * 10, index * 10 + 5, {"index": index})
+        spans = recorder.spans()
+        self.assertEqual([span[4]["index"] for span in spans], [6, 7, 8, 9])
+        self.assertEqual(recorder.recorded, 10)
+        self.assertEqual(recorder.to_dict()["dropped"], 6)
+
+    def test_spans_ordered_by_start(self):
+        recorder = SpanRecorder(8)
+        recorder.record("cycle", 100, 200)
+        recorder.record("poll", 110, 150)
+        recorder.record("queue", 105, 108)
+        self.assertEqual([span[0] for span in recorder.spans()], ["cycle", "queue", "poll"])
+
+    def test_disabled_recorder(self):
+        recorder = SpanRecorder(0)
+        with recorder.span("cycle"):
+            pass
+        recorder.finish("poll", recorder.start())
+        self.assertEqual(recorder.spans(), [])
+        self.assertEqual(recorder.recorded, 0)
+
+    def test_concurrent_writers(self):
+        recorder = SpanRecorder(1000)
+
+        def write():
+            for _ in range(100):
+                with recorder.span("queue"):
+                    pass
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(recorder.spans()), 400)
+
+    def test_summary_and_clear(self):
+        recorder = SpanRecorder(8)
+        recorder.record("poll", 0, 2000000)
+        recorder.record("poll", 0, 4000000)
+        self.assertEqual(recorder.summary()["poll"], {"count": 2, "total_ms": 6.0, "mean_ms": 3.0, "max_ms": 4.0})
+        recorder.clear()
+        self.assertEqual(recorder.spans(), [])
+
+
+class TestSpanExport(unittest.TestCase):
+    """Tests for the JSON and Chrome trace formats"""
+
+    def setUp(self):
+        self.recorder = SpanRecorder(8)
+        with self.recorder.span("cycle"):
+            with self.recorder.span("deliver", {"to": "overlay"}):
+                pass
+
+    def test_json_format(self):
+        data = json.loads(self.recorder.dumps("json"))
+        self.assertEqual([span["name"] for span in data["spans"]], ["cycle", "deliver"])
+        self.assertEqual(data["spans"][1]["args"], {"to": "overlay"})
+        self.assertEqual(data["spans"][0]["thread"], threading.current_thread().name)
+        self.assertIn("deliver", data["summary"])
+
+    def test_chrome_format(self):
+        events = json.loads(self.recorder.dumps("chrome"))["traceEvents"]
+        metadata = [event for event in events if event["ph"] == "M"]
+        complete = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(metadata[0]["args"]["name"], threading.current_thread().name)
+        self.assertEqual([event["name"] for event in complete], ["cycle", "deliver"])
+        cycle, deliver = complete
+        self.assertLessEqual(cycle["ts"], deliver["ts"])
+        self.assertGreaterEqual(cycle["ts"] + cycle["dur"], deliver["ts"] + deliver["dur"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.recorder.dumps("xml")
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR1"), "SIGUSR1 is not available")
+    def test_dump_on_signal(self):
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                self.assertTrue(install_dump_signal(self.recorder, temp_dir))
+                os.kill(os.getpid(), signal.SIGUSR1)
+                names = os.listdir(temp_dir)
+                self.assertEqual(len(names), 1)
+                self.assertTrue(names[0].startswith("spans-"))
+                with open(os.path.join(temp_dir, names[0]), encoding="utf-8") as f:
+                    self.assertIn("traceEvents", json.load(f))
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+
+    def test_dump_signal_needs_main_thread(self):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(install_dump_signal(self.recorder, ".")))
+        thread.start()
+        thread.join()
+        self.assertEqual(result, [False])
+
+
+class TestMonitorSpans(unittest.TestCase):
+    """Tests for the spans the monitor records on each cycle"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.node = StandInNode(wallet_addresses=[WATCHED])
+        self.node.start()
+
+    def tearDown(self):
+        self.node.stop()
+        self.temp_dir.cleanup()
+
+    def make_monitor(self, **settings):
+        config = {'wallet_address': WATCHED, 'rpc_url': self.node.url, 'tx_cache_path': '', 'min_donation': COIN}
+        config.update(settings)
+        monitor = SatoxWalletMonitor(config)
+        monitor.alert_file = os.path.join(self.temp_dir.name, 'alert.txt')
+        monitor.log_file = os.path.join(self.temp_dir.name, 'donations.log')
+        return monitor
+
+    def test_cycle_records_pipeline_stages(self):
+        monitor = self.make_monitor()
+        self.node.broadcast(WATCHED, 5 * COIN)
+        monitor.run_cycle(time.monotonic())
+        names = {span[0] for span in monitor.spans.spans()}
+        self.assertTrue({"cycle", "poll", "parse", "dedup", "enrich", "queue", "deliver"} <= names, names)
+        delivered = [span[4]["to"] for span in monitor.spans.spans() if span[0] == "deliver"]
+        self.assertEqual(sorted(delivered), ["log", "overlay"])
+
+    def test_span_capacity_setting(self):
+        monitor = self.make_monitor(span_capacity=0)
+        monitor.run_cycle(time.monotonic())
+        self.assertEqual(monitor.spans.spans(), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
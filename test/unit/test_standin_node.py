@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Stand-in Node
+Tests the simulated chain, wallet views, reorgs, fault injection and load generators
+"""
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+import time
+
+import requests
+
+# Add the parent directory to the path to import the stand-in node
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from amounts import COIN
+from standin_node import (
+    DUST_AMOUNT, P2P_MAGIC, RPCError, StandInNode, dust_spam, poisson_donations, raid_burst
+)
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+OTHER = "SQBurnSatoXAddressXXXXXXXXXXUqEipi"
+
+
+class TestStandInChain(unittest.TestCase):
+    """Tests for the chain model behind the RPC interface"""
+
+    def setUp(self):
+        self.node = StandInNode(wallet_addresses=[WATCHED], height=10)
+
+    def test_mempool_and_mining(self):
+        txid = self.node.broadcast(WATCHED, 250000001)
+        self.assertEqual(self.node.dispatch("getrawmempool", []), [txid])
+        self.assertEqual(self.node.dispatch("gettransaction", [txid])["confirmations"], 0)
+
+        block_hash = self.node.mine()[0]
+        self.assertEqual(self.node.dispatch("getbestblockhash", []), block_hash)
+        block = self.node.dispatch("getblock", [block_hash, 2])
+        self.assertEqual((block["height"], block["confirmations"]), (11, 1))
+        self.assertEqual(block["tx"][0]["vout"][0]["scriptPubKey"]["addresses"], [WATCHED])
+        self.assertEqual(self.node.dispatch("getrawmempool", []), [])
+        self.node.mine(2)
+        self.assertEqual(self.node.dispatch("listtransactions", ["*", 10])[0]["confirmations"], 3)
+
+    def test_wallet_only_sees_its_addresses(self):
+        self.node.broadcast(OTHER, COIN)
+        with self.assertRaises(RPCError):
+            self.node.dispatch("gettransaction", [self.node.broadcast(OTHER, COIN)])
+        self.assertEqual(self.node.dispatch("listtransactions", []), [])
+        self.assertEqual(len(self.node.dispatch("getaddressmempool", [{"addresses": [OTHER]}])), 2)
+
+    def test_parameter_errors(self):
+        with self.assertRaises(RPCError) as raised:
+            self.node.dispatch("getblockcount", [1])
+        self.assertEqual(raised.exception.code, -1)
+        with self.assertRaises(RPCError):
+            self.node.dispatch("gettransaction", [])
+
+        # A TypeError inside a handler is a stand-in bug, not bad parameters
+        self.node.rpc_getblockcount = lambda: None + 1
+        with self.assertRaises(TypeError):
+            self.node.dispatch("getblockcount", [])
+
+    def test_reorg_returns_and_drops_transactions(self):
+        kept = self.node.broadcast(WATCHED, COIN)
+        dropped = self.node.broadcast(WATCHED, 2 * COIN)
+        old_tip = self.node.mine()[0]
+        self.node.reorg(1, drop=[dropped])
+
+        self.assertEqual(self.node.height, 12)
+        self.assertEqual(self.node.dispatch("getblock", [old_tip])["confirmations"], -1)
+        self.assertEqual(self.node.dispatch("gettransaction", [kept])["confirmations"], 2)
+        self.assertEqual(self.node.dispatch("gettransaction", [dropped])["confirmations"], -1)
+
+        since = self.node.dispatch("listsinceblock", [old_tip])
+        self.assertEqual({entry["txid"] for entry in since["removed"]}, {kept, dropped})
+        self.assertEqual([entry["txid"] for entry in since["transactions"]], [kept])
+
+    def test_scheduled_reorg(self):
+        self.node.schedule_reorg(12, 2)
+        self.node.mine(2)
+        self.assertEqual(self.node.height, 13)
+        orphans = [block for block in self.node.blocks.values() if self.node.chain[block.height] is not block]
+        self.assertEqual(sorted(block.height for block in orphans), [11, 12])
+
+    def test_accelerated_block_clock(self):
+        node = StandInNode(height=0, block_interval=0.01)
+        node._last_block -= 0.05
+        self.assertGreaterEqual(node.dispatch("getblockcount", []), 5)
+
+    def test_generators(self):
+        rng = random.Random(7)
+        schedule = poisson_donations(10, 100, [WATCHED], rng=rng)
+        self.assertTrue(800 < len(schedule) < 1200)
+        self.assertEqual(schedule, sorted(schedule))
+        burst = raid_burst(50, [WATCHED, OTHER], start=5, spread=2, rng=rng)
+        self.assertEqual(len(burst), 50)
+        self.assertTrue(all(5 <= offset <= 7 for offset, _, _ in burst))
+        dust = dust_spam(4, 2.5, [WATCHED])
+        self.assertEqual([offset for offset, _, _ in dust], [0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.25])
+        self.assertTrue(all(amount == DUST_AMOUNT for _, _, amount in dust))
+
+
+class TestStandInRPC(unittest.TestCase):
+    """Tests for the HTTP interface and the monitor running against it"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.node = StandInNode(wallet_addresses=[WATCHED], rpc_user="user", rpc_password="pass")
+        self.node.start()
+
+    def tearDown(self):
+        self.node.stop()
+        self.temp_dir.cleanup()
+
+    def make_monitor(self, **settings):
+        url = self.node.url.replace("http://", "http://user:pass@")
+        config = {'wallet_address': WATCHED, 'rpc_url': url, 'tx_cache_path': '', 'min_donation': COIN}
+        config.update(settings)
+        monitor = SatoxWalletMonitor(config)
+        monitor.alert_file = os.path.join(self.temp_dir.name, 'alert.txt')
+        monitor.log_file = os.path.join(self.temp_dir.name, 'donations.log')
+        return monitor
+
+    def read_alert(self, monitor):
+        with open(monitor.alert_file, encoding='utf-8') as f:
+            return f.read()
+
+    def test_exact_amount_literals_and_auth(self):
+        self.node.broadcast(WATCHED, 250000001)
+        payload = {"jsonrpc": "1.0", "id": 1, "method": "listtransactions", "params": []}
+        response = requests.post(self.node.url, json=payload, auth=("user", "pass"), timeout=5)
+        self.assertIn('"amount": 2.50000001', response.text)
+        self.assertEqual(requests.post(self.node.url, json=payload, timeout=5).status_code, 401)
+
+    def test_wallet_mode_alerts(self):
+        monitor = self.make_monitor()
+        self.assertTrue(monitor.test_connection())
+        self.node.broadcast(WATCHED, 1500000000)
+        self.node.broadcast(WATCHED, DUST_AMOUNT)
+        monitor.check_for_donations()
+        self.assertEqual(self.read_alert(monitor), f"{WATCHED[:8]}... donated 15.00 SATOX!")
+        self.assertEqual(monitor.totals.count, 1)
+        self.assertEqual(monitor.get_wallet_balance(), 0)
+        self.node.mine()
+        self.assertEqual(monitor.get_wallet_balance(), 1500000546)
+
+    def test_one_transaction_paying_two_watched_addresses(self):
+        self.node.wallet_addresses = None
+        for rounds, policy in enumerate(("zero-conf", "confirmed"), 1):
+            monitor = self.make_monitor(watch_addresses=[OTHER], alert_policy=policy, confirmations=1)
+            txid = self.node.broadcast(WATCHED, 2 * COIN, (OTHER, 3 * COIN))
+            self.node.mine()
+            monitor.check_for_donations()
+            monitor.check_for_donations()
+            # The wallet also still lists the previous round's transaction
+            self.assertEqual(monitor.totals.count, 2 * rounds, policy)
+            self.assertEqual(monitor.totals.total, 5 * COIN * rounds, policy)
+            self.assertEqual({key for key in monitor.processed_txs if key[0] == txid},
+                             {(txid, WATCHED), (txid, OTHER)}, policy)
+
+    def test_two_outputs_to_one_address(self):
+        for mode in ("wallet", "mempool"):
+            monitor = self.make_monitor(ingestion_mode=mode)
+            if mode == "mempool":
+                monitor.check_mempool()
+            txid = self.node.broadcast(WATCHED, COIN, (WATCHED, 2 * COIN))
+            if mode == "mempool":
+                monitor.check_mempool()
+            else:
+                monitor.check_for_donations()
+                monitor.check_for_donations()
+            self.assertEqual(monitor.totals.count, 1, mode)
+            self.assertEqual(monitor.totals.total, 3 * COIN, mode)
+            self.assertIn((txid, WATCHED), monitor.processed_txs, mode)
+
+    def test_mempool_and_addressindex_modes(self):
+        for mode in ("mempool", "addressindex"):
+            monitor = self.make_monitor(ingestion_mode=mode, index_start_height=self.node.height + 1)
+            if mode == "mempool":
+                monitor.check_mempool()
+            txid = self.node.broadcast(WATCHED, 3 * COIN)
+            if mode == "mempool":
+                monitor.check_mempool()
+            else:
+                monitor.check_for_donations()
+            self.assertIn((txid, WATCHED), monitor.processed_txs, mode)
+
+    def test_p2p_mode(self):
+        port = self.node.start_p2p()
+        waiting = self.node.broadcast(WATCHED, 3 * COIN)
+        monitor = self.make_monitor(ingestion_mode="p2p", p2p_host="127.0.0.1", p2p_port=port,
+                                    p2p_magic=P2P_MAGIC.hex())
+        monitor.p2p_listener.start()
+        try:
+            self.assertTrue(monitor.p2p_listener.connected.wait(5))
+            announced = self.node.broadcast(WATCHED, 4 * COIN)
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and monitor.totals.count < 2:
+                monitor.check_p2p()
+                time.sleep(0.02)
+        finally:
+            monitor.p2p_listener.stop()
+        self.assertIn((waiting, WATCHED), monitor.processed_txs)
+        self.assertIn((announced, WATCHED), monitor.processed_txs)
+        self.assertEqual(monitor.totals.total, 7 * COIN)
+
+    def test_confirmation_policy_follows_reorg(self):
+        monitor = self.make_monitor(alert_policy="both", confirmations=2)
+        txid = self.node.broadcast(WATCHED, 5 * COIN)
+        monitor.check_for_donations()
+        self.assertTrue(self.read_alert(monitor).endswith("(pending)"))
+        self.node.mine(2)
+        monitor.check_for_donations()
+        self.assertEqual(monitor.totals.count, 1)
+
+        self.node.reorg(2, drop=[txid])
+        monitor.check_for_donations()
+        self.assertEqual(monitor.totals.count, 0)
+        self.assertNotIn((txid, WATCHED), monitor.processed_txs)
+
+    def test_injected_faults(self):
+        monitor = self.make_monitor()
+        self.node.fail("listtransactions")
+        self.node.broadcast(WATCHED, 5 * COIN)
+        monitor.check_for_donations()
+        self.assertEqual(monitor.totals.count, 0)
+        self.node.clear_failures()
+        monitor.check_for_donations()
+        self.assertEqual(monitor.totals.count, 1)
+
+        self.node.down = True
+        self.assertFalse(monitor.test_connection())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Transaction Cache
+Tests LRU eviction, unconfirmed expiry, promotion and persistence across instances
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path to import the cache module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from tx_cache import TransactionCache
+from wallet_monitor import SatoxWalletMonitor
+
+WATCHED = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def transaction(confirmations, amount=250000000):
+    return {"amount": amount, "confirmations": confirmations,
+            "details": [{"category": "receive", "address": WATCHED, "amount": amount}]}
+
+
+class TestTransactionCache(unittest.TestCase):
+    """Tests for TransactionCache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "tx_cache.db")
+        self.clock = FakeClock()
+        self.cache = TransactionCache(self.path, capacity=2, unconfirmed_ttl=10, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_unconfirmed_entries_expire(self):
+        self.cache.put("aa", transaction(0))
+        self.assertEqual(self.cache.get("aa")["confirmations"], 0)
+        self.clock.now = 11
+        self.assertIsNone(self.cache.get("aa"))
+        self.assertEqual(self.cache.stats()["disk_entries"], 0)
+
+    def test_confirmed_entries_promoted_and_persisted(self):
+        self.cache.put("aa", transaction(0))
+        self.cache.put("aa", transaction(6))
+        self.clock.now = 1000
+        self.assertEqual(self.cache.get("aa"), transaction(6))
+        self.assertEqual(self.cache.promotions, 1)
+        self.cache.close()
+
+        # A new process finds the confirmed transaction on disk
+        reopened = TransactionCache(self.path)
+        try:
+            self.assertEqual(reopened.get("aa"), transaction(6))
+            self.assertEqual(reopened.get("aa", "getrawtransaction"), None)
+            stats = reopened.stats()
+            self.assertEqual((stats["disk_hits"], stats["misses"], stats["disk_entries"]), (1, 1, 1))
+        finally:
+            reopened.close()
+
+    def test_lru_eviction_falls_back_to_disk(self):
+        for txid in ("aa", "bb", "cc"):
+            self.cache.put(txid, transaction(6))
+        self.assertEqual(self.cache.stats()["memory_entries"], 2)
+        self.assertIsNotNone(self.cache.get("aa"))
+        self.assertEqual(self.cache.disk_hits, 1)
+        self.assertIsNotNone(self.cache.get("aa"))
+        self.assertEqual(self.cache.memory_hits, 1)
+
+    def test_shallow_confirmations_stay_in_memory(self):
+        self.cache.put("aa", transaction(1))
+        self.assertEqual(self.cache.stats()["disk_entries"], 0)
+        self.clock.now = 11
+        self.assertIsNone(self.cache.get("aa"))
+        shallow = TransactionCache(None, min_confirmations=1)
+        self.assertTrue(shallow.is_confirmed(transaction(1)))
+
+    def test_raw_hex_is_immutable(self):
+        self.cache.put("aa", "0200ff", "getrawtransaction")
+        self.clock.now = 1000
+        self.assertEqual(self.cache.get("aa", "getrawtransaction"), "0200ff")
+
+    def test_fetch_and_hit_rate(self):
+        loads = []
+        loader = lambda: loads.append(1) or transaction(6)
+        for _ in range(4):
+            self.assertEqual(self.cache.fetch("aa", loader), transaction(6))
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(self.cache.hit_rate, 0.75)
+
+    def test_memory_only(self):
+        cache = TransactionCache(None)
+        cache.put("aa", transaction(6))
+        self.assertEqual(cache.get("aa"), transaction(6))
+        self.assertEqual(cache.stats()["disk_entries"], 0)
+
+
+class TestSenderLookupCaching(unittest.TestCase):
+    """Tests that enrichment lookups go through the cache"""
+
+    def test_confirmed_lookup_fetched_once(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = SatoxWalletMonitor({'wallet_address': WATCHED,
+                                          'tx_cache_path': os.path.join(temp_dir, 'tx.db')})
+            with patch.object(monitor, 'rpc_call', return_value=transaction(2)) as rpc:
+                self.assertEqual(monitor.get_sender_address("aa"), WATCHED)
+                self.assertEqual(monitor.get_sender_address("aa"), WATCHED)
+            self.assertEqual(rpc.call_count, 1)
+            self.assertEqual(monitor.rpc_status()["tx_cache"]["memory_hits"], 1)
+            monitor.tx_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -9,6 +9,8 @@ import sys
 import os
 import tempfile
 import json
+import logging
+import subprocess
 from unittest.mock import Mock, patch, MagicMock
 
 # Add the parent directory to the path to import the wallet monitor
@@ -30,7 +32,8 @@ class TestSatoxWalletMonitor(unittest.TestCase):
             'rpc_url': 'http://localhost:8332',
             'check_interval': 30,
             'alert_duration': 5,
-            'log_file': 'test_donation_monitor.log'
+            'log_file': 'test_donation_monitor.log',
+            'ledger_path': ''
         }
         self.monitor = SatoxWalletMonitor(self.test_config)
     
@@ -54,7 +57,7 @@ class TestSatoxWalletMonitor(unittest.TestCase):
     def test_validate_address(self):
         """Test address validation"""
         # Valid Satoxcoin address
-        valid_address = "S8f3test1234567890abcdef"
+        valid_address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
         self.assertTrue(self.monitor.validate_address(valid_address))
         
         # Invalid addresses
@@ -62,12 +65,26 @@ class TestSatoxWalletMonitor(unittest.TestCase):
             "invalid",
             "1234567890",
             "S8f3",  # Too short
-            "S8f3test1234567890abcdefghijklmnopqrstuvwxyz"  # Too long
+            "S8f3test1234567890abcdefghijklmnopqrstuvwxyz",  # Too long
+            "S8f3test1234567890abcdef",  # Not Base58Check
+            "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2ocd"  # Bad checksum
         ]
         
         for addr in invalid_addresses:
             self.assertFalse(self.monitor.validate_address(addr))
     
+    def test_load_watch_addresses(self):
+        """Test that only valid addresses are added to the watch set"""
+        valid = self.monitor.load_watch_addresses([
+            "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ",
+            "SQBurnSatoXAddressXXXXXXXXXXUqEipi",
+            "S8f3test1234567890abcdef"
+        ])
+        
+        self.assertEqual(valid, {"SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ", "SQBurnSatoXAddressXXXXXXXXXXUqEipi"})
+        self.assertIn("SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ", self.monitor.watched_addresses)
+        self.assertNotIn("S8f3test1234567890abcdef", self.monitor.watched_addresses)
+    
     @patch('requests.post')
     def test_get_wallet_balance(self, mock_post):
         """Test wallet balance retrieval"""
@@ -81,7 +98,191 @@ class TestSatoxWalletMonitor(unittest.TestCase):
         mock_post.return_value = mock_response
         
         balance = self.monitor.get_wallet_balance()
-        self.assertEqual(balance, 150.75)
+        self.assertEqual(balance, 15075000000)
+    
+    @patch('requests.post')
+    def test_check_for_donations_integer_pipeline(self, mock_post):
+        """Test that RPC decimals become exact base units end to end"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        self.monitor.load_watch_addresses([address])
+        self.monitor.min_donation = 100000000
+        bodies = iter([
+            '{"result": [{"txid": "aa", "category": "receive", "address": "%s", "amount": 0.1},'
+            ' {"txid": "bb", "category": "receive", "address": "%s", "amount": 0.99999999},'
+            ' {"txid": "cc", "category": "receive", "address": "%s", "amount": 1.00000000}], "error": null}'
+            % (address, address, address),
+            '{"result": {"details": []}, "error": null}'
+        ])
+        
+        def respond(*args, **kwargs):
+            response = Mock()
+            body = next(bodies)
+            response.json.side_effect = lambda **hooks: json.loads(body, **hooks)
+            return response
+        
+        mock_post.side_effect = respond
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            self.monitor.log_file = os.path.join(temp_dir, 'donations.log')
+            self.monitor.check_for_donations()
+            
+            with open(self.monitor.alert_file) as f:
+                self.assertIn("donated 1.00 SATOX", f.read())
+        
+        self.assertEqual(self.monitor.processed_txs, {("cc", address)})
+        self.assertEqual(self.monitor.totals.total, 100000000)
+        self.assertIsInstance(self.monitor.totals.total, int)
+    
+    def test_confirmation_policy_both(self):
+        """Test provisional then final alerts under the 'both' policy"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address,
+                                          alert_policy='both', confirmations=2))
+        chain = {'best': 'h100', 'confirmations': 0}
+        blocks = {
+            'h100': {'height': 100, 'previousblockhash': 'h99'},
+            'h101': {'height': 101, 'previousblockhash': 'h100'}
+        }
+        
+        def fake_rpc(method, params=None, **kwargs):
+            if method == 'getbestblockhash':
+                return chain['best']
+            if method == 'getblock':
+                return blocks[params[0]]
+            if method == 'listtransactions':
+                return [{'txid': 'aa', 'category': 'receive', 'address': address,
+                         'amount': 500000000, 'confirmations': chain['confirmations']}]
+            return None
+        
+        with tempfile.TemporaryDirectory() as temp_dir, patch.object(monitor, 'rpc_call', side_effect=fake_rpc):
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            monitor.log_file = os.path.join(temp_dir, 'donations.log')
+            
+            monitor.check_for_donations()
+            with open(monitor.alert_file) as f:
+                self.assertIn("(pending)", f.read())
+            self.assertEqual(monitor.totals.total, 0)
+            
+            chain.update(best='h101', confirmations=2)
+            monitor.check_for_donations()
+            with open(monitor.alert_file) as f:
+                self.assertNotIn("(pending)", f.read())
+            self.assertEqual(monitor.totals.total, 500000000)
+            self.assertIn(('aa', address), monitor.processed_txs)
+    
+    def test_inclusion_height_from_block_hash(self):
+        """Test that a block landing mid-poll does not shift the inclusion height"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address,
+                                          alert_policy='confirmed', confirmations=2))
+        chain = {'best': 'h100'}
+        blocks = {
+            'h100': {'height': 100, 'previousblockhash': 'h99', 'confirmations': 2},
+            'h101': {'height': 101, 'previousblockhash': 'h100', 'confirmations': 1}
+        }
+        
+        def fake_rpc(method, params=None, **kwargs):
+            if method == 'getbestblockhash':
+                return chain['best']
+            if method == 'getblock':
+                return blocks[params[0]]
+            if method == 'listtransactions':
+                # Block 101 arrived after getbestblockhash was answered
+                return [{'txid': 'aa', 'category': 'receive', 'address': address, 'amount': 500000000,
+                         'confirmations': 2, 'blockhash': 'h100'}]
+            return None
+        
+        kinds = []
+        with patch.object(monitor, 'rpc_call', side_effect=fake_rpc), \
+                patch.object(monitor, '_apply_event', side_effect=lambda kind, *args: kinds.append(kind)):
+            monitor.check_for_donations()
+            self.assertEqual(kinds, ['seen'])
+            chain['best'] = 'h101'
+            monitor.check_for_donations()
+        self.assertEqual(kinds, ['seen', 'confirmed'])
+    
+    @patch('requests.post')
+    def test_rpc_batch(self, mock_post):
+        """Test that batch replies are mapped back to call order"""
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            {'id': 1, 'result': 'second', 'error': None},
+            {'id': 0, 'result': 'first', 'error': None},
+            {'id': 2, 'result': None, 'error': {'code': -5, 'message': 'No such transaction'}}
+        ]
+        mock_post.return_value = mock_response
+        
+        results = self.monitor.rpc_batch([('a', []), ('b', []), ('c', [])])
+        
+        self.assertEqual(results, ['first', 'second', None])
+        self.assertEqual(len(mock_post.call_args[1]['json']), 3)
+    
+    def test_mempool_mode_alerts_new_donation(self):
+        """Test that mempool mode routes new transactions through the pipeline"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address, ingestion_mode='mempool'))
+        mempool = []
+        tx = {'txid': 'ff', 'vout': [{'value': 300000000, 'scriptPubKey': {'addresses': [address]}}]}
+        
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(monitor.mempool_watcher, 'rpc_call', side_effect=lambda method: list(mempool)), \
+                patch.object(monitor.mempool_watcher, 'rpc_batch', return_value=[tx]), \
+                patch.object(monitor, 'get_sender_address', return_value='Unknown'):
+            monitor.alert_file = os.path.join(temp_dir, 'alert.txt')
+            monitor.log_file = os.path.join(temp_dir, 'donations.log')
+            
+            monitor.check_mempool()
+            mempool.append('ff')
+            monitor.check_mempool()
+        
+        self.assertEqual(monitor.processed_txs, {('ff', address)})
+        self.assertEqual(monitor.totals.total, 300000000)
+    
+    def test_address_index_mode_skips_wallet(self):
+        """Test that address index mode never calls wallet RPCs"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address,
+                                          ingestion_mode='addressindex', index_start_height=10))
+        called = []
+        
+        def fake_rpc(method, params=None, **kwargs):
+            called.append(method)
+            if method == 'getblockcount':
+                return 10
+            if method == 'getaddressdeltas':
+                return [{'txid': 'dd', 'address': address, 'satoshis': 200000000, 'height': 10}]
+            return []
+        
+        monitor.address_index.rpc_call = fake_rpc
+        with patch.object(monitor, 'rpc_call', side_effect=fake_rpc), \
+                patch.object(monitor, 'deliver_alert', return_value='Unknown'), \
+                patch.object(monitor, 'log_donation'):
+            monitor.check_for_donations()
+        
+        self.assertNotIn('listtransactions', called)
+        self.assertEqual(monitor.processed_txs, {('dd', address)})
+    
+    def test_p2p_mode_feeds_pipeline(self):
+        """Test that payments queued by the P2P listener are alerted"""
+        address = "SiGAJKZkB7xQdqzKHWRcus9PoLVoXx2occ"
+        monitor = SatoxWalletMonitor(dict(self.test_config, wallet_address=address,
+                                          ingestion_mode='p2p', p2p_magic='53415458', p2p_port=60777))
+        self.assertEqual(monitor.p2p_listener.magic, b'SATX')
+        self.assertEqual(monitor.p2p_listener.port, 60777)
+        
+        monitor.p2p_listener.payments.put(('pp', address, 300000000, None))
+        with patch.object(monitor, 'deliver_alert', return_value='Unknown') as deliver, \
+                patch.object(monitor, 'log_donation'):
+            monitor.check_p2p()
+        
+        deliver.assert_called_once_with('pp', 300000000)
+        with self.assertRaises(ValueError):
+            SatoxWalletMonitor(dict(self.test_config, ingestion_mode='p2p', p2p_magic='xyz'))
+    
+    def test_invalid_alert_policy(self):
+        """Test that unknown alert policies are rejected"""
+        with self.assertRaises(ValueError):
+            SatoxWalletMonitor(dict(self.test_config, alert_policy='sometimes'))
     
     @patch('requests.post')
     def test_get_wallet_balance_error(self, mock_post):
@@ -98,9 +299,46 @@ class TestSatoxWalletMonitor(unittest.TestCase):
         balance = self.monitor.get_wallet_balance()
         self.assertIsNone(balance)
     
+    def test_import_has_no_side_effects(self):
+        """Test that importing the module leaves .env, logging and requests alone"""
+        code = ("import logging, sys, wallet_monitor; "
+                "print('requests' in sys.modules, len(logging.getLogger().handlers))")
+        root = os.path.join(os.path.dirname(__file__), '..', '..')
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.split()
+        self.assertEqual(output, ['False', '0'])
+    
+    def test_initialize_loads_env_file(self):
+        """Test that initialize() reads .env into the module settings"""
+        import wallet_monitor
+        handlers = list(logging.getLogger().handlers)
+        saved = {key: os.environ.get(key) for key in ('SATOX_MIN_DONATION', 'SATOX_INGESTION_MODE')}
+        min_donation = wallet_monitor.MIN_DONATION
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env_file = os.path.join(temp_dir, '.env')
+            with open(env_file, 'w') as f:
+                f.write("# overlay settings\nSATOX_MIN_DONATION=2.5\nSATOX_INGESTION_MODE = mempool\n")
+            try:
+                wallet_monitor.initialize(env_file, os.path.join(temp_dir, 'monitor.log'))
+                self.assertEqual(wallet_monitor.MIN_DONATION, 250000000)
+                self.assertEqual(SatoxWalletMonitor({'tx_cache_path': ''}).ingestion_mode, 'mempool')
+            finally:
+                for key, value in saved.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+                wallet_monitor.load_settings()
+                wallet_monitor.shutdown_logging()
+                for handler in logging.getLogger().handlers:
+                    if handler not in handlers:
+                        logging.getLogger().removeHandler(handler)
+                        handler.close()
+        self.assertEqual(wallet_monitor.MIN_DONATION, min_donation)
+    
     def test_create_donation_alert(self):
         """Test donation alert creation"""
-        amount = 100.50
+        amount = 10050000000
         address = "S8f3test1234567890abcdef"
         
         alert = self.monitor.create_donation_alert(amount, address)
@@ -117,7 +355,7 @@ class TestSatoxWalletMonitor(unittest.TestCase):
         
         try:
             self.monitor.log_file = temp_filename
-            amount = 75.25
+            amount = 7525000000
             address = "S8f3test1234567890abcdef"
             
             self.monitor.log_donation(amount, address)
@@ -125,7 +363,7 @@ class TestSatoxWalletMonitor(unittest.TestCase):
             # Check if log file was created and contains the donation
             with open(temp_filename, 'r') as f:
                 log_content = f.read()
-                self.assertIn(str(amount), log_content)
+                self.assertIn("75.25 SATOX", log_content)
                 self.assertIn(self.monitor.obfuscate_address(address), log_content)
         
         finally:
@@ -138,7 +376,7 @@ class TestDonationAlert(unittest.TestCase):
     
     def test_donation_alert_creation(self):
         """Test DonationAlert object creation"""
-        amount = 50.00
+        amount = 5000000000
         address = "S8f3test1234567890abcdef"
         
         alert = DonationAlert(amount, address)
@@ -149,29 +387,40 @@ class TestDonationAlert(unittest.TestCase):
     
     def test_donation_alert_to_dict(self):
         """Test DonationAlert serialization"""
-        amount = 25.75
+        amount = 2575000000
         address = "S8f3test1234567890abcdef"
         
         alert = DonationAlert(amount, address)
         alert_dict = alert.to_dict()
         
-        self.assertEqual(alert_dict['amount'], amount)
+        self.assertEqual(alert_dict['amount'], 25.75)
+        self.assertEqual(alert_dict['amount_units'], amount)
         self.assertEqual(alert_dict['address'], address)
         self.assertIn('timestamp', alert_dict)
     
     def test_donation_alert_from_dict(self):
         """Test DonationAlert deserialization"""
         alert_data = {
-            'amount': 100.00,
+            'amount': 100.0,
+            'amount_units': 10000000000,
             'address': 'S8f3test1234567890abcdef',
             'timestamp': 1234567890.123
         }
         
         alert = DonationAlert.from_dict(alert_data)
         
-        self.assertEqual(alert.amount, alert_data['amount'])
+        self.assertEqual(alert.amount, alert_data['amount_units'])
         self.assertEqual(alert.address, alert_data['address'])
         self.assertEqual(alert.timestamp, alert_data['timestamp'])
+        self.assertEqual(DonationAlert.from_dict(alert.to_dict()).amount, alert.amount)
+    
+    def test_donation_alert_legacy_float_amount(self):
+        """Test that SATOX amounts without amount_units are converted to base units"""
+        alert = DonationAlert.from_dict({'amount': 0.1, 'address': 'S8f3test1234567890abcdef'})
+        
+        self.assertEqual(alert.amount, 10000000)
+        self.assertIsInstance(alert.amount, int)
+        self.assertEqual(DonationAlert.from_dict({'amount': 100, 'address': 'S8f3'}).amount, 10000000000)
 
 def run_unit_tests():
     """Run all unit tests"""
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Satoxcoin Stream Donation Overlay - Transaction Cache
+Copyright (c) 2025 Satoxcoin Core Developers
+
+Two-tier cache for gettransaction/getrawtransaction results. An in-memory
+LRU sits in front of a small SQLite file keyed by method and txid.
+Transactions buried min_confirmations deep (the same depth the
+confirmation tracker and the caching proxy treat as final) no longer
+change, so they are written to disk and kept across restarts; shallower
+ones stay in memory only and expire after a short TTL so a later lookup
+picks up the final version.
+
+The "confirmations" field of a cached result is the count at the time it
+was cached - a lower bound, not the current value.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_UNCONFIRMED_TTL = 30.0
+# Reorg-safe depth, as SATOX_CONFIRMATIONS and the proxy's finality depth
+DEFAULT_MIN_CONFIRMATIONS = 6
+
+CacheKey = Tuple[str, str]
+
+
+class TransactionCache:
+    """In-memory LRU backed by an on-disk store of confirmed transactions"""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 unconfirmed_ttl: float = DEFAULT_UNCONFIRMED_TTL,
+                 min_confirmations: int = DEFAULT_MIN_CONFIRMATIONS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.capacity = capacity
+        self.unconfirmed_ttl = unconfirmed_ttl
+        self.min_confirmations = min_confirmations
+        self.clock = clock
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.promotions = 0
+        # key -> (result, expiry or None for confirmed entries)
+        self._memory: "OrderedDict[CacheKey, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use; None when disabled, unusable or not yet created"""
+        if self._db is None and self.path and (create or os.path.exists(self.path)):
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS transactions "
+                    "(method TEXT NOT NULL, txid TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (method, txid))"
+                    " WITHOUT ROWID"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Transaction cache disabled, cannot open {self.path}: {e}")
+                self.path = None
+                self._db = None
+        return self._db
+
+    def is_confirmed(self, result: Any, method: str = "gettransaction") -> bool:
+        """True when result is final enough to cache forever"""
+        if method == "getrawtransaction" and isinstance(result, str):
+            # Raw hex is identical before and after confirmation
+            return True
+        return isinstance(result, dict) and (result.get("confirmations") or 0) >= self.min_confirmations
+
+    def get(self, txid: str, method: str = "gettransaction") -> Optional[Any]:
+        """Return the cached result for txid, or None on a miss"""
+        key = (method, txid)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                result, expiry = entry
+                if expiry is None or expiry > self.clock():
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return result
+                del self._memory[key]
+
+            db = self._connect()
+            if db is not None:
+                row = db.execute("SELECT data FROM transactions WHERE method = ? AND txid = ?", key).fetchone()
+                if row is not None:
+                    result = json.loads(zlib.decompress(row[0]))
+                    self._remember(key, result, None)
+                    self.disk_hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, txid: str, result: Any, method: str = "gettransaction") -> None:
+        """Cache result; confirmed results are also persisted to disk"""
+        if result is None:
+            return
+        key = (method, txid)
+        with self._lock:
+            if not self.is_confirmed(result, method):
+                self._remember(key, result, self.clock() + self.unconfirmed_ttl)
+                return
+            previous = self._memory.get(key)
+            self._remember(key, result, None)
+            if previous is not None and previous[1] is not None:
+                self.promotions += 1
+            db = self._connect(create=True)
+            if db is not None:
+                try:
+                    data = zlib.compress(json.dumps(result, separators=(",", ":")).encode())
+                    db.execute("INSERT OR REPLACE INTO transactions (method, txid, data) VALUES (?, ?, ?)",
+                               (method, txid, data))
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist transaction {txid}: {e}")
+
+    def fetch(self, txid: str, loader: Callable[[], Any], method: str = "gettransaction") -> Optional[Any]:
+        """Return the cached result or call loader() and cache what it returns"""
+        result = self.get(txid, method)
+        if result is None:
+            result = loader()
+            self.put(txid, result, method)
+        return result
+
+    def _remember(self, key: CacheKey, result: Any, expiry: Optional[float]) -> None:
+        self._memory[key] = (result, expiry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and sizes of both tiers"""
+        with self._lock:
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "promotions": self.promotions,
+                "hit_rate": round(self.hit_rate, 4),
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
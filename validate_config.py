@@ -10,6 +10,9 @@ import requests
 import json
 from typing import List, Dict, Any
 
+from amounts import format_amount, parse_amount
+from satox_address import validate_address, validate_many
+
 def load_env_file():
     """Load environment variables from .env file if it exists"""
     env_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -33,18 +36,14 @@ def get_config() -> Dict[str, Any]:
         'rpc_host': os.getenv("SATOX_RPC_HOST", "127.0.0.1"),
         'rpc_port': int(os.getenv("SATOX_RPC_PORT", "7777")),
         'donation_address': os.getenv("SATOX_DONATION_ADDRESS", "your_donation_address_here"),
-        'min_donation': float(os.getenv("SATOX_MIN_DONATION", "1.0")),
+        'watch_addresses': [a.strip() for a in os.getenv("SATOX_WATCH_ADDRESSES", "").split(",") if a.strip()],
+        'min_donation': parse_amount(os.getenv("SATOX_MIN_DONATION", "1.0")),
         'debug': os.getenv("SATOX_DEBUG", "false").lower() == "true"
     }
 
 def validate_satox_address(address: str) -> bool:
-    """Validate Satoxcoin address format"""
-    if not address or len(address) < 26 or len(address) > 35:
-        return False
-    if not address.startswith('S'):
-        return False
-    # Basic format check
-    return all(c in '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz' for c in address)
+    """Validate Satoxcoin address (Base58Check checksum and version byte)"""
+    return validate_address(address)
 
 def test_rpc_connection(config: Dict[str, Any]) -> bool:
     """Test connection to Satox Core RPC"""
@@ -142,6 +141,11 @@ def validate_configuration(config: Dict[str, Any]) -> List[str]:
     if not validate_satox_address(config['donation_address']):
         errors.append("Invalid donation address format")
     
+    # Validate additional watch addresses in one batch
+    for address, valid in validate_many(config['watch_addresses']).items():
+        if not valid:
+            errors.append(f"Invalid watch address: {address}")
+    
     # Validate port number
     if not (1024 <= config['rpc_port'] <= 65535):
         errors.append("Invalid RPC port number")
@@ -168,7 +172,7 @@ def main():
     print(f"   RPC Host: {config['rpc_host']}:{config['rpc_port']}")
     print(f"   RPC User: {config['rpc_user']}")
     print(f"   Donation Address: {config['donation_address'][:8]}...{config['donation_address'][-4:]}")
-    print(f"   Minimum Donation: {config['min_donation']} SATOX")
+    print(f"   Minimum Donation: {format_amount(config['min_donation'], 8)} SATOX")
     print(f"   Debug Mode: {config['debug']}")
     
     # Validate configuration
@@ -7,32 +7,29 @@ Monitors a Satox Core wallet for incoming donations and generates alerts for OBS
 Cross-platform compatible version.
 """
 
-import json
+import atexit
 import time
-import requests
 import logging
 import os
-import sys
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Set, TextIO, Tuple
 
-# Load environment variables from .env file if it exists
-def load_env_file():
-    """Load environment variables from .env file"""
-    env_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-    if os.path.exists(env_file):
-        try:
-            with open(env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        os.environ[key.strip()] = value.strip()
-        except Exception as e:
-            print(f"Warning: Could not load .env file: {e}")
-
-# Load environment variables
-load_env_file()
+from amounts import DonationTotals, coerce_amount, format_amount, parse_amount
+from confirmations import (
+    ALERT_POLICIES, CONFIRMED, POLICY_BOTH, POLICY_ZERO_CONF,
+    RECONFIRMED, RETRACTED, SEEN, ConfirmationTracker
+)
+from ingestion import AddressIndexSource, MempoolWatcher
+from metrics import MetricsRegistry
+from p2p_listener import DEFAULT_P2P_PORT, P2PMempoolListener, resolve_network_magic
+from profiler import SamplingProfiler, SlowCycleWatchdog, install_profile_signal
+from rpc_client import (
+    PRIORITY_BALANCE, PRIORITY_DETECTION, PRIORITY_ENRICHMENT, NodePool, RPCUnavailable, RpcScheduler
+)
+from satox_address import default_validator, validate_address as _validate_address, validate_many
+from spans import SpanRecorder, install_dump_signal
+from tx_cache import DEFAULT_MIN_CONFIRMATIONS, TransactionCache
 
 # Windows compatibility imports
 try:
@@ -41,14 +38,7 @@ try:
 except ImportError:
     IS_WINDOWS = False
 
-# Configuration
-RPC_USER = os.getenv("SATOX_RPC_USER", "your_rpc_username")
-RPC_PASSWORD = os.getenv("SATOX_RPC_PASSWORD", "your_rpc_password")
-RPC_HOST = os.getenv("SATOX_RPC_HOST", "127.0.0.1")
-RPC_PORT = int(os.getenv("SATOX_RPC_PORT", "7777"))  # Satoxcoin RPC port (from official spec)
-DONATION_ADDRESS = os.getenv("SATOX_DONATION_ADDRESS", "your_donation_address_here")
-MIN_DONATION = float(os.getenv("SATOX_MIN_DONATION", "1.0"))  # Minimum donation amount in SATOX
-DEBUG = os.getenv("SATOX_DEBUG", "false").lower() == "true"
+INGESTION_MODES = ("wallet", "mempool", "addressindex", "p2p")
 
 # Satoxcoin Network Information (from https://github.com/satoverse/satoxcoin):
 # - P2P Port: 60777
@@ -56,46 +46,148 @@ DEBUG = os.getenv("SATOX_DEBUG", "false").lower() == "true"
 # - Algorithm: KawPoW
 # - Block Time: 60 seconds
 
-# Setup logging with Windows-compatible paths
+# Windows-compatible paths; the log file is only opened by setup_logging()
 log_dir = os.path.dirname(os.path.abspath(__file__))
 log_file = os.path.join(log_dir, "donation_monitor.log")
+ENV_FILE = os.path.join(log_dir, '.env')
 
-logging.basicConfig(
-    level=logging.DEBUG if DEBUG else logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def load_env_file(path: str = ENV_FILE) -> None:
+    """Load environment variables from .env file"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        os.environ[key.strip()] = value.strip()
+        except Exception as e:
+            print(f"Warning: Could not load .env file: {e}")
+
+def load_settings() -> None:
+    """Read the SATOX_* environment variables into the module-level defaults
+    
+    Runs at import (environment only) and again from initialize() once
+    the .env file has been loaded.
+    """
+    global RPC_USER, RPC_PASSWORD, RPC_HOST, RPC_PORT, RPC_URLS, RPC_HEALTH_INTERVAL, RPC_RATE
+    global DONATION_ADDRESS, WATCH_ADDRESSES, MIN_DONATION, DONATION_GOAL, ALERT_POLICY, REQUIRED_CONFIRMATIONS
+    global INGESTION_MODE, INDEX_START_HEIGHT, POLL_INTERVAL, MEMPOOL_INTERVAL
+    global P2P_HOST, P2P_PORT, P2P_MAGIC, DATADIR, DEBUG, TX_CACHE_PATH, SPAN_CAPACITY, OVERLAY_LISTEN
+    global LEDGER_PATH, DONATION_DB, CYCLE_DEADLINE, PROFILE_SECONDS, LOG_MAX_MB, LOG_ROTATE_HOURS, LOG_BACKUPS, LOG_REPEAT_WINDOW
+    RPC_USER = os.getenv("SATOX_RPC_USER", "your_rpc_username")
+    RPC_PASSWORD = os.getenv("SATOX_RPC_PASSWORD", "your_rpc_password")
+    RPC_HOST = os.getenv("SATOX_RPC_HOST", "127.0.0.1")
+    RPC_PORT = int(os.getenv("SATOX_RPC_PORT", "7777"))  # Satoxcoin RPC port (from official spec)
+    RPC_URLS = [u.strip() for u in os.getenv("SATOX_RPC_URLS", "").split(",") if u.strip()]  # Several nodes for failover
+    RPC_HEALTH_INTERVAL = float(os.getenv("SATOX_RPC_HEALTH_INTERVAL", "10"))  # Seconds between node probes
+    RPC_RATE = float(os.getenv("SATOX_RPC_RATE", "50"))  # Max RPC calls per second to the node (0 = unlimited)
+    DONATION_ADDRESS = os.getenv("SATOX_DONATION_ADDRESS", "your_donation_address_here")
+    WATCH_ADDRESSES = [a.strip() for a in os.getenv("SATOX_WATCH_ADDRESSES", "").split(",") if a.strip()]  # Extra addresses to monitor
+    MIN_DONATION = parse_amount(os.getenv("SATOX_MIN_DONATION", "1.0"))  # Minimum donation amount in base units
+    DONATION_GOAL = parse_amount(os.getenv("SATOX_DONATION_GOAL", "0"))  # Stream goal in base units (0 = no goal)
+    ALERT_POLICY = os.getenv("SATOX_ALERT_POLICY", POLICY_ZERO_CONF)  # zero-conf, confirmed or both
+    REQUIRED_CONFIRMATIONS = int(os.getenv("SATOX_CONFIRMATIONS", "6"))  # Confirmations for a final alert
+    INGESTION_MODE = os.getenv("SATOX_INGESTION_MODE", "wallet")  # wallet, mempool, addressindex or p2p
+    INDEX_START_HEIGHT = os.getenv("SATOX_INDEX_START_HEIGHT")  # First block scanned in addressindex mode
+    POLL_INTERVAL = float(os.getenv("SATOX_POLL_INTERVAL", "5"))  # Seconds between wallet polls
+    MEMPOOL_INTERVAL = float(os.getenv("SATOX_MEMPOOL_INTERVAL", "0.5"))  # Seconds between mempool diffs
+    P2P_HOST = os.getenv("SATOX_P2P_HOST", RPC_HOST)  # Node address for p2p mode
+    P2P_PORT = int(os.getenv("SATOX_P2P_PORT", str(DEFAULT_P2P_PORT)))  # Satoxcoin P2P port
+    P2P_MAGIC = os.getenv("SATOX_P2P_MAGIC")  # Network magic as hex (default: read from the block files)
+    DATADIR = os.getenv("SATOX_DATADIR", os.path.expanduser("~/.satoxcoin"))  # Satox Core data directory
+    DEBUG = os.getenv("SATOX_DEBUG", "false").lower() == "true"
+    # Confirmed transactions fetched for enrichment persist here across restarts (empty = memory only)
+    TX_CACHE_PATH = os.getenv("SATOX_TX_CACHE", os.path.join(log_dir, "tx_cache.db"))
+    LEDGER_PATH = os.getenv("SATOX_LEDGER", "donations.jsonl")  # JSONL donation events, relative to the log (empty = off)
+    DONATION_DB = os.getenv("SATOX_DONATION_DB", "")  # SQLite donation store for dashboards, relative to the log (empty = off)
+    SPAN_CAPACITY = int(os.getenv("SATOX_SPAN_CAPACITY", "4096"))  # Pipeline spans kept for /debug/spans (0 = off)
+    OVERLAY_LISTEN = os.getenv("SATOX_OVERLAY_LISTEN", "")  # host:port to serve the overlay from the monitor (empty = off)
+    CYCLE_DEADLINE = float(os.getenv("SATOX_CYCLE_DEADLINE", "10"))  # Profile cycles running longer (seconds, 0 = off)
+    PROFILE_SECONDS = float(os.getenv("SATOX_PROFILE_SECONDS", "30"))  # Length of SIGUSR2 and slow-cycle profiles
+    LOG_MAX_MB = float(os.getenv("SATOX_LOG_MAX_MB", "10"))  # Rotate the log at this size (0 = no size limit)
+    LOG_ROTATE_HOURS = float(os.getenv("SATOX_LOG_ROTATE_HOURS", "24"))  # ...and at this age (0 = no age limit)
+    LOG_BACKUPS = int(os.getenv("SATOX_LOG_BACKUPS", "7"))  # Gzipped segments kept (0 = keep all)
+    LOG_REPEAT_WINDOW = float(os.getenv("SATOX_LOG_REPEAT_WINDOW", "60"))  # Collapse identical errors within (seconds)
+
+# Configuration (environment only until initialize() loads .env)
+load_settings()
+
+# Queue, listener thread and rotating file behind the root logger, once set up
+log_pipeline = None
+
+def setup_logging(path: str = log_file) -> None:
+    """Log to the console and to path through a queue and a listener thread
+    
+    Callers only enqueue records; the listener writes them, rotating path by
+    size and age and gzipping old segments in the background.
+    """
+    global log_pipeline
+    from log_pipeline import LogPipeline
+    
+    shutdown_logging()
+    log_pipeline = LogPipeline(
+        path,
+        level=logging.DEBUG if DEBUG else logging.INFO,
+        max_bytes=int(LOG_MAX_MB * 1024 * 1024),
+        interval=LOG_ROTATE_HOURS * 3600,
+        backup_count=LOG_BACKUPS,
+        repeat_window=LOG_REPEAT_WINDOW
+    )
+    log_pipeline.start()
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Write out queued log records and stop the listener thread"""
+    global log_pipeline
+    if log_pipeline is not None:
+        log_pipeline.stop()
+        log_pipeline = None
+
+def initialize(env_file: str = ENV_FILE, log_path: Optional[str] = log_file) -> None:
+    """Load .env, re-read the settings and set up logging (unless log_path is None)
+    
+    Called by the command-line entry points before building a monitor;
+    importing this module has no side effects beyond reading the environment.
+    """
+    load_env_file(env_file)
+    load_settings()
+    if log_path is not None:
+        setup_logging(log_path)
+
 class DonationAlert:
-    """Represents a donation alert with amount, address, and timestamp"""
+    """Represents a donation alert with amount (integer base units), address, and timestamp"""
     
-    def __init__(self, amount: float, address: str):
-        self.amount = amount
+    def __init__(self, amount: int, address: str):
+        self.amount = coerce_amount(amount)
         self.address = address
         self.timestamp = time.time()
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert alert to dictionary for serialization"""
+        """Convert alert to dictionary for serialization
+        
+        'amount' stays in SATOX for existing consumers; 'amount_units' is exact.
+        """
         return {
-            'amount': self.amount,
+            'amount': float(format_amount(self.amount, 8)),
+            'amount_units': self.amount,
             'address': self.address,
             'timestamp': self.timestamp
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DonationAlert':
-        """Create alert from dictionary"""
-        alert = cls(data['amount'], data['address'])
+        """Create alert from dictionary (amount_units, or amount in SATOX)"""
+        amount = data['amount_units'] if 'amount_units' in data else parse_amount(data['amount'])
+        alert = cls(amount, data['address'])
         alert.timestamp = data.get('timestamp', time.time())
         return alert
     
     def __str__(self) -> str:
         """String representation of the alert"""
-        return f"DonationAlert(amount={self.amount}, address={self.address[:8]}..., timestamp={self.timestamp})"
+        return f"DonationAlert(amount={format_amount(self.amount, 8)}, address={self.address[:8]}..., timestamp={self.timestamp})"
     
     def __repr__(self) -> str:
         """Detailed string representation"""
@@ -117,14 +209,147 @@ class SatoxWalletMonitor:
             self.log_file = log_file
             
         self.rpc_auth = (RPC_USER, RPC_PASSWORD)
-        self.processed_txs = set()
+        # (txid, address) of every donation already credited
+        self.processed_txs: Set[Tuple[str, str]] = set()
+        # Opened on the first donation and kept open (see log_donation)
+        self._donation_log: Optional[TextIO] = None
+        
+        settings = config or {}
+        
+        # RPC endpoints: an explicit list, else the single rpc_url; de-duplication
+        # state below is shared, so failing over never re-alerts a donation
+        if settings.get('rpc_urls'):
+            rpc_urls = list(settings['rpc_urls'])
+        elif config and 'rpc_url' in config:
+            rpc_urls = [self.rpc_url]
+        else:
+            rpc_urls = RPC_URLS or [self.rpc_url]
+        self.rpc_urls = rpc_urls
+        self.nodes = NodePool(rpc_urls, auth=self.rpc_auth,
+                              health_interval=settings.get('rpc_health_interval', RPC_HEALTH_INTERVAL))
+        # Detection, enrichment, balance checks and backfill share the node by priority
+        self.rpc_scheduler = RpcScheduler(rate=settings.get('rpc_rate', RPC_RATE))
+        # Enrichment lookups are cached; only transactions past reorg depth go to disk
+        self.tx_cache = TransactionCache(
+            settings.get('tx_cache_path', TX_CACHE_PATH) or None,
+            min_confirmations=max(settings.get('confirmations', REQUIRED_CONFIRMATIONS), DEFAULT_MIN_CONFIRMATIONS)
+        )
+        # Timed pipeline stages of recent cycles, dumped via /debug/spans or SIGUSR1
+        self.spans = SpanRecorder(settings.get('span_capacity', SPAN_CAPACITY))
+        # Structured donation events for donation_ledger.py, opened on the first one
+        self.ledger_path = settings.get('ledger_path', LEDGER_PATH)
+        self._ledger = None
+        self._donors: Dict[str, str] = {}
+        # Optional SQLite copy for dashboards (donation_store.py), written once per cycle
+        self.donation_db = settings.get('donation_db', DONATION_DB)
+        self.donation_store = None
+        # Stack samples on demand (SIGUSR2, /debug/profile) and of cycles overrunning their deadline
+        self.profiler = SamplingProfiler()
+        self.watchdog = SlowCycleWatchdog(
+            self.profiler, settings.get('cycle_deadline', CYCLE_DEADLINE),
+            os.path.dirname(os.path.abspath(self.log_file)), seconds=settings.get('profile_seconds', PROFILE_SECONDS)
+        )
+        self.min_donation = coerce_amount(settings.get('min_donation', MIN_DONATION))
+        self.totals = DonationTotals(goal=settings.get('donation_goal', DONATION_GOAL) or None)
+        
+        # Confirmation policy; the tracker is only needed when waiting for blocks
+        self.alert_policy = settings.get('alert_policy', ALERT_POLICY)
+        if self.alert_policy not in ALERT_POLICIES:
+            raise ValueError(f"Unknown alert policy {self.alert_policy!r}; expected one of {', '.join(ALERT_POLICIES)}")
+        self.tracker: Optional[ConfirmationTracker] = None
+        if self.alert_policy != POLICY_ZERO_CONF:
+            self.tracker = ConfirmationTracker(settings.get('confirmations', REQUIRED_CONFIRMATIONS))
+        # Heights of blocks older than the tracker remembers, by hash
+        self._block_heights: Dict[str, int] = {}
+        
+        # Addresses whose incoming payments count as donations
+        extra_addresses = settings.get('watch_addresses', WATCH_ADDRESSES)
+        self.watched_addresses: Set[str] = set()
+        self.load_watch_addresses([self.wallet_address] + list(extra_addresses))
+        
+        # Ingestion: the wallet poll always runs; mempool mode adds a fast diff loop
+        self.ingestion_mode = settings.get('ingestion_mode', INGESTION_MODE)
+        if self.ingestion_mode not in INGESTION_MODES:
+            raise ValueError(f"Unknown ingestion mode {self.ingestion_mode!r}; expected one of {', '.join(INGESTION_MODES)}")
+        self.poll_interval = settings.get('poll_interval', POLL_INTERVAL)
+        self.mempool_interval = settings.get('mempool_interval', MEMPOOL_INTERVAL)
+        self.mempool_watcher: Optional[MempoolWatcher] = None
+        if self.ingestion_mode == "mempool":
+            self.mempool_watcher = MempoolWatcher(self.rpc_call, self.rpc_batch, self.watched_addresses)
+        
+        # P2P mode streams mempool transactions over one connection to the node
+        self.p2p_listener: Optional[P2PMempoolListener] = None
+        if self.ingestion_mode == "p2p":
+            magic = resolve_network_magic(settings.get('p2p_magic', P2P_MAGIC), settings.get('datadir', DATADIR))
+            self.p2p_listener = P2PMempoolListener(
+                settings.get('p2p_host', P2P_HOST), settings.get('p2p_port', P2P_PORT),
+                self.watched_addresses, magic
+            )
+        
+        # Address index mode replaces the wallet poll entirely (no hot wallet needed)
+        self.address_index: Optional[AddressIndexSource] = None
+        if self.ingestion_mode == "addressindex":
+            start_height = settings.get('index_start_height', INDEX_START_HEIGHT)
+            self.address_index = AddressIndexSource(
+                self.rpc_call, self.watched_addresses,
+                start_height=int(start_height) if start_height is not None else None
+            )
+        
+        # Set by stop() to end run() from another thread
+        self._stop_event = threading.Event()
+        self._next_poll = 0.0
         
         # Windows-compatible file paths
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.alert_file = os.path.join(script_dir, "alert.txt")
         
-    def rpc_call(self, method: str, params: list = None) -> Optional[Dict[str, Any]]:
-        """Make RPC call to Satox Core wallet"""
+        # Prometheus metrics, scraped from the overlay server's /metrics
+        self.metrics = MetricsRegistry()
+        self._init_metrics()
+        
+    def _init_metrics(self) -> None:
+        """Register the monitor's counters, histograms and scrape-time gauges"""
+        metrics = self.metrics
+        self._rpc_calls = metrics.counter(
+            "satox_rpc_calls_total", "RPC calls by method and outcome (ok, error, unavailable)", ("method", "outcome"))
+        self._rpc_latency = metrics.histogram(
+            "satox_rpc_latency_seconds", "RPC round trip time, excluding the scheduler wait", ("method",))
+        self._donations_detected = metrics.counter(
+            "satox_donations_detected_total", "Donation state changes (seen, confirmed, reconfirmed, retracted)", ("event",))
+        self._alerts_delivered = metrics.counter(
+            "satox_alerts_delivered_total", "Alerts written to the overlay", ("state",))
+        self._cycle_duration = metrics.histogram(
+            "satox_cycle_duration_seconds", "Duration of one monitor poll cycle")
+        metrics.gauge(
+            "satox_rpc_queue_depth", "RPC calls waiting for a scheduler slot", self._queue_depth, ("priority",))
+        metrics.gauge(
+            "satox_dedup_entries", "Payments (txid, address) remembered for de-duplication", lambda: len(self.processed_txs))
+        metrics.counter_callback(
+            "satox_cache_lookups_total", "Cache lookups by cache and result", self._cache_lookups, ("cache", "result"))
+        
+    def _queue_depth(self) -> Dict[Tuple[str], int]:
+        return {(name,): cls.waiting for name, cls in self.rpc_scheduler.classes.items()}
+    
+    def _cache_lookups(self) -> Dict[Tuple[str, str], int]:
+        tx_cache = self.tx_cache
+        addresses = default_validator.cache_info()
+        return {
+            ("tx", "memory_hit"): tx_cache.memory_hits,
+            ("tx", "disk_hit"): tx_cache.disk_hits,
+            ("tx", "miss"): tx_cache.misses,
+            ("address", "hit"): addresses.hits,
+            ("address", "miss"): addresses.misses,
+        }
+    
+    def rpc_call(self, method: str, params: list = None, raise_unavailable: bool = False,
+                 priority: str = PRIORITY_DETECTION) -> Optional[Dict[str, Any]]:
+        """Make RPC call to Satox Core wallet
+        
+        Returns None on RPC errors and, unless raise_unavailable is set,
+        when no node is reachable; with raise_unavailable the caller gets
+        RPCUnavailable instead so "node down" is not mistaken for "empty".
+        The call waits for a slot of its priority class in rpc_scheduler.
+        """
         if params is None:
             params = []
             
@@ -136,32 +361,91 @@ class SatoxWalletMonitor:
         }
         
         try:
-            response = requests.post(
-                self.rpc_url,
-                json=payload,
-                auth=self.rpc_auth,
-                timeout=10
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            if "error" in result and result["error"] is not None:
-                logger.error(f"RPC Error: {result['error']}")
-                return None
-                
-            return result.get("result")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"RPC request failed: {e}")
+            queued = self.spans.start()
+            with self.rpc_scheduler.slot(priority):
+                self.spans.finish("queue", queued, {"method": method})
+                sent = time.perf_counter()
+                result = self.nodes.request(payload)
+                self._rpc_latency.observe(time.perf_counter() - sent, method)
+        except RPCUnavailable as e:
+            # Outages are logged once by the node pool when a circuit opens
+            logger.debug(f"RPC request {method} failed: {e}")
+            self._rpc_calls.inc(method, "unavailable")
+            if raise_unavailable:
+                raise
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response: {e}")
+        
+        if "error" in result and result["error"] is not None:
+            logger.error(f"RPC Error: {result['error']}")
+            self._rpc_calls.inc(method, "error")
             return None
+            
+        self._rpc_calls.inc(method, "ok")
+        return result.get("result")
+    
+    def rpc_batch(self, calls: List[Tuple[str, list]], priority: str = PRIORITY_DETECTION) -> List[Any]:
+        """Send several RPC calls in one JSON-RPC batch request
+        
+        Returns results in call order, with None for calls that failed.
+        """
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "1.0", "id": index, "method": method, "params": params}
+            for index, (method, params) in enumerate(calls)
+        ]
+        
+        try:
+            queued = self.spans.start()
+            with self.rpc_scheduler.slot(priority):
+                self.spans.finish("queue", queued, {"method": "batch"})
+                sent = time.perf_counter()
+                replies = self.nodes.request(payload)
+                self._rpc_latency.observe(time.perf_counter() - sent, "batch")
+        except RPCUnavailable as e:
+            logger.debug(f"RPC batch request failed: {e}")
+            for method, _ in calls:
+                self._rpc_calls.inc(method, "unavailable")
+            return [None] * len(calls)
+        
+        results: List[Any] = [None] * len(calls)
+        for reply in replies if isinstance(replies, list) else []:
+            index = reply.get("id")
+            if isinstance(index, int) and 0 <= index < len(calls) and reply.get("error") is None:
+                results[index] = reply.get("result")
+        for (method, _), result in zip(calls, results):
+            self._rpc_calls.inc(method, "ok" if result is not None else "error")
+        return results
+    
+    @property
+    def rpc_available(self) -> bool:
+        """False while every RPC endpoint is cut off by its circuit breaker"""
+        return self.nodes.available
+    
+    def rpc_status(self) -> Dict[str, Any]:
+        """Breaker state, failure counts, retry budget, scheduler queues and cache hits"""
+        status = self.nodes.stats()
+        status["scheduler"] = self.rpc_scheduler.stats()
+        status["tx_cache"] = self.tx_cache.stats()
+        return status
+    
+    def load_watch_addresses(self, addresses: Iterable[str]) -> Set[str]:
+        """Validate addresses in one batch and add the valid ones to the watch set"""
+        results = validate_many(addresses)
+        for address, valid in results.items():
+            if valid:
+                self.watched_addresses.add(address)
+            elif address not in ("your_donation_address_here", ""):
+                logger.warning(f"Ignoring invalid watch address: {address}")
+        return {address for address, valid in results.items() if valid}
     
     def get_sender_address(self, txid: str) -> str:
         """Extract sender address from transaction"""
         try:
-            tx = self.rpc_call("gettransaction", [txid])
+            with self.spans.span("enrich"):
+                tx = self.tx_cache.fetch(
+                    txid, lambda: self.rpc_call("gettransaction", [txid], priority=PRIORITY_ENRICHMENT)
+                )
             if not tx:
                 return "Unknown"
                 
@@ -178,38 +462,190 @@ class SatoxWalletMonitor:
     def check_for_donations(self) -> None:
         """Check for new donations and generate alerts"""
         try:
+            # Follow the chain tip first so inclusion heights are current
+            if self.tracker is not None:
+                self.sync_chain_tip()
+            
+            if self.address_index is not None:
+                with self.spans.span("poll", {"source": "addressindex"}):
+                    payments = list(self.address_index.poll())
+                for txid, address, amount, height in payments:
+                    self.handle_donation(txid, address, amount, height)
+                return
+            
             # Get recent transactions
-            transactions = self.rpc_call("listtransactions", ["*", 50, 0, True])
+            with self.spans.span("poll", {"source": "wallet"}):
+                transactions = self.rpc_call("listtransactions", ["*", 50, 0, True], raise_unavailable=True)
             if not transactions:
                 return
-                
-            for tx in transactions:
-                txid = tx.get("txid")
-                if not txid or txid in self.processed_txs:
-                    continue
-                    
-                # Check if it's a receive transaction to our donation address
-                if (tx.get("category") == "receive" and 
-                    tx.get("address") == DONATION_ADDRESS and
-                    tx.get("amount", 0) >= MIN_DONATION):
-                    
-                    amount = tx.get("amount", 0)
-                    donor_address = self.get_sender_address(txid)
-                    
-                    # Generate alert message
-                    message = f"{donor_address[:8]}... donated {amount:.2f} SATOX!"
-                    
-                    # Write to alert file
-                    self.write_alert(message)
-                    
-                    # Mark as processed
-                    self.processed_txs.add(txid)
-                    
-                    logger.info(f"New donation: {amount} SATOX from {donor_address[:8]}...")
+            
+            # (txid, address) -> [amount, inclusion height, conflicted]
+            received: Dict[Tuple[str, str], List[Any]] = {}
+            with self.spans.span("parse", {"count": len(transactions)}):
+                for tx in transactions:
+                    # Check if it's a receive transaction to our donation address
+                    if tx.get("category") != "receive":
+                        continue
+                    key = (tx.get("txid"), tx.get("address"))
+                    if key in received:
+                        # One entry per output: sum outputs paying the same address
+                        received[key][0] += tx.get("amount", 0)
+                        continue
+                    confirmations = tx.get("confirmations", 0)
+                    if confirmations < 0:
+                        # Conflicted (double-spent) transaction
+                        received[key] = [tx.get("amount", 0), None, True]
+                        continue
+                    height = None
+                    if confirmations > 0 and self.tracker is not None:
+                        height = self.inclusion_height(tx, confirmations)
+                    received[key] = [tx.get("amount", 0), height, False]
+            
+            for (txid, address), (amount, height, conflicted) in received.items():
+                self.handle_donation(txid, address, amount, height, conflicted)
                     
+        except RPCUnavailable as e:
+            logger.debug(f"Skipping donation check, Satox Core unavailable: {e}")
         except Exception as e:
             logger.error(f"Error checking for donations: {e}")
     
+    def check_mempool(self) -> None:
+        """Alert on donations that just entered the node's mempool"""
+        try:
+            with self.spans.span("poll", {"source": "mempool"}):
+                payments = list(self.mempool_watcher.poll())
+            for txid, address, amount, height in payments:
+                self.handle_donation(txid, address, amount, height)
+        except Exception as e:
+            logger.error(f"Error checking mempool: {e}")
+    
+    def check_p2p(self) -> None:
+        """Alert on donations relayed by the node over P2P"""
+        try:
+            with self.spans.span("poll", {"source": "p2p"}):
+                payments = list(self.p2p_listener.poll())
+            for txid, address, amount, height in payments:
+                self.handle_donation(txid, address, amount, height)
+        except Exception as e:
+            logger.error(f"Error checking P2P payments: {e}")
+    
+    def inclusion_height(self, tx: Dict[str, Any], confirmations: int) -> Optional[int]:
+        """Height of the block a listtransactions entry was mined in
+        
+        Taken from the entry's blockheight or blockhash rather than its
+        confirmations, which count from a tip that may have moved since
+        sync_chain_tip(). None when the block is no longer on the main chain.
+        """
+        height = tx.get("blockheight")
+        if isinstance(height, int):
+            return height
+        block_hash = tx.get("blockhash")
+        if not block_hash:
+            # Nodes that omit the block: estimate from the tip
+            if self.tracker.tip_height is None:
+                return None
+            return self.tracker.tip_height - confirmations + 1
+        height = self.tracker.height_of(block_hash)
+        if height is None:
+            height = self._block_heights.get(block_hash)
+        if height is None:
+            block = self.rpc_call("getblock", [block_hash, 1])
+            if not block or block.get("confirmations", 0) <= 0:
+                return None
+            height = block["height"]
+            if len(self._block_heights) >= 1024:
+                self._block_heights.clear()
+            self._block_heights[block_hash] = height
+        return height
+    
+    def sync_chain_tip(self) -> None:
+        """Follow the best block, confirming or retracting tracked donations"""
+        with self.spans.span("poll", {"source": "tip"}):
+            best_hash = self.rpc_call("getbestblockhash", raise_unavailable=True)
+            if not best_hash:
+                return
+            events = list(self.tracker.update_tip(best_hash, lambda block_hash: self.rpc_call("getblock", [block_hash, 1])))
+        for event in events:
+            self._apply_event(event.kind, event.donation.txid, event.donation.address, event.donation.amount)
+    
+    def handle_donation(self, txid: Optional[str], address: Optional[str], amount: Any,
+                        height: Optional[int] = None, conflicted: bool = False) -> None:
+        """Filter, de-duplicate and alert a payment seen by any ingestion source
+        
+        height is the block the payment was included in (None while unconfirmed).
+        """
+        with self.spans.span("dedup"):
+            events = self._dedup(txid, address, amount, height, conflicted)
+        for kind, event_txid, event_address, event_amount in events:
+            self._apply_event(kind, event_txid, event_address, event_amount)
+    
+    def _dedup(self, txid: Optional[str], address: Optional[str], amount: Any,
+               height: Optional[int], conflicted: bool) -> List[Tuple[str, str, str, int]]:
+        """(kind, txid, address, amount) events a payment causes after filtering"""
+        if not txid or address not in self.watched_addresses:
+            return []
+        amount = coerce_amount(amount)
+        if amount < self.min_donation:
+            return []
+        
+        key = (txid, address)
+        if self.tracker is None:
+            if key in self.processed_txs or conflicted:
+                return []
+            return [(CONFIRMED, txid, address, amount)]
+        
+        if key in self.processed_txs and key not in self.tracker:
+            # Confirmed deeper than the reorg window and already forgotten
+            return []
+        if conflicted:
+            height = None
+        return [(event.kind, event.donation.txid, event.donation.address, event.donation.amount)
+                for event in self.tracker.observe(txid, address, amount, height)]
+    
+    def _apply_event(self, kind: str, txid: str, address: str, amount: int) -> None:
+        """Turn a donation state change into alerts, totals and log entries"""
+        self._donations_detected.inc(kind)
+        if kind == SEEN:
+            if self.alert_policy == POLICY_BOTH:
+                self.deliver_alert(txid, amount, provisional=True)
+        elif kind == CONFIRMED:
+            donor_address = self.deliver_alert(txid, amount)
+            self.totals.add(address, amount)
+            
+            # Persist and mark as processed
+            with self.spans.span("deliver", {"to": "log"}):
+                self.log_donation(amount, donor_address)
+                self.record_donation(kind, txid, address, donor_address, amount)
+            self.processed_txs.add((txid, address))
+        elif kind == RECONFIRMED:
+            self.totals.add(address, amount)
+            self.processed_txs.add((txid, address))
+            self.record_donation(kind, txid, address, self._donors.get(txid, address), amount)
+            logger.info(f"Donation {txid[:16]}... re-confirmed after reorg")
+        elif kind == RETRACTED:
+            self.totals.remove(address, amount)
+            self.processed_txs.discard((txid, address))
+            self.record_donation(kind, txid, address, self._donors.get(txid, address), amount)
+            logger.warning(f"Donation {txid[:16]}... of {format_amount(amount, 8)} SATOX retracted by reorg")
+    
+    def deliver_alert(self, txid: str, amount: int, provisional: bool = False) -> str:
+        """Write the overlay alert for a donation and return the donor address"""
+        donor_address = self.get_sender_address(txid)
+        
+        # Write to alert file
+        with self.spans.span("deliver", {"to": "overlay"}):
+            self.write_alert(self.render_alert(donor_address, amount, provisional))
+        self._alerts_delivered.inc("pending" if provisional else "confirmed")
+        
+        suffix = " (pending)" if provisional else ""
+        logger.info(f"New donation: {format_amount(amount, 8)} SATOX from {donor_address[:8]}...{suffix}")
+        return donor_address
+    
+    def render_alert(self, donor_address: str, amount: int, provisional: bool = False) -> str:
+        """Format the overlay alert text for a donation"""
+        suffix = " (pending)" if provisional else ""
+        return f"{donor_address[:8]}... donated {format_amount(amount)} SATOX!{suffix}"
+    
     def write_alert(self, message: str) -> None:
         """Write alert message to file for OBS overlay"""
         try:
@@ -257,48 +693,111 @@ class SatoxWalletMonitor:
         return f"{address[:4]}****"
     
     def validate_address(self, address: str) -> bool:
-        """Validate Satoxcoin address format"""
-        # Basic validation: starts with 'S' and is reasonable length
-        if not address or len(address) < 15 or len(address) > 34:
-            return False
-        if not address.startswith('S'):
-            return False
-        return True
+        """Validate Satoxcoin address (Base58Check checksum and version byte)"""
+        return _validate_address(address)
     
-    def get_wallet_balance(self) -> Optional[float]:
-        """Get current wallet balance"""
+    def get_wallet_balance(self) -> Optional[int]:
+        """Get current wallet balance in base units"""
         try:
-            result = self.rpc_call("getbalance")
+            result = self.rpc_call("getbalance", priority=PRIORITY_BALANCE)
             if result is not None:
-                return float(result)
+                return coerce_amount(result)
             return None
         except Exception as e:
             logger.error(f"Error getting wallet balance: {e}")
             return None
     
-    def create_donation_alert(self, amount: float, address: str) -> DonationAlert:
+    def create_donation_alert(self, amount: int, address: str) -> DonationAlert:
         """Create a donation alert object"""
         return DonationAlert(amount, address)
     
-    def log_donation(self, amount: float, address: str) -> None:
-        """Log donation to file"""
+    def log_donation(self, amount: int, address: str, timestamp: Optional[float] = None) -> None:
+        """Log donation (amount in base units) to file
+        
+        timestamp defaults to now; backfills pass the block time.
+        """
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            when = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+            timestamp = when.strftime("%Y-%m-%d %H:%M:%S")
             obfuscated_address = self.obfuscate_address(address)
-            log_message = f"[{timestamp}] Donation: {amount:.2f} SATOX from {obfuscated_address}\n"
+            log_message = f"[{timestamp}] Donation: {format_amount(amount)} SATOX from {obfuscated_address}"
             
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_message)
+            if log_pipeline is not None and log_pipeline.path == os.path.abspath(self.log_file):
+                # Same file as the rotating log: the logging thread writes it
+                log_pipeline.append(log_message)
+            else:
+                self._open_donation_log().write(log_message + "\n")
                 
-            logger.info(f"Donation logged: {amount} SATOX from {obfuscated_address}")
+            logger.info(f"Donation logged: {format_amount(amount, 8)} SATOX from {obfuscated_address}")
         except Exception as e:
             logger.error(f"Error logging donation: {e}")
     
+    def record_donation(self, kind: str, txid: str, address: str, donor: str, amount: int,
+                        timestamp: Optional[float] = None) -> None:
+        """Append a donation event to the JSONL ledger (see donation_ledger.py)
+        
+        A relative ledger_path is placed next to the log file; timestamp
+        defaults to now, backfills pass the block time. With donation_db
+        set the event is also buffered for the SQLite store until
+        commit_donations(), with the same timestamp so a later
+        "donation_store.py import" of the ledger skips it.
+        """
+        self._donors[txid] = donor
+        if timestamp is None:
+            timestamp = time.time()
+        directory = os.path.dirname(os.path.abspath(self.log_file))
+        if self.ledger_path:
+            try:
+                if self._ledger is None:
+                    from donation_ledger import DonationLedger
+                    self._ledger = DonationLedger(os.path.join(directory, self.ledger_path))
+                self._ledger.append(kind, txid, address, donor, amount, timestamp)
+            except Exception as e:
+                logger.error(f"Error recording donation in ledger: {e}")
+        if self.donation_db:
+            try:
+                if self.donation_store is None:
+                    from donation_store import DonationStore
+                    self.donation_store = DonationStore(os.path.join(directory, self.donation_db))
+                self.donation_store.add(kind, txid, address, donor, amount, timestamp)
+            except Exception as e:
+                logger.error(f"Error recording donation in donation store: {e}")
+    
+    def commit_donations(self) -> None:
+        """Write the events recorded since the last call to the SQLite store in one transaction
+        
+        The insert runs on the store's writer thread, so this does not wait on the disk.
+        """
+        if self.donation_store is not None:
+            self.donation_store.commit()
+    
+    def _open_donation_log(self) -> TextIO:
+        """The donation log file, opened once (line buffered) instead of per donation"""
+        f = self._donation_log
+        if f is None or f.name != self.log_file:
+            if f is not None:
+                f.close()
+            f = self._donation_log = open(self.log_file, "a", encoding="utf-8", buffering=1)
+        return f
+    
+    def close(self) -> None:
+        """Release the transaction cache, the donation log file, the ledger and the donation store"""
+        self.tx_cache.close()
+        if self._donation_log is not None:
+            self._donation_log.close()
+            self._donation_log = None
+        if self._ledger is not None:
+            self._ledger.close()
+            self._ledger = None
+        if self.donation_store is not None:
+            self.donation_store.close()
+            self.donation_store = None
+    
     def run(self) -> None:
         """Main monitoring loop"""
         logger.info("Starting Satoxcoin donation monitor...")
         logger.info(f"Monitoring address: {DONATION_ADDRESS}")
-        logger.info(f"Minimum donation: {MIN_DONATION} SATOX")
+        logger.info(f"Minimum donation: {format_amount(self.min_donation, 8)} SATOX")
         logger.info(f"Alert file: {self.alert_file}")
         logger.info(f"Log file: {log_file}")
         
@@ -309,23 +808,60 @@ class SatoxWalletMonitor:
         
         logger.info("Monitor is running. Press Ctrl+C or 'q' to stop.")
         
+        fast_source = self.mempool_watcher is not None or self.p2p_listener is not None
+        tick = self.mempool_interval if fast_source else self.poll_interval
+        if self.p2p_listener is not None:
+            self.p2p_listener.start()
+        self.watchdog.start()
         try:
-            while True:
+            while not self._stop_event.is_set():
                 # Check for keypress (Windows)
                 if self.check_windows_keypress():
                     logger.info("Monitor stopped by user")
                     break
                 
-                self.check_for_donations()
-                time.sleep(5)  # Check every 5 seconds
+                self.run_cycle(time.monotonic())
+                self._stop_event.wait(tick)
                 
         except KeyboardInterrupt:
             logger.info("Monitor stopped by user (Ctrl+C)")
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
+        finally:
+            self.watchdog.stop()
+            if self.p2p_listener is not None:
+                self.p2p_listener.stop()
+            self.close()
+    
+    def run_cycle(self, now: float) -> None:
+        """Poll the fast ingestion sources, and the wallet when its interval is due
+        
+        now is a time.monotonic() reading; the soak test passes a virtual clock.
+        """
+        started = time.perf_counter()
+        self.watchdog.cycle_started()
+        try:
+            with self.spans.span("cycle"):
+                if self.mempool_watcher is not None:
+                    self.check_mempool()
+                if self.p2p_listener is not None:
+                    self.check_p2p()
+                
+                if now >= self._next_poll:
+                    self.check_for_donations()
+                    self._next_poll = now + self.poll_interval
+                self.commit_donations()
+        finally:
+            self.watchdog.cycle_finished()
+        self._cycle_duration.observe(time.perf_counter() - started)
+    
+    def stop(self) -> None:
+        """Ask run() to return after the current iteration"""
+        self._stop_event.set()
 
 def main():
     """Main entry point with improved configuration validation"""
+    initialize()
     print("🪙 Satoxcoin Stream Donation Overlay")
     print("=" * 50)
     
@@ -359,16 +895,17 @@ def main():
     # Validate donation address format
     if not validate_satox_address(DONATION_ADDRESS):
         print(f"❌ Invalid donation address format: {DONATION_ADDRESS}")
-        print("   Satoxcoin addresses should start with 'S' and be 26-35 characters long")
+        print("   Satoxcoin addresses are Base58Check encoded, start with 'S' and carry a valid checksum")
         return 1
     
     print(f"✅ Configuration validated")
     print(f"   RPC Host: {RPC_HOST}:{RPC_PORT}")
     print(f"   Donation Address: {DONATION_ADDRESS[:8]}...{DONATION_ADDRESS[-4:]}")
-    print(f"   Minimum Donation: {MIN_DONATION} SATOX")
+    print(f"   Minimum Donation: {format_amount(MIN_DONATION, 8)} SATOX")
     print(f"   Debug Mode: {DEBUG}")
     print()
     
+    overlay = None
     try:
         monitor = SatoxWalletMonitor()
         
@@ -385,6 +922,16 @@ def main():
         print("✅ Connected to Satox Core successfully")
         print()
         
+        # Diagnostics: SIGUSR1 dumps pipeline spans next to the log file
+        install_dump_signal(monitor.spans, log_dir)
+        # SIGUSR2 starts (and a second one stops) a sampling profile
+        install_profile_signal(monitor.profiler, log_dir, PROFILE_SECONDS)
+        if OVERLAY_LISTEN:
+            from overlay_server import OverlayServer
+            overlay = OverlayServer(os.path.dirname(monitor.alert_file), OVERLAY_LISTEN,
+                                    spans=monitor.spans, metrics=monitor.metrics, profiler=monitor.profiler)
+            print(f"🌐 Overlay served at {overlay.start()}/alert.html")
+        
         # Start monitoring
         monitor.run()
         
@@ -394,17 +941,15 @@ def main():
         logger.error(f"Unexpected error: {e}")
         print(f"❌ Error: {e}")
         return 1
+    finally:
+        if overlay is not None:
+            overlay.stop()
     
     return 0
 
 def validate_satox_address(address: str) -> bool:
-    """Validate Satoxcoin address format"""
-    if not address or len(address) < 26 or len(address) > 35:
-        return False
-    if not address.startswith('S'):
-        return False
-    # Basic format check - could be enhanced with proper checksum validation
-    return all(c in '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz' for c in address)
+    """Validate Satoxcoin address (Base58Check checksum and version byte)"""
+    return _validate_address(address)
 
 if __name__ == "__main__":
     main()